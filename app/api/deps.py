@@ -2,40 +2,68 @@
 from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.user import User
-from app.repositories.user_repo import UserRepository
+from app.repositories.user_repo import AsyncUserRepository, UserRepository
 from app.core.security import decode_access_token
+from app.core.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _user_id_from_token(token: str) -> int:
+    """User ID in a JWT, or 401."""
     # Decode token
     payload = decode_access_token(token)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     # Get user ID from token
     user_id: str = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return int(user_id)
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user from JWT token."""
+    user = UserRepository.get_by_id(db, _user_id_from_token(token))
+    if user is None:
+        raise _credentials_exception()
     
-    # Get user from database
-    user = UserRepository.get_by_id(db, int(user_id))
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """get_current_user for async endpoints (looks the user up on the async engine)."""
+    user = await AsyncUserRepository.get_by_id(db, _user_id_from_token(token))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     return user
 
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """Require an authenticated user listed in settings.admin_usernames."""
+    if current_user.username not in settings.admin_usernames:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
@@ -5,6 +5,8 @@ from app.api.v1 import workspace_router
 from app.api.v1 import chat_router
 from app.api.v1 import mcp_router  # DEPRECATED: use connected_app_router
 from app.api.v1 import connected_app_router
+from app.api.v1 import admin_router
+from app.api.v1 import metrics_router
 
 __all__ = [
     "auth_router",
@@ -13,5 +15,7 @@ __all__ = [
     "chat_router",
     "mcp_router",
     "connected_app_router",
+    "admin_router",
+    "metrics_router",
 ]
 
@@ -0,0 +1,98 @@
+"""Admin router for inspecting runtime routing decisions and stats, and for profiling runs."""
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.api.deps import get_admin_user
+from app.db.session import get_db
+from app.models.user import User
+from app.repositories.agent_run_repo import AgentRunRepository
+from app.core.adaptive_router import get_adaptive_router
+from app.core.config import settings
+from app.telemetry.profiling import profiler_backend, profiling_switch
+from app.telemetry.stats import llm_stats, research_stats
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/model-router")
+def get_model_router_state(current_user: User = Depends(get_admin_user)):
+    """Adaptive model router configuration and per-node/model stats."""
+    return {
+        "enabled": settings.model_router_enabled,
+        "candidates": settings.model_router_candidates,
+        "slo_p95_s": settings.model_router_slo_p95_s,
+        "max_error_rate": settings.model_router_max_error_rate,
+        "max_json_failure_rate": settings.model_router_max_json_failure_rate,
+        "min_samples": settings.model_router_min_samples,
+        "exploration": settings.model_router_exploration,
+        "stats": get_adaptive_router().snapshot(),
+    }
+
+
+@router.get("/model-router/decisions")
+def get_model_router_decisions(limit: int = 50, current_user: User = Depends(get_admin_user)):
+    """Most recent model routing decisions (newest first)."""
+    decisions = list(get_adaptive_router().decisions)
+    return list(reversed(decisions))[:limit]
+
+
+@router.get("/latency")
+def get_latency_stats(current_user: User = Depends(get_admin_user)):
+    """Per-model LLM and per-provider research latency stats."""
+    return {
+        "llm": llm_stats.snapshot(),
+        "research": research_stats.snapshot(),
+    }
+
+
+@router.get("/profiling")
+def get_profiling_state(current_user: User = Depends(get_admin_user)):
+    """Profiling backend, armed workspaces and recently saved profiles (saved by this process)."""
+    return {
+        "enabled": settings.profiling_enabled,
+        "backend": profiler_backend(),
+        "header": settings.profiling_header,
+        "armed": profiling_switch.snapshot(),
+        "recent": list(reversed(profiling_switch.recent)),
+    }
+
+
+@router.post("/profiling/workspaces/{workspace_id}")
+def arm_workspace_profiling(
+    workspace_id: int,
+    requests: int = 1,
+    ttl_s: float = 3600.0,
+    current_user: User = Depends(get_admin_user),
+):
+    """Profile the workspace's next chat requests (served by any worker process)."""
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Profiling is disabled (PROFILING_ENABLED)")
+    if requests < 1 or ttl_s <= 0:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="requests and ttl_s must be positive")
+    try:
+        return profiling_switch.arm(workspace_id, requests=requests, ttl_s=ttl_s)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workspace not found")
+
+
+@router.delete("/profiling/workspaces/{workspace_id}", status_code=status.HTTP_204_NO_CONTENT)
+def disarm_workspace_profiling(workspace_id: int, current_user: User = Depends(get_admin_user)):
+    """Cancel profiling for a workspace."""
+    if not profiling_switch.disarm(workspace_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workspace is not armed for profiling")
+
+
+@router.get("/agent-runs/{run_id}/profile")
+def get_agent_run_profile(run_id: int, current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+    """Download the profile of a profiled run (.folded from the sampler, HTML from pyinstrument, .prof from cProfile)."""
+    run = AgentRunRepository.get_by_id(db, run_id)
+    if not run or not run.profile_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile for this run")
+    path = Path(run.profile_path)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile file no longer exists")
+    if path.suffix == ".html":
+        return FileResponse(path, media_type="text/html")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
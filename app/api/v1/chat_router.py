@@ -1,39 +1,65 @@
 """Chat router."""
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import json
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
 from app.services.chat_service import ChatService
-from app.repositories.conversation_repo import ConversationRepository
-from app.repositories.message_repo import MessageRepository
+from app.repositories.conversation_repo import AsyncConversationRepository
+from app.repositories.message_repo import AsyncMessageRepository
 from app.schemas.chat import ChatRequest, ChatMessage, ConversationOut, ConversationListResponse
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user_async
+from app.core.config import settings
+from app.utils.pagination import CursorPage, decode_cursor, encode_cursor
 
+# Endpoints are async: the database is reached through the async engine and
+# graph turns run on ChatService's thread pool, not on the request threadpool
 router = APIRouter(prefix="/workspaces/{workspace_id}/chat", tags=["chat"])
 
 
+def format_sse_event(event: Dict[str, Any]) -> str:
+    """
+    Stamp an event's data with the current time and serialize it as an SSE message.
+    
+    Args:
+        event: {"event": name, "data": {...}}
+        
+    Returns:
+        "data: <json>\n\n"
+    """
+    if isinstance(event.get("data"), dict):
+        event["data"]["timestamp"] = datetime.utcnow().isoformat()
+    return f"data: {json.dumps(event)}\n\n"
+
+
+def _profile_requested(request: Request) -> bool:
+    """Whether the request carries the profiling header (ChatService checks the user is an admin)."""
+    return request.headers.get(settings.profiling_header, "").lower() in ("1", "true", "yes")
+
+
 @router.post("")
-def send_message(
+async def send_message(
     workspace_id: int,
     chat_request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a chat message and get response."""
     from app.core.logging import get_logger
     logger = get_logger(__name__)
     
     try:
-        result = ChatService.process_message(
+        result = await ChatService.process_message(
             db,
             current_user,
             workspace_id,
             chat_request.conversation_id,
-            chat_request.message
+            chat_request.message,
+            profile=_profile_requested(request),
         )
         return result
     except ValueError as e:
@@ -51,13 +77,13 @@ def send_message(
 
 
 @router.get("/conversations", response_model=ConversationListResponse)
-def list_conversations(
+async def list_conversations(
     workspace_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List conversations in a workspace."""
-    conversations = ConversationRepository.get_by_workspace(db, workspace_id, limit=50, offset=0)
+    conversations = await AsyncConversationRepository.get_by_workspace(db, workspace_id, limit=50, offset=0)
     return ConversationListResponse(
         conversations=[ConversationOut.from_orm(c) for c in conversations],
         total=len(conversations)
@@ -65,34 +91,29 @@ def list_conversations(
 
 
 @router.post("/stream")
-def stream_message(
+async def stream_message(
     workspace_id: int,
     chat_request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Stream chat message processing with Server-Sent Events (SSE)."""
     from app.core.logging import get_logger
     logger = get_logger(__name__)
     
-    def generate():
+    async def generate():
         try:
             # Stream events from ChatService
-            for event in ChatService.stream_message(
+            async for event in ChatService.stream_message(
                 db,
                 current_user,
                 workspace_id,
                 chat_request.conversation_id,
-                chat_request.message
+                chat_request.message,
+                profile=_profile_requested(request),
             ):
-                # Add timestamp to event
-                if "data" in event and "timestamp" in event["data"]:
-                    event["data"]["timestamp"] = datetime.utcnow().isoformat()
-                elif "data" in event:
-                    event["data"]["timestamp"] = datetime.utcnow().isoformat()
-                
-                # Format as SSE
-                yield f"data: {json.dumps(event)}\n\n"
+                yield format_sse_event(event)
             
         except ValueError as e:
             logger.error(f"ValueError in stream: {str(e)}", exc_info=True)
@@ -101,10 +122,9 @@ def stream_message(
                 "data": {
                     "error": str(e),
                     "type": "validation",
-                    "timestamp": datetime.utcnow().isoformat()
                 }
             }
-            yield f"data: {json.dumps(error_event)}\n\n"
+            yield format_sse_event(error_event)
         except Exception as e:
             import traceback
             error_detail = str(e) if str(e) else f"{type(e).__name__}: {repr(e)}"
@@ -115,10 +135,9 @@ def stream_message(
                 "data": {
                     "error": f"Internal server error: {error_detail}",
                     "type": "server",
-                    "timestamp": datetime.utcnow().isoformat()
                 }
             }
-            yield f"data: {json.dumps(error_event)}\n\n"
+            yield format_sse_event(error_event)
     
     return StreamingResponse(
         generate(),
@@ -131,18 +150,29 @@ def stream_message(
     )
 
 
-@router.get("/conversations/{conversation_id}/messages", response_model=List[ChatMessage])
-def get_messages(
+@router.get("/conversations/{conversation_id}/messages", response_model=CursorPage[ChatMessage])
+async def get_messages(
     workspace_id: int,
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (older messages)"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get messages from a conversation."""
+    """Get messages from a conversation, latest page first (each page in chronological order)."""
     # Verify conversation belongs to workspace
-    if not ConversationRepository.belongs_to_workspace(db, conversation_id, workspace_id):
+    if not await AsyncConversationRepository.belongs_to_workspace(db, conversation_id, workspace_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
     
-    messages = MessageRepository.get_by_conversation(db, conversation_id)
-    return [ChatMessage.from_orm(m) for m in messages]
+    try:
+        before = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    messages, has_more = await AsyncMessageRepository.get_page(db, conversation_id, limit=limit, before=before)
+    return CursorPage[ChatMessage](
+        items=[ChatMessage.from_orm(m) for m in messages],
+        next_cursor=encode_cursor(messages[0].created_at, messages[0].id) if has_more else None,
+        has_more=has_more,
+    )
 
@@ -0,0 +1,14 @@
+"""Prometheus metrics endpoint."""
+from fastapi import APIRouter, HTTPException, Response
+from app.telemetry.metrics import metrics_enabled, render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (node latency, LLM tokens/cost, upstream HTTP durations)."""
+    if not metrics_enabled():
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,365 @@
+"""Measurement-driven model selection: cheapest candidate that meets the node's SLOs."""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import random
+import threading
+from app.core.config import settings
+from app.telemetry.stats import RollingStats
+from app.utils.json_repair import parse_json
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are not locked against other processes
+    fcntl = None
+
+# Persist stats after this many recorded outcomes
+SAVE_EVERY = 20
+# Counters merged into the stats file as deltas
+COUNTERS = ("calls", "errors", "cost_total", "costed_calls", "json_checks", "json_failures")
+
+
+class ModelStats(RollingStats):
+    """Rolling stats for one (node, model) pair, plus token cost and JSON validity."""
+
+    def __init__(self, window: int = 200):
+        super().__init__(window)
+        self.cost_total = 0.0
+        self.costed_calls = 0
+        self.json_checks = 0
+        self.json_failures = 0
+        # Recorded since the last save, merged into the stats file by the next one
+        self._unsaved_latencies: List[float] = []
+        self._saved_counters = dict.fromkeys(COUNTERS, 0)
+
+    def record(self, latency: float, success: bool = True) -> None:
+        super().record(latency, success)
+        if success:
+            with self._lock:
+                self._unsaved_latencies.append(latency)
+
+    def record_cost(self, cost: float) -> None:
+        with self._lock:
+            self.cost_total += cost
+            self.costed_calls += 1
+
+    def record_json(self, ok: bool) -> None:
+        with self._lock:
+            self.json_checks += 1
+            if not ok:
+                self.json_failures += 1
+
+    @property
+    def mean_cost(self) -> Optional[float]:
+        """Average USD cost per call (None if the model has no known price)."""
+        return self.cost_total / self.costed_calls if self.costed_calls else None
+
+    @property
+    def json_failure_rate(self) -> float:
+        return self.json_failures / self.json_checks if self.json_checks else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data.update({
+            "samples": self.samples,
+            "mean_cost_usd": self.mean_cost,
+            "json_checks": self.json_checks,
+            "json_failure_rate": round(self.json_failure_rate, 4),
+        })
+        return data
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable state for persistence."""
+        with self._lock:
+            data = {key: getattr(self, key) for key in COUNTERS}
+            data["latencies"] = list(self._latencies)
+            return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], window: int = 200) -> "ModelStats":
+        stats = cls(window)
+        stats.merge(data)
+        stats._saved_counters = {key: getattr(stats, key) for key in COUNTERS}
+        return stats
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """Add serialized stats or a delta (latencies appended, counters summed)."""
+        with self._lock:
+            self._latencies.extend(data.get("latencies", []))
+            for key in COUNTERS:
+                setattr(self, key, getattr(self, key) + data.get(key, 0))
+
+    def unsaved(self) -> Dict[str, Any]:
+        """What was recorded since the last save, in to_dict() form."""
+        with self._lock:
+            delta = {key: getattr(self, key) - self._saved_counters[key] for key in COUNTERS}
+            delta["latencies"] = list(self._unsaved_latencies)
+            return delta
+
+    def mark_saved(self, delta: Dict[str, Any]) -> None:
+        """Record that a delta from unsaved() is in the stats file."""
+        with self._lock:
+            del self._unsaved_latencies[:len(delta["latencies"])]
+            for key in COUNTERS:
+                self._saved_counters[key] += delta[key]
+
+
+def estimate_cost(model: str, usage: Optional[Dict[str, Any]]) -> Optional[float]:
+    """
+    USD cost of a call from token usage and settings.llm_model_prices.
+
+    Args:
+        model: Model identifier
+        usage: Token usage ({"input_tokens", "output_tokens"})
+
+    Returns:
+        Cost in USD, or None if usage or the model's price is unknown
+    """
+    price = settings.llm_model_prices.get(model)
+    if not usage or not price:
+        return None
+    input_price, output_price = price
+    return (usage.get("input_tokens", 0) * input_price + usage.get("output_tokens", 0) * output_price) / 1_000_000
+
+
+class AdaptiveModelRouter:
+    """
+    Picks a model per node from settings.model_router_candidates.
+
+    - Exploit: the cheapest candidate with enough samples whose p95 latency,
+      error rate and JSON-failure rate meet the node's SLOs
+    - Explore: with probability model_router_exploration, the least-sampled candidate
+    - Otherwise the static choice from llm_router is kept
+
+    Stats are kept per (node, model) and persisted to a JSON file shared by
+    the worker processes: each save merges what this process recorded since
+    its last save into the file, under a file lock, on a background thread.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize router.
+
+        Args:
+            path: JSON file for persisted stats
+        """
+        self.path = path
+        self._stats: Dict[Tuple[str, str], ModelStats] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._unsaved = 0
+        self._saving = False
+        self.decisions: deque = deque(maxlen=200)
+        self.load()
+
+    def stats(self, node: str, model: str) -> ModelStats:
+        """Get (or create) stats for a node/model pair."""
+        with self._lock:
+            key = (node, model)
+            if key not in self._stats:
+                self._stats[key] = ModelStats()
+            return self._stats[key]
+
+    def _meets_slo(self, node: str, stats: ModelStats) -> bool:
+        slo = settings.model_router_slo_p95_s.get(node)
+        if slo is not None and (stats.p95 is None or stats.p95 > slo):
+            return False
+        if stats.error_rate > settings.model_router_max_error_rate:
+            return False
+        return stats.json_failure_rate <= settings.model_router_max_json_failure_rate
+
+    def choose(self, node: str, default: str) -> str:
+        """
+        Choose the model for a node.
+
+        Args:
+            node: Node name ("intent_router", "app_plan", "answer", ...)
+            default: Static choice, used when adaptive routing has no answer
+
+        Returns:
+            Model identifier
+        """
+        candidates: List[str] = settings.model_router_candidates.get(node, [])
+        if not settings.model_router_enabled or not candidates:
+            return default
+
+        if random.random() < settings.model_router_exploration:
+            model = min(candidates, key=lambda m: (self.stats(node, m).calls, random.random()))
+            return self._decide(node, model, "explore")
+
+        eligible = [
+            m for m in candidates
+            if self.stats(node, m).samples >= settings.model_router_min_samples
+            and self._meets_slo(node, self.stats(node, m))
+        ]
+        if not eligible:
+            return self._decide(node, default, "default (no candidate meets SLO yet)")
+
+        # Unknown cost sorts last; ties go to the faster model
+        def rank(m: str):
+            stats = self.stats(node, m)
+            cost = stats.mean_cost
+            return (cost is None, cost or 0.0, stats.p95)
+
+        return self._decide(node, min(eligible, key=rank), "cheapest within SLO")
+
+    def _decide(self, node: str, model: str, reason: str) -> str:
+        self.decisions.append({
+            "at": datetime.utcnow().isoformat(),
+            "node": node,
+            "model": model,
+            "reason": reason,
+        })
+        logger.debug(f"Model router: {node} -> {model} ({reason})")
+        return model
+
+    def record(
+        self,
+        node: str,
+        model: str,
+        latency: float,
+        success: bool,
+        usage: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record the outcome of an LLM call made for a node."""
+        stats = self.stats(node, model)
+        stats.record(latency, success)
+        cost = estimate_cost(model, usage)
+        if cost is not None:
+            stats.record_cost(cost)
+        self._maybe_save()
+
+    def record_json(self, node: str, model: str, ok: bool) -> None:
+        """Record whether a node could parse the model's JSON output."""
+        self.stats(node, model).record_json(ok)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Stats grouped by node, then model."""
+        with self._lock:
+            items = list(self._stats.items())
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (node, model), stats in items:
+            data = stats.snapshot()
+            data["meets_slo"] = self._meets_slo(node, stats)
+            result.setdefault(node, {})[model] = data
+        return result
+
+    def _maybe_save(self) -> None:
+        """Save every SAVE_EVERY outcomes, off the caller's thread (often the event loop)."""
+        with self._lock:
+            self._unsaved += 1
+            if self._unsaved < SAVE_EVERY or self._saving:
+                return
+            self._unsaved = 0
+            self._saving = True
+        threading.Thread(target=self._background_save, name="culi-router-stats", daemon=True).start()
+
+    def _background_save(self) -> None:
+        try:
+            self.save()
+        finally:
+            with self._lock:
+                self._saving = False
+
+    def _read(self, path: Path) -> Dict[Tuple[str, str], ModelStats]:
+        """Stats persisted in a file (empty if missing or unreadable)."""
+        if not path.exists():
+            return {}
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            return {(item["node"], item["model"]): ModelStats.from_dict(item) for item in payload}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable model router stats {path}: {str(e)}")
+            return {}
+
+    def save(self) -> None:
+        """
+        Merge what this process recorded since its last save into the JSON file.
+
+        Blocking (file lock, read, atomic replace): call it off the event loop.
+        """
+        with self._lock:
+            items = list(self._stats.items())
+        path = Path(self.path)
+        with self._save_lock:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path.with_suffix(".lock"), "a") as lock_file:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    persisted = self._read(path)
+                    deltas = []
+                    for key, stats in items:
+                        delta = stats.unsaved()
+                        persisted.setdefault(key, ModelStats()).merge(delta)
+                        deltas.append((stats, delta))
+                    payload = [
+                        {"node": node, "model": model, **stats.to_dict()}
+                        for (node, model), stats in persisted.items()
+                    ]
+                    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                    tmp.write_text(json.dumps(payload), encoding="utf-8")
+                    os.replace(tmp, path)
+            except OSError as e:
+                logger.warning(f"Failed to save model router stats: {str(e)}")
+                return
+        for stats, delta in deltas:
+            stats.mark_saved(delta)
+
+    def load(self) -> None:
+        """Load persisted stats, if any."""
+        loaded = self._read(Path(self.path))
+        if loaded:
+            self._stats.update(loaded)
+            logger.info(f"Loaded model router stats for {len(loaded)} node/model pairs")
+
+
+def parse_json_output(node: str, response: Any, allow_truncated: bool = True) -> Any:
+    """
+    Parse a model's JSON output (repairing it locally if needed), recording
+    success or failure for the model router.
+
+    Args:
+        node: Node name
+        response: LLM response (from invoke_llm)
+        allow_truncated: Accept output cut off mid-value (see parse_json)
+
+    Returns:
+        Parsed JSON
+
+    Raises:
+        ValueError: If no JSON could be recovered from the output, or it was
+            truncated and allow_truncated is False
+    """
+    model = response.response_metadata.get("requested_model") or response.response_metadata.get("model_name", "")
+    try:
+        parsed = parse_json(response.content, allow_truncated=allow_truncated)
+    except ValueError:
+        get_adaptive_router().record_json(node, model, ok=False)
+        raise
+    get_adaptive_router().record_json(node, model, ok=True)
+    return parsed
+
+
+_router: Optional[AdaptiveModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_adaptive_router() -> AdaptiveModelRouter:
+    """
+    Get the global adaptive model router.
+
+    Returns:
+        AdaptiveModelRouter instance
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = AdaptiveModelRouter(settings.model_router_stats_path)
+    return _router
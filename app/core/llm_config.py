@@ -7,7 +7,12 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 
-def get_llm(temperature: Optional[float] = None, model: Optional[str] = None, max_tokens: Optional[int] = None) -> ChatOpenAI:
+def get_llm(
+    temperature: Optional[float] = None,
+    model: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    max_retries: Optional[int] = None,
+) -> ChatOpenAI:
     """
     Create and return a ChatOpenAI instance configured for OpenRouter.
     
@@ -15,6 +20,7 @@ def get_llm(temperature: Optional[float] = None, model: Optional[str] = None, ma
         temperature: Override default temperature setting
         model: Override default model (e.g., "openai/gpt-3.5-turbo" for simple tasks)
         max_tokens: Override default max_tokens setting
+        max_retries: Override client retry count (0 lets callers fail over themselves)
         
     Returns:
         Configured ChatOpenAI instance
@@ -35,6 +41,7 @@ def get_llm(temperature: Optional[float] = None, model: Optional[str] = None, ma
     
     # Strip whitespace from API key
     api_key = api_key.strip()
+    retry_kwargs = {"max_retries": max_retries} if max_retries is not None else {}
     
     # For OpenRouter, we need to pass headers
     # ChatOpenAI creates both sync and async clients internally
@@ -46,6 +53,7 @@ def get_llm(temperature: Optional[float] = None, model: Optional[str] = None, ma
     # Try using http_client with custom headers
     try:
         import httpx
+        from app.telemetry.http import async_transport, sync_transport
         
         # Create httpx client with headers for OpenRouter
         http_client = httpx.Client(
@@ -54,6 +62,7 @@ def get_llm(temperature: Optional[float] = None, model: Optional[str] = None, ma
                 "X-Title": "Culi Backend",
             },
             timeout=60.0,
+            transport=sync_transport(),
         )
         
         async_http_client = httpx.AsyncClient(
@@ -62,6 +71,7 @@ def get_llm(temperature: Optional[float] = None, model: Optional[str] = None, ma
                 "X-Title": "Culi Backend",
             },
             timeout=60.0,
+            transport=async_transport(),
         )
         
         model_name = model or settings.llm_model
@@ -75,6 +85,7 @@ def get_llm(temperature: Optional[float] = None, model: Optional[str] = None, ma
             openai_api_base=settings.openrouter_base_url,
             http_client=http_client,
             http_async_client=async_http_client,
+            **retry_kwargs,
         )
     except ImportError:
         # Fallback: use default client creation
@@ -89,6 +100,7 @@ def get_llm(temperature: Optional[float] = None, model: Optional[str] = None, ma
             max_tokens=max_tokens_value,
             openai_api_key=api_key,
             openai_api_base=settings.openrouter_base_url,
+            **retry_kwargs,
         )
 
 
@@ -0,0 +1,327 @@
+"""Resilient LLM invocation: hedged backup requests and failover to fallback models."""
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+import asyncio
+import time
+import openai
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
+from app.core.llm_config import get_llm
+from app.core.config import settings
+from app.core.adaptive_router import get_adaptive_router, estimate_cost
+from app.telemetry.stats import llm_stats
+from app.telemetry.metrics import record_llm_call
+from app.telemetry.tracing import finish_span, set_attributes, span, start_span
+from app.utils.async_utils import run_sync
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+Messages = List[Any]  # OpenAI-format dicts or LangChain messages
+
+
+def json_schema_format(schema: Type[BaseModel], name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Build an OpenAI-style JSON-schema response_format from a pydantic model.
+
+    Args:
+        schema: Pydantic model describing the expected output
+        name: Schema name (default: model class name)
+
+    Returns:
+        response_format dict, or None if structured output is disabled
+    """
+    if not settings.llm_structured_output:
+        return None
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name or schema.__name__,
+            "schema": schema.model_json_schema(),
+            "strict": False,  # Free-form params objects are not allowed in strict mode
+        },
+    }
+
+
+def get_fallback_model(model: str) -> Optional[str]:
+    """
+    Get the backup model for a primary model.
+
+    Args:
+        model: Primary model identifier
+
+    Returns:
+        Fallback model identifier, or None if hedging is not configured
+    """
+    fallback = settings.llm_fallback_models.get(model, settings.llm_fallback_model)
+    # Same model is allowed: OpenRouter may route the backup to another upstream provider
+    return fallback or None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and connection errors warrant a failover."""
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, asyncio.TimeoutError)
+
+
+def hedge_delay(model: str) -> float:
+    """
+    Seconds to wait for the primary model before firing the backup request.
+
+    Uses the model's rolling p95 latency once enough samples exist, clamped
+    to the configured bounds; the default delay before that.
+    """
+    stats = llm_stats.get(model)
+    if stats.samples < settings.llm_hedge_min_samples:
+        return settings.llm_hedge_default_delay_s
+    return max(settings.llm_hedge_min_delay_s, min(stats.p95, settings.llm_hedge_max_delay_s))
+
+
+def _record(
+    model: str,
+    node: Optional[str],
+    latency: float,
+    success: bool,
+    usage: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Record a call's outcome in the rolling stats, the model router and Prometheus metrics."""
+    llm_stats.get(model).record(latency, success=success)
+    if node:
+        get_adaptive_router().record(node, model, latency, success=success, usage=usage)
+    record_llm_call(model, latency, success, usage, estimate_cost(model, usage))
+
+
+def _span_attributes(model: str, node: Optional[str], temperature: Optional[float], max_tokens: Optional[int]) -> Dict[str, Any]:
+    return {
+        "gen_ai.system": "openrouter",
+        "gen_ai.request.model": model,
+        "gen_ai.request.temperature": temperature,
+        "gen_ai.request.max_tokens": max_tokens,
+        "culi.node": node,
+    }
+
+
+def _usage_attributes(usage: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    usage = usage or {}
+    return {
+        "gen_ai.usage.input_tokens": usage.get("input_tokens"),
+        "gen_ai.usage.output_tokens": usage.get("output_tokens"),
+    }
+
+
+async def _call(
+    model: str,
+    messages: Messages,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    node: Optional[str],
+    response_format: Optional[Dict[str, Any]] = None,
+    failover: bool = False,
+) -> BaseMessage:
+    """Invoke one model and record its latency (and node-level outcome for the model router).
+
+    With failover=True (a backup request may follow) client retries are
+    disabled: they would hide 429/5xx from the hedge/failover logic.
+    Otherwise the client keeps its default retries.
+    """
+    llm = get_llm(temperature=temperature, model=model, max_tokens=max_tokens, max_retries=0 if failover else None)
+    if response_format:
+        llm = llm.bind(response_format=response_format)
+    with span("llm.chat", _span_attributes(model, node, temperature, max_tokens)) as current:
+        start = time.perf_counter()
+        try:
+            response = await llm.ainvoke(messages)
+        except asyncio.CancelledError:
+            current.set_attribute("culi.llm.cancelled", True)  # Hedge loser
+            raise
+        except Exception:
+            _record(model, node, time.perf_counter() - start, success=False)
+            raise
+        _record(model, node, time.perf_counter() - start, success=True, usage=response.usage_metadata)
+        set_attributes(_usage_attributes(response.usage_metadata), current)
+    # Which model actually answered (the backup may have won)
+    response.response_metadata["requested_model"] = model
+    return response
+
+
+async def ainvoke_llm(
+    messages: Messages,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    hedge: bool = True,
+    node: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> BaseMessage:
+    """
+    Invoke an LLM with hedging and failover.
+
+    The primary model is called first. If it has not answered by its hedge
+    deadline (rolling p95), a backup request goes to the fallback model and
+    whichever answers first is used; the other request is cancelled. A 429,
+    5xx, timeout or connection error from one model fails over to the other
+    immediately.
+
+    Args:
+        messages: Chat messages
+        model: Primary model (default: settings.llm_model)
+        temperature: Sampling temperature
+        max_tokens: Maximum output tokens
+        hedge: Allow a backup request to the fallback model
+        node: Calling node, for per-node model router stats
+        response_format: Provider structured output format (see json_schema_format)
+
+    Returns:
+        Model response message (response_metadata["requested_model"] is
+        the model that answered)
+
+    Raises:
+        Exception: Non-retryable errors, or the last error if all models failed
+    """
+    model = model or settings.llm_model
+    fallback = get_fallback_model(model) if hedge and settings.llm_hedge_enabled else None
+    if not fallback:
+        return await _call(model, messages, temperature, max_tokens, node, response_format)
+
+    primary = asyncio.ensure_future(_call(model, messages, temperature, max_tokens, node, response_format, failover=True))
+    tasks: Dict[asyncio.Task, str] = {primary: model}
+    pending = {primary}
+    deadline = time.perf_counter() + hedge_delay(model)
+    last_error: Optional[BaseException] = None
+
+    def start_fallback(reason: str) -> None:
+        logger.info(f"LLM {model}: {reason}, sending backup request to {fallback}")
+        # Last resort: nothing fails over from the backup, so it keeps client retries
+        task = asyncio.ensure_future(_call(fallback, messages, temperature, max_tokens, node, response_format))
+        tasks[task] = fallback
+        pending.add(task)
+
+    try:
+        while pending:
+            hedged = len(tasks) > 1
+            timeout = None if hedged else max(0.0, deadline - time.perf_counter())
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                start_fallback("slower than hedge deadline")
+                continue
+
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        logger.info(f"LLM backup {tasks[task]} answered first")
+                    for other, name in tasks.items():
+                        llm_stats.get(name).record_contest(won=other is task)
+                    return task.result()
+                last_error = task.exception()
+                logger.warning(f"LLM {tasks[task]} failed: {str(last_error)}")
+
+            # Primary failed before the hedge deadline -> fail over if the error allows it
+            if not hedged:
+                if not is_retryable(last_error):
+                    raise last_error
+                start_fallback("retryable error")
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise last_error
+
+
+async def astream_llm(
+    messages: Messages,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    node: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+    outcome: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream an LLM response as text chunks.
+
+    Streams cannot be hedged once output has started, so only failover
+    applies: a retryable error before the first chunk restarts the stream on
+    the fallback model.
+
+    Args:
+        messages: Chat messages
+        model: Model (default: settings.llm_model)
+        temperature: Sampling temperature
+        max_tokens: Maximum output tokens
+        node: Calling node, for per-node model router stats
+        response_format: Provider structured output format (see json_schema_format)
+        outcome: If given, receives "finish_reason" once the stream has ended
+            ("length" means the output was cut off at max_tokens)
+
+    Yields:
+        Text chunks
+    """
+    model = model or settings.llm_model
+    fallback = get_fallback_model(model) if settings.llm_hedge_enabled else None
+    candidates = [model] + ([fallback] if fallback else [])
+
+    for attempt, name in enumerate(candidates):
+        # Zero client retries only when another candidate can take over
+        retries = 0 if attempt < len(candidates) - 1 else None
+        llm = get_llm(temperature=temperature, model=name, max_tokens=max_tokens, max_retries=retries)
+        if response_format:
+            llm = llm.bind(response_format=response_format)
+        # Not made current: the consumer may resume this generator from another context
+        current = start_span("llm.chat_stream", _span_attributes(name, node, temperature, max_tokens))
+        start = time.perf_counter()
+        started = False
+        usage = None
+        finish_reason = None
+        error = None
+        try:
+            async for chunk in llm.astream(messages, stream_usage=True):
+                usage = chunk.usage_metadata or usage
+                finish_reason = (chunk.response_metadata or {}).get("finish_reason") or finish_reason
+                if chunk.content:
+                    started = True
+                    yield chunk.content
+        except Exception as e:
+            error = e
+            _record(name, node, time.perf_counter() - start, success=False)
+            if started or attempt == len(candidates) - 1 or not is_retryable(e):
+                raise
+            logger.warning(f"LLM stream {name} failed before output ({str(e)}), failing over to {candidates[attempt + 1]}")
+            continue
+        else:
+            _record(name, node, time.perf_counter() - start, success=True, usage=usage)
+            set_attributes(_usage_attributes(usage), current)
+            if outcome is not None:
+                outcome["finish_reason"] = finish_reason
+            return
+        finally:
+            finish_span(current, error)
+
+
+def invoke_llm(
+    messages: Messages,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    hedge: bool = True,
+    node: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> BaseMessage:
+    """
+    Sync wrapper around ainvoke_llm for graph nodes.
+
+    Args:
+        messages: Chat messages
+        model: Primary model (default: settings.llm_model)
+        temperature: Sampling temperature
+        max_tokens: Maximum output tokens
+        hedge: Allow a backup request to the fallback model
+        node: Calling node, for per-node model router stats
+        response_format: Provider structured output format (see json_schema_format)
+
+    Returns:
+        Model response message
+    """
+    return run_sync(ainvoke_llm(messages, model, temperature, max_tokens, hedge, node, response_format))
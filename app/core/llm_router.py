@@ -1,12 +1,13 @@
 """LLM model router for dynamic model selection based on task complexity."""
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.adaptive_router import get_adaptive_router
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def get_model_for_intent_router(state: Optional[Dict[str, Any]] = None) -> str:
+def _static_model_for_intent_router(state: Optional[Dict[str, Any]] = None) -> str:
     """
     Get model for intent classification.
     
@@ -22,7 +23,7 @@ def get_model_for_intent_router(state: Optional[Dict[str, Any]] = None) -> str:
     return model
 
 
-def get_model_for_app_plan(state: Optional[Dict[str, Any]] = None) -> str:
+def _static_model_for_app_plan(state: Optional[Dict[str, Any]] = None) -> str:
     """
     Get model for plan generation.
     
@@ -61,7 +62,7 @@ def get_model_for_app_plan(state: Optional[Dict[str, Any]] = None) -> str:
     return model
 
 
-def get_model_for_answer(state: Optional[Dict[str, Any]] = None) -> str:
+def _static_model_for_answer(state: Optional[Dict[str, Any]] = None) -> str:
     """
     Get model for answer generation.
     
@@ -100,6 +101,42 @@ def get_model_for_answer(state: Optional[Dict[str, Any]] = None) -> str:
     return model
 
 
+def get_model_for_intent_router(state: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Get model for intent classification (adaptive router, static rules as default).
+    
+    Returns:
+        Model identifier for OpenRouter
+    """
+    return get_adaptive_router().choose("intent_router", _static_model_for_intent_router(state))
+
+
+def get_model_for_app_plan(state: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Get model for plan generation (adaptive router, static rules as default).
+    
+    Args:
+        state: Current graph state to determine complexity
+        
+    Returns:
+        Model identifier for OpenRouter
+    """
+    return get_adaptive_router().choose("app_plan", _static_model_for_app_plan(state))
+
+
+def get_model_for_answer(state: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Get model for answer generation (adaptive router, static rules as default).
+    
+    Args:
+        state: Current graph state to determine complexity
+        
+    Returns:
+        Model identifier for OpenRouter
+    """
+    return get_adaptive_router().choose("answer", _static_model_for_answer(state))
+
+
 def get_model_for_node(node_name: str, state: Optional[Dict[str, Any]] = None) -> str:
     """
     Get appropriate model for a specific node.
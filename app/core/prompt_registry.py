@@ -0,0 +1,236 @@
+"""Prompt template registry: templates in app/prompts are loaded, validated and precompiled once."""
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import string
+import threading
+import time
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+
+# Placeholders each node supplies; a template using anything else fails validation
+PROMPT_FIELDS: Dict[str, set] = {
+    "intent_router_prompt": {"user_input", "chat_context", "app_context", "app_available", "today"},
+    "router_prompt": {"user_input", "chat_context", "mcp_available", "app_context", "app_available", "today"},
+    "app_plan_prompt": {"user_input", "chat_context", "app_name", "app_category", "app_data"},
+    "planner_prompt": {"user_input", "chat_context", "accounting_mode", "mcp_data", "app_name", "app_category", "app_data"},
+    "answer_prompt": {"user_input", "chat_context", "kb_context", "app_data", "mcp_data", "web_results", "step_results", "plan"},
+}
+
+
+class PromptTemplateError(ValueError):
+    """Raised when a prompt template cannot be parsed or uses unknown placeholders."""
+
+
+class PromptTemplate:
+    """
+    A prompt template parsed once into literal text and placeholder segments.
+
+    format() joins the precompiled segments instead of re-parsing the template
+    on every call; the result is identical to str.format().
+    """
+
+    def __init__(self, name: str, text: str, path: Optional[Path] = None, mtime: float = 0.0):
+        """
+        Parse and validate a template.
+
+        Args:
+            name: Template name (file name without .txt)
+            text: Template text (str.format syntax, "{{" / "}}" for literal braces)
+            path: Source file
+            mtime: Source file modification time
+
+        Raises:
+            PromptTemplateError: If the template is malformed or uses unknown placeholders
+        """
+        self.name = name
+        self.text = text
+        self.path = path
+        self.mtime = mtime
+        self.version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        self._segments: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        try:
+            for literal, field, spec, conversion in string.Formatter().parse(text):
+                if field is not None and (not field.isidentifier() or spec and "{" in spec):
+                    raise PromptTemplateError(f"Prompt {name}: unsupported placeholder {{{field}}}")
+                self._segments.append((literal, field, spec or "", conversion))
+        except ValueError as e:
+            if isinstance(e, PromptTemplateError):
+                raise
+            raise PromptTemplateError(f"Prompt {name}: {str(e)} (escape literal braces as {{{{ }}}})") from e
+        self.fields = {field for _, field, _, _ in self._segments if field is not None}
+
+        allowed = PROMPT_FIELDS.get(name)
+        if allowed is not None and not self.fields <= allowed:
+            unknown = ", ".join(sorted(self.fields - allowed))
+            raise PromptTemplateError(f"Prompt {name}: unknown placeholders {unknown}")
+
+    def format(self, **values: Any) -> str:
+        """
+        Render the template.
+
+        Args:
+            **values: Placeholder values (extra values are ignored)
+
+        Returns:
+            Rendered prompt
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        parts = []
+        for literal, field, spec, conversion in self._segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            parts.append(format(value, spec) if spec else str(value))
+        return "".join(parts)
+
+
+class PromptRegistry:
+    """
+    All prompt templates of a directory, loaded at startup.
+
+    With hot reload on (development), get() re-checks file modification times
+    at most every reload interval and re-parses changed templates; a template
+    that fails validation keeps its previous version.
+    """
+
+    def __init__(self, directory: Path = PROMPTS_DIR, hot_reload: bool = False, reload_interval_s: float = 1.0):
+        """
+        Initialize registry.
+
+        Args:
+            directory: Directory with *.txt templates
+            hot_reload: Reload templates when their files change
+            reload_interval_s: Minimum seconds between file checks
+        """
+        self.directory = Path(directory)
+        self.hot_reload = hot_reload
+        self.reload_interval_s = reload_interval_s
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+
+    def load_all(self) -> None:
+        """
+        Load and validate every template.
+
+        Raises:
+            PromptTemplateError: If any template is invalid
+        """
+        templates = {}
+        for path in sorted(self.directory.glob("*.txt")):
+            templates[path.stem] = self._load(path)
+        with self._lock:
+            self._templates = templates
+            self._last_check = time.monotonic()
+        logger.info(f"Loaded {len(templates)} prompt templates: {self.versions()}")
+
+    @staticmethod
+    def _load(path: Path) -> PromptTemplate:
+        return PromptTemplate(path.stem, path.read_text(encoding="utf-8"), path, path.stat().st_mtime)
+
+    def _reload_changed(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_check < self.reload_interval_s:
+                return
+            self._last_check = now
+            current = dict(self._templates)
+
+        changed = {}
+        for path in self.directory.glob("*.txt"):
+            known = current.get(path.stem)
+            try:
+                if known and path.stat().st_mtime == known.mtime:
+                    continue
+                changed[path.stem] = self._load(path)
+            except (OSError, PromptTemplateError) as e:
+                logger.error(f"Prompt reload failed, keeping previous version: {str(e)}")
+        if changed:
+            with self._lock:
+                self._templates.update(changed)
+            for name, template in changed.items():
+                logger.info(f"Reloaded prompt {name} (version {template.version})")
+
+    def get(self, name: str, fallback: Optional[str] = None) -> PromptTemplate:
+        """
+        Get a template by name.
+
+        Args:
+            name: Template name (file name without .txt)
+            fallback: Template to use if name does not exist
+
+        Returns:
+            PromptTemplate
+
+        Raises:
+            KeyError: If neither template exists
+        """
+        if self.hot_reload:
+            self._reload_changed()
+        with self._lock:
+            template = self._templates.get(name) or (self._templates.get(fallback) if fallback else None)
+        if template is None:
+            raise KeyError(f"Prompt template not found: {name}")
+        return template
+
+    def versions(self) -> Dict[str, str]:
+        """Current version (content hash) of every template."""
+        with self._lock:
+            return {name: template.version for name, template in self._templates.items()}
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """
+    Get the global prompt registry, loading it on first use.
+
+    Returns:
+        PromptRegistry instance
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            registry = PromptRegistry(
+                PROMPTS_DIR,
+                hot_reload=settings.prompt_hot_reload,
+                reload_interval_s=settings.prompt_reload_interval_s,
+            )
+            registry.load_all()
+            _registry = registry
+    return _registry
+
+
+def get_prompt(name: str, state: Optional[Dict[str, Any]] = None, fallback: Optional[str] = None) -> PromptTemplate:
+    """
+    Get a prompt template and record its version on the run.
+
+    Args:
+        name: Template name
+        state: Node's state update; the version is stored in its "prompt_versions"
+            (merged into the run's versions by the state reducer)
+        fallback: Template to use if name does not exist
+
+    Returns:
+        PromptTemplate
+    """
+    template = get_prompt_registry().get(name, fallback)
+    if state is not None:
+        versions = state.get("prompt_versions") or {}
+        versions[template.name] = template.version
+        state["prompt_versions"] = versions
+    return template
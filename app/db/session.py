@@ -1,21 +1,66 @@
-"""Database session management."""
+"""Database session management.
+
+Two engines share the same database: the sync engine (psycopg2) behind
+get_db, used by auth, admin and background writers, and the async engine
+(asyncpg, or aiosqlite for SQLite URLs) behind get_async_db, used by the
+chat and conversation endpoints so that waiting on the database does not
+hold a thread. Pool sizes are per engine and per worker process.
+"""
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from app.core.config import settings
 from app.db.base import Base
 
+# Async drivers for the URL schemes of settings.database_url
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """
+    The async-driver form of a database URL.
+
+    Args:
+        url: SQLAlchemy URL, e.g. postgresql://... or postgresql+psycopg2://...
+
+    Returns:
+        Same URL with the async driver, e.g. postgresql+asyncpg://...
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url  # Assume the URL already names an async driver
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
 # Create database engine
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_s,
+    pool_recycle=settings.db_pool_recycle_s,
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the chat path
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    pool_pre_ping=True,
+    pool_size=settings.db_async_pool_size,
+    max_overflow=settings.db_async_max_overflow,
+    pool_timeout=settings.db_pool_timeout_s,
+    pool_recycle=settings.db_pool_recycle_s,
+)
+
+# Objects stay usable after commit: async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -29,7 +74,15 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting an async database session.
+    Yields a session on the async engine and closes it after use.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
-
@@ -1,7 +1,7 @@
 """Base classes, enums, and DTOs for app adapters."""
 from enum import Enum
-from typing import Protocol, Dict, Any, List, Literal, Optional
-from pydantic import BaseModel
+from typing import Protocol, Dict, Any, List, Literal, Optional, Union
+from pydantic import BaseModel, Field
 
 
 class AppCategory(str, Enum):
@@ -23,13 +23,25 @@ class ConnectedAppConfig(BaseModel):
     name: str                      # Display name: "KiotViet", "Misa eShop"
     category: AppCategory          # App category
     connection_method: ConnectionMethod  # How to connect
-    credentials: Dict[str, Any]    # OAuth credentials, API keys, etc.
+    credentials: Dict[str, Any] = Field(repr=False)  # OAuth credentials, API keys, etc. (kept out of reprs and logs)
     extra: Dict[str, Any] = {}     # Additional configuration
     
     class Config:
         use_enum_values = True
 
 
+def as_app_config(config: Union[ConnectedAppConfig, Dict[str, Any]]) -> ConnectedAppConfig:
+    """
+    The typed config of a state's connected_app.
+    
+    ChatService puts a ConnectedAppConfig in the state; states built elsewhere
+    (replayed cassettes, scripts) may carry it as a plain dict.
+    """
+    if isinstance(config, ConnectedAppConfig):
+        return config
+    return ConnectedAppConfig(**(config or {}))
+
+
 class AppReadIntent(BaseModel):
     """Intent for reading data from app."""
     kind: str                      # "LIST_INVOICES", "SUMMARY_REVENUE", "LIST_PRODUCTS", ...
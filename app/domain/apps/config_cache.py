@@ -0,0 +1,74 @@
+"""Per-workspace cache of the resolved connected app.
+
+Resolving a workspace's connected app takes one or two queries, Fernet
+decryption of its secrets and a ConnectedAppConfig; the result is the same
+on every turn until the connection changes. Entries live in process memory
+only (the decrypted secrets are never written to a shared cache) and expire
+after settings.connected_app_cache_ttl_s. ConnectedAppRepository invalidates
+a workspace on every write, so changes are seen at once on the process that
+made them and within the TTL on the others.
+"""
+from typing import Any, Dict, Optional, Tuple
+import threading
+import time
+from app.core.config import settings
+
+MISSING = object()  # get() result for workspaces that are not cached
+
+
+class WorkspaceAppCache:
+    """Resolved connected app per workspace, with TTL and explicit invalidation."""
+
+    def __init__(self):
+        self._entries: Dict[int, Tuple[Optional[Dict[str, Any]], float]] = {}  # {workspace: (app, expires_at)}
+        self._generations: Dict[int, int] = {}  # Bumped on invalidation
+        self._lock = threading.Lock()
+
+    def get(self, workspace_id: int) -> Any:
+        """The cached connected app (None if the workspace has none), or MISSING."""
+        entry = self._entries.get(workspace_id)
+        if entry is None:
+            return MISSING
+        connected_app, expires_at = entry
+        if time.monotonic() >= expires_at:
+            with self._lock:
+                if self._entries.get(workspace_id) is entry:
+                    del self._entries[workspace_id]
+            return MISSING
+        return connected_app
+
+    def generation(self, workspace_id: int) -> int:
+        """Invalidation counter of the workspace; pass it to set() after resolving."""
+        return self._generations.get(workspace_id, 0)
+
+    def set(self, workspace_id: int, connected_app: Optional[Dict[str, Any]], generation: int) -> None:
+        """
+        Cache a resolved connected app.
+
+        Args:
+            workspace_id: Workspace ID
+            connected_app: Resolved connected app in state format, or None if the workspace has none
+            generation: generation() read before resolving; if the workspace was invalidated
+                since, the value may be stale and is not cached
+        """
+        ttl = settings.connected_app_cache_ttl_s
+        if ttl <= 0:
+            return
+        with self._lock:
+            if self._generations.get(workspace_id, 0) == generation:
+                self._entries[workspace_id] = (connected_app, time.monotonic() + ttl)
+
+    def invalidate(self, workspace_id: int) -> None:
+        """Drop the workspace's entry (its connections changed)."""
+        with self._lock:
+            self._entries.pop(workspace_id, None)
+            self._generations[workspace_id] = self._generations.get(workspace_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for workspace_id in self._entries:
+                self._generations[workspace_id] = self._generations.get(workspace_id, 0) + 1
+            self._entries.clear()
+
+
+workspace_app_cache = WorkspaceAppCache()
@@ -1,5 +1,9 @@
 """KiotViet adapter implementing BaseAppAdapter."""
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from datetime import date, datetime, time
+import asyncio
+import re
+import unicodedata
 from app.domain.apps.base import (
     BaseAppAdapter,
     ConnectedAppConfig,
@@ -11,10 +15,44 @@ from app.domain.apps.base import (
 from app.domain.apps.kiotviet.config import KiotVietConfig
 from app.domain.apps.kiotviet.api_client import KiotVietApiClient
 from app.domain.apps.kiotviet import mappers
+from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Customers/branches matched when resolving a name filter to IDs
+MAX_FILTER_MATCHES = 20
+CUSTOMER_CODE_RE = re.compile(r"^KH\w*\d+$", re.IGNORECASE)
+PHONE_RE = re.compile(r"^\+?\d[\d .-]{7,}$")
+# Revenue summaries page through all matching invoices (KiotViet caps pageSize at 100)
+INVOICE_PAGE_SIZE = 100
+INVOICE_PAGE_CONCURRENCY = 4
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip Vietnamese accents for name matching."""
+    text = unicodedata.normalize("NFD", text.lower().replace("đ", "d"))
+    return "".join(ch for ch in text if unicodedata.category(ch) != "Mn").strip()
+
+
+def _to_datetime(value: Any, end_of_day: bool = False) -> Optional[datetime]:
+    """Parse a YYYY-MM-DD string (or date/datetime) filter value."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        parsed = datetime.combine(value, time.min)
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value))
+        except ValueError:
+            logger.warning(f"Ignoring invalid date filter: {value}")
+            return None
+        if len(str(value)) > 10:
+            return parsed  # Explicit time given
+    return parsed.replace(hour=23, minute=59, second=59) if end_of_day else parsed
+
 
 class KiotVietAdapter:
     """
@@ -45,6 +83,7 @@ class KiotVietAdapter:
             # If we're in an async context, we need to use a different approach
             # Create a new event loop in a thread
             import concurrent.futures
+            import contextvars
             import threading
             
             def run_in_thread():
@@ -55,13 +94,142 @@ class KiotVietAdapter:
                 finally:
                     new_loop.close()
             
+            # The caller's context (trace span, metrics labels) follows the work into the thread
             with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_in_thread)
+                future = executor.submit(contextvars.copy_context().run, run_in_thread)
                 return future.result()
         except RuntimeError:
             # No running loop, can use asyncio.run
             return asyncio.run(coro)
     
+    async def _find_customer_ids(self, client: KiotVietApiClient, customer: str) -> List[int]:
+        """Resolve a customer code, phone number or name to customer IDs."""
+        customer = customer.strip()
+        if CUSTOMER_CODE_RE.match(customer):
+            result = await client.get_customers(code=customer.upper(), page_size=MAX_FILTER_MATCHES)
+        elif PHONE_RE.match(customer):
+            result = await client.get_customers(contact_number=customer, page_size=MAX_FILTER_MATCHES)
+        else:
+            result = await client.get_customers(name=customer, page_size=MAX_FILTER_MATCHES)
+        return [c["id"] for c in result.get("data", []) if "id" in c]
+    
+    async def _find_branch_ids(self, client: KiotVietApiClient, branch: str) -> List[int]:
+        """Resolve a branch name to branch IDs (accent/case-insensitive substring match)."""
+        wanted = _fold(branch)
+        result = await client.get_branches()
+        return [
+            b["id"] for b in result.get("data", [])
+            if "id" in b and wanted in _fold(b.get("branchName", ""))
+        ]
+    
+    async def _fetch_filtered(self, client: KiotVietApiClient, intent: AppReadIntent) -> Dict[str, Any]:
+        """
+        Fetch a list with the generic read filters pushed down to the KiotViet API.
+        
+        Generic params (from AppReadIntent): from_date, to_date, customer, branch,
+        name; everything else is passed through as API keyword arguments.
+        
+        Args:
+            client: KiotViet API client
+            intent: LIST_* or SUMMARY_REVENUE read intent
+            
+        Returns:
+            Raw API response (empty list if a named customer/branch matches nothing)
+        """
+        params = dict(intent.params)
+        from_date = _to_datetime(params.pop("from_date", None))
+        to_date = _to_datetime(params.pop("to_date", None), end_of_day=True)
+        customer = params.pop("customer", None)
+        branch = params.pop("branch", None)
+        name = params.pop("name", None)
+        
+        if intent.kind == "LIST_PRODUCTS":
+            if name:
+                params["name"] = name
+            return await client.get_products(**params)
+        
+        if intent.kind == "LIST_CUSTOMERS":
+            if customer or name:
+                params["name"] = customer or name
+            return await client.get_customers(**params)
+        
+        # Invoices / orders: customer and branch filters need IDs
+        if customer:
+            params["customer_ids"] = await self._find_customer_ids(client, customer)
+            if not params["customer_ids"]:
+                logger.info(f"No KiotViet customer matches '{customer}'")
+                return {"data": [], "total": 0}
+        if branch:
+            params["branch_ids"] = await self._find_branch_ids(client, branch)
+            if not params["branch_ids"]:
+                logger.info(f"No KiotViet branch matches '{branch}'")
+                return {"data": [], "total": 0}
+        
+        if intent.kind == "LIST_ORDERS":
+            if from_date:
+                params["from_date"] = from_date
+            if to_date:
+                params["to_date"] = to_date
+            return await client.get_orders(**params)
+        
+        # Invoices are filtered by purchase date (when the sale happened)
+        if from_date:
+            params["from_purchase_date"] = from_date
+        if to_date:
+            params["to_purchase_date"] = to_date
+        return await client.get_invoices(**params)
+    
+    async def _fetch_all_invoices(self, client: KiotVietApiClient, intent: AppReadIntent) -> Dict[str, Any]:
+        """
+        Fetch every invoice matching a SUMMARY_REVENUE intent, page by page.
+        
+        The first page gives the total; the remaining pages are fetched
+        concurrently, up to settings.kiotviet_summary_max_invoices invoices.
+        
+        Args:
+            client: KiotViet API client
+            intent: SUMMARY_REVENUE read intent
+            
+        Returns:
+            {"data": invoices fetched, "total": invoices matching}
+        """
+        # Resolve names to IDs once instead of on every page
+        params = dict(intent.params)
+        customer = params.pop("customer", None)
+        branch = params.pop("branch", None)
+        if customer:
+            params["customer_ids"] = await self._find_customer_ids(client, customer)
+            if not params["customer_ids"]:
+                logger.info(f"No KiotViet customer matches '{customer}'")
+                return {"data": [], "total": 0}
+        if branch:
+            params["branch_ids"] = await self._find_branch_ids(client, branch)
+            if not params["branch_ids"]:
+                logger.info(f"No KiotViet branch matches '{branch}'")
+                return {"data": [], "total": 0}
+        params["page_size"] = INVOICE_PAGE_SIZE
+        
+        first = await self._fetch_filtered(client, AppReadIntent(kind=intent.kind, params=params))
+        invoices = list(first.get("data", []))
+        total = first.get("total", len(invoices))
+        wanted = min(total, settings.kiotviet_summary_max_invoices)
+        if not invoices or len(invoices) >= wanted:
+            return {"data": invoices, "total": total}
+        
+        semaphore = asyncio.Semaphore(INVOICE_PAGE_CONCURRENCY)
+        
+        async def fetch_page(offset: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                page = AppReadIntent(kind=intent.kind, params={**params, "current_item": offset})
+                return (await self._fetch_filtered(client, page)).get("data", [])
+        
+        pages = await asyncio.gather(*(
+            fetch_page(offset) for offset in range(len(invoices), wanted, INVOICE_PAGE_SIZE)
+        ))
+        for page in pages:
+            invoices.extend(page)
+        return {"data": invoices[:wanted], "total": total}
+    
     def read(self, intent: AppReadIntent, config: ConnectedAppConfig) -> Dict[str, Any]:
         """
         Read data from KiotViet based on intent.
@@ -78,19 +246,19 @@ class KiotVietAdapter:
         try:
             # Dispatch based on intent kind
             if intent.kind == "LIST_INVOICES":
-                result = self._run_async(client.get_invoices(**intent.params))
+                result = self._run_async(self._fetch_filtered(client, intent))
                 return mappers.map_invoice_list(result)
             
             elif intent.kind == "LIST_ORDERS":
-                result = self._run_async(client.get_orders(**intent.params))
+                result = self._run_async(self._fetch_filtered(client, intent))
                 return mappers.map_order_list(result)
             
             elif intent.kind == "LIST_PRODUCTS":
-                result = self._run_async(client.get_products(**intent.params))
+                result = self._run_async(self._fetch_filtered(client, intent))
                 return mappers.map_product_list(result)
             
             elif intent.kind == "LIST_CUSTOMERS":
-                result = self._run_async(client.get_customers(**intent.params))
+                result = self._run_async(self._fetch_filtered(client, intent))
                 return mappers.map_customer_list(result)
             
             elif intent.kind == "LIST_CATEGORIES":
@@ -102,9 +270,8 @@ class KiotVietAdapter:
                 return mappers.map_branch_list(result)
             
             elif intent.kind == "SUMMARY_REVENUE":
-                # Get invoices and calculate summary
-                params = intent.params.copy()
-                result = self._run_async(client.get_invoices(**params))
+                # All invoices of the period (filtered by the API), not just the first page
+                result = self._run_async(self._fetch_all_invoices(client, intent))
                 return mappers.map_summary_revenue(result)
             
             elif intent.kind == "GET_PRODUCT":
@@ -4,6 +4,7 @@ from typing import Any, Dict, Optional, List
 from datetime import datetime, timedelta
 from app.domain.apps.kiotviet.config import KiotVietConfig
 from app.integrations.kiotviet_oauth import get_access_token
+from app.telemetry.http import async_transport
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -55,7 +56,7 @@ class KiotVietApiClient:
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create async HTTP client."""
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=30.0)
+            self._client = httpx.AsyncClient(timeout=30.0, transport=async_transport())
         return self._client
     
     async def close(self) -> None:
@@ -1,6 +1,9 @@
 """Data mappers for KiotViet API responses to internal schema."""
 from typing import Dict, Any, List
 
+# Invoices listed in a revenue summary (the totals cover all fetched invoices)
+SUMMARY_INVOICE_SAMPLE = 100
+
 
 def map_invoice_list(raw: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -112,10 +115,11 @@ def map_summary_revenue(raw: Dict[str, Any]) -> Dict[str, Any]:
     Map revenue summary data from invoices.
     
     Args:
-        raw: Raw invoice data
+        raw: Raw invoice data (all fetched pages)
         
     Returns:
-        Summary with total revenue, count, etc.
+        Summary with total revenue, count, etc. (only the first
+        SUMMARY_INVOICE_SAMPLE invoices are listed)
     """
     invoices = raw.get("data", [])
     total_revenue = sum(float(inv.get("total", 0)) for inv in invoices)
@@ -126,6 +130,7 @@ def map_summary_revenue(raw: Dict[str, Any]) -> Dict[str, Any]:
         "paid": total_paid,
         "outstanding": total_revenue - total_paid,
         "count": len(invoices),
-        "invoices": invoices,
+        "total_invoices": raw.get("total", len(invoices)),  # More than count if the page was truncated
+        "invoices": invoices[:SUMMARY_INVOICE_SAMPLE],
     }
 
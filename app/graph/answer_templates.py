@@ -0,0 +1,276 @@
+"""Templated answers for simple app reads (revenue, counts, single lookups), rendered without an LLM."""
+from typing import Any, Callable, Dict, Optional
+from datetime import date
+import re
+import unicodedata
+from app.utils.time_utils import now_vietnam
+
+# Questions that need reasoning over the data go to the LLM
+OPEN_ENDED_CUES = (
+    "tai sao", "vi sao", "phan tich", "so sanh", "danh gia", "giai thich", "nhan xet",
+    "goi y", "de xuat", "loi khuyen", "tu van", "xu huong", "du bao", "nen ",
+    "nhu the nao", "the nao", "ra sao", "tong hop", "bao cao",
+)
+
+# Questions asking for a count ("bao nhiêu hóa đơn", "số lượng khách hàng"), matched folded
+COUNT_CUES = ("bao nhieu", "so luong", "tong so", "dem ")
+# "mấy đơn hàng": matched with accents, since "mấy" folds to "may" like "máy" (machine)
+ACCENTED_COUNT_RE = re.compile(r"\bmấy\b")
+
+# Vietnamese names for counted entities, by read kind
+ENTITY_NAMES = {
+    "LIST_INVOICES": ("hóa đơn", "invoices"),
+    "LIST_ORDERS": ("đơn hàng", "orders"),
+    "LIST_PRODUCTS": ("sản phẩm", "products"),
+    "LIST_CUSTOMERS": ("khách hàng", "customers"),
+}
+
+# Generic read filters (see app_read_node.FILTER_KEYS)
+READ_FILTERS = ("from_date", "to_date", "customer", "branch", "name")
+
+# Filters each read kind's endpoint applies (KiotVietAdapter._fetch_filtered);
+# a kind with any other filter is answered by the LLM, since the templated
+# total would cover the whole store
+APPLIED_FILTERS = {
+    "SUMMARY_REVENUE": {"from_date", "to_date", "customer", "branch"},
+    "LIST_INVOICES": {"from_date", "to_date", "customer", "branch"},
+    "LIST_ORDERS": {"from_date", "to_date", "customer", "branch"},
+    "LIST_PRODUCTS": {"name"},
+    "LIST_CUSTOMERS": {"customer", "name"},
+}
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip Vietnamese accents."""
+    text = unicodedata.normalize("NFD", text.lower().replace("đ", "d"))
+    return "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+
+
+def _asks_count(question: str) -> bool:
+    """Whether the user's text asks how many."""
+    if ACCENTED_COUNT_RE.search(unicodedata.normalize("NFC", question.lower())):
+        return True
+    folded = re.sub(r"[^\w\s]", " ", _fold(question)) + " "
+    return any(cue in folded for cue in COUNT_CUES)
+
+
+def format_vnd(amount: Any) -> str:
+    """
+    Format an amount as Vietnamese dong ("1.250.000 ₫").
+
+    Args:
+        amount: Amount (number or numeric string)
+
+    Returns:
+        Formatted amount with "." as thousands separator
+    """
+    try:
+        value = round(float(amount))
+    except (TypeError, ValueError):
+        value = 0
+    return f"{value:,}".replace(",", ".") + " ₫"
+
+
+def format_number(value: Any) -> str:
+    """Format a quantity with "." thousands separator and "," decimals."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if number.is_integer():
+        return f"{int(number):,}".replace(",", ".")
+    text = f"{number:,.2f}".rstrip("0")
+    return text.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def format_date(value: Any) -> str:
+    """Format an ISO date/datetime string as dd/mm/yyyy (unparseable values as-is)."""
+    text = str(value or "")
+    match = re.match(r"(\d{4})-(\d{2})-(\d{2})", text)
+    return f"{match.group(3)}/{match.group(2)}/{match.group(1)}" if match else text
+
+
+def describe_period(params: Dict[str, Any], today: Optional[date] = None) -> str:
+    """
+    Vietnamese phrase for the read's date filters ("hôm nay", "từ 01/09/2026 đến 15/09/2026").
+
+    Args:
+        params: AppReadIntent params (from_date/to_date as YYYY-MM-DD)
+        today: Reference date (default: today in Vietnam time)
+
+    Returns:
+        Period phrase, or "" if the read has no date filter
+    """
+    from_date, to_date = params.get("from_date"), params.get("to_date")
+    if not from_date and not to_date:
+        return ""
+    today_str = (today or now_vietnam().date()).isoformat()
+    if from_date and from_date == to_date:
+        return "hôm nay" if from_date == today_str else f"ngày {format_date(from_date)}"
+    if from_date and to_date:
+        return f"từ {format_date(from_date)} đến {format_date(to_date)}"
+    if from_date:
+        return f"từ {format_date(from_date)}"
+    return f"đến {format_date(to_date)}"
+
+
+def _with_period(text: str, period: str) -> str:
+    return f"{text} {period}" if period else text
+
+
+def _applies_filters(kind: str, params: Dict[str, Any]) -> bool:
+    """Whether the endpoint of a read kind applied every filter in params."""
+    applied = APPLIED_FILTERS.get(kind, set())
+    if any(params.get(key) for key in READ_FILTERS if key not in applied):
+        return False
+    if kind == "LIST_CUSTOMERS" and params.get("customer") and params.get("name"):
+        return params["customer"] == params["name"]  # Only one is sent as the name filter
+    return True
+
+
+def _describe_filters(kind: str, subject: str, params: Dict[str, Any]) -> str:
+    """Subject qualified by the customer, name and branch filters of a read."""
+    name = params.get("name")
+    if params.get("customer"):
+        if kind == "LIST_CUSTOMERS":
+            name = params["customer"]  # Customer list: the customer is the name filter
+        else:
+            subject += f" của khách hàng {params['customer']}"
+    if name:
+        subject += f" khớp với \"{name}\""
+    if params.get("branch"):
+        subject += f" tại chi nhánh {params['branch']}"
+    return subject
+
+
+def _revenue(data: Dict[str, Any], params: Dict[str, Any], question: str) -> Optional[str]:
+    if "revenue" not in data or not _applies_filters("SUMMARY_REVENUE", params):
+        return None
+    count = data.get("count", 0)
+    if data.get("total_invoices", count) > count:
+        return None  # Not every invoice was fetched: a templated total would be wrong
+    period = describe_period(params)
+    if not count:
+        return _with_period(_describe_filters("SUMMARY_REVENUE", "Không có hóa đơn nào", params), period) + "."
+    lines = [
+        _with_period(_describe_filters("SUMMARY_REVENUE", "Doanh thu", params), period) + f": **{format_vnd(data['revenue'])}** ({format_number(count)} hóa đơn).",
+        f"- Đã thu: {format_vnd(data.get('paid', 0))}",
+        f"- Còn phải thu: {format_vnd(data.get('outstanding', 0))}",
+    ]
+    return "\n".join(lines)
+
+
+def _count(kind: str) -> Callable[[Dict[str, Any], Dict[str, Any], str], Optional[str]]:
+    entity, key = ENTITY_NAMES[kind]
+
+    def render(data: Dict[str, Any], params: Dict[str, Any], question: str) -> Optional[str]:
+        if key not in data or not _asks_count(question) or not _applies_filters(kind, params):
+            return None
+        total = data.get("total") or len(data[key])
+        subject = _describe_filters(kind, entity, params)
+        return _with_period(f"Có **{format_number(total)}** {subject}", describe_period(params)) + "."
+    return render
+
+
+def _product(data: Dict[str, Any], params: Dict[str, Any], question: str) -> Optional[str]:
+    product = data.get("product") or {}
+    if not product.get("name"):
+        return None
+    lines = [f"**{product['name']}** (mã {product.get('code', '-')})"]
+    if product.get("basePrice") is not None:
+        unit = f"/{product['unit']}" if product.get("unit") else ""
+        lines.append(f"- Giá bán: {format_vnd(product['basePrice'])}{unit}")
+    inventories = product.get("inventories") or []
+    if inventories:
+        on_hand = sum(float(inv.get("onHand", 0)) for inv in inventories)
+        lines.append(f"- Tồn kho: {format_number(on_hand)}")
+        if len(inventories) > 1:
+            lines.extend(
+                f"  - {inv.get('branchName', '-')}: {format_number(inv.get('onHand', 0))}"
+                for inv in inventories
+            )
+    if product.get("categoryName"):
+        lines.append(f"- Nhóm hàng: {product['categoryName']}")
+    return "\n".join(lines)
+
+
+def _customer(data: Dict[str, Any], params: Dict[str, Any], question: str) -> Optional[str]:
+    customer = data.get("customer") or {}
+    if not customer.get("name"):
+        return None
+    lines = [f"**{customer['name']}** (mã {customer.get('code', '-')})"]
+    if customer.get("contactNumber"):
+        lines.append(f"- Điện thoại: {customer['contactNumber']}")
+    if customer.get("address"):
+        lines.append(f"- Địa chỉ: {customer['address']}")
+    if customer.get("totalRevenue") is not None:
+        lines.append(f"- Tổng mua: {format_vnd(customer['totalRevenue'])}")
+    if customer.get("debt") is not None:
+        lines.append(f"- Công nợ: {format_vnd(customer['debt'])}")
+    return "\n".join(lines)
+
+
+def _document(key: str, label: str) -> Callable[[Dict[str, Any], Dict[str, Any], str], Optional[str]]:
+    def render(data: Dict[str, Any], params: Dict[str, Any], question: str) -> Optional[str]:
+        doc = data.get(key) or {}
+        if not doc.get("code"):
+            return None
+        date_field = doc.get("purchaseDate") or doc.get("createdDate")
+        lines = [f"**{label} {doc['code']}**" + (f" ngày {format_date(date_field)}" if date_field else "")]
+        if doc.get("customerName"):
+            lines.append(f"- Khách hàng: {doc['customerName']}")
+        if doc.get("branchName"):
+            lines.append(f"- Chi nhánh: {doc['branchName']}")
+        if doc.get("total") is not None:
+            lines.append(f"- Tổng tiền: {format_vnd(doc['total'])}")
+        if doc.get("totalPayment") is not None:
+            lines.append(f"- Đã thanh toán: {format_vnd(doc['totalPayment'])}")
+        if doc.get("statusValue"):
+            lines.append(f"- Trạng thái: {doc['statusValue']}")
+        details = doc.get("invoiceDetails") or doc.get("orderDetails") or []
+        if details:
+            lines.append(f"- Số mặt hàng: {format_number(len(details))}")
+        return "\n".join(lines)
+    return render
+
+
+# Renderer per read kind, called with (app_data, params, user text); each
+# returns None when the template does not fit
+TEMPLATES: Dict[str, Callable[[Dict[str, Any], Dict[str, Any], str], Optional[str]]] = {
+    "SUMMARY_REVENUE": _revenue,
+    "LIST_INVOICES": _count("LIST_INVOICES"),
+    "LIST_ORDERS": _count("LIST_ORDERS"),
+    "LIST_PRODUCTS": _count("LIST_PRODUCTS"),
+    "LIST_CUSTOMERS": _count("LIST_CUSTOMERS"),
+    "GET_PRODUCT": _product,
+    "GET_CUSTOMER": _customer,
+    "GET_INVOICE": _document("invoice", "Hóa đơn"),
+    "GET_ORDER": _document("order", "Đơn hàng"),
+}
+
+
+def render_template_answer(state: Dict[str, Any]) -> Optional[str]:
+    """
+    Render the answer for a simple app read locally.
+
+    Applies only to app reads that succeeded and whose question is not
+    open-ended (no "tại sao", "phân tích", "so sánh", ...).
+
+    Args:
+        state: Graph state after app_read (intent, read_intent, app_data, user_input)
+
+    Returns:
+        Answer text, or None if the LLM should answer
+    """
+    read_intent = state.get("read_intent") or {}
+    data = state.get("app_data") or {}
+    if state.get("intent") != "app_read" or not data or "error" in data:
+        return None
+    render = TEMPLATES.get(read_intent.get("kind", ""))
+    if not render:
+        return None
+    question = state.get("user_input", "")
+    folded = re.sub(r"[^\w\s]", " ", _fold(question)) + " "
+    if any(cue in folded for cue in OPEN_ENDED_CUES):
+        return None
+    return render(data, read_intent.get("params") or {}, question)
@@ -4,7 +4,7 @@ from typing import Literal
 from app.graph.state import CuliState
 from app.graph.nodes import (
     context_node,
-    web_search_node,
+    kb_search_node,
     present_plan_node,
     execute_plan_node,
     answer_node,
@@ -13,6 +13,10 @@ from app.graph.nodes import (
 from app.graph.nodes.intent_router_node import intent_router_node
 from app.graph.nodes.app_read_node import app_read_node_sync as app_read_node
 from app.graph.nodes.app_plan_node import app_plan_node
+from app.graph.nodes.research_node import research_node
+from app.core.config import settings
+from app.telemetry.metrics import instrument_node
+from app.telemetry.tracing import trace_node
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -75,21 +79,33 @@ def route_after_context(state: CuliState) -> Literal["answer", "app_read", "app_
         return "answer"
 
 
+def route_after_kb(state: CuliState) -> Literal["answer", "web_search"]:
+    """Answer from the knowledge base if retrieval is confident, else search the web."""
+    if state.get("kb_confidence", 0.0) >= settings.kb_min_confidence:
+        return "answer"
+    return "web_search"
+
+
 def build_graph() -> StateGraph:
     """Build and return the LangGraph application."""
     # Create graph
     workflow = StateGraph(CuliState)
     
+    def add_node(name, node):
+        # Every node is timed (Prometheus histogram per node) and traced (OpenTelemetry span)
+        workflow.add_node(name, instrument_node(name, trace_node(name, node)))
+    
     # Add nodes
-    workflow.add_node("intent_router", intent_router_node)  # New intent router
-    workflow.add_node("context", context_node)
-    workflow.add_node("web_search", web_search_node)  # Use Google Custom Search API
-    workflow.add_node("app_read", app_read_node)  # Generic app read node
-    workflow.add_node("app_plan", app_plan_node)  # New app plan node
-    workflow.add_node("present_plan", present_plan_node)
-    workflow.add_node("execute_plan", execute_plan_node)
-    workflow.add_node("answer", answer_node)
-    workflow.add_node("error", error_node)
+    add_node("intent_router", intent_router_node)  # New intent router
+    add_node("context", context_node)
+    add_node("kb_search", kb_search_node)  # Local knowledge base first
+    add_node("web_search", research_node)  # Google Custom Search and/or LLM web search (settings.research_mode)
+    add_node("app_read", app_read_node)  # Generic app read node
+    add_node("app_plan", app_plan_node)  # New app plan node
+    add_node("present_plan", present_plan_node)
+    add_node("execute_plan", execute_plan_node)
+    add_node("answer", answer_node)
+    add_node("error", error_node)
     
     # Keep deprecated nodes for backward compatibility (optional)
     # workflow.add_node("router", router_node)  # DEPRECATED
@@ -105,7 +121,7 @@ def build_graph() -> StateGraph:
         route_intent,
         {
             "general_qa": "context",
-            "tax_qa": "web_search",
+            "tax_qa": "kb_search",
             "app_read": "context",
             "app_plan": "context",
             "no_app": "answer",  # Direct to answer if no app
@@ -124,6 +140,16 @@ def build_graph() -> StateGraph:
         }
     )
     
+    # Knowledge base -> answer (confident) or web search (fallback)
+    workflow.add_conditional_edges(
+        "kb_search",
+        route_after_kb,
+        {
+            "answer": "answer",
+            "web_search": "web_search",
+        }
+    )
+    
     # After web search -> answer
     workflow.add_edge("web_search", "answer")
     
@@ -3,6 +3,9 @@ from app.graph.nodes.router_node import router_node  # DEPRECATED: use intent_ro
 from app.graph.nodes.intent_router_node import intent_router_node  # NEW
 from app.graph.nodes.context_node import context_node
 from app.graph.nodes.web_search_node import web_search_node
+from app.graph.nodes.llm_web_search_node import llm_web_search_node
+from app.graph.nodes.research_node import research_node
+from app.graph.nodes.kb_search_node import kb_search_node
 from app.graph.nodes.mcp_read_node import mcp_read_node  # DEPRECATED
 from app.graph.nodes.app_read_node import app_read_node_sync as app_read_node  # NEW: generic app read
 from app.graph.nodes.planner_node import planner_node  # DEPRECATED: use app_plan_node
@@ -17,6 +20,9 @@ __all__ = [
     "intent_router_node",  # NEW
     "context_node",
     "web_search_node",
+    "llm_web_search_node",
+    "research_node",
+    "kb_search_node",
     "mcp_read_node",  # DEPRECATED
     "app_read_node",  # NEW
     "planner_node",  # DEPRECATED
@@ -1,22 +1,28 @@
 """Answer node for generating final response."""
-from typing import Dict, Any
-from pathlib import Path
-from app.core.llm_config import get_llm
+from typing import Dict, Any, Optional, Tuple
+from app.core.prompt_registry import get_prompt
+from app.core.llm_invoke import invoke_llm
+from app.core.config import settings
+from app.graph.answer_templates import render_template_answer
 from app.core.logging import get_logger
 import json
 
 logger = get_logger(__name__)
 
 
-def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
+def build_answer_prompt(state: Dict[str, Any], update: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[str]]:
     """
-    Generate final answer from all context.
+    Assemble the answer prompt from the gathered context.
+    
+    App data lists are cut to their first items and the JSON is truncated,
+    so large reads (thousands of invoices) stay within the token budget.
     
     Args:
         state: Current graph state
+        update: Node's state update, receives the prompt version (not recorded if None)
         
     Returns:
-        Updated state with answer
+        (prompt, error message from the app read or None)
     """
     user_input = state.get("user_input", "")
     chat_context = state.get("chat_context", "")
@@ -30,9 +36,8 @@ def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
     step_results = state.get("step_results", [])
     plan = state.get("plan", {})
     
-    # Load prompt template
-    prompt_path = Path(__file__).parent.parent.parent / "prompts" / "answer_prompt.txt"
-    prompt_template = prompt_path.read_text()
+    # Prompt template
+    prompt_template = get_prompt("answer_prompt", update)
     
     # Format data for prompt - limit size to avoid token limit
     # Check if there's an error in app_data
@@ -84,9 +89,7 @@ def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
     plan_str = json.dumps(plan, indent=2, ensure_ascii=False) if plan else "None"
     
     # Format prompt - use app_data variable name, but accept mcp_data for backward compatibility
-    # Replace {mcp_data} with {app_data} if present, or use app_data_str
-    formatted_prompt = prompt_template.replace("{mcp_data}", "{app_data}")
-    prompt = formatted_prompt.format(
+    prompt = prompt_template.format(
         user_input=user_input,
         chat_context=chat_context,
         kb_context=kb_context,
@@ -97,21 +100,39 @@ def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
         plan=plan_str,
     )
     
+    return prompt, error_message if has_error else None
+
+
+def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate final answer from all context.
+    
+    Args:
+        state: Current graph state
+        
+    Returns:
+        State update with answer
+    """
+    # Simple reads (revenue, counts, single lookups) are answered from a template
+    if settings.answer_templates_enabled:
+        templated = render_template_answer(state)
+        if templated:
+            logger.info(f"Answer rendered from template for {state['read_intent']['kind']}")
+            return {"answer": templated}
+    
+    update: Dict[str, Any] = {}
+    prompt, error_message = build_answer_prompt(state, update)
+    has_error = error_message is not None
+    
     # Get LLM response - use optimized model for answer generation
     from app.core.llm_router import get_model_for_answer
-    from app.core.config import settings
     model = get_model_for_answer(state)
-    llm = get_llm(
-        temperature=0.7,
-        model=model,
-        max_tokens=settings.llm_max_tokens_answer
-    )
     
     try:
-        response = llm.invoke([
+        response = invoke_llm([
             {"role": "system", "content": "You are Culi, a helpful AI accounting assistant for Vietnamese small businesses. Respond in Vietnamese. If there's an error reading data from the app, explain it clearly to the user and suggest what they can do."},
             {"role": "user", "content": prompt}
-        ])
+        ], model=model, temperature=0.7, max_tokens=settings.llm_max_tokens_answer, node="answer")
         
         answer = response.content.strip()
         
@@ -122,7 +143,7 @@ def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
             else:
                 answer = "Xin lỗi, không thể tạo phản hồi. Vui lòng thử lại."
         
-        state["answer"] = answer
+        update["answer"] = answer
         
         logger.info("Answer generated successfully")
         
@@ -130,10 +151,10 @@ def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
         logger.error(f"Error generating answer: {str(e)}", exc_info=True)
         # Create a helpful error message
         if has_error and error_message:
-            state["answer"] = f"Xin lỗi, đã xảy ra lỗi khi xử lý yêu cầu của bạn. Lỗi khi đọc dữ liệu: {error_message}. Vui lòng kiểm tra kết nối hoặc thử lại sau."
+            update["answer"] = f"Xin lỗi, đã xảy ra lỗi khi xử lý yêu cầu của bạn. Lỗi khi đọc dữ liệu: {error_message}. Vui lòng kiểm tra kết nối hoặc thử lại sau."
         else:
-            state["answer"] = f"Xin lỗi, đã có lỗi khi tạo phản hồi: {str(e)}"
-        state["error"] = str(e)
+            update["answer"] = f"Xin lỗi, đã có lỗi khi tạo phản hồi: {str(e)}"
+        update["error"] = str(e)
     
-    return state
+    return update
 
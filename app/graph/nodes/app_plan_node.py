@@ -1,7 +1,13 @@
 """App plan node for generating execution plans based on app category."""
-from typing import Dict, Any
-from pathlib import Path
-from app.core.llm_config import get_llm
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.prompt_registry import get_prompt
+import asyncio
+from app.core.llm_invoke import invoke_llm, astream_llm, json_schema_format
+from app.graph.output_schemas import PlanOutput
+from app.core.adaptive_router import parse_json_output
+from app.graph.nodes.execute_plan_node import run_plan_step
+from app.utils.json_repair import IncrementalJSONParser
+from app.utils.async_utils import run_sync
 from app.core.logging import get_logger
 import json
 
@@ -20,8 +26,9 @@ def app_plan_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current graph state
         
     Returns:
-        Updated state with plan
+        State update with the plan (and, when pipelined, the step results)
     """
+    update: Dict[str, Any] = {}
     user_input = state.get("user_input", "")
     chat_context = state.get("chat_context", "")
     connected_app = state.get("connected_app")
@@ -34,14 +41,8 @@ def app_plan_node(state: Dict[str, Any]) -> Dict[str, Any]:
         app_category = connected_app.get("category", "UNKNOWN")
         app_name = connected_app.get("name", "Unknown")
     
-    # Load prompt template
-    prompt_path = Path(__file__).parent.parent.parent / "prompts" / "app_plan_prompt.txt"
-    
-    # Fallback to old prompt if new one doesn't exist
-    if not prompt_path.exists():
-        prompt_path = Path(__file__).parent.parent.parent / "prompts" / "planner_prompt.txt"
-    
-    prompt_template = prompt_path.read_text()
+    # Prompt template (fallback to old prompt if the new one doesn't exist)
+    prompt_template = get_prompt("app_plan_prompt", update, fallback="planner_prompt")
     
     # Format prompt
     app_data_str = json.dumps(app_data, indent=2, ensure_ascii=False) if app_data else "None"
@@ -58,62 +59,200 @@ def app_plan_node(state: Dict[str, Any]) -> Dict[str, Any]:
     from app.core.llm_router import get_model_for_app_plan
     from app.core.config import settings
     model = get_model_for_app_plan(state)
-    llm = get_llm(
-        temperature=0.3,
-        model=model,
-        max_tokens=settings.llm_max_tokens_plan
-    )
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a planning assistant. Generate a plan with generic actions (CREATE_PRODUCT, CREATE_INVOICE, etc.). "
+                      "Return only valid JSON, no additional text."
+        },
+        {
+            "role": "user",
+            "content": prompt + "\n\nReturn only valid JSON, no additional text."
+        }
+    ]
+    
+    # Auto-approved plans can start executing while the plan is still being generated
+    if settings.auto_approve_plans and settings.plan_pipelined_execution and connected_app:
+        update.update(_generate_and_execute(messages, model, connected_app))
+        return update
     
     try:
-        response = llm.invoke([
-            {
-                "role": "system",
-                "content": "You are a planning assistant. Generate a plan with generic actions (CREATE_PRODUCT, CREATE_INVOICE, etc.). "
-                          "Return only valid JSON, no additional text."
-            },
-            {
-                "role": "user",
-                "content": prompt + "\n\nReturn only valid JSON, no additional text."
-            }
-        ])
-        
-        # Parse response
-        content = response.content.strip()
-        # Remove markdown code blocks if present
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-            content = content.strip()
+        response = invoke_llm(
+            messages,
+            model=model,
+            temperature=0.3,
+            max_tokens=settings.llm_max_tokens_plan,
+            node="app_plan",
+            response_format=json_schema_format(PlanOutput, name="Plan"),
+        )
         
-        plan = json.loads(content)
-        
-        # Ensure plan has required structure
-        if "steps" not in plan:
-            plan["steps"] = []
-        if "description" not in plan:
-            plan["description"] = "Execution plan"
-        
-        # Validate step format
-        for i, step in enumerate(plan["steps"]):
-            if "id" not in step:
-                step["id"] = i + 1
-            if "action" not in step:
-                step["action"] = "UNKNOWN"
-            if "params" not in step:
-                step["params"] = {}
+        # Parse response (fences and other malformed JSON are repaired locally); a
+        # cut-off plan is rejected, since its last step may be incomplete
+        plan = normalize_plan(parse_json_output("app_plan", response, allow_truncated=False))
         
         # Initialize execution state
-        state["plan"] = plan
-        state["plan_approved"] = False
-        state["current_step_index"] = 0
-        state["step_results"] = []
+        update["plan"] = plan
+        update["plan_approved"] = False
+        update["current_step_index"] = 0
         
         logger.info(f"Plan generated for {app_name} ({app_category}): {len(plan.get('steps', []))} steps")
         
     except Exception as e:
         logger.error(f"Error in app_plan_node: {str(e)}", exc_info=True)
-        state["error"] = f"Failed to generate plan: {str(e)}"
+        update["error"] = f"Failed to generate plan: {str(e)}"
+    
+    return update
+
+
+def normalize_step(step: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Fill in missing step fields (id, action, params)."""
+    if "id" not in step:
+        step["id"] = index + 1
+    if "action" not in step:
+        step["action"] = "UNKNOWN"
+    if "params" not in step:
+        step["params"] = {}
+    return step
+
+
+def normalize_plan(plan: Any) -> Dict[str, Any]:
+    """Ensure a parsed plan has description and well-formed steps."""
+    if not isinstance(plan, dict):
+        plan = {"steps": plan if isinstance(plan, list) else []}
+    
+    # Ensure plan has required structure
+    if not isinstance(plan.get("steps"), list):
+        plan["steps"] = []
+    if "description" not in plan:
+        plan["description"] = "Execution plan"
+    
+    # Validate step format
+    plan["steps"] = [
+        normalize_step(step, i) for i, step in enumerate(s for s in plan["steps"] if isinstance(s, dict))
+    ]
+    return plan
+
+
+def _completed_steps(parser: IncrementalJSONParser) -> List[Dict[str, Any]]:
+    """Steps whose JSON object is complete in the text streamed so far."""
+    partial = parser.value()
+    steps = partial if isinstance(partial, list) else (partial or {}).get("steps")
+    if not isinstance(steps, list):
+        return []
+    # While the steps array is open, its last element may still be streaming
+    steps_depth = 1 if isinstance(partial, list) else 2
+    if parser.depth >= steps_depth:
+        steps = steps[:-1]
+    return [step for step in steps if isinstance(step, dict)]
+
+
+async def stream_and_execute_plan(
+    messages: List[Dict[str, Any]],
+    model: str,
+    connected_app: Dict[str, Any],
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[str]]:
+    """
+    Stream the plan from the LLM and execute each step as soon as it is complete.
     
-    return state
+    Steps run one at a time in plan order (later steps may depend on earlier
+    ones), overlapping with generation of the rest of the plan. Only steps
+    whose JSON object was streamed complete are executed: if the output is
+    cut off (stream error, unclosed JSON or finish_reason "length"), the
+    partial step is not run and the steps still queued are dropped, since
+    every step is a write to the connected app.
+    
+    Args:
+        messages: Plan prompt messages
+        model: Plan model
+        connected_app: Connected app from state
+        
+    Returns:
+        (plan with the executed steps, step results, error message or None)
+    """
+    from app.core.config import settings
+    parser = IncrementalJSONParser()
+    steps: List[Dict[str, Any]] = []
+    results: List[Dict[str, Any]] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    outcome: Dict[str, Any] = {}
+    error = None
+    
+    async def executor():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, step = item
+            logger.info(f"Executing streamed step {index + 1}: {step['action']}")
+            results.append(await asyncio.to_thread(run_plan_step, step, index, connected_app))
+    
+    def dispatch(completed: List[Dict[str, Any]]):
+        for step in completed[len(steps):]:
+            step = normalize_step(step, len(steps))
+            steps.append(step)
+            queue.put_nowait((len(steps) - 1, step))
+    
+    def drop_queued():
+        while not queue.empty():
+            queue.get_nowait()
+    
+    worker = asyncio.ensure_future(executor())
+    try:
+        async for chunk in astream_llm(
+            messages,
+            model=model,
+            temperature=0.3,
+            max_tokens=settings.llm_max_tokens_plan,
+            node="app_plan",
+            response_format=json_schema_format(PlanOutput, name="Plan"),
+            outcome=outcome,
+        ):
+            dispatch(_completed_steps(parser.feed(chunk)))
+        if parser.done and outcome.get("finish_reason") != "length":
+            plan = normalize_plan(parser.value())
+            dispatch(plan["steps"])
+        else:
+            logger.error(f"Plan output cut off after {len(steps)} complete steps "
+                         f"(finish_reason={outcome.get('finish_reason')})")
+            drop_queued()
+            plan = normalize_plan(parser.value())
+            error = "Failed to generate plan: the plan output was cut off; the incomplete step was not executed"
+    except Exception as e:
+        logger.error(f"Plan stream failed after {len(steps)} steps: {str(e)}", exc_info=True)
+        drop_queued()
+        plan = normalize_plan(parser.value() if parser.depth or parser.done else None)
+        error = f"Failed to generate plan: {str(e)}"
+    except asyncio.CancelledError:
+        drop_queued()
+        raise
+    finally:
+        queue.put_nowait(None)
+        await worker
+    
+    plan["steps"] = steps[:len(results)]  # Dropped steps were never executed
+    return plan, results, error
 
+
+def _generate_and_execute(
+    messages: List[Dict[str, Any]],
+    model: str,
+    connected_app: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Pipelined plan generation + execution (auto-approve mode); returns the state update."""
+    try:
+        plan, results, error = run_sync(stream_and_execute_plan(messages, model, connected_app))
+    except Exception as e:
+        logger.error(f"Error in app_plan_node: {str(e)}", exc_info=True)
+        return {"error": f"Failed to generate plan: {str(e)}"}
+    
+    update = {
+        "plan": plan,
+        "plan_approved": True,
+        "current_step_index": len(plan["steps"]),
+        "step_results": results,  # Appended by the state reducer
+    }
+    if error:
+        update["error"] = error
+    
+    logger.info(f"Plan streamed and executed: {len(plan['steps'])} steps")
+    return update
@@ -1,8 +1,9 @@
 """App read node for querying data from apps using adapter pattern."""
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import asyncio
-from app.domain.apps.base import ConnectedAppConfig, AppReadIntent
+from app.domain.apps.base import AppReadIntent, as_app_config
 from app.domain.apps.registry import get_adapter
+from app.utils.vn_date_parser import find_date_ranges
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -49,6 +50,97 @@ def detect_app_read_intent(user_input: str, app_category: str) -> AppReadIntent:
         return AppReadIntent(kind="LIST_PRODUCTS", params={"page_size": 10})
 
 
+# Default page size per read kind
+DEFAULT_PAGE_SIZES = {
+    "LIST_INVOICES": 20,
+    "LIST_ORDERS": 20,
+    "LIST_PRODUCTS": 20,
+    "LIST_CUSTOMERS": 20,
+    "LIST_CATEGORIES": 100,
+    "SUMMARY_REVENUE": 100,
+}
+
+# Lookup param for the "code" filter of GET_* kinds, and the list kind used without a code
+LOOKUP_KINDS = {
+    "GET_PRODUCT": ("product_code", "LIST_PRODUCTS"),
+    "GET_CUSTOMER": ("customer_code", "LIST_CUSTOMERS"),
+    "GET_INVOICE": ("invoice_code", "LIST_INVOICES"),
+    "GET_ORDER": ("order_code", "LIST_ORDERS"),
+}
+
+FILTER_KEYS = ("from_date", "to_date", "customer", "branch", "name")
+
+# Read kinds the app can filter by date
+DATE_FILTER_KINDS = ("LIST_INVOICES", "LIST_ORDERS", "SUMMARY_REVENUE")
+
+
+def read_intent_from_request(read: Optional[Dict[str, Any]]) -> Optional[AppReadIntent]:
+    """
+    Build an AppReadIntent from the router's structured read request.
+    
+    Filters stay generic (from_date, to_date, customer, branch, name); the app
+    adapter translates them into API parameters.
+    
+    Args:
+        read: {"kind": ..., "filters": {...}} from the intent router
+        
+    Returns:
+        AppReadIntent, or None if the request is missing or invalid
+    """
+    if not isinstance(read, dict) or not read.get("kind"):
+        return None
+    kind = str(read["kind"]).upper()
+    filters = read.get("filters") or {}
+    params = {key: filters[key] for key in FILTER_KEYS if filters.get(key)}
+    
+    if kind in LOOKUP_KINDS:
+        code_param, list_kind = LOOKUP_KINDS[kind]
+        if filters.get("code"):
+            return AppReadIntent(kind=kind, params={code_param: filters["code"]})
+        kind = list_kind  # No code: search the list with the other filters
+    
+    if kind not in DEFAULT_PAGE_SIZES and kind != "LIST_BRANCHES":
+        logger.warning(f"Unknown read kind from router: {kind}")
+        return None
+    if kind in ("LIST_CATEGORIES", "LIST_BRANCHES"):
+        params = {}  # No filters on these endpoints
+    if kind in DEFAULT_PAGE_SIZES:
+        params["page_size"] = DEFAULT_PAGE_SIZES[kind]
+    return AppReadIntent(kind=kind, params=params)
+
+
+def apply_date_filters(read_intent: AppReadIntent, user_input: str) -> AppReadIntent:
+    """
+    Fill from_date/to_date from the date expressions in the user's text.
+    
+    When the text names exactly one period the rule-based parser wins over the
+    router: relative periods ("tháng trước", "quý 3") are resolved exactly,
+    without an LLM. When it names several ("hôm qua và hôm nay") the router's
+    dates are kept, and only if the router gave none is the span from the
+    first start to the last end used.
+    
+    Args:
+        read_intent: Read intent to update
+        user_input: User's input text
+        
+    Returns:
+        The read intent (params updated in place)
+    """
+    if read_intent.kind not in DATE_FILTER_KINDS:
+        return read_intent
+    ranges = find_date_ranges(user_input)
+    router_dates = read_intent.params.get("from_date") or read_intent.params.get("to_date")
+    if len(ranges) == 1:
+        start, end = ranges[0]
+    elif ranges and not router_dates:
+        start, end = min(r[0] for r in ranges), max(r[1] for r in ranges)
+    else:
+        return read_intent
+    read_intent.params["from_date"] = start.isoformat()
+    read_intent.params["to_date"] = end.isoformat()
+    return read_intent
+
+
 async def app_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Read data from app using adapter pattern.
@@ -58,39 +150,46 @@ async def app_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current graph state with connected_app
         
     Returns:
-        Updated state with app_data
+        State update with app_data and the read_intent actually used
     """
     connected_app_dict = state.get("connected_app")
     user_input = state.get("user_input", "")
     
     if not connected_app_dict:
         logger.warning("No connected app available")
-        state["app_data"] = {"error": "No app connection configured"}
-        return state
+        return {"app_data": {"error": "No app connection configured"}}
     
+    update: Dict[str, Any] = {}
     try:
-        # Build ConnectedAppConfig from state
-        app_config = ConnectedAppConfig(**connected_app_dict.get("config", {}))
+        # Typed config resolved by ChatService
+        app_config = as_app_config(connected_app_dict.get("config"))
         
         # Get category string - handle both enum and string
         category_str = app_config.category.value if hasattr(app_config.category, 'value') else str(app_config.category)
         
-        # Detect read intent
-        read_intent = detect_app_read_intent(user_input, category_str)
-        logger.info(f"Detected read intent: {read_intent.kind} for app: {app_config.app_id}")
+        # Use the read request extracted by the intent router, keyword detection as fallback
+        read_intent = state.get("read_intent")
+        if read_intent:
+            read_intent = AppReadIntent(**read_intent)
+            logger.info(f"Router read intent: {read_intent.kind} {read_intent.params} for app: {app_config.app_id}")
+        else:
+            read_intent = detect_app_read_intent(user_input, category_str)
+            logger.info(f"Detected read intent: {read_intent.kind} for app: {app_config.app_id}")
+        read_intent = apply_date_filters(read_intent, user_input)
+        update["read_intent"] = read_intent.model_dump()  # What was actually read, for the answer node
         
         # Get adapter and read data
         adapter = get_adapter(app_config.app_id)
         data = adapter.read(read_intent, app_config)
         
-        state["app_data"] = data
+        update["app_data"] = data
         logger.info(f"App read completed: {read_intent.kind}, result keys: {list(data.keys())}")
         
     except Exception as e:
         logger.error(f"App read error: {str(e)}", exc_info=True)
-        state["app_data"] = {"error": str(e)}
+        update["app_data"] = {"error": str(e)}
     
-    return state
+    return update
 
 
 def app_read_node_sync(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -102,6 +201,7 @@ def app_read_node_sync(state: Dict[str, Any]) -> Dict[str, Any]:
         loop = asyncio.get_running_loop()
         # Event loop is running, need to run in thread
         import concurrent.futures
+        import contextvars
         import threading
         
         def run_in_thread():
@@ -112,8 +212,9 @@ def app_read_node_sync(state: Dict[str, Any]) -> Dict[str, Any]:
             finally:
                 new_loop.close()
         
+        # The caller's context (trace span, metrics labels) follows the work into the thread
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(run_in_thread)
+            future = executor.submit(contextvars.copy_context().run, run_in_thread)
             return future.result()
     except RuntimeError:
         # No running loop, can use asyncio.run
@@ -13,7 +13,7 @@ def context_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current graph state
         
     Returns:
-        Updated state with chat_context
+        State update with chat_context
     """
     messages = state.get("messages", [])
     intent = state.get("intent", "general_qa")
@@ -32,9 +32,9 @@ def context_node(state: Dict[str, Any]) -> Dict[str, Any]:
     else:
         chat_context = "No previous conversation."
     
-    state["chat_context"] = chat_context
-    state["kb_context"] = ""  # Placeholder for future RAG
-    
     logger.debug(f"Context gathered: {len(messages)} messages, intent: {intent}")
-    return state
+    return {
+        "chat_context": chat_context,
+        "kb_context": "",  # Placeholder for future RAG
+    }
 
@@ -13,7 +13,7 @@ def error_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current graph state with error information
         
     Returns:
-        Updated state with error message
+        State update with the error message as answer
     """
     error = state.get("error", "An unexpected error occurred")
     
@@ -26,8 +26,7 @@ Xin lỗi, đã có lỗi xảy ra:
 Vui lòng thử lại hoặc liên hệ hỗ trợ nếu vấn đề vẫn tiếp tục.
 """
     
-    state["answer"] = error_message
     logger.error(f"Error node executed: {error}")
     
-    return state
+    return {"answer": error_message}
 
@@ -1,10 +1,13 @@
 """Intent router node for classifying user intent based on connected app."""
 from typing import Dict, Any
-import json
 from langchain_core.prompts import ChatPromptTemplate
-from app.core.llm_config import get_llm
+from app.core.llm_invoke import invoke_llm, json_schema_format
+from app.graph.output_schemas import IntentClassification
+from app.graph.nodes.app_read_node import read_intent_from_request
+from app.utils.time_utils import now_vietnam
+from app.core.adaptive_router import parse_json_output
 from app.core.logging import get_logger
-from pathlib import Path
+from app.core.prompt_registry import get_prompt
 
 logger = get_logger(__name__)
 
@@ -24,24 +27,15 @@ def intent_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current graph state
         
     Returns:
-        Updated state with intent classification
+        State update with the intent classification
     """
+    update: Dict[str, Any] = {}
     user_input = state.get("user_input", "")
     messages = state.get("messages", [])
     connected_app = state.get("connected_app")
     
-    # Load prompt template
-    prompt_path = Path(__file__).parent.parent.parent / "prompts" / "intent_router_prompt.txt"
-    
-    # Fallback to old prompt if new one doesn't exist
-    if not prompt_path.exists():
-        prompt_path = Path(__file__).parent.parent.parent / "prompts" / "router_prompt.txt"
-    
-    if not prompt_path.exists():
-        logger.warning(f"Prompt file not found: {prompt_path}")
-        prompt_template = "Classify user intent based on input: {user_input}"
-    else:
-        prompt_template = prompt_path.read_text()
+    # Prompt template (fallback to old prompt if the new one doesn't exist)
+    prompt_template = get_prompt("intent_router_prompt", update, fallback="router_prompt")
     
     # Build context from messages - use configurable history length
     from app.core.config import settings
@@ -63,22 +57,18 @@ def intent_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
         user_input=user_input,
         chat_context=chat_context,
         app_context=app_context,
-        app_available=str(connected_app is not None)
+        app_available=str(connected_app is not None),
+        today=now_vietnam().date().isoformat(),
     )
     
     # Get LLM response - use optimized model for classification
     from app.core.llm_router import get_model_for_intent_router
     from app.core.config import settings
     model = get_model_for_intent_router(state)
-    llm = get_llm(
-        temperature=0.1,
-        model=model,
-        max_tokens=settings.llm_max_tokens_intent
-    )
     
     try:
         # Request JSON format
-        response = llm.invoke([
+        response = invoke_llm([
             {
                 "role": "system",
                 "content": "You are an intent classifier. Classify user intent into: general_qa, tax_qa, app_read, app_plan, or no_app. "
@@ -88,18 +78,16 @@ def intent_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 "role": "user",
                 "content": prompt + "\n\nReturn only valid JSON, no additional text."
             }
-        ])
-        
-        # Parse response
-        content = response.content.strip()
-        # Remove markdown code blocks if present
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-            content = content.strip()
+        ],
+            model=model,
+            temperature=0.1,
+            max_tokens=settings.llm_max_tokens_intent,
+            node="intent_router",
+            response_format=json_schema_format(IntentClassification),
+        )
         
-        classification = json.loads(content)
+        # Parse response (fences, truncation and other malformed JSON are repaired locally)
+        classification = parse_json_output("intent_router", response)
         
         # Update state with new intent values
         intent = classification.get("intent", "general_qa")
@@ -114,23 +102,28 @@ def intent_router_node(state: Dict[str, Any]) -> Dict[str, Any]:
         if not connected_app and intent in ["app_read", "app_plan"]:
             intent = "no_app"
         
-        state["intent"] = intent
-        state["needs_web"] = classification.get("needs_web", False) or intent == "tax_qa"
-        state["needs_app"] = classification.get("needs_app", False) or intent in ["app_read", "app_plan"]
-        state["needs_plan"] = classification.get("needs_plan", False) or intent == "app_plan"
+        update["intent"] = intent
+        update["needs_web"] = classification.get("needs_web", False) or intent == "tax_qa"
+        update["needs_app"] = classification.get("needs_app", False) or intent in ["app_read", "app_plan"]
+        update["needs_plan"] = classification.get("needs_plan", False) or intent == "app_plan"
+        
+        # Read parameters extracted in the same call (app_read_node falls back to keywords)
+        read_intent = read_intent_from_request(classification.get("read")) if intent == "app_read" else None
+        update["read_intent"] = read_intent.model_dump() if read_intent else None
         
         logger.info(
-            f"Intent classified: {state['intent']} "
-            f"(needs_web={state['needs_web']}, needs_app={state['needs_app']}, needs_plan={state['needs_plan']})"
+            f"Intent classified: {update['intent']} "
+            f"(needs_web={update['needs_web']}, needs_app={update['needs_app']}, needs_plan={update['needs_plan']})"
         )
         
     except Exception as e:
         logger.error(f"Error in intent_router_node: {str(e)}", exc_info=True)
         # Default to general_qa on error
-        state["intent"] = "general_qa"
-        state["needs_web"] = False
-        state["needs_app"] = False
-        state["needs_plan"] = False
+        update["intent"] = "general_qa"
+        update["needs_web"] = False
+        update["needs_app"] = False
+        update["needs_plan"] = False
+        update["read_intent"] = None
     
-    return state
+    return update
 
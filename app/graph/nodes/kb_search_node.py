@@ -0,0 +1,50 @@
+"""Knowledge base search node for tax/accounting questions."""
+from typing import Dict, Any
+from app.memory.knowledge_base import search_knowledge_base
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def kb_search_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Answer tax_qa from the local knowledge base index.
+
+    Sets kb_confidence so the graph can fall back to web search when
+    retrieval is weak (or when no index has been built).
+
+    Args:
+        state: Current graph state
+
+    Returns:
+        State update with kb_confidence (and kb_context when confident)
+    """
+    user_input = state.get("user_input", "")
+
+    try:
+        hits = search_knowledge_base(user_input)
+    except Exception as e:
+        logger.error(f"Knowledge base search error: {str(e)}", exc_info=True)
+        hits = []
+
+    if not hits:
+        logger.info("Knowledge base: no hits, falling back to web search")
+        return {"kb_confidence": 0.0}
+
+    confidence = hits[0]["confidence"]
+    update: Dict[str, Any] = {"kb_confidence": confidence}
+
+    if confidence >= settings.kb_min_confidence:
+        context_parts = []
+        for hit in hits:
+            title = hit.get("title", "")
+            source = hit.get("source", "")
+            context_parts.append(f"**{title}** ({source}):\n{hit['text']}")
+        update["kb_context"] = "\n\n---\n\n".join(context_parts)
+
+    logger.info(
+        f"Knowledge base: {len(hits)} hits, confidence={confidence:.2f} "
+        f"(threshold={settings.kb_min_confidence})"
+    )
+    return update
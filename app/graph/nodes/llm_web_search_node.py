@@ -1,23 +1,25 @@
 """LLM Web search node using GPT-4o-mini Search Preview."""
 from typing import Dict, Any
-from app.core.llm_config import get_llm
+from app.core.llm_invoke import ainvoke_llm
 from app.core.config import settings
+from app.utils.async_utils import run_sync
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def llm_web_search_node(state: Dict[str, Any]) -> Dict[str, Any]:
+async def llm_research(state: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Search the web using GPT-4o-mini Search Preview model.
-    This model has built-in web search capabilities and will automatically
-    search and synthesize information from the web.
-    
+    LLM web search provider (model with built-in web search).
+
     Args:
         state: Current graph state
-        
+
     Returns:
-        Updated state with web_results and kb_context
+        Dict with web_results and kb_context
+
+    Raises:
+        Exception: LLM errors are propagated to the caller
     """
     user_input = state.get("user_input", "")
     chat_context = state.get("chat_context", "")
@@ -36,50 +38,63 @@ Hãy:
 
 Trả lời bằng tiếng Việt."""
     
-    try:
-        # Use GPT-4o-mini Search Preview model
-        # This model has built-in web search capability and will automatically
-        # search the web and synthesize information
-        llm = get_llm(
-            temperature=0.3,  # Lower temperature for more factual search results
-            model=settings.llm_model_web_search,
-            max_tokens=settings.llm_max_tokens_web_search
-        )
-        
-        # Invoke LLM with search prompt
-        # The model will automatically search the web and synthesize results
-        response = llm.invoke([
-            {
-                "role": "system",
-                "content": "Bạn là trợ lý tìm kiếm thông tin chuyên nghiệp. Sử dụng khả năng tìm kiếm web của bạn để tìm và tổng hợp thông tin chính xác, đáng tin cậy. Trả lời bằng tiếng Việt."
-            },
-            {
-                "role": "user",
-                "content": search_prompt
-            }
-        ])
-        
-        # Extract search results and summary
-        search_result_text = response.content.strip()
-        
-        # Store the synthesized search result
-        state["web_results"] = [
+    # Use GPT-4o-mini Search Preview model
+    # This model has built-in web search capability and will automatically
+    # search the web and synthesize information.
+    # Invoke async, so a lost research race can cancel the request. No backup
+    # model: fallback models cannot search the web.
+    messages = [
+        {
+            "role": "system",
+            "content": "Bạn là trợ lý tìm kiếm thông tin chuyên nghiệp. Sử dụng khả năng tìm kiếm web của bạn để tìm và tổng hợp thông tin chính xác, đáng tin cậy. Trả lời bằng tiếng Việt."
+        },
+        {
+            "role": "user",
+            "content": search_prompt
+        }
+    ]
+    response = await ainvoke_llm(
+        messages,
+        model=settings.llm_model_web_search,
+        temperature=0.3,  # Lower temperature for more factual search results
+        max_tokens=settings.llm_max_tokens_web_search,
+        hedge=False,
+    )
+    
+    # Extract search results and summary
+    search_result_text = response.content.strip()
+    logger.info(f"LLM web search completed: {len(search_result_text)} characters")
+    
+    # Store the synthesized search result and use the full result as kb_context
+    return {
+        "web_results": [
             {
                 "title": "Kết quả tìm kiếm tổng hợp",
                 "snippet": search_result_text,
                 "source": "GPT-4o-mini Search Preview"
             }
-        ]
-        
-        # Use the full result as kb_context
-        state["kb_context"] = search_result_text
-        
-        logger.info(f"LLM web search completed: {len(search_result_text)} characters")
+        ] if search_result_text else [],
+        "kb_context": search_result_text,
+    }
+
+
+def llm_web_search_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Search the web using GPT-4o-mini Search Preview model.
+    This model has built-in web search capabilities and will automatically
+    search and synthesize information from the web.
+    
+    Args:
+        state: Current graph state
         
+    Returns:
+        State update with web_results and kb_context
+    """
+    try:
+        return run_sync(llm_research(state))
     except Exception as e:
         logger.error(f"LLM web search error: {str(e)}", exc_info=True)
-        state["web_results"] = []
-        state["kb_context"] = f"Lỗi khi tìm kiếm thông tin: {str(e)}"
-    
-    return state
-
+        return {
+            "web_results": [],
+            "kb_context": f"Lỗi khi tìm kiếm thông tin: {str(e)}",
+        }
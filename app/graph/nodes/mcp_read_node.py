@@ -1,6 +1,7 @@
 """MCP read node for querying KiotViet data."""
 from typing import Dict, Any
 import asyncio
+import contextvars
 import json
 from app.integrations.kiotviet_mcp_client import KiotVietMCPClient
 from app.core.logging import get_logger
@@ -48,7 +49,7 @@ def mcp_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
             if loop.is_running():
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, client.list_products(page_size=20))
+                    future = executor.submit(contextvars.copy_context().run, asyncio.run, client.list_products(page_size=20))
                     results["products"] = future.result()
             else:
                 results["products"] = asyncio.run(client.list_products(page_size=20))
@@ -58,7 +59,7 @@ def mcp_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
             if loop.is_running():
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, client.list_invoices(page_size=20))
+                    future = executor.submit(contextvars.copy_context().run, asyncio.run, client.list_invoices(page_size=20))
                     results["invoices"] = future.result()
             else:
                 results["invoices"] = asyncio.run(client.list_invoices(page_size=20))
@@ -68,7 +69,7 @@ def mcp_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
             if loop.is_running():
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, client.list_orders(page_size=20))
+                    future = executor.submit(contextvars.copy_context().run, asyncio.run, client.list_orders(page_size=20))
                     results["orders"] = future.result()
             else:
                 results["orders"] = asyncio.run(client.list_orders(page_size=20))
@@ -78,7 +79,7 @@ def mcp_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
             if loop.is_running():
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, client.search_customers(page_size=20))
+                    future = executor.submit(contextvars.copy_context().run, asyncio.run, client.search_customers(page_size=20))
                     results["customers"] = future.result()
             else:
                 results["customers"] = asyncio.run(client.search_customers(page_size=20))
@@ -89,7 +90,7 @@ def mcp_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
             if loop.is_running():
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, client.list_products(page_size=10))
+                    future = executor.submit(contextvars.copy_context().run, asyncio.run, client.list_products(page_size=10))
                     results["products"] = future.result()
             else:
                 results["products"] = asyncio.run(client.list_products(page_size=10))
@@ -1,6 +1,6 @@
 """Planner node for generating execution plans."""
 from typing import Dict, Any
-from pathlib import Path
+from app.core.prompt_registry import get_prompt
 from app.core.llm_config import get_llm
 from app.core.logging import get_logger
 import json
@@ -24,8 +24,7 @@ def planner_node(state: Dict[str, Any]) -> Dict[str, Any]:
     mcp_data = state.get("mcp_data", {})
     
     # Load prompt template
-    prompt_path = Path(__file__).parent.parent.parent / "prompts" / "planner_prompt.txt"
-    prompt_template = prompt_path.read_text()
+    prompt_template = get_prompt("planner_prompt", state)
     
     # Format prompt
     mcp_data_str = json.dumps(mcp_data, indent=2, ensure_ascii=False) if mcp_data else "None"
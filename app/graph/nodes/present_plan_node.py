@@ -16,7 +16,7 @@ def present_plan_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current graph state with plan
         
     Returns:
-        Updated state (waiting for user decision)
+        State update with the presentation and approval flag
     """
     plan = state.get("plan", {})
     
@@ -35,8 +35,6 @@ def present_plan_node(state: Dict[str, Any]) -> Dict[str, Any]:
     for i, step in enumerate(steps, 1):
         presentation += f"\n{i}. **{step.get('action', 'Unknown')}** - {step.get('description', 'No description')}"
     
-    state["answer"] = presentation
-    
     # Plan approval logic
     # TODO: Implement checkpoint mechanism for proper user approval with pause/resume
     # For now: auto-approve plans (can be configured via environment variable)
@@ -44,11 +42,9 @@ def present_plan_node(state: Dict[str, Any]) -> Dict[str, Any]:
     auto_approve_plans = getattr(settings, 'auto_approve_plans', True)  # Default: True for development
     
     if auto_approve_plans:
-        state["plan_approved"] = True
         logger.info(f"Plan auto-approved: {len(steps)} steps (auto_approve_plans={auto_approve_plans})")
     else:
-        state["plan_approved"] = False
         logger.info(f"Plan requires manual approval: {len(steps)} steps (checkpoint mechanism needed)")
     
-    return state
+    return {"answer": presentation, "plan_approved": bool(auto_approve_plans)}
 
@@ -0,0 +1,154 @@
+"""Research node: Google search and/or LLM web search, raced or hedged."""
+from typing import Dict, Any, Callable, Awaitable, Optional
+import asyncio
+import time
+from app.graph.nodes.web_search_node import google_research
+from app.graph.nodes.llm_web_search_node import llm_research
+from app.telemetry.stats import research_stats
+from app.utils.async_utils import run_sync
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+ResearchProvider = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+PROVIDERS: Dict[str, ResearchProvider] = {
+    "google": google_research,
+    "llm": llm_research,
+}
+
+# Hedge delay used before the primary provider has any latency samples
+DEFAULT_HEDGE_DELAY = 4.0
+
+
+def is_sufficient(result: Dict[str, Any]) -> bool:
+    """A provider result is good enough to answer from if it has any results."""
+    return bool(result.get("web_results"))
+
+
+async def _timed(name: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a provider and record its latency (cancelled runs are not recorded)."""
+    start = time.perf_counter()
+    try:
+        result = await PROVIDERS[name](state)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        research_stats.get(name).record(time.perf_counter() - start, success=False)
+        raise
+    research_stats.get(name).record(time.perf_counter() - start, success=True)
+    return result
+
+
+def _hedge_delay(primary: str) -> float:
+    """Seconds to wait for the primary before starting the secondary."""
+    if settings.research_hedge_delay_s > 0:
+        return settings.research_hedge_delay_s
+    p95 = research_stats.get(primary).p95
+    return p95 if p95 is not None else DEFAULT_HEDGE_DELAY
+
+
+async def research(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the research stage according to settings.research_mode.
+
+    - "google" / "llm": a single provider
+    - "race": start both providers at once
+    - "hedge": start the primary, then the secondary if the primary is slower
+      than the hedge delay, fails, or returns nothing
+
+    The first sufficient result wins and the other provider is cancelled.
+
+    Args:
+        state: Current graph state
+
+    Returns:
+        Dict with web_results and kb_context
+
+    Raises:
+        Exception: The last provider error if no provider returned a result
+    """
+    mode = settings.research_mode
+    if mode in PROVIDERS:
+        return await _timed(mode, state)
+
+    primary = settings.research_primary
+    secondary = next(name for name in PROVIDERS if name != primary)
+
+    tasks: Dict[asyncio.Task, str] = {}
+
+    def start(name: str) -> None:
+        tasks[asyncio.ensure_future(_timed(name, state))] = name
+
+    start(primary)
+    if mode == "race":
+        start(secondary)
+    hedge_at = time.perf_counter() + _hedge_delay(primary)
+
+    pending = set(tasks)
+    winner: Optional[str] = None
+    fallback: Optional[Dict[str, Any]] = None
+    fallback_name: Optional[str] = None
+    last_error: Optional[BaseException] = None
+
+    try:
+        while pending and winner is None:
+            hedged = secondary in tasks.values()
+            timeout = None if hedged else max(0.0, hedge_at - time.perf_counter())
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                name = tasks[task]
+                if task.exception() is not None:
+                    last_error = task.exception()
+                    logger.warning(f"Research provider {name} failed: {str(last_error)}")
+                    continue
+                result = task.result()
+                if winner is None and is_sufficient(result):
+                    winner = name
+                    fallback, fallback_name = result, name
+                elif fallback is None:
+                    fallback, fallback_name = result, name
+
+            # Primary too slow, failed or empty -> hedge with the secondary
+            if winner is None and secondary not in tasks.values():
+                logger.info(f"Hedging research with {secondary}")
+                start(secondary)
+                pending.add(next(t for t, n in tasks.items() if n == secondary))
+    finally:
+        for task in pending:
+            task.cancel()
+
+    used = winner or fallback_name
+    if len(tasks) > 1:  # A hedge the primary won before the delay was no contest
+        for name in tasks.values():
+            research_stats.get(name).record_contest(won=name == used)
+    if pending:
+        logger.info(f"Research won by {used}, cancelled {[tasks[t] for t in pending]}")
+
+    if fallback is not None:
+        stats = research_stats.get(used)
+        logger.info(f"Research provider {used}: p50={stats.p50}, p95={stats.p95}, win_rate={stats.win_rate:.2f}")
+        return fallback
+    raise last_error or RuntimeError("No research provider returned a result")
+
+
+def research_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Research external information (Google search and/or LLM web search).
+    
+    Args:
+        state: Current graph state
+        
+    Returns:
+        State update with web_results and kb_context
+    """
+    try:
+        return run_sync(research(state))
+    except Exception as e:
+        logger.error(f"Research error: {str(e)}")
+        return {
+            "web_results": [],
+            "kb_context": f"Error during web search: {str(e)}",
+        }
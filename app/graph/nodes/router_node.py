@@ -6,7 +6,7 @@ from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 from app.core.llm_config import get_llm
 from app.core.logging import get_logger
-from pathlib import Path
+from app.core.prompt_registry import get_prompt
 
 logger = get_logger(__name__)
 
@@ -35,8 +35,7 @@ def router_node(state: Dict[str, Any]) -> Dict[str, Any]:
     mcp_connection = state.get("mcp_connection")
     
     # Load prompt template
-    prompt_path = Path(__file__).parent.parent.parent / "prompts" / "router_prompt.txt"
-    prompt_template = prompt_path.read_text()
+    prompt_template = get_prompt("router_prompt", state)
     
     # Build context from messages
     chat_context = "\n".join([
@@ -1,69 +1,86 @@
 """Web search node for external information research."""
-from typing import Dict, Any
-import asyncio
-from app.integrations.web_search_client import search_web
+from typing import Dict, Any, List
+from app.integrations.web_search_client import search_web_multi
+from app.graph.tools.search_query_planner import plan_search_queries
+from app.utils.async_utils import run_sync
+from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def web_search_node(state: Dict[str, Any]) -> Dict[str, Any]:
+def build_web_context(results: List[Dict[str, Any]]) -> str:
     """
-    Search the web for information.
+    Build kb_context from the top search results.
+
+    Args:
+        results: Merged search results
+
+    Returns:
+        Context text for the answer node
+    """
+    if not results:
+        return "No web search results found."
+
+    context_parts = []
+    for r in results[:5]:  # Use top 5 results
+        title = r.get("title", "")
+        snippet = r.get("snippet", "")
+        full_content = r.get("full_content", "")
+        link = r.get("link", "")
+        
+        # Prefer full_content if available, otherwise use snippet
+        if full_content:
+            context_parts.append(f"**{title}** ({link}):\n{full_content}")
+        else:
+            context_parts.append(f"**{title}** ({link}): {snippet}")
     
+    kb_context = "\n\n---\n\n".join(context_parts)
+    logger.info(f"Built kb_context with {len(context_parts)} results, total length: {len(kb_context)}")
+    return kb_context
+
+
+async def google_research(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Google Custom Search provider (search + page fetching).
+
     Args:
         state: Current graph state
-        
+
     Returns:
-        Updated state with web_results and kb_context
+        Dict with web_results and kb_context
+
+    Raises:
+        Exception: Search errors are propagated to the caller
     """
     user_input = state.get("user_input", "")
-    chat_context = state.get("chat_context", "")
+    messages = state.get("messages", [])
     
-    # Build search query
-    query = f"{user_input} {chat_context}".strip()
+    # Plan 1-3 focused queries instead of appending the chat history to the input
+    queries = await plan_search_queries(user_input, messages, max_queries=settings.web_search_max_queries)
+    logger.info(f"Search queries: {queries}")
     
-    # Perform search
-    try:
-        # Run async search
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If already in async context, use asyncio.create_task
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, search_web(query, num_results=10))
-                results = future.result()
-        else:
-            results = asyncio.run(search_web(query, num_results=10))
-        
-        state["web_results"] = results
-        
-        # Build kb_context from results
-        if results:
-            context_parts = []
-            for r in results[:5]:  # Use top 5 results
-                title = r.get("title", "")
-                snippet = r.get("snippet", "")
-                full_content = r.get("full_content", "")
-                link = r.get("link", "")
-                
-                # Prefer full_content if available, otherwise use snippet
-                if full_content:
-                    context_parts.append(f"**{title}** ({link}):\n{full_content}")
-                else:
-                    context_parts.append(f"**{title}** ({link}): {snippet}")
-            
-            state["kb_context"] = "\n\n---\n\n".join(context_parts)
-            logger.info(f"Built kb_context with {len(context_parts)} results, total length: {len(state['kb_context'])}")
-        else:
-            state["kb_context"] = "No web search results found."
-        
-        logger.info(f"Web search completed: {len(results)} results")
+    results = await search_web_multi(queries, num_results=10)
+    logger.info(f"Web search completed: {len(results)} results")
+    return {"web_results": results, "kb_context": build_web_context(results)}
+
+
+def web_search_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Search the web for information.
+    
+    Args:
+        state: Current graph state
         
+    Returns:
+        State update with web_results and kb_context
+    """
+    try:
+        # Run async search on the shared loop (keeps the page fetch pool warm)
+        return run_sync(google_research(state))
     except Exception as e:
         logger.error(f"Web search error: {str(e)}")
-        state["web_results"] = []
-        state["kb_context"] = f"Error during web search: {str(e)}"
-    
-    return state
-
+        return {
+            "web_results": [],
+            "kb_context": f"Error during web search: {str(e)}",
+        }
@@ -0,0 +1,50 @@
+"""Schemas for structured LLM output (provider JSON-schema mode)."""
+from typing import Literal, Optional
+from pydantic import BaseModel
+from app.domain.apps.base import Plan
+
+IntentName = Literal["general_qa", "tax_qa", "app_read", "app_plan", "no_app"]
+
+ReadKind = Literal[
+    "LIST_INVOICES", "LIST_ORDERS", "LIST_PRODUCTS", "LIST_CUSTOMERS", "LIST_CATEGORIES",
+    "LIST_BRANCHES", "SUMMARY_REVENUE", "GET_PRODUCT", "GET_CUSTOMER", "GET_INVOICE", "GET_ORDER",
+]
+
+
+class ReadFilters(BaseModel):
+    """Filters the user stated for an app read (all optional)."""
+    from_date: Optional[str] = None   # YYYY-MM-DD
+    to_date: Optional[str] = None     # YYYY-MM-DD (inclusive)
+    customer: Optional[str] = None    # Customer name or code
+    branch: Optional[str] = None      # Branch name
+    name: Optional[str] = None        # Product name
+    code: Optional[str] = None        # Record code for GET_* lookups
+
+
+class ReadRequest(BaseModel):
+    """What to read from the connected app."""
+    kind: ReadKind
+    filters: ReadFilters = ReadFilters()
+
+
+class IntentClassification(BaseModel):
+    """Output of the intent router."""
+    intent: IntentName
+    reasoning: str = ""
+    needs_web: bool = False
+    needs_app: bool = False
+    needs_plan: bool = False
+    read: Optional[ReadRequest] = None  # Only for app_read
+
+
+# Plans are requested in the same shape the adapters execute
+PlanOutput = Plan
+
+__all__ = [
+    "IntentClassification",
+    "IntentName",
+    "ReadFilters",
+    "ReadKind",
+    "ReadRequest",
+    "PlanOutput",
+]
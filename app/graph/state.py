@@ -1,15 +1,30 @@
-"""LangGraph state definition."""
-from typing import TypedDict, List, Optional, Dict, Any
+"""LangGraph state definition.
+
+Nodes return only the keys they change. Keys that accumulate during a run
+(step_results, prompt_versions, node_timings) have reducers, so a node's
+update holds only its own entries and LangGraph merges them into the state.
+"""
+from typing import Annotated, TypedDict, List, Optional, Dict, Any
+import operator
 from app.domain.apps.base import ConnectedAppConfig, Plan
 
 
+def merge_dicts(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reducer: keys of the update override those already in the state."""
+    if not left:
+        return right or {}
+    if not right:
+        return left
+    return {**left, **right}
+
+
 class ConnectedApp(TypedDict, total=False):
     """Connected app information in state."""
     id: str
     name: str                  # "KiotViet", "Misa eShop", ...
     category: str              # "POS_SIMPLE" | "ACCOUNTING" | "UNKNOWN"
     connection_method: str     # "api" | "mcp"
-    config: Dict[str, Any]     # api_base_url, credentials hoặc mcp_url, tool_ids,...
+    config: ConnectedAppConfig  # Typed config with decrypted credentials (a plain dict in replayed cassettes)
 
 
 class CuliState(TypedDict, total=False):
@@ -32,10 +47,12 @@ class CuliState(TypedDict, total=False):
     needs_web: bool       # Cần web search
     needs_app: bool       # Cần đụng tới app bên ngoài (KiotViet, Misa,...)
     needs_plan: bool      # Cần lập plan
+    read_intent: Optional[Dict[str, Any]]  # AppReadIntent (kind + filters) extracted by the intent router
     
     # Ngữ cảnh
     chat_context: str     # Summarized history
     kb_context: str       # RAG results (optional)
+    kb_confidence: float  # Retrieval confidence of the local knowledge base (0-1)
     
     # Kết quả từ web
     web_results: List[Dict[str, Any]]
@@ -47,10 +64,14 @@ class CuliState(TypedDict, total=False):
     plan: Optional[Dict[str, Any]]  # Plan dict with steps
     plan_approved: bool
     current_step_index: int
-    step_results: List[Dict[str, Any]]
+    step_results: Annotated[List[Dict[str, Any]], operator.add]  # Nodes return only new results
     
     # Output cuối
     answer: str
     error: Optional[str]
     stream_events: List[Dict[str, Any]]  # For streaming
+    
+    # Run metadata
+    prompt_versions: Annotated[Dict[str, str], merge_dicts]  # Prompt template name -> version (content hash) used in this run
+    node_timings: Annotated[List[Dict[str, Any]], operator.add]  # [{"node", "duration_ms"}] in execution order
 
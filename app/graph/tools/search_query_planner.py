@@ -0,0 +1,133 @@
+"""Search query planner: turn a chat turn into 1-3 focused web search queries."""
+from typing import List, Dict, Any, Optional
+import json
+import re
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Conversational filler that only dilutes search queries
+STOP_PHRASES = [
+    "cho tôi hỏi", "cho mình hỏi", "cho em hỏi", "tôi muốn hỏi", "mình muốn hỏi", "em muốn hỏi",
+    "bạn ơi", "xin hỏi", "làm ơn", "giúp tôi", "giúp mình", "giúp em",
+    "như thế nào", "thế nào", "là gì", "ra sao", "bao nhiêu", "có phải",
+    "vậy", "nhé", "nhỉ", "ạ", "à", "ơi",
+]
+# Question tags, stripped only at the end of a clause: elsewhere "không" is a
+# negation ("sản phẩm không chịu thuế") and must stay in the query
+QUESTION_TAGS = ["được không", "hay không", "có không", "không"]
+STOP_WORDS = {
+    "tôi", "mình", "em", "anh", "chị", "bạn", "thì", "là", "và", "của", "có",
+    "cho", "với", "được", "những", "các", "này", "đó", "kia", "nào", "gì", "mà",
+    "hỏi", "muốn", "cần", "biết", "phải", "nên", "sao", "ạ", "nhé", "vậy", "còn",
+}
+
+MAX_QUERY_WORDS = 12
+
+_REWRITE_PROMPT = """Rewrite the user's question into 1 to 3 short Google search queries in Vietnamese.
+Each query must be under 12 words, keep legal document numbers and years, and drop filler words.
+Use the previous question only to resolve references like "còn ... thì sao".
+
+Previous question: {previous}
+Question: {question}
+
+Return only a JSON array of strings."""
+
+
+def extract_key_terms(text: str) -> str:
+    """
+    Strip conversational filler and stop words, keeping content words in order.
+
+    Args:
+        text: User text
+
+    Returns:
+        Space-separated key terms
+    """
+    lowered = text.lower()
+    for phrase in STOP_PHRASES:
+        lowered = re.sub(rf"(?<!\w){re.escape(phrase)}(?!\w)", " ", lowered)
+    for tag in QUESTION_TAGS:
+        lowered = re.sub(rf"(?<!\w){re.escape(tag)}(?=\s*(?:[?.!,;]|$))", " ", lowered)
+    words = re.findall(r"[\w./-]+", lowered)
+    return " ".join(w for w in words if w not in STOP_WORDS)
+
+
+def _previous_user_message(messages: List[Dict[str, Any]]) -> Optional[str]:
+    """Latest user message before the current one (messages end with the current input)."""
+    user_messages = [m.get("content", "") for m in messages if m.get("role") == "user"]
+    return user_messages[-2] if len(user_messages) >= 2 else None
+
+
+def _dedupe(queries: List[str], max_queries: int) -> List[str]:
+    """Drop empty and duplicate queries (case/whitespace-insensitive)."""
+    seen = set()
+    unique = []
+    for query in queries:
+        query = " ".join(query.split()[:MAX_QUERY_WORDS])
+        key = query.lower()
+        if query and key not in seen:
+            seen.add(key)
+            unique.append(query)
+    return unique[:max_queries]
+
+
+async def _rewrite_with_llm(user_input: str, previous: Optional[str]) -> List[str]:
+    """Ask a cheap model for focused queries (returns [] on any failure)."""
+    from app.core.llm_invoke import ainvoke_llm
+    try:
+        response = await ainvoke_llm([{
+            "role": "user",
+            "content": _REWRITE_PROMPT.format(previous=previous or "None", question=user_input),
+        }], model=settings.llm_model_intent, temperature=0.1, max_tokens=150)
+        content = response.content.strip()
+        start, end = content.find("["), content.rfind("]")
+        queries = json.loads(content[start:end + 1]) if start != -1 and end > start else []
+        return [q for q in queries if isinstance(q, str)]
+    except Exception as e:
+        logger.warning(f"Query rewrite failed, using key terms: {str(e)}")
+        return []
+
+
+async def plan_search_queries(
+    user_input: str,
+    messages: Optional[List[Dict[str, Any]]] = None,
+    max_queries: int = 3,
+) -> List[str]:
+    """
+    Build 1-3 focused search queries for a turn.
+
+    A coroutine: it is called from google_research on the shared event loop,
+    where the sync invoke_llm (run_sync) cannot be used.
+
+    Uses a cheap LLM rewrite when settings.web_search_query_rewrite is on,
+    otherwise (or if the rewrite fails) key-term extraction. Short follow-up
+    questions are combined with the key terms of the previous question instead
+    of appending the whole chat history.
+
+    Args:
+        user_input: Current user input
+        messages: Chat history in OpenAI format (ending with the current input)
+        max_queries: Maximum number of queries
+
+    Returns:
+        List of queries (at least one if user_input is not empty)
+    """
+    previous = _previous_user_message(messages or [])
+
+    if settings.web_search_query_rewrite:
+        rewritten = _dedupe(await _rewrite_with_llm(user_input, previous), max_queries)
+        if rewritten:
+            return rewritten
+
+    key_terms = extract_key_terms(user_input)
+    # The raw wording only when no key terms could be extracted: as an extra
+    # query it mostly repeats the key-term query and costs a search call
+    queries = [key_terms or user_input.strip()]
+
+    # Follow-up like "còn hộ kinh doanh thì sao?" needs the topic of the previous question
+    if previous and len(key_terms.split()) < 4:
+        queries.append(f"{extract_key_terms(previous)} {key_terms}")
+
+    return _dedupe(queries, max_queries)
@@ -0,0 +1,215 @@
+"""HTML-to-text extraction, run in a bounded process pool off the event loop."""
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import multiprocessing
+import threading
+from bs4 import BeautifulSoup
+import html2text
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Configure html2text converter
+html_converter = html2text.HTML2Text()
+html_converter.ignore_links = False
+html_converter.ignore_images = True
+html_converter.body_width = 0  # Don't wrap lines
+
+# Elements that never carry article content
+NOISE_TAGS = ["script", "style", "nav", "footer", "header", "aside"]
+
+# Maximum characters of extracted text kept per page (token budget)
+MAX_CONTENT_CHARS = 5000
+
+# Prefer faster parsers when installed: selectolax (direct text extraction),
+# then lxml as the BeautifulSoup backend, falling back to html.parser.
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+try:
+    import lxml  # noqa: F401
+    BS4_PARSER = "lxml"
+except ImportError:
+    BS4_PARSER = "html.parser"
+
+
+def extract_text(html: str, max_chars: int = MAX_CONTENT_CHARS) -> str:
+    """
+    Extract readable text from an HTML document.
+    
+    Pure function of its input so it can run in a worker process.
+    
+    Args:
+        html: Raw HTML
+        max_chars: Maximum characters to keep
+        
+    Returns:
+        Cleaned text, truncated to max_chars
+    """
+    if SelectolaxParser is not None:
+        tree = SelectolaxParser(html)
+        for node in tree.css(",".join(NOISE_TAGS)):
+            node.decompose()
+        root = tree.body or tree.root
+        text = root.text(separator="\n") if root is not None else ""
+    else:
+        # Parse HTML and remove non-content elements
+        soup = BeautifulSoup(html, BS4_PARSER)
+        for element in soup(NOISE_TAGS):
+            element.decompose()
+        # Convert to text using html2text
+        text = html_converter.handle(str(soup))
+    
+    # Clean up: remove excessive whitespace
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    content = '\n'.join(lines)
+    
+    # Limit content length to avoid token limits
+    if len(content) > max_chars:
+        content = content[:max_chars] + "... (truncated)"
+    return content
+
+
+def _ping() -> bool:
+    """No-op task used to start worker processes ahead of the first request."""
+    return True
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_extract_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the extraction process pool, or None if disabled (web_extract_workers=0).
+    
+    Workers are spawned (not forked) so they never inherit the server's
+    threads or locks.
+    
+    Returns:
+        ProcessPoolExecutor or None
+    """
+    global _pool
+    if settings.web_extract_workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.web_extract_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _pool
+
+
+def warm_extract_pool() -> None:
+    """Start all worker processes now (application startup) instead of on first use."""
+    pool = get_extract_pool()
+    if pool is None:
+        return
+    try:
+        futures = [pool.submit(_ping) for _ in range(settings.web_extract_workers)]
+        for future in futures:
+            future.result()
+        logger.info(f"HTML extraction pool ready ({settings.web_extract_workers} workers)")
+    except Exception as e:
+        # Not fatal: extract_text_async recreates the pool or falls back to a thread
+        logger.error(f"Failed to warm HTML extraction pool: {str(e)}")
+        _reset_broken_pool(pool)
+
+
+def shutdown_extract_pool() -> None:
+    """Shut down the extraction pool (application shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _reset_broken_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next call creates a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _recycle_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Replace a pool whose worker is stuck on a document.
+    
+    A ProcessPoolExecutor cannot kill one worker, so the whole pool is
+    retired: new work goes to a fresh pool and the old workers are
+    terminated. Other documents still in the old pool fail with
+    BrokenProcessPool and are retried on the fresh pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False)
+    for process in processes:
+        process.terminate()
+
+
+async def extract_text_async(html: str, timeout: Optional[float] = None) -> str:
+    """
+    Extract text without blocking the event loop.
+    
+    Runs extract_text in the process pool with a per-document timeout. A page
+    that exceeds the timeout yields empty content; if a worker was already
+    parsing it, the pool is recycled so that a pathological page cannot keep
+    the worker busy past the timeout. If the pool is disabled or broken,
+    extraction falls back to a thread.
+    
+    Args:
+        html: Raw HTML
+        timeout: Per-document timeout in seconds (defaults to settings.web_extract_timeout)
+        
+    Returns:
+        Extracted text, or empty string on timeout
+    """
+    loop = asyncio.get_running_loop()
+    timeout = timeout if timeout is not None else settings.web_extract_timeout
+    deadline = loop.time() + timeout
+    
+    while True:
+        pool = get_extract_pool()
+        if pool is None:
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(extract_text, html), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"HTML extraction timed out after {timeout}s ({len(html)} chars)")
+                return ""
+        
+        try:
+            future = pool.submit(extract_text, html)
+        except (BrokenProcessPool, RuntimeError):
+            if pool is not _pool:
+                continue  # Shut down by another document's timeout: retry on the fresh pool
+            raise
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            # Still queued: cancelled by wait_for. Running: only killing the worker stops it
+            stuck = future.running()
+            logger.warning(
+                f"HTML extraction timed out after {timeout}s ({len(html)} chars)"
+                + (", recycling the worker pool" if stuck else " waiting for a worker")
+            )
+            if stuck:
+                _recycle_pool(pool)
+            return ""
+        except BrokenProcessPool:
+            if pool is not _pool:
+                continue  # Retired by another document's timeout: retry on the fresh pool
+            logger.error("HTML extraction pool is broken, recreating it and extracting in a thread")
+            _reset_broken_pool(pool)
+            return await asyncio.wait_for(asyncio.to_thread(extract_text, html), max(0.0, deadline - loop.time()))
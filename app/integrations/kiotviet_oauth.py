@@ -2,6 +2,7 @@
 import httpx
 from typing import Optional
 from app.core.config import settings
+from app.telemetry.http import async_transport
 from app.core.logging import get_logger
 import time
 
@@ -68,7 +69,7 @@ async def get_access_token(client_id: str, client_secret: str) -> str:
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     
     try:
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=async_transport()) as client:
             response = await client.post(
                 settings.kiotviet_token_url,
                 data=data,
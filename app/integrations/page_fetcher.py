@@ -0,0 +1,168 @@
+"""Pooled, per-host bounded page fetcher with a streaming byte cap."""
+from typing import AsyncIterator, Dict, Optional
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+import asyncio
+import weakref
+import httpx
+from app.core.config import settings
+from app.telemetry.http import async_transport
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+# Content types worth downloading and parsing
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+@dataclass
+class FetchResult:
+    """Result of a page fetch."""
+    url: str
+    status_code: int
+    html: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    truncated: bool = False        # Body was cut at the byte cap
+    skipped: bool = False          # Non-HTML content type, body not downloaded
+
+
+class PageFetcher:
+    """
+    Shared HTTP client for fetching web pages.
+
+    - One connection pool for all fetches on an event loop
+    - At most per_host_limit concurrent requests to the same host
+    - Bodies are streamed and cut at max_bytes
+    - Non-HTML responses are skipped after reading headers only
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        per_host_limit: int,
+        max_bytes: int,
+        timeout: float,
+    ):
+        """
+        Initialize fetcher.
+
+        Args:
+            max_connections: Connection pool size
+            per_host_limit: Concurrent requests allowed per host
+            max_bytes: Maximum body bytes to download per page
+            timeout: Request timeout in seconds
+        """
+        self.per_host_limit = per_host_limit
+        self.max_bytes = max_bytes
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            transport=async_transport(limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            )),
+        )
+        # Per-host semaphores and the fetches holding or waiting for them; a
+        # host's entry is dropped when its last fetch ends, so search-result
+        # hosts seen once do not accumulate
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the per_host_limit slots of the URL's host."""
+        host = urlsplit(url).hostname or ""
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            async with semaphore:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._host_semaphores[host]
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """
+        Fetch a page.
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers (e.g. conditional request validators)
+
+        Returns:
+            FetchResult (status 304 results carry no body)
+
+        Raises:
+            httpx.HTTPStatusError: For 4xx/5xx responses
+            httpx.TimeoutException: On timeout
+        """
+        async with self._host_slot(url):
+            async with self._client.stream("GET", url, headers=headers) as response:
+                result = FetchResult(
+                    url=url,
+                    status_code=response.status_code,
+                    headers=dict(response.headers),
+                )
+                if response.status_code == 304:
+                    return result
+                response.raise_for_status()
+
+                content_type = response.headers.get("content-type", "").lower()
+                if content_type and not content_type.startswith(HTML_CONTENT_TYPES):
+                    logger.debug(f"Skipping non-HTML content ({content_type}): {url}")
+                    result.skipped = True
+                    return result
+
+                chunks = []
+                received = 0
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    received += len(chunk)
+                    if received >= self.max_bytes:
+                        result.truncated = True
+                        break
+
+                body = b"".join(chunks)[:self.max_bytes]
+                result.html = body.decode(response.charset_encoding or "utf-8", errors="ignore")
+                if result.truncated:
+                    logger.debug(f"Truncated {url} at {self.max_bytes} bytes")
+                return result
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+
+# One fetcher per event loop (httpx pools cannot be shared across loops)
+_fetchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PageFetcher]" = weakref.WeakKeyDictionary()
+
+
+def get_page_fetcher() -> PageFetcher:
+    """
+    Get the page fetcher for the running event loop.
+
+    Returns:
+        PageFetcher instance
+    """
+    loop = asyncio.get_running_loop()
+    fetcher = _fetchers.get(loop)
+    if fetcher is None:
+        fetcher = PageFetcher(
+            max_connections=settings.web_fetch_max_connections,
+            per_host_limit=settings.web_fetch_per_host_limit,
+            max_bytes=settings.web_fetch_max_bytes,
+            timeout=settings.web_fetch_timeout,
+        )
+        _fetchers[loop] = fetcher
+    return fetcher
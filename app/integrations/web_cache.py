@@ -0,0 +1,279 @@
+"""Persistent on-disk cache for web search results and extracted page content."""
+from typing import List, Dict, Any, Optional, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS page_cache (
+    url TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_search_cache_last_access ON search_cache (last_access);
+CREATE INDEX IF NOT EXISTS ix_page_cache_last_access ON page_cache (last_access);
+"""
+
+# The running size is re-read from the database at most this often, to pick
+# up writes and evictions by other worker processes sharing the file
+SIZE_RESYNC_SECONDS = 60.0
+
+
+@dataclass
+class CachedPage:
+    """Cached extracted page text with revalidation validators."""
+    url: str
+    content: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the page was last fetched or revalidated."""
+        return time.time() - self.fetched_at
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for cache keys (case, unicode form, whitespace)."""
+    query = unicodedata.normalize("NFC", query).lower()
+    return re.sub(r"\s+", " ", query).strip()
+
+
+class WebCache:
+    """
+    Two-level SQLite cache: search results by normalized query (TTL) and
+    page text by URL (ETag/Last-Modified revalidation).
+
+    Total stored size is capped; least recently used entries are evicted
+    across both levels. The size is tracked as entries are written and
+    deleted, so writes do not scan the tables.
+
+    All methods do blocking SQLite I/O: call them from async code with
+    asyncio.to_thread().
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Initialize cache.
+
+        Args:
+            path: SQLite file path
+            max_bytes: Size cap for cached payloads
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        self._size = self.total_size()
+        self._size_synced_at = time.monotonic()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one operation (safe across threads), commit and close it."""
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _search_key(query: str, num_results: int) -> str:
+        return f"{num_results}:{normalize_query(query)}"
+
+    def get_search(self, query: str, num_results: int, ttl: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get cached search results if younger than ttl seconds.
+
+        Args:
+            query: Search query
+            num_results: Number of results requested
+            ttl: Time-to-live in seconds
+
+        Returns:
+            Cached results or None
+        """
+        key = self._search_key(query, num_results)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT results, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            results, created_at = row
+            if now - created_at > ttl:
+                self._delete(conn, "search_cache", "key", key)
+                return None
+            conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(results)
+
+    def put_search(self, query: str, num_results: int, results: List[Dict[str, Any]]) -> None:
+        """Store search results (without page content, which is cached per URL)."""
+        key = self._search_key(query, num_results)
+        payload = json.dumps(
+            [{k: v for k, v in r.items() if k != "full_content"} for r in results],
+            ensure_ascii=False,
+        )
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._connect() as conn:
+            replaced = self._stored_size(conn, "search_cache", "key", key)
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, results, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now),
+            )
+        self._grow(size - replaced)
+        self._evict()
+
+    def get_page(self, url: str) -> Optional[CachedPage]:
+        """Get cached page content (fresh or stale - caller decides whether to revalidate)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT content, etag, last_modified, fetched_at FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute("UPDATE page_cache SET last_access = ? WHERE url = ?", (time.time(), url))
+        content, etag, last_modified, fetched_at = row
+        return CachedPage(url=url, content=content, etag=etag, last_modified=last_modified, fetched_at=fetched_at)
+
+    def put_page(
+        self,
+        url: str,
+        content: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store extracted page content with its validators."""
+        size = len(content.encode("utf-8"))
+        now = time.time()
+        with self._connect() as conn:
+            replaced = self._stored_size(conn, "page_cache", "url", url)
+            conn.execute(
+                "INSERT OR REPLACE INTO page_cache "
+                "(url, content, etag, last_modified, size, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, content, etag, last_modified, size, now, now),
+            )
+        self._grow(size - replaced)
+        self._evict()
+
+    def mark_revalidated(self, url: str) -> None:
+        """Reset page freshness after a 304 Not Modified response."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE page_cache SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url)
+            )
+
+    @staticmethod
+    def _stored_size(conn: sqlite3.Connection, table: str, column: str, key: str) -> int:
+        """Size of the entry an upsert is about to replace (0 if new)."""
+        row = conn.execute(f"SELECT size FROM {table} WHERE {column} = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _delete(self, conn: sqlite3.Connection, table: str, column: str, key: str) -> None:
+        """Delete one entry and account for its size."""
+        self._grow(-self._stored_size(conn, table, column, key))
+        conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (key,))
+
+    def _grow(self, delta: int) -> None:
+        with self._lock:
+            self._size += delta
+
+    def total_size(self) -> int:
+        """Total payload bytes stored in both levels (full scan; see _evict for the running size)."""
+        with self._connect() as conn:
+            search_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM search_cache").fetchone()[0]
+            page_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_cache").fetchone()[0]
+        return search_size + page_size
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until below 90% of the size cap."""
+        with self._lock:
+            now = time.monotonic()
+            stale = now - self._size_synced_at > SIZE_RESYNC_SECONDS
+            if self._size <= self.max_bytes and not stale:
+                return
+            # Exact size before evicting: other processes write to the same file
+            self._size = self.total_size()
+            self._size_synced_at = now
+            total = self._size
+            if total <= self.max_bytes:
+                return
+            target = int(self.max_bytes * 0.9)
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT 'search', key, size, last_access FROM search_cache "
+                    "UNION ALL SELECT 'page', url, size, last_access FROM page_cache "
+                    "ORDER BY last_access ASC"
+                ).fetchall()
+                evicted = 0
+                for table, key, size, _ in rows:
+                    if total <= target:
+                        break
+                    if table == "search":
+                        conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    else:
+                        conn.execute("DELETE FROM page_cache WHERE url = ?", (key,))
+                    total -= size
+                    evicted += 1
+            self._size = total
+            logger.info(f"Web cache evicted {evicted} entries (size now {total} bytes)")
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM search_cache")
+            conn.execute("DELETE FROM page_cache")
+        with self._lock:
+            self._size = 0
+
+
+_web_cache: Optional[WebCache] = None
+
+
+def get_web_cache() -> Optional[WebCache]:
+    """
+    Get the global web cache, or None if caching is disabled or unavailable.
+
+    Returns:
+        WebCache instance or None
+    """
+    global _web_cache
+    if not settings.web_cache_enabled:
+        return None
+    if _web_cache is None:
+        try:
+            _web_cache = WebCache(settings.web_cache_path, settings.web_cache_max_bytes)
+        except Exception as e:
+            logger.warning(f"Web cache unavailable, continuing without cache: {str(e)}")
+            return None
+    return _web_cache
@@ -1,71 +1,227 @@
 """Web search client using Google Custom Search API."""
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit
 import asyncio
-from bs4 import BeautifulSoup
-import html2text
 from app.core.config import settings
+from app.telemetry.http import async_transport
 from app.core.logging import get_logger
+from app.integrations.web_cache import get_web_cache
+from app.integrations.page_fetcher import get_page_fetcher
+from app.integrations.html_extract import extract_text_async
 
 logger = get_logger(__name__)
 
-# Configure html2text converter
-html_converter = html2text.HTML2Text()
-html_converter.ignore_links = False
-html_converter.ignore_images = True
-html_converter.body_width = 0  # Don't wrap lines
 
-
-async def fetch_url_content(url: str, timeout: float = 10.0) -> str:
+async def fetch_url_content(url: str, timeout: Optional[float] = None) -> str:
     """
     Fetch and extract text content from a URL.
     
+    Uses the shared page fetcher (pooled connections, per-host limits, byte cap).
+    Extracted text is cached per URL. Fresh entries are served without any
+    request; stale ones are revalidated with If-None-Match/If-Modified-Since.
+    
     Args:
         url: URL to fetch
-        timeout: Request timeout in seconds
+        timeout: Request timeout in seconds (defaults to settings.web_fetch_timeout)
         
     Returns:
         Extracted text content, or empty string if error
     """
+    # SQLite I/O runs off the event loop
+    cache = get_web_cache()
+    cached = await asyncio.to_thread(cache.get_page, url) if cache else None
+    if cached and cached.age < settings.web_page_cache_fresh_seconds:
+        logger.debug(f"Page cache hit for {url}")
+        return cached.content
+    
+    headers = {}
+    if cached:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    
     try:
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-            # Set user agent to avoid blocking
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            
-            # Parse HTML and extract text
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header", "aside"]):
-                script.decompose()
-            
-            # Convert to text using html2text
-            text = html_converter.handle(str(soup))
-            
-            # Clean up: remove excessive whitespace
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            content = '\n'.join(lines)
-            
-            # Limit content length to avoid token limits (keep first 5000 chars)
-            if len(content) > 5000:
-                content = content[:5000] + "... (truncated)"
-            
-            logger.debug(f"Fetched content from {url}: {len(content)} characters")
-            return content
-            
-    except httpx.TimeoutException:
+        fetcher = get_page_fetcher()
+        if timeout is not None:
+            result = await asyncio.wait_for(fetcher.fetch(url, headers=headers), timeout)
+        else:
+            result = await fetcher.fetch(url, headers=headers)
+        
+        if result.status_code == 304 and cached:
+            await asyncio.to_thread(cache.mark_revalidated, url)
+            logger.debug(f"Page cache revalidated for {url}")
+            return cached.content
+        if result.skipped or not result.html:
+            return ""
+        
+        # CPU-bound parsing runs in the extraction process pool
+        content = await extract_text_async(result.html)
+        
+        if cache and content:
+            await asyncio.to_thread(
+                cache.put_page,
+                url,
+                content,
+                etag=result.headers.get("etag"),
+                last_modified=result.headers.get("last-modified"),
+            )
+        
+        logger.debug(f"Fetched content from {url}: {len(content)} characters")
+        return content
+        
+    except (httpx.TimeoutException, asyncio.TimeoutError):
         logger.warning(f"Timeout fetching {url}")
-        return ""
+        return cached.content if cached else ""
     except httpx.HTTPStatusError as e:
         logger.warning(f"HTTP error fetching {url}: {e.response.status_code}")
         return ""
     except Exception as e:
         logger.warning(f"Error fetching {url}: {str(e)}")
-        return ""
+        return cached.content if cached else ""
+
+
+async def google_search(query: str, num_results: int = 10) -> List[Dict[str, Any]]:
+    """
+    Query Google Custom Search API (results cached by normalized query).
+    
+    Args:
+        query: Search query
+        num_results: Number of results to return (max 10 per page)
+        
+    Returns:
+        List of results with title, link and snippet
+        
+    Raises:
+        httpx.HTTPError: If the API request fails
+    """
+    cache = get_web_cache()
+    if cache:
+        cached_results = await asyncio.to_thread(
+            cache.get_search, query, num_results, ttl=settings.web_search_cache_ttl
+        )
+        if cached_results is not None:
+            logger.info(f"Search cache hit: {len(cached_results)} results for query: {query}")
+            return cached_results
+    
+    url = settings.google_search_url
+    params = {
+        "key": settings.google_search_api_key,
+        "cx": settings.google_search_cx,
+        "q": query,
+        "num": min(num_results, 10),  # Max 10 per request
+    }
+    
+    async with httpx.AsyncClient(transport=async_transport()) as client:
+        response = await client.get(url, params=params, timeout=30.0)
+        response.raise_for_status()
+        data = response.json()
+    
+    results = []
+    for item in data.get("items", []):
+        results.append({
+            "title": item.get("title", ""),
+            "link": item.get("link", ""),
+            "snippet": item.get("snippet", ""),
+        })
+    
+    if cache and results:
+        await asyncio.to_thread(cache.put_search, query, num_results, results)
+    return results
+
+
+async def _attach_full_content(results: List[Dict[str, Any]], max_content_results: int) -> None:
+    """Fetch full content for the top results concurrently (in place)."""
+    logger.info(f"Fetching full content for top {min(max_content_results, len(results))} results")
+    
+    # Fetch content concurrently for top results
+    fetch_tasks = [fetch_url_content(result["link"]) for result in results[:max_content_results]]
+    
+    # Wait for all fetches to complete
+    contents = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+    
+    # Add content to results
+    for i, content in enumerate(contents):
+        if isinstance(content, Exception):
+            logger.warning(f"Error fetching content for {results[i]['link']}: {str(content)}")
+            results[i]["full_content"] = ""
+        else:
+            results[i]["full_content"] = content
+            if content:
+                logger.info(f"Fetched {len(content)} characters from {results[i]['link']}")
+
+
+def _normalize_url(url: str) -> str:
+    """Normalize a URL for deduplication (drop fragment, trailing slash, scheme case)."""
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def merge_results(result_lists: List[List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal rank fusion, deduplicating by URL.
+    
+    A page found by several queries ranks above one found by a single query.
+    
+    Args:
+        result_lists: One ranked list per query
+        k: RRF damping constant
+        
+    Returns:
+        Merged list, best first
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    scores: Dict[str, float] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results):
+            key = _normalize_url(result.get("link", ""))
+            if key not in merged:
+                merged[key] = dict(result)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return [merged[key] for key in sorted(merged, key=lambda key: scores[key], reverse=True)]
+
+
+async def search_web_multi(
+    queries: List[str],
+    num_results: int = 10,
+    fetch_content: bool = True,
+    max_content_results: int = 5,
+) -> List[Dict[str, Any]]:
+    """
+    Run several search queries concurrently and fetch only the top unique pages.
+    
+    Args:
+        queries: Search queries (see app.graph.tools.search_query_planner)
+        num_results: Results per query (max 10)
+        fetch_content: Whether to fetch full content of top merged results
+        max_content_results: Maximum number of pages to fetch
+        
+    Returns:
+        Merged, URL-deduplicated results, best first
+    """
+    if not settings.google_search_api_key or not settings.google_search_cx:
+        logger.warning("Google Search API not configured. Returning empty results.")
+        return []
+    
+    responses = await asyncio.gather(
+        *(google_search(query, num_results) for query in queries),
+        return_exceptions=True,
+    )
+    result_lists = []
+    for query, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            logger.error(f"Web search error for query '{query}': {str(response)}")
+            continue
+        result_lists.append(response)
+    
+    results = merge_results(result_lists)
+    if fetch_content and results:
+        await _attach_full_content(results, max_content_results)
+    
+    logger.info(f"Web search completed: {len(results)} unique results for {len(queries)} queries: {queries}")
+    return results
 
 
 async def search_web(query: str, num_results: int = 10, fetch_content: bool = True, max_content_results: int = 5) -> List[Dict[str, Any]]:
@@ -85,59 +241,19 @@ async def search_web(query: str, num_results: int = 10, fetch_content: bool = Tr
         logger.warning("Google Search API not configured. Returning empty results.")
         return []
     
-    url = "https://www.googleapis.com/customsearch/v1"
-    params = {
-        "key": settings.google_search_api_key,
-        "cx": settings.google_search_cx,
-        "q": query,
-        "num": min(num_results, 10),  # Max 10 per request
-    }
-    
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            for item in data.get("items", []):
-                result = {
-                    "title": item.get("title", ""),
-                    "link": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                }
-                results.append(result)
-            
-            # Fetch full content for top results if requested
-            if fetch_content and results:
-                logger.info(f"Fetching full content for top {min(max_content_results, len(results))} results")
-                
-                # Fetch content concurrently for top results
-                fetch_tasks = []
-                for i, result in enumerate(results[:max_content_results]):
-                    fetch_tasks.append(fetch_url_content(result["link"]))
-                
-                # Wait for all fetches to complete
-                contents = await asyncio.gather(*fetch_tasks, return_exceptions=True)
-                
-                # Add content to results
-                for i, content in enumerate(contents):
-                    if i < len(results):
-                        if isinstance(content, Exception):
-                            logger.warning(f"Error fetching content for {results[i]['link']}: {str(content)}")
-                            results[i]["full_content"] = ""
-                        else:
-                            results[i]["full_content"] = content
-                            if content:
-                                logger.info(f"Fetched {len(content)} characters from {results[i]['link']}")
-            
-            logger.info(f"Web search completed: {len(results)} results for query: {query}")
-            return results
-            
+        results = await google_search(query, num_results)
+        
+        # Fetch full content for top results if requested
+        if fetch_content and results:
+            await _attach_full_content(results, max_content_results)
+        
+        logger.info(f"Web search completed: {len(results)} results for query: {query}")
+        return results
+        
     except httpx.HTTPStatusError as e:
         logger.error(f"Google Search API error: {e.response.status_code} - {e.response.text}")
         return []
     except Exception as e:
         logger.error(f"Web search error: {str(e)}")
         return []
-
@@ -3,10 +3,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logging import setup_logging
-from app.api.v1 import auth_router, health_router, workspace_router, chat_router, mcp_router, connected_app_router
+from app.api.v1 import auth_router, health_router, workspace_router, chat_router, mcp_router, connected_app_router, admin_router, metrics_router
+from app.telemetry.metrics import setup_metrics
+from app.telemetry.tracing import setup_tracing
 
 # Setup logging
 setup_logging()
+setup_metrics()
+setup_tracing()
 
 # Create FastAPI app
 app = FastAPI(
@@ -31,6 +35,8 @@ app.include_router(workspace_router.router, prefix="/api/v1")
 app.include_router(chat_router.router, prefix="/api/v1")
 app.include_router(mcp_router.router, prefix="/api/v1")  # DEPRECATED: use connected_app_router
 app.include_router(connected_app_router.router, prefix="/api/v1")  # Connected apps API
+app.include_router(admin_router.router, prefix="/api/v1")  # Admin: routing stats
+app.include_router(metrics_router.router)  # Prometheus scrape endpoint at /metrics
 
 
 # Import domain apps to register adapters
@@ -42,6 +48,15 @@ async def startup_event():
     from app.core.logging import get_logger
     logger = get_logger(__name__)
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
+    
+    # Load and validate prompt templates (fails startup on a broken template)
+    from app.core.prompt_registry import get_prompt_registry
+    get_prompt_registry()
+    
+    # Spawn HTML extraction workers now rather than on the first tax_qa turn
+    import asyncio
+    from app.integrations.html_extract import warm_extract_pool
+    await asyncio.to_thread(warm_extract_pool)
 
 
 @app.on_event("shutdown")
@@ -50,4 +65,24 @@ async def shutdown_event():
     from app.core.logging import get_logger
     logger = get_logger(__name__)
     logger.info(f"Shutting down {settings.app_name}")
+    
+    import asyncio
+    from app.core.adaptive_router import get_adaptive_router
+    await asyncio.to_thread(get_adaptive_router().save)
+    
+    from app.services.agent_trace_service import shutdown_trace_writer
+    shutdown_trace_writer()
+    
+    from app.telemetry.tracing import shutdown_tracing
+    shutdown_tracing()
+    
+    from app.utils.async_utils import shutdown_background_loop, shutdown_graph_executor
+    shutdown_graph_executor()
+    shutdown_background_loop()
+    
+    from app.db.session import async_engine
+    await async_engine.dispose()
+    
+    from app.integrations.html_extract import shutdown_extract_pool
+    shutdown_extract_pool()
 
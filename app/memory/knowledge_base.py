@@ -0,0 +1,440 @@
+"""Local knowledge base index (BM25 + optional embeddings) for tax/accounting questions."""
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from datetime import datetime
+import functools
+import hashlib
+import json
+import math
+import re
+import unicodedata
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Pointer file naming the active index version inside the index directory
+CURRENT_POINTER = "CURRENT"
+INDEX_FILE = "index.json"
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def strip_accents(text: str) -> str:
+    """Remove Vietnamese diacritics ("thuế" -> "thue", "đ" -> "d")."""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    normalized = unicodedata.normalize("NFD", text)
+    return "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for BM25.
+
+    Vietnamese words are usually several syllables ("hộ kinh doanh"), so syllable
+    bigrams are indexed alongside unigrams. Unaccented forms are added so queries
+    typed without diacritics still match.
+
+    Args:
+        text: Raw text
+
+    Returns:
+        List of index terms
+    """
+    syllables = _WORD_RE.findall(unicodedata.normalize("NFC", text.lower()))
+    terms: List[str] = []
+    for i, syllable in enumerate(syllables):
+        terms.append(syllable)
+        plain = strip_accents(syllable)
+        if plain != syllable:
+            terms.append(plain)
+        if i + 1 < len(syllables):
+            terms.append(f"{syllable}_{syllables[i + 1]}")
+    return terms
+
+
+def query_terms(text: str) -> List[str]:
+    """Unique unigram terms of a query (used for coverage-based confidence)."""
+    seen = []
+    for syllable in _WORD_RE.findall(unicodedata.normalize("NFC", text.lower())):
+        if syllable not in seen:
+            seen.append(syllable)
+    return seen
+
+
+def chunk_text(text: str, chunk_size: int = 1200, overlap: int = 200) -> List[str]:
+    """
+    Split text into overlapping chunks, preferring paragraph boundaries.
+
+    Args:
+        text: Document text
+        chunk_size: Target chunk size in characters
+        overlap: Characters carried over from the previous chunk
+
+    Returns:
+        List of chunks
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    chunks: List[str] = []
+    current = ""
+    for paragraph in paragraphs:
+        # Hard-split paragraphs that are larger than a chunk on their own
+        while len(paragraph) > chunk_size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:chunk_size])
+            paragraph = paragraph[max(chunk_size - overlap, 1):]
+        if current and len(current) + len(paragraph) + 2 > chunk_size:
+            chunks.append(current)
+            current = current[-overlap:] if overlap else ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    """Cosine similarity between two vectors."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def get_embedder(model: Optional[str] = None):
+    """
+    Get the embeddings client for a model, or None if embeddings are disabled.
+
+    Clients are cached per model, so queries reuse one HTTP connection pool.
+
+    Args:
+        model: Embedding model (defaults to settings.kb_embedding_model)
+
+    Returns:
+        OpenAIEmbeddings instance or None
+    """
+    model_name = model or settings.kb_embedding_model
+    if not model_name:
+        return None
+    return _embedder(model_name)
+
+
+@functools.lru_cache(maxsize=8)
+def _embedder(model_name: str):
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(
+        model=model_name,
+        openai_api_key=settings.openrouter_api_key.strip(),
+        openai_api_base=settings.openrouter_base_url,
+    )
+
+
+class KnowledgeBaseIndex:
+    """In-memory BM25 index over document chunks, persisted as versioned JSON."""
+
+    def __init__(
+        self,
+        chunks: List[Dict[str, Any]],
+        version: str = "",
+        embedding_model: str = "",
+        embeddings: Optional[List[List[float]]] = None,
+    ):
+        """
+        Initialize index from chunks.
+
+        Args:
+            chunks: List of {"text", "source", "title"} dicts
+            version: Index version identifier
+            embedding_model: Model used to build embeddings (empty if none)
+            embeddings: One vector per chunk (optional)
+        """
+        self.chunks = chunks
+        self.version = version
+        self.embedding_model = embedding_model
+        self.embeddings = embeddings or []
+
+        # Build inverted index: term -> {chunk_idx: term frequency}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: List[int] = []
+        for idx, chunk in enumerate(chunks):
+            terms = tokenize(chunk["text"])
+            self.doc_lengths.append(len(terms))
+            for term in terms:
+                self.postings.setdefault(term, {})
+                self.postings[term][idx] = self.postings[term].get(idx, 0) + 1
+        self.avg_doc_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency (unknown terms get the maximum)."""
+        n = len(self.chunks)
+        df = len(self.postings.get(term, {}))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def bm25_scores(self, query: str) -> Dict[int, float]:
+        """Score all chunks containing at least one query term."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for idx, tf in postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self.doc_lengths[idx] / (self.avg_doc_length or 1)
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+        return scores
+
+    def coverage(self, query: str, chunk_idx: int) -> float:
+        """
+        IDF-weighted fraction of query words present in a chunk.
+
+        Used as retrieval confidence: 1.0 means every (informative) query word
+        appears in the chunk, 0.0 means none does.
+        """
+        words = query_terms(query)
+        if not words:
+            return 0.0
+        total = 0.0
+        matched = 0.0
+        for word in words:
+            weight = self.idf(word)
+            total += weight
+            postings = self.postings.get(word) or self.postings.get(strip_accents(word)) or {}
+            if chunk_idx in postings:
+                matched += weight
+        return matched / total if total else 0.0
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the index.
+
+        Args:
+            query: User question
+            top_k: Number of hits to return
+            query_embedding: Query vector (only used if the index has embeddings)
+
+        Returns:
+            Hits sorted by score, each with text, source, title, score and confidence
+        """
+        scores = self.bm25_scores(query)
+        use_embeddings = bool(query_embedding and self.embeddings)
+        if not scores and not use_embeddings:
+            return []
+
+        max_bm25 = max(scores.values()) if scores else 0.0
+        candidates: List[Tuple[int, float, float]] = []
+        indices = range(len(self.chunks)) if use_embeddings else scores.keys()
+        for idx in indices:
+            lexical = scores.get(idx, 0.0) / max_bm25 if max_bm25 else 0.0
+            semantic = _cosine(query_embedding, self.embeddings[idx]) if use_embeddings else 0.0
+            combined = (lexical + semantic) / 2 if use_embeddings else lexical
+            candidates.append((idx, combined, semantic))
+        candidates.sort(key=lambda c: c[1], reverse=True)
+
+        hits = []
+        for idx, score, semantic in candidates[:top_k]:
+            confidence = self.coverage(query, idx)
+            if use_embeddings:
+                confidence = (confidence + max(semantic, 0.0)) / 2
+            chunk = self.chunks[idx]
+            hits.append({
+                "text": chunk["text"],
+                "source": chunk.get("source", ""),
+                "title": chunk.get("title", ""),
+                "score": round(score, 4),
+                "confidence": round(confidence, 4),
+            })
+        return hits
+
+    def save(self, index_dir: str) -> Path:
+        """
+        Persist index as a new version and point CURRENT at it.
+
+        Args:
+            index_dir: Base index directory
+
+        Returns:
+            Path to the version directory
+        """
+        base = Path(index_dir)
+        version_dir = base / self.version
+        version_dir.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": self.version,
+            "created_at": datetime.utcnow().isoformat(),
+            "embedding_model": self.embedding_model,
+            "chunks": self.chunks,
+            "embeddings": self.embeddings,
+        }
+        (version_dir / INDEX_FILE).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        # Switch the pointer last so readers never see a half-written version
+        tmp_pointer = base / f"{CURRENT_POINTER}.tmp"
+        tmp_pointer.write_text(self.version, encoding="utf-8")
+        tmp_pointer.replace(base / CURRENT_POINTER)
+        return version_dir
+
+    @classmethod
+    def load(cls, index_dir: str, version: Optional[str] = None) -> Optional["KnowledgeBaseIndex"]:
+        """
+        Load an index version (defaults to CURRENT).
+
+        Args:
+            index_dir: Base index directory
+            version: Specific version to load
+
+        Returns:
+            KnowledgeBaseIndex, or None if no index has been built
+        """
+        base = Path(index_dir)
+        if version is None:
+            pointer = base / CURRENT_POINTER
+            if not pointer.exists():
+                return None
+            version = pointer.read_text(encoding="utf-8").strip()
+        index_path = base / version / INDEX_FILE
+        if not index_path.exists():
+            logger.warning(f"Knowledge base index not found: {index_path}")
+            return None
+        payload = json.loads(index_path.read_text(encoding="utf-8"))
+        return cls(
+            chunks=payload.get("chunks", []),
+            version=payload.get("version", version),
+            embedding_model=payload.get("embedding_model", ""),
+            embeddings=payload.get("embeddings") or None,
+        )
+
+
+def read_document(path: Path) -> str:
+    """
+    Read a source document as plain text (.txt, .md, .html/.htm).
+
+    Args:
+        path: Document path
+
+    Returns:
+        Plain text content
+    """
+    raw = path.read_text(encoding="utf-8", errors="ignore")
+    if path.suffix.lower() in (".html", ".htm"):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(raw, "html.parser")
+        for element in soup(["script", "style", "nav", "footer", "header", "aside"]):
+            element.decompose()
+        return soup.get_text("\n")
+    return raw
+
+
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".html", ".htm")
+
+
+def build_index(
+    source_dir: str,
+    chunk_size: int = 1200,
+    overlap: int = 200,
+    embedding_model: str = "",
+) -> KnowledgeBaseIndex:
+    """
+    Build an index from every supported document under source_dir.
+
+    The version is derived from the build time and a hash of the chunk texts,
+    so rebuilding unchanged sources produces a recognisable version suffix.
+
+    Args:
+        source_dir: Directory of documents
+        chunk_size: Chunk size in characters
+        overlap: Chunk overlap in characters
+        embedding_model: Embedding model to use (empty disables embeddings)
+
+    Returns:
+        Built (unsaved) index
+    """
+    base = Path(source_dir)
+    chunks: List[Dict[str, Any]] = []
+    digest = hashlib.sha256()
+    for path in sorted(p for p in base.rglob("*") if p.suffix.lower() in SUPPORTED_EXTENSIONS):
+        text = read_document(path)
+        title = path.stem.replace("_", " ")
+        for chunk in chunk_text(text, chunk_size=chunk_size, overlap=overlap):
+            chunks.append({"text": chunk, "source": str(path.relative_to(base)), "title": title})
+            digest.update(chunk.encode("utf-8"))
+
+    embeddings = None
+    if embedding_model and chunks:
+        embedder = get_embedder(embedding_model)
+        embeddings = embedder.embed_documents([c["text"] for c in chunks])
+
+    version = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{digest.hexdigest()[:8]}"
+    logger.info(f"Built knowledge base index {version}: {len(chunks)} chunks from {source_dir}")
+    return KnowledgeBaseIndex(chunks, version=version, embedding_model=embedding_model, embeddings=embeddings)
+
+
+# Active index, reloaded when the CURRENT pointer changes
+_loaded_index: Optional[KnowledgeBaseIndex] = None
+# Modification time of the pointer the active index was read from
+_pointer_mtime: Optional[int] = None
+
+
+def get_index() -> Optional[KnowledgeBaseIndex]:
+    """
+    Get the active index, reloading when the CURRENT pointer changes.
+
+    The pointer is only re-read when its modification time changes, so a
+    query costs a stat() rather than a file read.
+
+    Returns:
+        KnowledgeBaseIndex or None if no index has been built
+    """
+    global _loaded_index, _pointer_mtime
+    pointer = Path(settings.kb_index_dir) / CURRENT_POINTER
+    try:
+        mtime = pointer.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _loaded_index is not None and mtime == _pointer_mtime:
+        return _loaded_index
+    version = pointer.read_text(encoding="utf-8").strip()
+    if _loaded_index is None or _loaded_index.version != version:
+        _loaded_index = KnowledgeBaseIndex.load(settings.kb_index_dir, version)
+        if _loaded_index:
+            logger.info(f"Loaded knowledge base index {version} ({len(_loaded_index)} chunks)")
+    _pointer_mtime = mtime if _loaded_index is not None else None
+    return _loaded_index
+
+
+def search_knowledge_base(query: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Search the local knowledge base.
+
+    Args:
+        query: User question
+        top_k: Number of hits (defaults to settings.kb_top_k)
+
+    Returns:
+        List of hits (empty if no index is available)
+    """
+    index = get_index()
+    if not index or not len(index):
+        return []
+
+    query_embedding = None
+    if index.embeddings and index.embedding_model:
+        try:
+            query_embedding = get_embedder(index.embedding_model).embed_query(query)
+        except Exception as e:
+            logger.warning(f"Query embedding failed, using BM25 only: {str(e)}")
+
+    return index.search(query, top_k=top_k or settings.kb_top_k, query_embedding=query_embedding)
@@ -14,6 +14,7 @@ from app.models.conversation import Conversation
 from app.models.message import Message, MessageSender
 from app.models.agent_run import AgentRun
 from app.models.agent_step import AgentStep, StepStatus
+from app.models.profiling_arm import ProfilingArm
 
 __all__ = [
     "User",
@@ -33,5 +34,6 @@ __all__ = [
     "AgentRun",
     "AgentStep",
     "StepStatus",
+    "ProfilingArm",
 ]
 
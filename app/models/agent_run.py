@@ -1,5 +1,5 @@
 """Agent run model for logging LangGraph executions."""
-from sqlalchemy import Column, Integer, ForeignKey, JSON, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, JSON, DateTime, String
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import BaseModel
@@ -13,6 +13,11 @@ class AgentRun(BaseModel):
     conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False, index=True)
     state_before = Column(JSON, nullable=True)  # State snapshot before execution
     state_after = Column(JSON, nullable=True)   # State snapshot after execution
+    status = Column(String(20), nullable=False, default="success")  # "success" or "error"
+    duration_ms = Column(Integer, nullable=True)  # Wall time of the graph execution
+    node_timings = Column(JSON, nullable=True)  # [{"node", "duration_ms", "status"}] in execution order
+    error_message = Column(String(1000), nullable=True)
+    profile_path = Column(String(500), nullable=True)  # Profiler artifact, for operator-profiled runs
     
     # Relationships
     conversation = relationship("Conversation", backref="agent_runs")
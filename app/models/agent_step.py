@@ -26,6 +26,7 @@ class AgentStep(BaseModel):
     output_data = Column(JSON, nullable=True)     # Step output result
     status = Column(SQLEnum(StepStatus), nullable=False, default=StepStatus.PENDING)
     error_message = Column(String(1000), nullable=True)  # Error message if failed
+    duration_ms = Column(Integer, nullable=True)  # Step execution time
     
     # Relationships
     run = relationship("AgentRun", backref="steps")
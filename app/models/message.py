@@ -1,5 +1,5 @@
 """Message model."""
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, JSON, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 import enum
 from app.db.base import BaseModel
@@ -15,8 +15,12 @@ class Message(BaseModel):
     """Message model for chat messages."""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # Keyset pagination and latest-history reads: WHERE conversation_id = ? ORDER BY created_at, id
+        Index("ix_messages_conversation_created_id", "conversation_id", "created_at", "id"),
+    )
     
-    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False, index=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)  # Indexed by ix_messages_conversation_created_id
     sender = Column(SQLEnum(MessageSender), nullable=False)
     content = Column(Text, nullable=False)
     message_metadata = Column(JSON, nullable=True)  # Additional metadata (tool calls, reasoning, etc.)
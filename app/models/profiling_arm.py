@@ -0,0 +1,16 @@
+"""Profiling arm model: workspaces an operator armed for profiling."""
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from app.db.base import BaseModel
+
+
+class ProfilingArm(BaseModel):
+    """Workspace whose next chat requests are profiled, shared by all worker processes."""
+    
+    __tablename__ = "profiling_arms"
+    
+    workspace_id = Column(Integer, ForeignKey("workspaces.id"), nullable=False, unique=True, index=True)
+    remaining = Column(Integer, nullable=False)  # Requests still to profile
+    expires_at = Column(DateTime, nullable=False)  # UTC; the arm lapses unused after this
+    
+    def __repr__(self):
+        return f"<ProfilingArm(workspace_id={self.workspace_id}, remaining={self.remaining})>"
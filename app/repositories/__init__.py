@@ -1,10 +1,12 @@
 """Repository layer."""
-from app.repositories.user_repo import UserRepository
-from app.repositories.workspace_repo import WorkspaceRepository
+from app.repositories.user_repo import AsyncUserRepository, UserRepository
+from app.repositories.workspace_repo import AsyncWorkspaceRepository, WorkspaceRepository
 from app.repositories.app_connection_repo import AppConnectionRepository  # DEPRECATED
-from app.repositories.connected_app_repo import ConnectedAppRepository  # NEW
-from app.repositories.conversation_repo import ConversationRepository
-from app.repositories.message_repo import MessageRepository
+from app.repositories.connected_app_repo import AsyncConnectedAppRepository, ConnectedAppRepository  # NEW
+from app.repositories.conversation_repo import AsyncConversationRepository, ConversationRepository
+from app.repositories.message_repo import AsyncMessageRepository, MessageRepository
+from app.repositories.agent_run_repo import AgentRunRepository
+from app.repositories.profiling_arm_repo import ProfilingArmRepository
 
 __all__ = [
     "UserRepository",
@@ -13,4 +15,11 @@ __all__ = [
     "ConnectedAppRepository",  # NEW
     "ConversationRepository",
     "MessageRepository",
+    "AgentRunRepository",
+    "ProfilingArmRepository",
+    "AsyncUserRepository",
+    "AsyncWorkspaceRepository",
+    "AsyncConnectedAppRepository",
+    "AsyncConversationRepository",
+    "AsyncMessageRepository",
 ]
@@ -0,0 +1,40 @@
+"""Agent run repository for database operations."""
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.models.agent_run import AgentRun
+from app.models.agent_step import AgentStep, StepStatus
+
+
+class AgentRunRepository:
+    """Repository for AgentRun/AgentStep model operations."""
+    
+    @staticmethod
+    def get_by_id(db: Session, run_id: int) -> Optional[AgentRun]:
+        """Get agent run by ID."""
+        return db.query(AgentRun).filter(AgentRun.id == run_id).first()
+    
+    @staticmethod
+    def create_batch(db: Session, records: List[Dict[str, Any]]) -> List[AgentRun]:
+        """
+        Insert runs with their steps in one transaction.
+        
+        Args:
+            db: Database session
+            records: Run records (AgentRun columns plus "steps": list of AgentStep columns)
+            
+        Returns:
+            Created runs
+        """
+        runs = []
+        for record in records:
+            record = dict(record)
+            steps = record.pop("steps", [])
+            run = AgentRun(**record)
+            for step in steps:
+                step = dict(step)
+                step["status"] = StepStatus(step.get("status") or StepStatus.PENDING)
+                run.steps.append(AgentStep(**step))
+            runs.append(run)
+        db.add_all(runs)
+        db.commit()
+        return runs
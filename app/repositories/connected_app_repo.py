@@ -1,8 +1,16 @@
-"""Connected app repository for database operations."""
+"""Connected app repository for database operations.
+
+Every write invalidates the workspace's cached resolved connected app
+(app.domain.apps.config_cache). AsyncConnectedAppRepository only reads:
+connections are written through the sync repository.
+"""
 from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.connected_app import ConnectedApp, ConnectionStatus
 from app.domain.apps.base import AppCategory, ConnectionMethod
+from app.domain.apps.config_cache import workspace_app_cache
 
 
 class ConnectedAppRepository:
@@ -91,6 +99,7 @@ class ConnectedAppRepository:
         )
         db.add(connected_app)
         db.commit()
+        workspace_app_cache.invalidate(workspace_id)
         db.refresh(connected_app)
         return connected_app
     
@@ -133,14 +142,17 @@ class ConnectedAppRepository:
             connected_app.is_default = False
         
         db.commit()
+        workspace_app_cache.invalidate(connected_app.workspace_id)
         db.refresh(connected_app)
         return connected_app
     
     @staticmethod
     def delete(db: Session, connected_app: ConnectedApp) -> None:
         """Delete connected app."""
+        workspace_id = connected_app.workspace_id
         db.delete(connected_app)
         db.commit()
+        workspace_app_cache.invalidate(workspace_id)
     
     @staticmethod
     def unset_defaults(db: Session, workspace_id: int) -> None:
@@ -150,4 +162,28 @@ class ConnectedAppRepository:
             ConnectedApp.is_default == True
         ).update({"is_default": False})
         db.commit()
+        workspace_app_cache.invalidate(workspace_id)
+
 
+class AsyncConnectedAppRepository:
+    """Connected app lookups on an async session (resolving a workspace's app for chat)."""
+    
+    @staticmethod
+    async def get_default(db: AsyncSession, workspace_id: int) -> Optional[ConnectedApp]:
+        """Get default connected app for workspace."""
+        return await db.scalar(
+            select(ConnectedApp).where(
+                ConnectedApp.workspace_id == workspace_id,
+                ConnectedApp.is_default == True
+            ).limit(1)
+        )
+    
+    @staticmethod
+    async def get_by_workspace(db: AsyncSession, workspace_id: int) -> List[ConnectedApp]:
+        """Get all connected apps for workspace."""
+        result = await db.scalars(
+            select(ConnectedApp).where(
+                ConnectedApp.workspace_id == workspace_id
+            ).order_by(ConnectedApp.created_at.desc())
+        )
+        return list(result)
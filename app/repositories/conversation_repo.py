@@ -1,5 +1,7 @@
 """Conversation repository for database operations."""
 from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.conversation import Conversation
 
@@ -52,3 +54,45 @@ class ConversationRepository:
         ).first()
         return conversation is not None
 
+
+class AsyncConversationRepository:
+    """Conversation operations on an async session (chat and conversation endpoints)."""
+    
+    @staticmethod
+    async def get_by_id(db: AsyncSession, conversation_id: int) -> Optional[Conversation]:
+        """Get conversation by ID."""
+        return await db.scalar(select(Conversation).where(Conversation.id == conversation_id))
+    
+    @staticmethod
+    async def get_by_workspace(
+        db: AsyncSession,
+        workspace_id: int,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Conversation]:
+        """Get conversations by workspace with pagination."""
+        result = await db.scalars(
+            select(Conversation).where(
+                Conversation.workspace_id == workspace_id
+            ).order_by(Conversation.created_at.desc()).limit(limit).offset(offset)
+        )
+        return list(result)
+    
+    @staticmethod
+    async def create(db: AsyncSession, workspace_id: int, title: Optional[str] = None) -> Conversation:
+        """Create a new conversation."""
+        conversation = Conversation(workspace_id=workspace_id, title=title)
+        db.add(conversation)
+        await db.commit()  # id and created_at are set on flush; the session does not expire them
+        return conversation
+    
+    @staticmethod
+    async def belongs_to_workspace(db: AsyncSession, conversation_id: int, workspace_id: int) -> bool:
+        """Check if conversation belongs to workspace."""
+        conversation_id = await db.scalar(
+            select(Conversation.id).where(
+                Conversation.id == conversation_id,
+                Conversation.workspace_id == workspace_id
+            )
+        )
+        return conversation_id is not None
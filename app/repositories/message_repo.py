@@ -1,5 +1,8 @@
 """Message repository for database operations."""
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.message import Message, MessageSender
 
@@ -29,6 +32,55 @@ class MessageRepository:
         
         return query.all()
     
+    @staticmethod
+    def get_page(
+        db: Session,
+        conversation_id: int,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+    ) -> Tuple[List[Message], bool]:
+        """
+        Keyset-paginated messages, newest page first.
+        
+        Uses the (conversation_id, created_at, id) index: the cost of a page
+        does not grow with how far back it is.
+        
+        Args:
+            db: Database session
+            conversation_id: Conversation ID
+            limit: Page size
+            before: (created_at, id) of the oldest message of the previous page, None for the latest page
+            
+        Returns:
+            (messages in chronological order, whether older messages exist)
+        """
+        query = db.query(Message).filter(Message.conversation_id == conversation_id)
+        if before is not None:
+            query = query.filter(tuple_(Message.created_at, Message.id) < tuple_(*before))
+        rows = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1).all()
+        return rows[:limit][::-1], len(rows) > limit
+    
+    @staticmethod
+    def get_history(db: Session, conversation_id: int, limit: int) -> List[Tuple[MessageSender, str]]:
+        """
+        The last messages of a conversation as (sender, content), oldest first.
+        
+        Only the two columns are loaded (not message_metadata, which can hold
+        whole plans and step results).
+        
+        Args:
+            db: Database session
+            conversation_id: Conversation ID
+            limit: Number of messages
+            
+        Returns:
+            [(sender, content)] in chronological order
+        """
+        rows = db.query(Message.sender, Message.content).filter(
+            Message.conversation_id == conversation_id
+        ).order_by(Message.created_at.desc(), Message.id.desc()).limit(limit).all()
+        return [(sender, content) for sender, content in reversed(rows)]
+    
     @staticmethod
     def create(
         db: Session,
@@ -62,3 +114,52 @@ class MessageRepository:
         db.delete(message)
         db.commit()
 
+
+class AsyncMessageRepository:
+    """Message operations on an async session (chat and conversation endpoints).
+    
+    Same queries as MessageRepository.get_page/get_history; see there.
+    """
+    
+    @staticmethod
+    async def get_page(
+        db: AsyncSession,
+        conversation_id: int,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+    ) -> Tuple[List[Message], bool]:
+        """Keyset-paginated messages, newest page first: (messages in chronological order, whether older exist)."""
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if before is not None:
+            query = query.where(tuple_(Message.created_at, Message.id) < tuple_(*before))
+        rows = list(await db.scalars(query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)))
+        return rows[:limit][::-1], len(rows) > limit
+    
+    @staticmethod
+    async def get_history(db: AsyncSession, conversation_id: int, limit: int) -> List[Tuple[MessageSender, str]]:
+        """The last messages of a conversation as (sender, content), oldest first."""
+        result = await db.execute(
+            select(Message.sender, Message.content).where(
+                Message.conversation_id == conversation_id
+            ).order_by(Message.created_at.desc(), Message.id.desc()).limit(limit)
+        )
+        return [(sender, content) for sender, content in reversed(result.all())]
+    
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        conversation_id: int,
+        sender: MessageSender,
+        content: str,
+        metadata: Optional[dict] = None
+    ) -> Message:
+        """Create a new message."""
+        message = Message(
+            conversation_id=conversation_id,
+            sender=sender,
+            content=content,
+            message_metadata=metadata
+        )
+        db.add(message)
+        await db.commit()  # id and created_at are set on flush; the session does not expire them
+        return message
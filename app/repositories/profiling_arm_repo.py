@@ -0,0 +1,68 @@
+"""Profiling arm repository for database operations."""
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.models.profiling_arm import ProfilingArm
+
+
+class ProfilingArmRepository:
+    """Repository for ProfilingArm model operations."""
+    
+    @staticmethod
+    def arm(db: Session, workspace_id: int, requests: int, expires_at: datetime) -> ProfilingArm:
+        """Arm a workspace, replacing an existing arm."""
+        arm = db.query(ProfilingArm).filter(ProfilingArm.workspace_id == workspace_id).first()
+        if arm is None:
+            arm = ProfilingArm(workspace_id=workspace_id)
+            db.add(arm)
+        arm.remaining = requests
+        arm.expires_at = expires_at
+        db.commit()
+        db.refresh(arm)
+        return arm
+    
+    @staticmethod
+    def disarm(db: Session, workspace_id: int) -> bool:
+        """Delete a workspace's arm; False if it was not armed."""
+        deleted = db.query(ProfilingArm).filter(ProfilingArm.workspace_id == workspace_id).delete()
+        db.commit()
+        return deleted > 0
+    
+    @staticmethod
+    def get_active(db: Session, now: Optional[datetime] = None) -> List[ProfilingArm]:
+        """Arms that have requests left and have not expired."""
+        now = now or datetime.utcnow()
+        return db.query(ProfilingArm).filter(
+            ProfilingArm.remaining > 0,
+            ProfilingArm.expires_at > now,
+        ).all()
+    
+    @staticmethod
+    def take(db: Session, workspace_id: int, now: Optional[datetime] = None) -> bool:
+        """
+        Consume one profiled request of an armed workspace.
+        
+        The decrement is a single conditional UPDATE, so concurrent requests
+        in different processes cannot profile more requests than were armed.
+        
+        Args:
+            db: Database session
+            workspace_id: Workspace of the request
+            now: Current UTC time
+            
+        Returns:
+            True if the request should be profiled
+        """
+        now = now or datetime.utcnow()
+        taken = db.query(ProfilingArm).filter(
+            ProfilingArm.workspace_id == workspace_id,
+            ProfilingArm.remaining > 0,
+            ProfilingArm.expires_at > now,
+        ).update({ProfilingArm.remaining: ProfilingArm.remaining - 1}, synchronize_session=False)
+        # Spent or expired arms are not needed any more
+        db.query(ProfilingArm).filter(
+            ProfilingArm.workspace_id == workspace_id,
+            (ProfilingArm.remaining <= 0) | (ProfilingArm.expires_at <= now),
+        ).delete(synchronize_session=False)
+        db.commit()
+        return taken > 0
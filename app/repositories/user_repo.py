@@ -1,5 +1,7 @@
 """User repository for database operations."""
 from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 
@@ -39,3 +41,11 @@ class UserRepository:
         """Check if username exists."""
         return db.query(User).filter(User.username == username).first() is not None
 
+
+class AsyncUserRepository:
+    """User lookups on an async session (chat and conversation endpoints)."""
+    
+    @staticmethod
+    async def get_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+        """Get user by ID."""
+        return await db.scalar(select(User).where(User.id == user_id))
@@ -1,5 +1,7 @@
 """Workspace repository for database operations."""
 from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.workspace import Workspace
 
@@ -50,3 +52,11 @@ class WorkspaceRepository:
         ).first()
         return workspace is not None
 
+
+class AsyncWorkspaceRepository:
+    """Workspace lookups on an async session (chat and conversation endpoints)."""
+    
+    @staticmethod
+    async def get_by_id(db: AsyncSession, workspace_id: int) -> Optional[Workspace]:
+        """Get workspace by ID."""
+        return await db.scalar(select(Workspace).where(Workspace.id == workspace_id))
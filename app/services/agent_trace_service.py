@@ -0,0 +1,270 @@
+"""Agent run tracing: graph executions are recorded to AgentRun/AgentStep through a batching background writer."""
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import queue
+import threading
+import time
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.agent_step import StepStatus
+from app.repositories.agent_run_repo import AgentRunRepository
+from app.telemetry.cassette import REDACTED, SENSITIVE_KEYS
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Snapshot limits: keep traces small enough to write on every run
+MAX_STRING_CHARS = 500
+MAX_LIST_ITEMS = 5
+MAX_DEPTH = 3
+
+# State keys that are not worth storing (history is in messages, events are transient)
+SKIPPED_KEYS = {"messages", "stream_events", "db"}
+
+_STEP_STATUSES = {status.value for status in StepStatus}
+
+
+def _compact(value: Any, depth: int = 0) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= MAX_STRING_CHARS else value[:MAX_STRING_CHARS] + f"... ({len(value)} chars)"
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    if depth >= MAX_DEPTH:
+        if isinstance(value, (list, tuple)):
+            return f"[{len(value)} items]"
+        if isinstance(value, dict):
+            return f"{{{len(value)} keys}}"
+        return _compact(str(value), depth)
+    if isinstance(value, dict):
+        return {
+            str(k): REDACTED if str(k).lower() in SENSITIVE_KEYS else _compact(v, depth + 1)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        items = [_compact(v, depth + 1) for v in value[:MAX_LIST_ITEMS]]
+        if len(value) > MAX_LIST_ITEMS:
+            items.append(f"... ({len(value) - MAX_LIST_ITEMS} more)")
+        return items
+    return _compact(str(value), depth)
+
+
+def compact_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    JSON-safe, size-bounded snapshot of a graph state.
+
+    Long strings are truncated, lists cut to a few items and deep structures
+    summarized; chat history is reduced to a message count. Credentials are
+    never stored: the connected app's config is dropped and values under
+    sensitive keys (tokens, secrets, passwords) are redacted.
+
+    Args:
+        state: Graph state
+
+    Returns:
+        Snapshot dict
+    """
+    snapshot = {key: _compact(value) for key, value in state.items() if key not in SKIPPED_KEYS}
+    connected_app = state.get("connected_app")
+    if isinstance(connected_app, dict):
+        # The config holds the app's credentials, typed or as a dict
+        snapshot["connected_app"] = _compact({
+            key: REDACTED if key == "config" else value for key, value in connected_app.items()
+        })
+    if "messages" in state:
+        snapshot["message_count"] = len(state.get("messages") or [])
+    return snapshot
+
+
+def _plan_steps(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """AgentStep rows from the plan and its step results."""
+    plan_steps = (state.get("plan") or {}).get("steps") or []
+    params_by_id = {step.get("id", i + 1): step.get("params") for i, step in enumerate(plan_steps)}
+    steps = []
+    for index, result in enumerate(state.get("step_results") or []):
+        status = result.get("status")
+        error = result.get("error")
+        steps.append({
+            "step_index": index,
+            "action": str(result.get("action") or "")[:200],
+            "input_data": _compact(params_by_id.get(result.get("step_id"))),
+            "output_data": _compact(result.get("output")),
+            "status": status if status in _STEP_STATUSES else StepStatus.FAILED.value,
+            "error_message": str(error)[:1000] if error else None,
+            "duration_ms": result.get("duration_ms"),
+        })
+    return steps
+
+
+class RunTrace:
+    """
+    Trace of one graph execution.
+
+    Created before the graph runs, with a snapshot of the input state;
+    finish() snapshots the final state and enqueues the record.
+    """
+
+    def __init__(self, conversation_id: int, state: Dict[str, Any]):
+        """
+        Start a trace.
+
+        Args:
+            conversation_id: Conversation the run belongs to
+            state: Initial graph state
+        """
+        self.conversation_id = conversation_id
+        self.started_at = datetime.utcnow()
+        self._start = time.perf_counter()
+        self._state_before = compact_state(state) if settings.agent_trace_enabled else None
+        self._finished = False
+
+    def finish(
+        self,
+        final_state: Optional[Dict[str, Any]],
+        error: Optional[BaseException] = None,
+        profile_path: Optional[str] = None,
+    ) -> None:
+        """
+        Record the run (only the first call counts).
+
+        Args:
+            final_state: State after the run (or the last state seen, on failure)
+            error: Exception that aborted the run, if any
+            profile_path: Profiler artifact, if the run was profiled
+        """
+        if self._finished or not settings.agent_trace_enabled:
+            return
+        self._finished = True
+        final_state = final_state or {}
+        message = str(error) if error else final_state.get("error")
+        record = {
+            "conversation_id": self.conversation_id,
+            "created_at": self.started_at,
+            "state_before": self._state_before,
+            "state_after": compact_state(final_state),
+            "status": "error" if message else "success",
+            "duration_ms": round((time.perf_counter() - self._start) * 1000),
+            "node_timings": final_state.get("node_timings") or [],
+            "error_message": str(message)[:1000] if message else None,
+            "profile_path": profile_path,
+            "steps": _plan_steps(final_state),
+        }
+        get_trace_writer().enqueue(record)
+
+
+class AgentTraceWriter:
+    """
+    Background writer that batches run records into few transactions.
+
+    enqueue() never blocks: when the queue is full the record is dropped
+    (and counted) rather than slowing down the chat request.
+    """
+
+    def __init__(self, batch_size: int = 50, flush_interval_s: float = 1.0, max_queue: int = 1000):
+        """
+        Initialize writer.
+
+        Args:
+            batch_size: Maximum runs per insert transaction
+            flush_interval_s: Maximum seconds a record waits for a batch to fill
+            max_queue: Queue capacity
+        """
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = False
+        self.dropped = 0
+        self.written = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="culi-trace-writer", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        """Queue a run record for writing."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Agent trace queue full, dropped run record ({self.dropped} dropped so far)")
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for a record, then collect more until the batch is full or the interval passes."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval_s)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval_s
+        while len(batch) < self.batch_size:
+            # Once the interval has passed (or on shutdown) only take what is already queued
+            remaining = 0 if self._stopping else deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        db = SessionLocal()
+        try:
+            AgentRunRepository.create_batch(db, batch)
+            self.written += len(batch)
+            logger.debug(f"Wrote {len(batch)} agent run traces")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write {len(batch)} agent run traces: {str(e)}")
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            elif self._stopping:
+                return
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Write what is queued and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._stopping = True
+        if thread is not None:
+            thread.join(timeout)
+            if self._queue.qsize():
+                logger.warning(f"Agent trace writer stopped with {self._queue.qsize()} records unwritten")
+
+
+_writer: Optional[AgentTraceWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_trace_writer() -> AgentTraceWriter:
+    """
+    Get the global trace writer.
+
+    Returns:
+        AgentTraceWriter instance
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AgentTraceWriter(
+                batch_size=settings.agent_trace_batch_size,
+                flush_interval_s=settings.agent_trace_flush_interval_s,
+                max_queue=settings.agent_trace_queue_size,
+            )
+    return _writer
+
+
+def shutdown_trace_writer() -> None:
+    """Flush and stop the global trace writer (application shutdown)."""
+    with _writer_lock:
+        writer = _writer
+    if writer is not None:
+        writer.shutdown()
@@ -1,50 +1,81 @@
-"""Chat service for orchestrating LangGraph execution."""
-from typing import Dict, Any, Optional
-from sqlalchemy.orm import Session
+"""Chat service for orchestrating LangGraph execution.
+
+Database access goes through the async engine; the graph itself is
+synchronous and runs on the graph thread pool (app.utils.async_utils), so a
+turn waiting on the database holds no thread and a turn waiting on the LLM
+holds one graph thread but no event-loop time.
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.models.user import User
-from app.models.conversation import Conversation
-from app.models.message import Message, MessageSender
-from app.repositories.conversation_repo import ConversationRepository
-from app.repositories.message_repo import MessageRepository
-from app.repositories.mcp_connection_repo import MCPConnectionRepository
-from app.repositories.workspace_repo import WorkspaceRepository
-from app.utils.crypto import decrypt
+from app.models.message import MessageSender
+from app.repositories.conversation_repo import AsyncConversationRepository
+from app.repositories.message_repo import AsyncMessageRepository
+from app.repositories.workspace_repo import AsyncWorkspaceRepository
 from app.graph.app_graph import get_graph
 from app.graph.state import CuliState
+from app.services.agent_trace_service import RunTrace
+from app.services.connected_app_service import ConnectedAppService
+from app.telemetry.cassette import start_recording
+from app.telemetry.profiling import start_profiling
+from app.telemetry.tracing import mark_error, set_attributes, traced
+from app.utils.async_utils import iterate_in_graph_executor, run_in_graph_executor
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# "updates" drives the per-node events; the last "values" chunk is the final state
+STREAM_MODES = ["updates", "values"]
+
 
 class ChatService:
     """Service for chat operations."""
     
     @staticmethod
-    def prepare_state(
-        db: Session,
+    async def prepare_state(
+        db: AsyncSession,
         user: User,
         workspace_id: int,
         conversation_id: Optional[int],
         user_input: str
-    ) -> Dict[str, Any]:
+    ) -> Tuple[Dict[str, Any], int]:
         """Prepare initial state for LangGraph."""
         # Get or create conversation
         if conversation_id:
-            conversation = ConversationRepository.get_by_id(db, conversation_id)
+            conversation = await AsyncConversationRepository.get_by_id(db, conversation_id)
             if not conversation or conversation.workspace_id != workspace_id:
                 raise ValueError("Conversation not found or access denied")
         else:
-            conversation = ConversationRepository.create(db, workspace_id, title=None)
+            conversation = await AsyncConversationRepository.create(db, workspace_id, title=None)
             conversation_id = conversation.id
         
-        # Load chat history
-        messages = MessageRepository.get_by_conversation(db, conversation_id)
+        # Load chat history (nodes only use the last chat_history_length messages)
+        history = await AsyncMessageRepository.get_history(db, conversation_id, limit=settings.chat_history_length)
+        
+        # Connected app of the workspace (resolved config is cached per workspace)
+        connected_app = await ConnectedAppService.aget_workspace_app(db, workspace_id)
+        if connected_app:
+            connected_app = dict(connected_app)  # The cached entry is shared between turns
+        
+        return ChatService._initial_state(user, workspace_id, conversation_id, history, user_input, connected_app), conversation_id
+    
+    @staticmethod
+    def _initial_state(
+        user: User,
+        workspace_id: int,
+        conversation_id: int,
+        history: List[Tuple[MessageSender, str]],
+        user_input: str,
+        connected_app: Optional[Dict[str, Any]],
+    ) -> CuliState:
+        """Initial graph state of a turn."""
         messages_openai_format = [
             {
-                "role": "user" if msg.sender == MessageSender.USER else "assistant",
-                "content": msg.content
+                "role": "user" if sender == MessageSender.USER else "assistant",
+                "content": content
             }
-            for msg in messages
+            for sender, content in history
         ]
         
         # Add current user message
@@ -53,71 +84,7 @@ class ChatService:
             "content": user_input
         })
         
-        # Get connected app (new system)
-        from app.repositories.connected_app_repo import ConnectedAppRepository
-        from app.domain.apps.base import ConnectedAppConfig, AppCategory, ConnectionMethod
-        from app.utils.crypto import decrypt
-        
-        # Get default connected app for workspace
-        connected_app_model = ConnectedAppRepository.get_default(db, workspace_id)
-        
-        if not connected_app_model:
-            # Try to get any active connection
-            all_connections = ConnectedAppRepository.get_by_workspace(db, workspace_id)
-            active_connections = [c for c in all_connections if c.status.value == "active"]
-            if active_connections:
-                connected_app_model = active_connections[0]
-                logger.info(f"Using first active connection: {connected_app_model.id} (no default set)")
-        
-        # Map to ConnectedAppConfig and state format
-        connected_app = None
-        if connected_app_model:
-            # Build credentials dict
-            credentials = {}
-            if connected_app_model.connection_method.value == "api":
-                if connected_app_model.client_id and connected_app_model.client_secret_encrypted:
-                    credentials["client_id"] = connected_app_model.client_id
-                    try:
-                        credentials["client_secret"] = decrypt(connected_app_model.client_secret_encrypted)
-                    except Exception as e:
-                        logger.error(f"Failed to decrypt client_secret: {str(e)}", exc_info=True)
-                        raise ValueError(f"Failed to decrypt client_secret: {str(e)}")
-                if connected_app_model.retailer:
-                    credentials["retailer"] = connected_app_model.retailer
-            elif connected_app_model.connection_method.value == "mcp":
-                if connected_app_model.mcp_server_url:
-                    credentials["mcp_server_url"] = connected_app_model.mcp_server_url
-                if connected_app_model.mcp_auth_config_encrypted:
-                    import json
-                    credentials["mcp_auth_config"] = json.loads(decrypt(connected_app_model.mcp_auth_config_encrypted))
-            
-            # Add extra config from config_json
-            if connected_app_model.config_json:
-                credentials.update(connected_app_model.config_json)
-            
-            # Create ConnectedAppConfig
-            app_config = ConnectedAppConfig(
-                app_id=connected_app_model.app_id,
-                name=connected_app_model.name,
-                category=connected_app_model.app_category,
-                connection_method=connected_app_model.connection_method,
-                credentials=credentials,
-                extra={},
-            )
-            
-            # Map to state format (ConnectedApp TypedDict)
-            connected_app = {
-                "id": str(connected_app_model.id),
-                "name": connected_app_model.name,
-                "category": connected_app_model.app_category.value,
-                "connection_method": connected_app_model.connection_method.value,
-                "config": app_config.dict(),
-            }
-            
-            logger.info(f"Loaded connected app: {connected_app_model.name} ({connected_app_model.app_id})")
-        
-        # Build initial state
-        state: CuliState = {
+        return {
             "user_id": str(user.id),
             "workspace_id": str(workspace_id),
             "conversation_id": str(conversation_id),
@@ -128,8 +95,10 @@ class ChatService:
             "needs_web": False,
             "needs_app": False,  # NEW: changed from needs_mcp
             "needs_plan": False,
+            "read_intent": None,
             "chat_context": "",
             "kb_context": "",
+            "kb_confidence": 0.0,
             "web_results": [],
             "app_data": {},  # NEW: changed from mcp_data
             "plan": None,
@@ -139,58 +108,116 @@ class ChatService:
             "answer": "",
             "error": None,
             "stream_events": [],
+            "prompt_versions": {},
+            "node_timings": [],
         }
-        
-        return state, conversation_id
     
     @staticmethod
-    def process_message(
-        db: Session,
+    async def _start_turn(
+        db: AsyncSession,
         user: User,
         workspace_id: int,
         conversation_id: Optional[int],
         user_input: str
-    ) -> Dict[str, Any]:
-        """Process a chat message through LangGraph."""
+    ) -> Tuple[Dict[str, Any], int]:
+        """Check access, prepare the state and save the user message."""
         # Verify workspace access
-        workspace = WorkspaceRepository.get_by_id(db, workspace_id)
+        workspace = await AsyncWorkspaceRepository.get_by_id(db, workspace_id)
         if not workspace or workspace.owner_id != user.id:
             raise ValueError("Workspace not found or access denied")
         
         # Prepare state
-        state, conversation_id = ChatService.prepare_state(
+        state, conversation_id = await ChatService.prepare_state(
             db, user, workspace_id, conversation_id, user_input
         )
         
         # Save user message
-        MessageRepository.create(
+        await AsyncMessageRepository.create(
             db,
             conversation_id=conversation_id,
             sender=MessageSender.USER,
             content=user_input
         )
         
+        set_attributes({"culi.workspace_id": workspace_id, "culi.conversation_id": conversation_id})
+        return state, conversation_id
+    
+    @staticmethod
+    def _finish_run(
+        trace: RunTrace,
+        recording: Any,
+        profiler: Any,
+        final_state: Optional[Dict[str, Any]],
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Record the run's trace, cassette and profile (blocking: call on the graph thread pool)."""
+        trace.finish(final_state, error=error, profile_path=profiler.save())
+        recording.save(final_state, error=error)
+    
+    @staticmethod
+    def _assistant_metadata(final_state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "intent": final_state.get("intent"),
+            "plan": final_state.get("plan"),
+            "step_results": final_state.get("step_results"),
+            "prompt_versions": final_state.get("prompt_versions"),
+        }
+    
+    @staticmethod
+    def _friendly_error(error_msg: str) -> str:
+        """User-facing message for a failed run."""
+        # Handle specific error cases
+        if "api_key" in error_msg.lower() or "OPENAI_API_KEY" in error_msg:
+            error_msg = "API key chưa được cấu hình. Vui lòng kiểm tra OPENROUTER_API_KEY trong file .env"
+        elif "402" in error_msg or "credits" in error_msg.lower() or "max_tokens" in error_msg.lower():
+            error_msg = (
+                "OpenRouter API key của bạn không đủ credits để xử lý request này. "
+                "Vui lòng: 1) Tăng monthly limit tại https://openrouter.ai/settings/keys, "
+                "hoặc 2) Giảm độ dài câu hỏi. "
+                f"Chi tiết: {error_msg}"
+            )
+        return error_msg
+    
+    @staticmethod
+    @traced("chat.process_message")
+    async def process_message(
+        db: AsyncSession,
+        user: User,
+        workspace_id: int,
+        conversation_id: Optional[int],
+        user_input: str,
+        profile: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Process a chat message through LangGraph.
+        
+        The run is profiled if profile is set by an admin or an operator armed the workspace.
+        """
+        state, conversation_id = await ChatService._start_turn(
+            db, user, workspace_id, conversation_id, user_input
+        )
+        
         # Execute graph
         graph = get_graph()
+        trace = RunTrace(conversation_id, state)
+        recording = start_recording(state)
+        profiler = await start_profiling(workspace_id, conversation_id, user.username, requested=profile)
         
         try:
             # Invoke graph
-            final_state = graph.invoke(state)
+            final_state = await run_in_graph_executor(profiler.run, recording.run, graph.invoke, state)
+            await run_in_graph_executor(ChatService._finish_run, trace, recording, profiler, final_state)
             
             # Get answer
             answer = final_state.get("answer", "Xin lỗi, không thể tạo phản hồi.")
             
             # Save assistant message
-            MessageRepository.create(
+            await AsyncMessageRepository.create(
                 db,
                 conversation_id=conversation_id,
                 sender=MessageSender.ASSISTANT,
                 content=answer,
-                metadata={
-                    "intent": final_state.get("intent"),
-                    "plan": final_state.get("plan"),
-                    "step_results": final_state.get("step_results"),
-                }
+                metadata=ChatService._assistant_metadata(final_state)
             )
             
             return {
@@ -203,191 +230,191 @@ class ChatService:
                     "needs_plan_approval": bool(final_state.get("plan") and not final_state.get("plan_approved")),
                 }
             }
-            
+        
         except ValueError as e:
+            await run_in_graph_executor(ChatService._finish_run, trace, recording, profiler, state, e)
             # Re-raise ValueError (e.g., missing API key) with clear message
             logger.error(f"Configuration error: {str(e)}", exc_info=True)
             raise ValueError(f"Configuration error: {str(e)}")
         except Exception as e:
+            await run_in_graph_executor(ChatService._finish_run, trace, recording, profiler, state, e)
             error_msg = str(e) if str(e) else f"{type(e).__name__}: {repr(e)}"
             logger.error(f"Error processing message: {error_msg}", exc_info=True)
-            # Provide more user-friendly error message
+            raise Exception(f"Failed to process message: {ChatService._friendly_error(error_msg)}")
+    
+    @staticmethod
+    def _node_events(node_name: str, update: Dict[str, Any], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        SSE events for one node's update.
+        
+        Args:
+            node_name: Node that ran
+            update: Keys the node changed
+            values: Full state before the update
+        
+        Returns:
+            node_start, the node's specific events, node_end
+        """
+        events = [{
+            "event": "node_start",
+            "data": {
+                "node": node_name,
+                "timestamp": None  # Will be set by router
+            }
+        }]
+        
+        # Emit specific events based on node and state
+        if node_name == "intent_router":
+            intent = update.get("intent", "")
+            if intent:
+                events.append({
+                    "event": "intent",
+                    "data": {
+                        "intent": intent,
+                        "node": node_name
+                    }
+                })
+        
+        elif node_name == "app_plan":
+            plan = update.get("plan")
+            if plan:
+                events.append({
+                    "event": "plan",
+                    "data": {
+                        "plan": plan,
+                        "node": node_name
+                    }
+                })
+        
+        elif node_name == "execute_plan":
+            step_results = update.get("step_results", [])
+            current_step_index = update.get("current_step_index", 0)
+            plan = values.get("plan") or {}  # Set by app_plan in an earlier superstep
+            steps = plan.get("steps", [])
             
-            # Handle specific error cases
-            if "api_key" in error_msg.lower() or "OPENAI_API_KEY" in error_msg:
-                error_msg = "API key chưa được cấu hình. Vui lòng kiểm tra OPENROUTER_API_KEY trong file .env"
-            elif "402" in error_msg or "credits" in error_msg.lower() or "max_tokens" in error_msg.lower():
-                error_msg = (
-                    "OpenRouter API key của bạn không đủ credits để xử lý request này. "
-                    "Vui lòng: 1) Tăng monthly limit tại https://openrouter.ai/settings/keys, "
-                    "hoặc 2) Giảm độ dài câu hỏi. "
-                    f"Chi tiết: {error_msg}"
-                )
+            if step_results:
+                latest_step = step_results[-1]
+                events.append({
+                    "event": "step",
+                    "data": {
+                        "step": latest_step,
+                        "current_step": current_step_index,
+                        "total_steps": len(steps),
+                        "node": node_name
+                    }
+                })
+        
+        elif node_name == "web_search":
+            web_results = update.get("web_results", [])
+            if web_results:
+                events.append({
+                    "event": "web_search",
+                    "data": {
+                        "results_count": len(web_results),
+                        "node": node_name
+                    }
+                })
+        
+        elif node_name == "app_read":
+            app_data = update.get("app_data", {})
+            if app_data:
+                events.append({
+                    "event": "app_data",
+                    "data": {
+                        "has_data": bool(app_data),
+                        "node": node_name
+                    }
+                })
+        
+        elif node_name == "answer":
+            answer = update.get("answer", "")
+            error = update.get("error")
             
-            raise Exception(f"Failed to process message: {error_msg}")
+            # Always emit answer event when answer node completes
+            # This ensures frontend receives the answer even if it's empty (will be handled in done event)
+            if answer:
+                events.append({
+                    "event": "answer",
+                    "data": {
+                        "content": answer,
+                        "node": node_name
+                    }
+                })
+            elif error:
+                # If answer node hasn't generated answer yet but there's an error,
+                # emit error info so frontend can show it
+                events.append({
+                    "event": "answer",
+                    "data": {
+                        "content": f"Đang xử lý lỗi: {error}",
+                        "node": node_name,
+                        "has_error": True
+                    }
+                })
+            else:
+                # Even if answer is empty, emit event so frontend knows answer node completed
+                # The done event will provide the final answer
+                events.append({
+                    "event": "answer",
+                    "data": {
+                        "content": "",
+                        "node": node_name,
+                        "pending": True
+                    }
+                })
+        
+        # Emit node end event
+        events.append({
+            "event": "node_end",
+            "data": {
+                "node": node_name,
+                "timestamp": None
+            }
+        })
+        return events
     
     @staticmethod
-    def stream_message(
-        db: Session,
+    @traced("chat.stream_message")
+    async def stream_message(
+        db: AsyncSession,
         user: User,
         workspace_id: int,
         conversation_id: Optional[int],
-        user_input: str
-    ):
+        user_input: str,
+        profile: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
         Stream chat message processing through LangGraph.
         Yields events as they occur during graph execution.
+        The run is profiled if profile is set by an admin or an operator armed the workspace.
         """
-        # Verify workspace access
-        workspace = WorkspaceRepository.get_by_id(db, workspace_id)
-        if not workspace or workspace.owner_id != user.id:
-            raise ValueError("Workspace not found or access denied")
-        
-        # Prepare state
-        state, conversation_id = ChatService.prepare_state(
+        state, conversation_id = await ChatService._start_turn(
             db, user, workspace_id, conversation_id, user_input
         )
         
-        # Save user message
-        MessageRepository.create(
-            db,
-            conversation_id=conversation_id,
-            sender=MessageSender.USER,
-            content=user_input
-        )
-        
         # Get graph
         graph = get_graph()
+        trace = RunTrace(conversation_id, state)
+        recording = start_recording(state)
+        profiler = await start_profiling(workspace_id, conversation_id, user.username, requested=profile)
+        final_state = None
         
         try:
-            # Stream graph execution
-            final_state = None
-            for event in graph.stream(state):
-                # Process each event (event is a dict: {node_name: state_update})
-                for node_name, state_update in event.items():
-                    # state_update is the updated state after node execution
-                    current_state = state_update if isinstance(state_update, dict) else {}
-                    
-                    # Emit node start event
-                    yield {
-                        "event": "node_start",
-                        "data": {
-                            "node": node_name,
-                            "timestamp": None  # Will be set by router
-                        }
-                    }
-                    
-                    # Emit specific events based on node and state
-                    if node_name == "intent_router":
-                        intent = current_state.get("intent", "")
-                        if intent:
-                            yield {
-                                "event": "intent",
-                                "data": {
-                                    "intent": intent,
-                                    "node": node_name
-                                }
-                            }
-                    
-                    elif node_name == "app_plan":
-                        plan = current_state.get("plan")
-                        if plan:
-                            yield {
-                                "event": "plan",
-                                "data": {
-                                    "plan": plan,
-                                    "node": node_name
-                                }
-                            }
-                    
-                    elif node_name == "execute_plan":
-                        step_results = current_state.get("step_results", [])
-                        current_step_index = current_state.get("current_step_index", 0)
-                        plan = current_state.get("plan", {})
-                        steps = plan.get("steps", [])
-                        
-                        if step_results:
-                            latest_step = step_results[-1]
-                            yield {
-                                "event": "step",
-                                "data": {
-                                    "step": latest_step,
-                                    "current_step": current_step_index,
-                                    "total_steps": len(steps),
-                                    "node": node_name
-                                }
-                            }
-                    
-                    elif node_name == "web_search":
-                        web_results = current_state.get("web_results", [])
-                        if web_results:
-                            yield {
-                                "event": "web_search",
-                                "data": {
-                                    "results_count": len(web_results),
-                                    "node": node_name
-                                }
-                            }
-                    
-                    elif node_name == "app_read":
-                        app_data = current_state.get("app_data", {})
-                        if app_data:
-                            yield {
-                                "event": "app_data",
-                                "data": {
-                                    "has_data": bool(app_data),
-                                    "node": node_name
-                                }
-                            }
-                    
-                    elif node_name == "answer":
-                        answer = current_state.get("answer", "")
-                        error = current_state.get("error")
-                        
-                        # Always emit answer event when answer node completes
-                        # This ensures frontend receives the answer even if it's empty (will be handled in done event)
-                        if answer:
-                            yield {
-                                "event": "answer",
-                                "data": {
-                                    "content": answer,
-                                    "node": node_name
-                                }
-                            }
-                        elif error:
-                            # If answer node hasn't generated answer yet but there's an error,
-                            # emit error info so frontend can show it
-                            yield {
-                                "event": "answer",
-                                "data": {
-                                    "content": f"Đang xử lý lỗi: {error}",
-                                    "node": node_name,
-                                    "has_error": True
-                                }
-                            }
-                        else:
-                            # Even if answer is empty, emit event so frontend knows answer node completed
-                            # The done event will provide the final answer
-                            yield {
-                                "event": "answer",
-                                "data": {
-                                    "content": "",
-                                    "node": node_name,
-                                    "pending": True
-                                }
-                            }
-                    
-                    # Emit node end event
-                    yield {
-                        "event": "node_end",
-                        "data": {
-                            "node": node_name,
-                            "timestamp": None
-                        }
-                    }
-                    
-                    # Keep track of final state
-                    final_state = current_state
+            # Stream graph execution, each step on the graph thread pool
+            values: Dict[str, Any] = state
+            chunks = profiler.iterate(recording.iterate(graph.stream(state, stream_mode=STREAM_MODES)))
+            async for mode, chunk in iterate_in_graph_executor(chunks):
+                if mode == "values":
+                    # Full state after each superstep; the last one is the final state
+                    values = final_state = chunk
+                    continue
+                # An "updates" chunk is {node_name: keys the node changed}
+                for node_name, state_update in chunk.items():
+                    update = state_update if isinstance(state_update, dict) else {}
+                    for event in ChatService._node_events(node_name, update, values):
+                        yield event
+            
+            await run_in_graph_executor(ChatService._finish_run, trace, recording, profiler, final_state)
             
             # Save assistant message if we have an answer
             if final_state:
@@ -405,17 +432,12 @@ class ChatService:
                     final_state["answer"] = answer
                 
                 # Always save message (even if it's an error message)
-                MessageRepository.create(
+                await AsyncMessageRepository.create(
                     db,
                     conversation_id=conversation_id,
                     sender=MessageSender.ASSISTANT,
                     content=answer,
-                    metadata={
-                        "intent": final_state.get("intent"),
-                        "plan": final_state.get("plan"),
-                        "step_results": final_state.get("step_results"),
-                        "error": error,
-                    }
+                    metadata={**ChatService._assistant_metadata(final_state), "error": error}
                 )
                 
                 # Always emit completion event (even if answer is error message)
@@ -429,8 +451,10 @@ class ChatService:
                         "error": error,
                     }
                 }
-            
+        
         except ValueError as e:
+            await run_in_graph_executor(ChatService._finish_run, trace, recording, profiler, final_state or state, e)
+            mark_error(e)
             logger.error(f"Configuration error in stream: {str(e)}", exc_info=True)
             yield {
                 "event": "error",
@@ -440,25 +464,14 @@ class ChatService:
                 }
             }
         except Exception as e:
+            await run_in_graph_executor(ChatService._finish_run, trace, recording, profiler, final_state or state, e)
+            mark_error(e)
             error_msg = str(e) if str(e) else f"{type(e).__name__}: {repr(e)}"
             logger.error(f"Error streaming message: {error_msg}", exc_info=True)
-            
-            # Handle specific error cases
-            if "api_key" in error_msg.lower() or "OPENAI_API_KEY" in error_msg:
-                error_msg = "API key chưa được cấu hình. Vui lòng kiểm tra OPENROUTER_API_KEY trong file .env"
-            elif "402" in error_msg or "credits" in error_msg.lower() or "max_tokens" in error_msg.lower():
-                error_msg = (
-                    "OpenRouter API key của bạn không đủ credits để xử lý request này. "
-                    "Vui lòng: 1) Tăng monthly limit tại https://openrouter.ai/settings/keys, "
-                    "hoặc 2) Giảm độ dài câu hỏi. "
-                    f"Chi tiết: {error_msg}"
-                )
-            
             yield {
                 "event": "error",
                 "data": {
-                    "error": f"Failed to process message: {error_msg}",
+                    "error": f"Failed to process message: {ChatService._friendly_error(error_msg)}",
                     "type": "processing"
                 }
             }
-
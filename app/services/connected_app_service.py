@@ -1,11 +1,13 @@
 """Connected app service for business logic."""
 from typing import List, Dict, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.connected_app import ConnectedApp
 from app.models.workspace import Workspace
-from app.repositories.connected_app_repo import ConnectedAppRepository
+from app.repositories.connected_app_repo import AsyncConnectedAppRepository, ConnectedAppRepository
 from app.repositories.workspace_repo import WorkspaceRepository
 from app.domain.apps.base import ConnectedAppConfig, AppCategory, ConnectionMethod
+from app.domain.apps.config_cache import MISSING, workspace_app_cache
 from app.domain.apps.registry import get_adapter
 from app.utils.crypto import encrypt, decrypt
 from app.core.logging import get_logger
@@ -119,6 +121,121 @@ class ConnectedAppService:
         logger.info(f"Created connected app: {connected_app.id} ({app_id})")
         return connected_app
     
+    @staticmethod
+    def build_app_config(connected_app: ConnectedApp) -> ConnectedAppConfig:
+        """
+        Typed config of a connection, with its secrets decrypted.
+        
+        Args:
+            connected_app: ConnectedApp row
+            
+        Returns:
+            ConnectedAppConfig
+            
+        Raises:
+            ValueError: If the client secret cannot be decrypted
+        """
+        credentials = {}
+        if connected_app.connection_method == ConnectionMethod.API:
+            if connected_app.client_id and connected_app.client_secret_encrypted:
+                credentials["client_id"] = connected_app.client_id
+                try:
+                    credentials["client_secret"] = decrypt(connected_app.client_secret_encrypted)
+                except Exception as e:
+                    logger.error(f"Failed to decrypt client_secret: {str(e)}", exc_info=True)
+                    raise ValueError(f"Failed to decrypt client_secret: {str(e)}")
+            if connected_app.retailer:
+                credentials["retailer"] = connected_app.retailer
+        elif connected_app.connection_method == ConnectionMethod.MCP:
+            if connected_app.mcp_server_url:
+                credentials["mcp_server_url"] = connected_app.mcp_server_url
+            if connected_app.mcp_auth_config_encrypted:
+                import json
+                credentials["mcp_auth_config"] = json.loads(decrypt(connected_app.mcp_auth_config_encrypted))
+        
+        # Add extra config from config_json
+        if connected_app.config_json:
+            credentials.update(connected_app.config_json)
+        
+        return ConnectedAppConfig(
+            app_id=connected_app.app_id,
+            name=connected_app.name,
+            category=connected_app.app_category,
+            connection_method=connected_app.connection_method,
+            credentials=credentials,
+            extra={},
+        )
+    
+    @staticmethod
+    def get_workspace_app(db: Session, workspace_id: int) -> Optional[Dict[str, Any]]:
+        """
+        The workspace's connected app in graph state format, resolved once per TTL.
+        
+        Uses the default connection, else the first active one. The result is
+        cached per workspace (see app.domain.apps.config_cache) and shared
+        between turns: callers must not modify it.
+        
+        Args:
+            db: Database session
+            workspace_id: Workspace ID
+            
+        Returns:
+            {"id", "name", "category", "connection_method", "config": ConnectedAppConfig}, or None
+        """
+        cached = workspace_app_cache.get(workspace_id)
+        if cached is not MISSING:
+            return cached
+        generation = workspace_app_cache.generation(workspace_id)
+        
+        connected_app = ConnectedAppRepository.get_default(db, workspace_id)
+        if not connected_app:
+            connected_app = ConnectedAppService._first_active(ConnectedAppRepository.get_by_workspace(db, workspace_id))
+        
+        resolved = ConnectedAppService._state_app(connected_app)
+        workspace_app_cache.set(workspace_id, resolved, generation)
+        return resolved
+    
+    @staticmethod
+    async def aget_workspace_app(db: AsyncSession, workspace_id: int) -> Optional[Dict[str, Any]]:
+        """get_workspace_app on an async session (same cache)."""
+        cached = workspace_app_cache.get(workspace_id)
+        if cached is not MISSING:
+            return cached
+        generation = workspace_app_cache.generation(workspace_id)
+        
+        connected_app = await AsyncConnectedAppRepository.get_default(db, workspace_id)
+        if not connected_app:
+            connected_app = ConnectedAppService._first_active(
+                await AsyncConnectedAppRepository.get_by_workspace(db, workspace_id)
+            )
+        
+        resolved = ConnectedAppService._state_app(connected_app)
+        workspace_app_cache.set(workspace_id, resolved, generation)
+        return resolved
+    
+    @staticmethod
+    def _first_active(connections: List[ConnectedApp]) -> Optional[ConnectedApp]:
+        """Fallback when no default is set: the newest active connection."""
+        active_connections = [c for c in connections if c.status.value == "active"]
+        if not active_connections:
+            return None
+        logger.info(f"Using first active connection: {active_connections[0].id} (no default set)")
+        return active_connections[0]
+    
+    @staticmethod
+    def _state_app(connected_app: Optional[ConnectedApp]) -> Optional[Dict[str, Any]]:
+        """A connection in graph state format (None stays None)."""
+        if not connected_app:
+            return None
+        logger.info(f"Loaded connected app: {connected_app.name} ({connected_app.app_id})")
+        return {
+            "id": str(connected_app.id),
+            "name": connected_app.name,
+            "category": connected_app.app_category.value,
+            "connection_method": connected_app.connection_method.value,
+            "config": ConnectedAppService.build_app_config(connected_app),
+        }
+    
     @staticmethod
     async def test_connection(db: Session, connection_id: int) -> Dict[str, Any]:
         """
@@ -136,27 +253,7 @@ class ConnectedAppService:
             raise ValueError(f"Connected app {connection_id} not found")
         
         try:
-            # Build ConnectedAppConfig
-            credentials = {}
-            if connected_app.connection_method == ConnectionMethod.API:
-                if connected_app.client_id and connected_app.client_secret_encrypted:
-                    credentials["client_id"] = connected_app.client_id
-                    try:
-                        credentials["client_secret"] = decrypt(connected_app.client_secret_encrypted)
-                    except Exception as e:
-                        logger.error(f"Failed to decrypt client_secret: {str(e)}", exc_info=True)
-                        raise ValueError(f"Failed to decrypt client_secret: {str(e)}")
-                if connected_app.retailer:
-                    credentials["retailer"] = connected_app.retailer
-            
-            app_config = ConnectedAppConfig(
-                app_id=connected_app.app_id,
-                name=connected_app.name,
-                category=connected_app.app_category,
-                connection_method=connected_app.connection_method,
-                credentials=credentials,
-                extra={},
-            )
+            app_config = ConnectedAppService.build_app_config(connected_app)
             
             # Test using adapter
             adapter = get_adapter(connected_app.app_id)
@@ -210,7 +307,7 @@ class ConnectedAppService:
         if connected_app.workspace_id != workspace_id:
             raise ValueError("Connected app does not belong to workspace")
         
-        # Update connection to be default (repo will unset others)
+        # Update connection to be default (repo will unset others and invalidate the workspace's cached config)
         return ConnectedAppRepository.update(
             db=db,
             connected_app=connected_app,
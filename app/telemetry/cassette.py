@@ -0,0 +1,471 @@
+"""Record/replay cassettes: the upstream HTTP traffic of one chat turn, for deterministic performance runs.
+
+A cassette holds the graph's initial state and every request the turn sent
+through the shared transports (OpenRouter, KiotViet, Google CSE, result
+pages), with response bodies chunk by chunk and their timing. Replaying it
+runs the real graph with a CassettePlayer answering those requests, so the
+service's own overhead can be measured without network access and compared
+between releases (see benchmarks/replay.py).
+
+The active session is kept in a context variable, which the transports in
+app.telemetry.http consult on every request: clients that are cached or
+created deep inside nodes are covered without being touched.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from contextvars import ContextVar, copy_context
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode
+import asyncio
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+import httpx
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+CASSETTE_VERSION = 1
+REDACTED = "REDACTED"
+
+# Request/response fields and query parameters that never reach a cassette
+SENSITIVE_KEYS = {
+    "access_token", "refresh_token", "client_secret", "api_key", "apikey", "key",
+    "password", "authorization", "mcp_auth_config",
+}
+# Response headers worth keeping for replay (content-length is recomputed from the body)
+KEPT_RESPONSE_HEADERS = {"content-type", "retry-after"}
+# Settings that decide which upstream URLs are called and how; replay applies them
+REPLAYED_SETTINGS = ("openrouter_base_url", "kiotviet_token_url", "google_search_url", "research_mode", "auto_approve_plans")
+
+_active: ContextVar[Optional["CassetteSession"]] = ContextVar("active_cassette", default=None)
+
+
+def active_cassette() -> Optional["CassetteSession"]:
+    """The recorder or player of the current turn, if any."""
+    return _active.get()
+
+
+def redact(value: Any) -> Any:
+    """Copy of a JSON-like value with sensitive keys replaced."""
+    if isinstance(value, dict):
+        return {k: REDACTED if str(k).lower() in SENSITIVE_KEYS else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def _redact_url(url: httpx.URL) -> str:
+    if not url.query:
+        return str(url)
+    params = [(k, REDACTED if k.lower() in SENSITIVE_KEYS else v)
+              for k, v in parse_qsl(url.query.decode("utf-8", "replace"), keep_blank_values=True)]
+    return str(url.copy_with(query=urlencode(params).encode("ascii")))
+
+
+def _redact_body(content: bytes, content_type: str) -> Optional[str]:
+    if not content:
+        return None
+    text = content.decode("utf-8", "replace")
+    if "json" in content_type:
+        try:
+            return json.dumps(redact(json.loads(text)), ensure_ascii=False, sort_keys=True)
+        except ValueError:
+            return text
+    if "x-www-form-urlencoded" in content_type:
+        params = [(k, REDACTED if k.lower() in SENSITIVE_KEYS else v) for k, v in parse_qsl(text, keep_blank_values=True)]
+        return urlencode(params)
+    return text
+
+
+def _request_key(request: httpx.Request, content: bytes) -> Tuple[str, str, Optional[str]]:
+    """(method, redacted URL, redacted body): how a request is matched on replay."""
+    body = _redact_body(content, request.headers.get("content-type", ""))
+    return request.method, _redact_url(request.url), body
+
+
+def _encode_chunk(offset: float, chunk: bytes) -> Dict[str, Any]:
+    try:
+        return {"t": round(offset, 4), "text": chunk.decode("utf-8")}
+    except UnicodeDecodeError:  # Chunk boundary inside a multi-byte character, or binary
+        return {"t": round(offset, 4), "b64": base64.b64encode(chunk).decode("ascii")}
+
+
+def _decode_chunk(chunk: Dict[str, Any]) -> bytes:
+    if "b64" in chunk:
+        return base64.b64decode(chunk["b64"])
+    return chunk["text"].encode("utf-8")
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, BaseModel):  # e.g. the typed connected app config; its secrets are redacted afterwards
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def _json_safe(value: Any) -> Any:
+    """Round-trip through JSON: drops nothing, but turns models, enums, tuples and the like into plain values."""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=_plain))
+
+
+class CassetteSession(ABC):
+    """Recorder or player bound to one turn through its own context."""
+
+    def __init__(self):
+        self._context = copy_context()
+        self._context.run(_active.set, self)
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call fn with this session active."""
+        return self._context.run(fn, *args, **kwargs)
+
+    def iterate(self, iterable: Iterable[Any]) -> Iterator[Any]:
+        """
+        Iterate with this session active on every step.
+
+        Streaming responses advance the graph from whichever thread pulls the
+        next event, so the session cannot simply be set once around the loop.
+        """
+        iterator = iter(iterable)
+        while True:
+            try:
+                item = self._context.run(next, iterator)
+            except StopIteration:
+                return
+            yield item
+
+    @abstractmethod
+    async def handle_async(self, request: httpx.Request, transport: httpx.AsyncBaseTransport) -> httpx.Response:
+        """Answer a request made through an async transport (transport is the real one)."""
+
+    @abstractmethod
+    def handle_sync(self, request: httpx.Request, transport: httpx.BaseTransport) -> httpx.Response:
+        """Answer a request made through a sync transport (transport is the real one)."""
+
+
+class _RecordedStream:
+    """Byte stream that appends response chunks (with their offsets) to an interaction."""
+
+    def __init__(self, stream: Any, interaction: Dict[str, Any], start: float):
+        self._stream = stream
+        self._chunks = interaction["response"]["chunks"]
+        self._start = start
+
+    def _add(self, chunk: bytes) -> None:
+        if chunk:
+            self._chunks.append(_encode_chunk(time.perf_counter() - self._start, chunk))
+
+
+class _RecordedAsyncStream(_RecordedStream, httpx.AsyncByteStream):
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._add(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class _RecordedSyncStream(_RecordedStream, httpx.SyncByteStream):
+    def __iter__(self):
+        for chunk in self._stream:
+            self._add(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class CassetteRecorder(CassetteSession):
+    """Forwards requests upstream and records them with their responses."""
+
+    def __init__(self, initial_state: Dict[str, Any]):
+        """
+        Args:
+            initial_state: Graph state the turn starts from (copied and redacted now)
+        """
+        super().__init__()
+        self.initial_state = redact(_json_safe(initial_state))
+        self.interactions: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._recorded_at = datetime.now(timezone.utc)
+        self._saved: Optional[Path] = None
+
+    def _begin(self, request: httpx.Request, content: bytes) -> Dict[str, Any]:
+        # Bodies are stored as sent over the wire; compressed ones could not be replayed chunk by chunk
+        request.headers["accept-encoding"] = "identity"
+        method, url, body = _request_key(request, content)
+        interaction = {
+            "method": method,
+            "url": url,
+            "request_body": body,
+            "started_s": round(time.perf_counter() - self._start, 4),
+            "response": None,
+        }
+        self.interactions.append(interaction)
+        return interaction
+
+    @staticmethod
+    def _response(interaction: Dict[str, Any], response: httpx.Response, elapsed: float) -> None:
+        interaction["response"] = {
+            "status": response.status_code,
+            "headers": [[k, v] for k, v in response.headers.items() if k.lower() in KEPT_RESPONSE_HEADERS],
+            "elapsed_s": round(elapsed, 4),
+            "chunks": [],
+        }
+
+    async def handle_async(self, request: httpx.Request, transport: httpx.AsyncBaseTransport) -> httpx.Response:
+        interaction = self._begin(request, await request.aread())
+        start = time.perf_counter()
+        response = await transport.handle_async_request(request)
+        self._response(interaction, response, time.perf_counter() - start)
+        return httpx.Response(
+            response.status_code, headers=response.headers, extensions=response.extensions,
+            stream=_RecordedAsyncStream(response.stream, interaction, start),
+        )
+
+    def handle_sync(self, request: httpx.Request, transport: httpx.BaseTransport) -> httpx.Response:
+        interaction = self._begin(request, request.read())
+        start = time.perf_counter()
+        response = transport.handle_request(request)
+        self._response(interaction, response, time.perf_counter() - start)
+        return httpx.Response(
+            response.status_code, headers=response.headers, extensions=response.extensions,
+            stream=_RecordedSyncStream(response.stream, interaction, start),
+        )
+
+    def to_dict(self, final_state: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None) -> Dict[str, Any]:
+        """The cassette: initial state, interactions and the recorded outcome."""
+        final_state = final_state or {}
+        interactions = []
+        for interaction in self.interactions:
+            response = interaction["response"]
+            if response is None:  # Transport error: replay it as a connection failure
+                interactions.append(interaction)
+                continue
+            content_type = dict((k.lower(), v) for k, v in response["headers"]).get("content-type", "")
+            if "json" in content_type and response["chunks"]:
+                # Whole-body JSON (tokens, credentials) is redacted; its chunking carries no timing worth keeping
+                body = b"".join(_decode_chunk(c) for c in response["chunks"])
+                redacted = _redact_body(body, content_type) or ""
+                response = {**response, "chunks": [{"t": response["chunks"][-1]["t"], "text": redacted}]}
+            interactions.append({**interaction, "response": response})
+        return {
+            "version": CASSETTE_VERSION,
+            "recorded_at": self._recorded_at.isoformat(),
+            "app_version": settings.app_version,
+            "settings": {name: getattr(settings, name) for name in REPLAYED_SETTINGS},
+            "initial_state": self.initial_state,
+            "outcome": {
+                "intent": final_state.get("intent"),
+                "answer": final_state.get("answer"),
+                "error": str(error) if error else final_state.get("error"),
+                "duration_s": round(time.perf_counter() - self._start, 4),
+            },
+            "interactions": interactions,
+        }
+
+    def save(
+        self,
+        final_state: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None,
+        directory: Optional[str] = None,
+    ) -> Optional[Path]:
+        """
+        Write the cassette as JSON; later calls for the same turn do nothing.
+
+        Args:
+            final_state: State the graph finished with
+            error: Exception that ended the turn, if any
+            directory: Target directory (default: settings.cassette_dir)
+
+        Returns:
+            Path of the file, or None if it could not be written
+        """
+        if self._saved is not None:
+            return self._saved
+        directory = Path(directory or settings.cassette_dir)
+        conversation = self.initial_state.get("conversation_id") or "turn"
+        path = directory / f"{self._recorded_at:%Y%m%dT%H%M%S}-{conversation}-{uuid.uuid4().hex[:8]}.json"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.to_dict(final_state, error), ensure_ascii=False, indent=1))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write cassette {path}: {e}")
+            return None
+        logger.info(f"Recorded cassette {path} ({len(self.interactions)} requests)")
+        self._saved = path
+        return path
+
+
+class _ReplayStream:
+    def __init__(self, chunks: List[Dict[str, Any]], preserve_timing: bool, headers_at: float):
+        self._chunks = chunks
+        self._preserve_timing = preserve_timing
+        self._previous = headers_at
+
+    def _gap(self, chunk: Dict[str, Any]) -> float:
+        gap = max(0.0, chunk["t"] - self._previous) if self._preserve_timing else 0.0
+        self._previous = chunk["t"]
+        return gap
+
+
+class _ReplayAsyncStream(_ReplayStream, httpx.AsyncByteStream):
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            gap = self._gap(chunk)
+            if gap:
+                await asyncio.sleep(gap)
+            yield _decode_chunk(chunk)
+
+
+class _ReplaySyncStream(_ReplayStream, httpx.SyncByteStream):
+    def __iter__(self):
+        for chunk in self._chunks:
+            gap = self._gap(chunk)
+            if gap:
+                time.sleep(gap)
+            yield _decode_chunk(chunk)
+
+
+class CassettePlayer(CassetteSession):
+    """Answers requests from a cassette; nothing reaches the network."""
+
+    def __init__(self, cassette: Dict[str, Any], preserve_timing: bool = False):
+        """
+        Args:
+            cassette: Loaded cassette (load_cassette())
+            preserve_timing: Wait the recorded time to headers and between body
+                chunks; otherwise respond immediately (CPU-only runs)
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.preserve_timing = preserve_timing
+        self.misses: List[str] = []
+        self._interactions = cassette.get("interactions") or []
+        self._used = [False] * len(self._interactions)
+        self._lock = threading.Lock()
+        # Exact match first; otherwise the next unused request to the same endpoint.
+        # Prompts embed today's date, so LLM request bodies rarely match exactly.
+        self._exact: Dict[Tuple[Any, ...], deque] = defaultdict(deque)
+        self._endpoint: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        for index, interaction in enumerate(self._interactions):
+            self._exact[(interaction["method"], interaction["url"], interaction.get("request_body"))].append(index)
+            self._endpoint[self._endpoint_key(interaction["method"], interaction["url"])].append(index)
+
+    @staticmethod
+    def _endpoint_key(method: str, url: str) -> Tuple[str, str]:
+        parsed = httpx.URL(url)
+        return method, f"{parsed.host}{parsed.path}"
+
+    def _take(self, request: httpx.Request, content: bytes) -> Optional[Dict[str, Any]]:
+        key = _request_key(request, content)
+        with self._lock:
+            for candidates in (self._exact.get(key), self._endpoint.get(self._endpoint_key(key[0], key[1]))):
+                while candidates:
+                    index = candidates.popleft()
+                    if not self._used[index]:
+                        self._used[index] = True
+                        return self._interactions[index]
+            self.misses.append(f"{key[0]} {key[1]}")
+        return None
+
+    @property
+    def unused(self) -> int:
+        """Recorded requests the replay never made."""
+        return self._used.count(False)
+
+    def _response(self, request: httpx.Request, interaction: Optional[Dict[str, Any]], stream_cls: type) -> httpx.Response:
+        if interaction is None:
+            raise httpx.ConnectError(f"No recorded response for {request.method} {_redact_url(request.url)}", request=request)
+        response = interaction.get("response")
+        if response is None:
+            raise httpx.ConnectError(f"Recorded transport error for {request.method} {request.url.path}", request=request)
+        return httpx.Response(
+            response["status"], headers=response["headers"],
+            stream=stream_cls(response["chunks"], self.preserve_timing, response.get("elapsed_s", 0.0)),
+        )
+
+    async def handle_async(self, request: httpx.Request, transport: httpx.AsyncBaseTransport) -> httpx.Response:
+        interaction = self._take(request, await request.aread())
+        if interaction and interaction.get("response") and self.preserve_timing:
+            await asyncio.sleep(interaction["response"].get("elapsed_s", 0.0))
+        return self._response(request, interaction, _ReplayAsyncStream)
+
+    def handle_sync(self, request: httpx.Request, transport: httpx.BaseTransport) -> httpx.Response:
+        interaction = self._take(request, request.read())
+        if interaction and interaction.get("response") and self.preserve_timing:
+            time.sleep(interaction["response"].get("elapsed_s", 0.0))
+        return self._response(request, interaction, _ReplaySyncStream)
+
+
+class _NoRecording:
+    """Stand-in when the turn is not recorded: runs everything directly."""
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return fn(*args, **kwargs)
+
+    def iterate(self, iterable: Iterable[Any]) -> Iterable[Any]:
+        return iterable
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+
+NO_RECORDING = _NoRecording()
+
+
+def start_recording(initial_state: Dict[str, Any]) -> Any:
+    """
+    Recorder for a chat turn if recording is enabled and the turn is sampled.
+
+    Args:
+        initial_state: Graph state the turn starts from
+
+    Returns:
+        CassetteRecorder, or NO_RECORDING (same run/iterate/save interface, does nothing)
+    """
+    if not settings.cassette_recording_enabled or random.random() >= settings.cassette_sample_rate:
+        return NO_RECORDING
+    try:
+        return CassetteRecorder(initial_state)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Cassette recording skipped: {e}")
+        return NO_RECORDING
+
+
+def load_cassette(path: Any) -> Dict[str, Any]:
+    """
+    Read a cassette file.
+
+    Args:
+        path: File path
+
+    Returns:
+        Cassette dict
+
+    Raises:
+        ValueError: If the file is not a cassette of a supported version
+    """
+    cassette = json.loads(Path(path).read_text())
+    if not isinstance(cassette, dict) or cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"{path}: not a version {CASSETTE_VERSION} cassette")
+    return cassette
+
+
+__all__ = [
+    "CassetteRecorder",
+    "CassettePlayer",
+    "NO_RECORDING",
+    "active_cassette",
+    "load_cassette",
+    "redact",
+    "start_recording",
+]
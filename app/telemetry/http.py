@@ -0,0 +1,108 @@
+"""Instrumented httpx transports: every upstream request is timed by host (API name or "other"), method and status.
+
+All outbound HTTP clients (OpenRouter, KiotViet, Google CSE, page fetcher)
+build their transport with async_transport()/sync_transport(), so this is
+the single place to observe upstream calls (Prometheus histogram and an
+OpenTelemetry client span per request) and to record or replay them
+(app.telemetry.cassette).
+"""
+from typing import Any, Dict
+import time
+import httpx
+from app.telemetry.cassette import active_cassette
+from app.telemetry.metrics import observe_http
+from app.telemetry.tracing import mark_failed, span
+
+
+def _span_attributes(request: httpx.Request) -> Dict[str, Any]:
+    # The query string is left out: Google CSE passes its API key there
+    return {
+        "http.request.method": request.method,
+        "server.address": request.url.host,
+        "url.path": request.url.path,
+    }
+
+
+def _record_status(current: Any, status_code: int) -> None:
+    current.set_attribute("http.response.status_code", status_code)
+    if status_code >= 400:
+        mark_failed(f"HTTP {status_code}", current)
+
+
+class InstrumentedAsyncTransport(httpx.AsyncBaseTransport):
+    """Async transport wrapper recording request durations and spans."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        with span(f"HTTP {request.method}", _span_attributes(request), kind="client") as current:
+            try:
+                cassette = active_cassette()
+                if cassette is not None:
+                    response = await cassette.handle_async(request, self._transport)
+                else:
+                    response = await self._transport.handle_async_request(request)
+                status = str(response.status_code)
+                _record_status(current, response.status_code)
+                return response
+            finally:
+                observe_http(request.url.host or "", request.method, status, time.perf_counter() - start)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Sync transport wrapper recording request durations and spans."""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        with span(f"HTTP {request.method}", _span_attributes(request), kind="client") as current:
+            try:
+                cassette = active_cassette()
+                if cassette is not None:
+                    response = cassette.handle_sync(request, self._transport)
+                else:
+                    response = self._transport.handle_request(request)
+                status = str(response.status_code)
+                _record_status(current, response.status_code)
+                return response
+            finally:
+                observe_http(request.url.host or "", request.method, status, time.perf_counter() - start)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def async_transport(**kwargs: Any) -> httpx.AsyncBaseTransport:
+    """
+    Build the transport for an httpx.AsyncClient.
+
+    Args:
+        **kwargs: httpx.AsyncHTTPTransport options (limits, retries, ...);
+            pool limits must be set here, not on the client, once a transport is passed
+
+    Returns:
+        Instrumented transport
+    """
+    return InstrumentedAsyncTransport(httpx.AsyncHTTPTransport(**kwargs))
+
+
+def sync_transport(**kwargs: Any) -> httpx.BaseTransport:
+    """
+    Build the transport for an httpx.Client.
+
+    Args:
+        **kwargs: httpx.HTTPTransport options
+
+    Returns:
+        Instrumented transport
+    """
+    return InstrumentedTransport(httpx.HTTPTransport(**kwargs))
@@ -1,11 +1,214 @@
-"""Metrics setup (placeholder for future Prometheus integration)."""
+"""Prometheus metrics: graph node latency, LLM tokens/cost, upstream HTTP durations.
+
+prometheus_client is optional (pip install -e ".[observability]"). Without it,
+or with METRICS_ENABLED=False, every recorder is a no-op.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+import functools
+import inspect
+import time
+from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    import prometheus_client
+except ImportError:  # Optional dependency
+    prometheus_client = None
+
+# Workspace of the graph run being executed (label for LLM usage metrics)
+current_workspace: ContextVar[str] = ContextVar("current_workspace", default="unknown")
+
+# Node latencies range from a few ms (routing) to minutes (plan execution)
+NODE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160)
+HTTP_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+
+# Host label of upstream requests: the known APIs by domain suffix. Everything
+# else (result pages fetched for web search) is "other", to bound the label set
+HTTP_HOST_LABELS = (
+    ("openrouter.ai", "openrouter"),
+    ("kiotapi.com", "kiotviet"),
+    ("kiotviet.vn", "kiotviet"),
+    ("googleapis.com", "googleapis"),
+)
+
+_metrics: Dict[str, Any] = {}
+
+
+def metrics_enabled() -> bool:
+    """True if metrics are collected."""
+    return bool(_metrics)
+
+
+def setup_metrics() -> None:
+    """Create the Prometheus metrics (idempotent)."""
+    if _metrics or not settings.metrics_enabled:
+        return
+    if prometheus_client is None:
+        logger.info("prometheus_client not installed, metrics disabled")
+        return
+    from prometheus_client import Counter, Histogram
+
+    _metrics.update({
+        "node_duration": Histogram(
+            "culi_graph_node_duration_seconds", "Graph node execution time",
+            ["node", "status"], buckets=NODE_BUCKETS,
+        ),
+        "llm_duration": Histogram(
+            "culi_llm_request_duration_seconds", "LLM request time (until the full response)",
+            ["model", "status"], buckets=NODE_BUCKETS,
+        ),
+        "llm_tokens": Counter(
+            "culi_llm_tokens_total", "LLM tokens by model and workspace",
+            ["model", "workspace", "type"],
+        ),
+        "llm_cost": Counter(
+            "culi_llm_cost_usd_total", "Estimated LLM cost in USD (settings.llm_model_prices)",
+            ["model", "workspace"],
+        ),
+        "http_duration": Histogram(
+            "culi_http_client_request_duration_seconds", "Upstream HTTP request time (until response headers)",
+            ["host", "method", "status"], buckets=HTTP_BUCKETS,
+        ),
+    })
+    logger.info("Prometheus metrics enabled")
+
+
+def _workspace_label() -> str:
+    return current_workspace.get() if settings.metrics_per_workspace else "all"
+
+
+def observe_node(node: str, seconds: float, status: str = "ok") -> None:
+    """Record a graph node execution."""
+    if _metrics:
+        _metrics["node_duration"].labels(node, status).observe(seconds)
+
+
+def record_llm_call(
+    model: str,
+    seconds: float,
+    success: bool,
+    usage: Optional[Dict[str, Any]] = None,
+    cost: Optional[float] = None,
+) -> None:
+    """
+    Record an LLM call: duration, prompt/completion tokens and estimated cost.
+
+    Args:
+        model: Model that served the call
+        seconds: Request duration
+        success: Whether the call succeeded
+        usage: Token usage ({"input_tokens", "output_tokens"})
+        cost: Estimated USD cost
+    """
+    if not _metrics:
+        return
+    _metrics["llm_duration"].labels(model, "ok" if success else "error").observe(seconds)
+    workspace = _workspace_label()
+    if usage:
+        _metrics["llm_tokens"].labels(model, workspace, "prompt").inc(usage.get("input_tokens", 0))
+        _metrics["llm_tokens"].labels(model, workspace, "completion").inc(usage.get("output_tokens", 0))
+    if cost:
+        _metrics["llm_cost"].labels(model, workspace).inc(cost)
+
+
+@functools.lru_cache(maxsize=1024)
+def http_host_label(host: str) -> str:
+    """
+    Bounded label for an upstream host.
+
+    Args:
+        host: Request host
+
+    Returns:
+        "openrouter", "kiotviet", "googleapis" or "other"
+    """
+    host = host.lower()
+    # Configured endpoints count too (benchmarks point them at local fakes)
+    configured = {
+        urlsplit(settings.openrouter_base_url).hostname: "openrouter",
+        urlsplit(settings.kiotviet_token_url).hostname: "kiotviet",
+        urlsplit(settings.google_search_url).hostname: "googleapis",
+    }
+    if host in configured:
+        return configured[host]
+    for domain, label in HTTP_HOST_LABELS:
+        if host == domain or host.endswith("." + domain):
+            return label
+    return "other"
+
+
+def observe_http(host: str, method: str, status: str, seconds: float) -> None:
+    """Record an upstream HTTP request (status is the code, or "error" for transport errors)."""
+    if _metrics:
+        _metrics["http_duration"].labels(http_host_label(host), method, status).observe(seconds)
+
+
+def _add_timing(update: Any, name: str, seconds: float) -> None:
+    """Add the node's duration to its update; the state reducer appends it to node_timings (saved with the AgentRun trace)."""
+    if isinstance(update, dict):
+        update["node_timings"] = [{"node": name, "duration_ms": round(seconds * 1000, 1)}]
+
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """
+    Wrap a graph node to time it and expose the run's workspace to LLM metrics.
+    
+    The duration is observed in the node histogram and appended to the
+    state's node_timings.
+
+    Args:
+        name: Node name in the graph
+        node: Node function (sync or async, takes the state and returns its update)
+
+    Returns:
+        Wrapped node
+    """
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+            token = current_workspace.set(str(state.get("workspace_id") or "unknown"))
+            start = time.perf_counter()
+            status = "error"
+            try:
+                result = await node(state)
+                status = "ok"
+                _add_timing(result, name, time.perf_counter() - start)
+                return result
+            finally:
+                observe_node(name, time.perf_counter() - start, status)
+                current_workspace.reset(token)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        token = current_workspace.set(str(state.get("workspace_id") or "unknown"))
+        start = time.perf_counter()
+        status = "error"
+        try:
+            result = node(state)
+            status = "ok"
+            _add_timing(result, name, time.perf_counter() - start)
+            return result
+        finally:
+            observe_node(name, time.perf_counter() - start, status)
+            current_workspace.reset(token)
+    return wrapper
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Current metrics in the Prometheus text format.
 
-def setup_metrics():
-    """Setup Prometheus metrics."""
-    # TODO: Implement Prometheus metrics
-    logger.debug("Metrics setup (placeholder)")
+    Returns:
+        (body, content type)
 
+    Raises:
+        RuntimeError: If metrics are disabled
+    """
+    if not _metrics:
+        raise RuntimeError("Metrics are disabled (METRICS_ENABLED=False or prometheus_client not installed)")
+    return prometheus_client.generate_latest(), prometheus_client.CONTENT_TYPE_LATEST
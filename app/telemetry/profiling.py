@@ -0,0 +1,390 @@
+"""On-demand profiling of chat runs, switched on by an operator.
+
+A run is profiled when an admin sends the profiling header with the chat
+request, or when an admin has armed the workspace (POST
+/api/v1/admin/profiling/workspaces/{id}) for its next few requests. Arms are
+stored in the database, so they apply whichever worker process serves the
+request. The artifact is written under settings.profiling_dir and linked from
+the run's AgentRun row (profile_path).
+
+Backends:
+- sampler (default): samples the stacks of every thread of the process and
+  saves collapsed stacks (.folded, for speedscope or flamegraph.pl). A run's
+  nodes execute on the graph's thread pool and its LLM/HTTP calls on the
+  shared event loop thread, which the other backends cannot see.
+- pyinstrument (optional, "observability" extra): HTML flame view, and
+- cprofile: .prof stats (pstats, snakeviz); both cover only the thread that
+  drives the graph.
+
+Requests that are not profiled pay a settings check and a set lookup; the
+set of armed workspaces is re-read from the database every few seconds.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from pathlib import Path
+import asyncio
+import cProfile
+import sys
+import threading
+import time
+import uuid
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.repositories.profiling_arm_repo import ProfilingArmRepository
+
+try:
+    from pyinstrument import Profiler as _Pyinstrument
+except ImportError:  # Optional dependency: fall back to cProfile
+    _Pyinstrument = None
+
+logger = get_logger(__name__)
+
+RECENT_PROFILES = 50  # Saved artifacts listed by the admin API
+
+
+def profiler_backend() -> str:
+    """Backend used for new profiles: "sampler", "pyinstrument" or "cprofile"."""
+    if settings.profiling_backend == "pyinstrument":
+        if _Pyinstrument is None:
+            logger.warning("PROFILING_BACKEND=pyinstrument but pyinstrument is not installed; using the sampler")
+            return "sampler"
+        return "pyinstrument"
+    if settings.profiling_backend == "cprofile":
+        return "cprofile"
+    return "sampler"
+
+
+class ThreadSampler:
+    """
+    Stack sampler covering every thread of the process.
+
+    A background thread reads sys._current_frames() every interval while
+    sampling is on and counts collapsed stacks ("thread;outer;...;inner"),
+    the input format of flamegraph.pl and speedscope. Stacks of other runs
+    executing at the same time are included: profile at low traffic.
+    """
+
+    def __init__(self, interval_s: float):
+        """
+        Args:
+            interval_s: Seconds between samples
+        """
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._sampling = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._sampling.is_set()
+
+    def start(self) -> None:
+        """Start or resume sampling."""
+        if self._closed.is_set():
+            return
+        self._sampling.set()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="culi-profile-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Pause sampling."""
+        self._sampling.clear()
+
+    def close(self) -> None:
+        """Stop the sampling thread (the collected stacks stay available)."""
+        self._closed.set()
+        self._sampling.set()  # Wake a paused loop so it can exit
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self) -> None:
+        own = threading.get_ident()
+        while True:
+            self._sampling.wait()
+            if self._closed.is_set():
+                return
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(self.interval_s)
+
+    def output(self) -> str:
+        """Collapsed stacks, one "stack count" line each."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfilingSwitch:
+    """
+    Workspaces armed by an operator for their next requests.
+
+    Arms live in the profiling_arms table, shared by all worker processes.
+    Each process caches the set of armed workspace ids for
+    settings.profiling_arm_refresh_s, so requests of other workspaces do not
+    query the database; the methods here are blocking.
+    """
+
+    def __init__(self):
+        self._armed_ids: Set[int] = set()
+        self._refreshed_at = float("-inf")
+        self._lock = threading.Lock()
+        self.recent: deque = deque(maxlen=RECENT_PROFILES)
+
+    @staticmethod
+    def _entry(arm: Any) -> Dict[str, Any]:
+        return {
+            "workspace_id": arm.workspace_id,
+            "remaining": arm.remaining,
+            "expires_at": arm.expires_at.isoformat(),
+        }
+
+    def arm(self, workspace_id: int, requests: int = 1, ttl_s: float = 3600.0) -> Dict[str, Any]:
+        """
+        Profile the workspace's next requests.
+
+        Args:
+            workspace_id: Workspace to profile
+            requests: Number of chat requests to profile
+            ttl_s: Seconds after which the switch expires unused
+
+        Returns:
+            The armed entry
+        """
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl_s)
+        with SessionLocal() as db:
+            entry = self._entry(ProfilingArmRepository.arm(db, workspace_id, requests, expires_at))
+        with self._lock:
+            self._armed_ids.add(workspace_id)
+        return entry
+
+    def disarm(self, workspace_id: int) -> bool:
+        """Cancel a workspace's switch; False if it was not armed."""
+        with SessionLocal() as db:
+            removed = ProfilingArmRepository.disarm(db, workspace_id)
+        with self._lock:
+            self._armed_ids.discard(workspace_id)
+        return removed
+
+    def needs_check(self, workspace_id: int) -> bool:
+        """Whether take() may return True or has to re-read the arms (no I/O)."""
+        stale = time.monotonic() - self._refreshed_at > settings.profiling_arm_refresh_s
+        return stale or workspace_id in self._armed_ids
+
+    def _refresh(self) -> None:
+        with SessionLocal() as db:
+            armed_ids = {arm.workspace_id for arm in ProfilingArmRepository.get_active(db)}
+        with self._lock:
+            self._armed_ids = armed_ids
+            self._refreshed_at = time.monotonic()
+
+    def take(self, workspace_id: int) -> bool:
+        """Consume one profiled request for the workspace, if armed (never raises)."""
+        try:
+            if time.monotonic() - self._refreshed_at > settings.profiling_arm_refresh_s:
+                self._refresh()
+            if workspace_id not in self._armed_ids:
+                return False
+            with SessionLocal() as db:
+                taken = ProfilingArmRepository.take(db, workspace_id)
+            if not taken:
+                with self._lock:
+                    self._armed_ids.discard(workspace_id)
+            return taken
+        except Exception as e:  # Profiling must never fail a chat request
+            logger.warning(f"Could not check profiling arm of workspace {workspace_id}: {e}")
+            return False
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Armed workspaces (expired and spent arms are left out)."""
+        with SessionLocal() as db:
+            return [self._entry(arm) for arm in ProfilingArmRepository.get_active(db)]
+
+
+profiling_switch = ProfilingSwitch()
+
+
+class RequestProfiler:
+    """
+    Profiler for one chat run.
+
+    Profiling is resumed around each call or iteration step and paused in
+    between, so a streamed run advanced from several threads is still one
+    profile.
+    """
+
+    def __init__(self, workspace_id: int, conversation_id: Optional[int], reason: str):
+        """
+        Args:
+            workspace_id: Workspace of the run
+            conversation_id: Conversation of the run
+            reason: What switched profiling on ("header" or "admin")
+        """
+        self.workspace_id = workspace_id
+        self.conversation_id = conversation_id
+        self.reason = reason
+        self.backend = profiler_backend()
+        self.started_at = datetime.utcnow()
+        if self.backend == "sampler":
+            self._profiler = ThreadSampler(settings.profiling_sampler_interval_s)
+        elif self.backend == "pyinstrument":
+            self._profiler = _Pyinstrument(interval=settings.profiling_interval_s, async_mode="disabled")
+        else:
+            self._profiler = cProfile.Profile()
+        self._failed = False
+        self._saved: Optional[str] = None
+
+    def _resume(self) -> None:
+        if self._failed:
+            return
+        try:
+            if self.backend in ("sampler", "pyinstrument"):
+                self._profiler.start()
+            else:
+                self._profiler.enable()
+        except (RuntimeError, ValueError) as e:  # Another profiler active on this thread
+            self._failed = True
+            logger.warning(f"Profiling disabled for workspace {self.workspace_id} run: {e}")
+
+    def _pause(self) -> None:
+        if self._failed:
+            return
+        if self.backend in ("sampler", "pyinstrument"):
+            if self._profiler.is_running:
+                self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call fn under the profiler."""
+        self._resume()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._pause()
+
+    def iterate(self, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Iterate, profiling each step (and not the consumer's work between steps)."""
+        iterator = iter(iterable)
+        while True:
+            self._resume()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._pause()
+            yield item
+
+    def save(self, directory: Optional[str] = None) -> Optional[str]:
+        """
+        Write the profile artifact (only the first call writes).
+
+        Args:
+            directory: Target directory (default: settings.profiling_dir)
+
+        Returns:
+            Path of the artifact, or None if nothing could be written
+        """
+        if self._saved is not None or self._failed:
+            return self._saved
+        if self.backend == "sampler":
+            self._profiler.close()
+        directory_path = Path(directory or settings.profiling_dir)
+        name = f"{self.started_at:%Y%m%dT%H%M%S}-ws{self.workspace_id}-{uuid.uuid4().hex[:8]}"
+        try:
+            directory_path.mkdir(parents=True, exist_ok=True)
+            if self.backend == "sampler":
+                if not self._profiler.samples:
+                    return None
+                path = directory_path / f"{name}.folded"
+                path.write_text(self._profiler.output(), encoding="utf-8")
+            elif self.backend == "pyinstrument":
+                if self._profiler.last_session is None:
+                    return None
+                path = directory_path / f"{name}.html"
+                path.write_text(self._profiler.output_html(), encoding="utf-8")
+            else:
+                path = directory_path / f"{name}.prof"
+                self._profiler.dump_stats(str(path))
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Could not save profile for workspace {self.workspace_id}: {e}")
+            return None
+        self._saved = str(path)
+        profiling_switch.recent.append({
+            "workspace_id": self.workspace_id,
+            "conversation_id": self.conversation_id,
+            "reason": self.reason,
+            "backend": self.backend,
+            "path": self._saved,
+            "created_at": self.started_at.isoformat(),
+        })
+        logger.info(f"Saved {self.backend} profile of workspace {self.workspace_id} run to {path}")
+        return self._saved
+
+
+class _NoProfile:
+    """Stand-in for runs that are not profiled: runs everything directly."""
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return fn(*args, **kwargs)
+
+    def iterate(self, iterable: Iterable[Any]) -> Iterable[Any]:
+        return iterable
+
+    def save(self, directory: Optional[str] = None) -> None:
+        return None
+
+
+NO_PROFILE = _NoProfile()
+
+
+async def start_profiling(
+    workspace_id: int,
+    conversation_id: Optional[int],
+    username: str,
+    requested: bool = False,
+) -> Any:
+    """
+    Profiler for a chat run, if an operator asked for one.
+
+    Args:
+        workspace_id: Workspace of the run
+        conversation_id: Conversation of the run
+        username: Requesting user (the profiling header counts only for admins)
+        requested: Whether the request carried the profiling header
+
+    Returns:
+        RequestProfiler, or NO_PROFILE (same run/iterate/save interface, does nothing)
+    """
+    if not settings.profiling_enabled:
+        return NO_PROFILE
+    if requested and username in settings.admin_usernames:
+        return RequestProfiler(workspace_id, conversation_id, "header")
+    # The arm check queries the database only for armed workspaces or when the cache is stale
+    if profiling_switch.needs_check(workspace_id) and await asyncio.to_thread(profiling_switch.take, workspace_id):
+        return RequestProfiler(workspace_id, conversation_id, "admin")
+    return NO_PROFILE
+
+
+__all__ = [
+    "NO_PROFILE",
+    "ProfilingSwitch",
+    "RequestProfiler",
+    "ThreadSampler",
+    "profiler_backend",
+    "profiling_switch",
+    "start_profiling",
+]
@@ -0,0 +1,135 @@
+"""In-process rolling statistics (latency percentiles, success and win rates)."""
+from typing import Dict, Any, Optional
+from collections import deque
+import math
+import threading
+
+
+def percentile(values, p: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of a sequence.
+
+    Args:
+        values: Numeric values
+        p: Percentile in [0, 100]
+
+    Returns:
+        Percentile value, or None if values is empty
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class RollingStats:
+    """
+    Rolling window of latencies and outcomes for one component.
+
+    Keeps the last `window` samples; counters (calls, errors, wins) are
+    lifetime totals for the process.
+    """
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize stats.
+
+        Args:
+            window: Number of recent latency samples kept for percentiles
+        """
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.wins = 0
+        self.contests = 0
+
+    def record(self, latency: float, success: bool = True) -> None:
+        """Record a completed call (latency in seconds)."""
+        with self._lock:
+            self.calls += 1
+            if success:
+                self._latencies.append(latency)
+            else:
+                self.errors += 1
+
+    def record_contest(self, won: bool) -> None:
+        """Record taking part in a race/hedge and whether this component won it."""
+        with self._lock:
+            self.contests += 1
+            if won:
+                self.wins += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency percentile over the window (None until a sample exists)."""
+        with self._lock:
+            samples = list(self._latencies)
+        return percentile(samples, p)
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> Optional[float]:
+        return self.percentile(99)
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.contests if self.contests else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable summary."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "p50_s": self.p50,
+            "p95_s": self.p95,
+            "p99_s": self.p99,
+            "contests": self.contests,
+            "wins": self.wins,
+            "win_rate": round(self.win_rate, 4),
+        }
+
+
+class StatsRegistry:
+    """Named RollingStats, created on first use."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._stats: Dict[str, RollingStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> RollingStats:
+        """Get (or create) the stats for a name."""
+        with self._lock:
+            if name not in self._stats:
+                self._stats[name] = RollingStats(self.window)
+            return self._stats[name]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Summaries for all names."""
+        with self._lock:
+            items = list(self._stats.items())
+        return {name: stats.snapshot() for name, stats in items}
+
+
+# Per-provider stats for the research stage (keys: "google", "llm")
+research_stats = StatsRegistry()
+
+# Per-model stats for LLM calls (keys: OpenRouter model ids)
+llm_stats = StatsRegistry()
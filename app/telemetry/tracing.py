@@ -1,11 +1,374 @@
-"""Tracing setup (placeholder for future OpenTelemetry integration)."""
+"""OpenTelemetry tracing: spans for chat runs, graph nodes, LLM calls, upstream HTTP and SQL.
+
+The OpenTelemetry SDK is optional (pip install -e ".[observability]").
+Without it, or with TRACING_ENABLED=False, span() and friends are no-ops.
+
+Context propagation: spans are kept in contextvars, which run_sync() and the
+graph's thread hand-offs copy, so LLM/HTTP spans made on the background loop
+nest under the node that triggered them.
+"""
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+from contextlib import contextmanager
+from pathlib import Path
+import functools
+import inspect
+from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    from opentelemetry import trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # Optional dependency
+    trace = None
+
+TRACER_NAME = "culi"
+
+_tracer = None
+_provider = None
+
+
+class _NoopSpan:
+    """Stand-in span when tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def set_status(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def tracing_enabled() -> bool:
+    """True if spans are recorded."""
+    return _tracer is not None
+
+
+def _build_exporter() -> Any:
+    """Span exporter selected by settings.tracing_exporter (console, file or otlp)."""
+    exporter = settings.tracing_exporter.lower()
+    if exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("opentelemetry-exporter-otlp-proto-http not installed, tracing disabled")
+            return None
+        return OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint or None)
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if exporter == "console":
+        return ConsoleSpanExporter()
+    if exporter == "file":
+        path = Path(settings.tracing_file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One JSON object per line, readable offline or importable into a trace viewer
+        return ConsoleSpanExporter(
+            out=open(path, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    logger.warning(f"Unknown TRACING_EXPORTER {settings.tracing_exporter!r}, tracing disabled")
+    return None
+
+
+def setup_tracing() -> None:
+    """Configure the tracer provider and exporter (idempotent)."""
+    global _tracer, _provider
+    if _tracer is not None or not settings.tracing_enabled:
+        return
+    if trace is None:
+        logger.info("opentelemetry not installed, tracing disabled")
+        return
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        logger.info("opentelemetry-sdk not installed, tracing disabled")
+        return
+
+    exporter = _build_exporter()
+    if exporter is None:
+        return
+    provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": settings.tracing_service_name,
+            "service.version": settings.app_version,
+        }),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    _tracer = trace.get_tracer(TRACER_NAME, settings.app_version)
+
+    from app.db.session import async_engine, engine
+    instrument_sqlalchemy(engine)
+    instrument_sqlalchemy(async_engine.sync_engine)  # Async engines emit their events on the sync engine
+    logger.info(f"OpenTelemetry tracing enabled ({settings.tracing_exporter} exporter)")
+
+
+def shutdown_tracing() -> None:
+    """Export pending spans (application shutdown)."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def _clean(attributes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drop None values and stringify types OpenTelemetry does not accept."""
+    cleaned = {}
+    for key, value in (attributes or {}).items():
+        if value is None:
+            continue
+        cleaned[key] = value if isinstance(value, (str, bool, int, float)) else str(value)
+    return cleaned
+
+
+def _kind(kind: str) -> Any:
+    return getattr(SpanKind, kind.upper(), SpanKind.INTERNAL)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal") -> Iterator[Any]:
+    """
+    Run a block in a span made current for the block's duration.
+
+    Exceptions leaving the block are recorded on the span and mark it as failed.
+
+    Args:
+        name: Span name
+        attributes: Span attributes (None values are skipped)
+        kind: Span kind ("internal", "client", ...)
+
+    Yields:
+        The span (a no-op span when tracing is disabled)
+    """
+    if _tracer is None:
+        yield NOOP_SPAN
+        return
+    with _tracer.start_as_current_span(name, kind=_kind(kind), attributes=_clean(attributes)) as current:
+        yield current
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal") -> Any:
+    """
+    Start a span without making it current (for generators and callbacks).
+
+    The parent is the current span. End it with finish_span().
+
+    Args:
+        name: Span name
+        attributes: Span attributes
+        kind: Span kind ("internal", "client", ...)
+
+    Returns:
+        The span (a no-op span when tracing is disabled)
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.start_span(name, kind=_kind(kind), attributes=_clean(attributes))
+
+
+def finish_span(current: Any, error: Optional[BaseException] = None) -> None:
+    """End a span from start_span(), marking it failed if error is given."""
+    if error is not None:
+        mark_error(error, current)
+    current.end()
+
+
+def set_attributes(attributes: Dict[str, Any], current: Any = None) -> None:
+    """Set attributes on a span (default: the current span)."""
+    if _tracer is None:
+        return
+    (current or trace.get_current_span()).set_attributes(_clean(attributes))
+
+
+def mark_error(error: BaseException, current: Any = None) -> None:
+    """Record a handled exception on a span (default: the current span) and mark it failed."""
+    if _tracer is None:
+        return
+    current = current or trace.get_current_span()
+    current.record_exception(error)
+    mark_failed(str(error), current)
+
+
+def mark_failed(description: str, current: Any = None) -> None:
+    """Mark a span (default: the current span) failed without an exception (HTTP 5xx, error in state)."""
+    if _tracer is None:
+        return
+    (current or trace.get_current_span()).set_status(Status(StatusCode.ERROR, description[:200]))
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator running a function, coroutine or (async) generator in a span.
+
+    For generators the span covers the whole iteration and is made current
+    only while the generator body runs, so it works when every next() comes
+    from a different thread (as with StreamingResponse).
+
+    Args:
+        name: Span name
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+                if _tracer is None:
+                    yield from func(*args, **kwargs)
+                    return
+                current = start_span(name)
+                iterator = func(*args, **kwargs)
+                try:
+                    while True:
+                        with trace.use_span(current, record_exception=False, set_status_on_exception=False):
+                            try:
+                                item = next(iterator)
+                            except StopIteration:
+                                return
+                        yield item
+                except GeneratorExit:
+                    iterator.close()
+                    raise
+                except BaseException as e:
+                    mark_error(e, current)
+                    raise
+                finally:
+                    current.end()
+            return generator_wrapper
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def async_generator_wrapper(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+                if _tracer is None:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                    return
+                current = start_span(name)
+                iterator = func(*args, **kwargs)
+                try:
+                    while True:
+                        with trace.use_span(current, record_exception=False, set_status_on_exception=False):
+                            try:
+                                item = await iterator.__anext__()
+                            except StopAsyncIteration:
+                                return
+                        yield item
+                except GeneratorExit:
+                    await iterator.aclose()
+                    raise
+                except BaseException as e:
+                    mark_error(e, current)
+                    raise
+                finally:
+                    current.end()
+            return async_generator_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_node(name: str, node: Callable) -> Callable:
+    """
+    Wrap a graph node in a "graph.<name>" span.
+
+    Args:
+        name: Node name in the graph
+        node: Node function (sync or async, takes the state and returns its update)
+
+    Returns:
+        Wrapped node
+    """
+    span_name = f"graph.{name}"
+
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+            with span(span_name, {"culi.node": name, "culi.workspace_id": state.get("workspace_id")}) as current:
+                result = await node(state)
+                _record_node_result(current, result)
+                return result
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        with span(span_name, {"culi.node": name, "culi.workspace_id": state.get("workspace_id")}) as current:
+            result = node(state)
+            _record_node_result(current, result)
+            return result
+    return wrapper
+
+
+def _record_node_result(current: Any, result: Any) -> None:
+    """Intent and error set by a node's update as span attributes (nodes report errors in state)."""
+    if _tracer is None or not isinstance(result, dict):
+        return
+    set_attributes({"culi.intent": result.get("intent")}, current)
+    if result.get("error"):
+        mark_failed(str(result["error"]), current)
+
+
+def instrument_sqlalchemy(engine: Any) -> None:
+    """
+    Add a span per SQL statement to an engine.
+
+    Statements only get spans inside an active trace (a chat request), so
+    background writers and health checks do not produce orphan traces.
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _tracer is None or not trace.get_current_span().get_span_context().is_valid:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        context._culi_span = start_span(f"db.{operation}", {
+            "db.system": engine.dialect.name,
+            "db.operation": operation,
+            "db.statement": statement[:1000],
+        }, kind="client")
 
-def setup_tracing():
-    """Setup OpenTelemetry tracing."""
-    # TODO: Implement OpenTelemetry tracing
-    logger.debug("Tracing setup (placeholder)")
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        current = getattr(context, "_culi_span", None)
+        if current is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                current.set_attribute("db.rowcount", cursor.rowcount)
+            finish_span(current)
+            context._culi_span = None
 
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        current = getattr(exception_context.execution_context, "_culi_span", None)
+        if current is not None:
+            finish_span(current, exception_context.original_exception)
+            exception_context.execution_context._culi_span = None
@@ -0,0 +1,143 @@
+"""Helpers for running async code from synchronous graph nodes, and the graph from async endpoints."""
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterable, Optional, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import functools
+import threading
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Long-lived event loop shared by all sync callers, so connection pools and
+# semaphores created on it survive across requests.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get (or start) the shared background event loop."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="culi-async-loop", daemon=True)
+            _thread.start()
+            logger.debug("Started background event loop")
+    return _loop
+
+
+async def _run_in_context(context: contextvars.Context, coro: Coroutine[Any, Any, T]) -> T:
+    """Await coro with the caller's context variables set (the task runs in its own copy)."""
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """
+    Run a coroutine on the shared background loop and wait for its result.
+
+    Safe to call from sync code whether or not the calling thread has its own
+    running event loop. The caller's context variables (e.g. the workspace
+    label for metrics) are visible to the coroutine.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Maximum seconds to wait (None waits forever)
+
+    Returns:
+        Coroutine result
+
+    Raises:
+        RuntimeError: If called from the background loop thread itself
+    """
+    loop = get_background_loop()
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the background loop thread")
+    future = asyncio.run_coroutine_threadsafe(_run_in_context(contextvars.copy_context(), coro), loop)
+    return future.result(timeout)
+
+
+def shutdown_background_loop() -> None:
+    """Stop the shared background loop (application shutdown)."""
+    global _loop, _thread
+    with _lock:
+        if _loop is not None and not _loop.is_closed():
+            _loop.call_soon_threadsafe(_loop.stop)
+            if _thread is not None:
+                _thread.join(timeout=5.0)
+            _loop.close()
+        _loop = None
+        _thread = None
+
+
+# Threads for graph runs started by async endpoints. Separate from the event
+# loop's default executor and from anyio's threadpool (40 threads, shared with
+# sync endpoints and dependencies), so settings.chat_graph_workers alone bounds
+# concurrent turns per worker process.
+_graph_executor: Optional[ThreadPoolExecutor] = None
+_END = object()  # next() default marking an exhausted iterator
+
+
+def get_graph_executor() -> ThreadPoolExecutor:
+    """Get (or create) the thread pool running graph turns."""
+    global _graph_executor
+    with _lock:
+        if _graph_executor is None:
+            _graph_executor = ThreadPoolExecutor(
+                max_workers=settings.chat_graph_workers, thread_name_prefix="culi-graph"
+            )
+    return _graph_executor
+
+
+async def run_in_graph_executor(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call a blocking function on the graph thread pool and await its result.
+
+    The function sees the caller's context variables (trace span, workspace
+    label); changes it makes to them stay in its thread.
+
+    Args:
+        fn: Function to call
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+
+    Returns:
+        fn's result
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_graph_executor(), functools.partial(context.run, fn, *args, **kwargs))
+
+
+async def iterate_in_graph_executor(iterable: Iterable[T]) -> AsyncIterator[T]:
+    """
+    Iterate a blocking iterator (e.g. graph.stream) with each step on the graph thread pool.
+
+    Args:
+        iterable: Sync iterable
+
+    Yields:
+        Its items
+    """
+    iterator = iter(iterable)
+    while True:
+        item = await run_in_graph_executor(next, iterator, _END)
+        if item is _END:
+            return
+        yield item
+
+
+def shutdown_graph_executor() -> None:
+    """Stop the graph thread pool (application shutdown)."""
+    global _graph_executor
+    with _lock:
+        executor, _graph_executor = _graph_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
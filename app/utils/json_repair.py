@@ -0,0 +1,351 @@
+"""Tolerant, incremental JSON parsing for LLM output.
+
+Repairs the usual ways models break JSON instead of re-requesting the output:
+code fences and prose around the value, trailing or missing commas, comments,
+single-quoted strings, unquoted keys, Python literals (True/False/None), raw
+newlines in strings, and output truncated mid-value (open strings, objects and
+arrays are closed). Text is consumed in chunks, so a streamed response can be
+parsed as it arrives.
+
+Truncation is reported (IncrementalJSONParser.truncated, or TruncatedJSONError
+from parse_json(allow_truncated=False)) for callers that must not act on a
+partial value. A bracket in prose before the JSON ("Here is [the] plan: {...}")
+is skipped: an array whose first item is a bare word is not taken as the root.
+"""
+from typing import Any, List, Optional
+import copy
+import json
+
+_LITERALS = {
+    "true": "true", "false": "false", "null": "null",
+    "True": "true", "False": "false", "None": "null",
+}
+_NUMBER_CHARS = set("0123456789+-.eE")
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+class TruncatedJSONError(ValueError):
+    """The output was cut off before its JSON value was closed."""
+
+
+class _Frame:
+    """Open object or array."""
+    __slots__ = ("kind", "expect", "count")
+
+    def __init__(self, kind: str):
+        self.kind = kind                                # "{" or "["
+        self.expect = "key" if kind == "{" else "value"  # key, colon, value, comma
+        self.count = 0
+
+
+class IncrementalJSONParser:
+    """
+    Streaming JSON repairer.
+
+    Usage:
+        parser = IncrementalJSONParser()
+        for chunk in stream:
+            parser.feed(chunk)
+            partial = parser.value()   # best-effort parse of the text so far
+    """
+
+    def __init__(self):
+        self._out: List[str] = []
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._done = False
+        self._quote: Optional[str] = None   # Open string delimiter
+        self._escape = False
+        self._token = ""                    # Pending bare word or number
+        self._comment: Optional[str] = None  # "line" or "block"
+        self._prev = ""                     # Previous raw char (comment detection)
+
+    @property
+    def done(self) -> bool:
+        """True once the root value has been closed."""
+        return self._done
+
+    @property
+    def truncated(self) -> bool:
+        """True if a value has started but is not closed (text() closes it for you)."""
+        return self._started and not self._done
+
+    @property
+    def depth(self) -> int:
+        """Number of currently open objects/arrays."""
+        return len(self._stack)
+
+    def feed(self, text: str) -> "IncrementalJSONParser":
+        """Consume more text."""
+        for ch in text:
+            if self._done:
+                break
+            self._consume(ch)
+            self._prev = ch
+        return self
+
+    # -- scanning -----------------------------------------------------------
+
+    def _consume(self, ch: str) -> None:
+        if self._comment:
+            if (self._comment == "line" and ch == "\n") or (
+                self._comment == "block" and self._prev == "*" and ch == "/"
+            ):
+                self._comment = None
+            return
+
+        if self._quote:
+            self._consume_string(ch)
+            return
+
+        if not self._started:
+            if ch in "{[":
+                self._started = True
+                self._open(ch)
+            return
+
+        if self._token and (ch.isalnum() or ch == "_" or (ch in _NUMBER_CHARS and self._is_number(self._token))):
+            self._token += ch
+            return
+        self._flush_token()
+        if not self._started:
+            self._consume(ch)  # The root was prose: look for the real start again
+            return
+
+        if ch == "/" and self._prev == "/":
+            self._comment = "line"
+        elif ch == "*" and self._prev == "/":
+            self._comment = "block"
+        elif ch == "#":
+            self._comment = "line"
+        elif ch in "{[":
+            self._begin_value()
+            self._open(ch)
+        elif ch in "}]":
+            self._close(ch)
+        elif ch in "\"'":
+            self._begin_string(ch)
+        elif ch == ":":
+            top = self._stack[-1]
+            if top.kind == "{" and top.expect == "colon":
+                self._out.append(":")
+                top.expect = "value"
+        elif ch == ",":
+            top = self._stack[-1]
+            if top.expect == "comma":
+                top.expect = "key" if top.kind == "{" else "value"
+        elif ch.isalnum() or ch in "_-+.":
+            self._token = ch
+
+    def _consume_string(self, ch: str) -> None:
+        if self._escape:
+            self._escape = False
+            # \' is not a valid JSON escape
+            self._out.append("'" if ch == "'" else "\\" + ch)
+        elif ch == "\\":
+            self._escape = True
+        elif ch == self._quote:
+            self._out.append('"')
+            self._quote = None
+            self._after_string()
+        elif ch == '"':
+            self._out.append('\\"')  # Inside a single-quoted string
+        else:
+            self._out.append(_STRING_ESCAPES.get(ch, ch))
+
+    @staticmethod
+    def _is_number(token: str) -> bool:
+        return token[0] in "0123456789-+."
+
+    # -- structure ----------------------------------------------------------
+
+    def _open(self, ch: str) -> None:
+        self._out.append(ch)
+        self._stack.append(_Frame(ch))
+
+    def _begin_item(self, frame: _Frame) -> None:
+        """Emit the separator before a new array item or object key."""
+        if frame.count:
+            self._out.append(",")
+        frame.count += 1
+
+    def _begin_value(self) -> None:
+        """Prepare the enclosing container for a value (object key, colon or array item)."""
+        top = self._stack[-1]
+        if top.kind == "[":
+            if top.expect in ("value", "comma"):
+                self._begin_item(top)
+            top.expect = "comma"
+            return
+        if top.expect in ("key", "comma"):
+            # A value where a key belongs: invent a key so the output stays valid
+            self._begin_item(top)
+            self._out.append(f'"_{top.count}":')
+        elif top.expect == "colon":
+            self._out.append(":")
+        top.expect = "comma"
+
+    def _begin_string(self, quote: str) -> None:
+        top = self._stack[-1]
+        if top.kind == "{" and top.expect in ("key", "comma"):
+            self._begin_item(top)
+            top.expect = "key_open"
+        else:
+            self._begin_value()
+        self._quote = quote
+        self._out.append('"')
+
+    def _after_string(self) -> None:
+        top = self._stack[-1]
+        if top.kind == "{" and top.expect == "key_open":
+            top.expect = "colon"
+
+    def _restart(self) -> None:
+        """Discard the root value: it was not JSON."""
+        self._out = []
+        self._stack = []
+        self._started = False
+
+    def _flush_token(self) -> None:
+        token, self._token = self._token, ""
+        if not token:
+            return
+        top = self._stack[-1]
+        if (len(self._stack) == 1 and top.kind == "[" and not top.count
+                and token not in _LITERALS and not self._is_number(token)):
+            self._restart()  # "[the] plan: {...}": a bracket in prose, not an array
+            return
+        if top.kind == "{" and top.expect in ("key", "comma"):
+            # Unquoted key
+            self._begin_item(top)
+            self._out.append(json.dumps(token))
+            top.expect = "colon"
+            return
+        self._begin_value()
+        if token in _LITERALS:
+            self._out.append(_LITERALS[token])
+        elif self._is_number(token):
+            self._out.append(self._clean_number(token))
+        else:
+            self._out.append(json.dumps(token))  # Bare word value
+
+    @staticmethod
+    def _clean_number(token: str) -> str:
+        token = token.lstrip("+").rstrip("+-.eE") or "0"
+        if token.startswith("."):
+            token = "0" + token
+        if token.startswith("-."):
+            token = "-0" + token[1:]
+        try:
+            json.loads(token)
+            return token
+        except ValueError:
+            return json.dumps(token)
+
+    def _finish_frame(self, frame: _Frame) -> None:
+        """Fill in a missing value before closing an object."""
+        if frame.kind == "{":
+            if frame.expect == "colon":
+                self._out.append(":null")
+            elif frame.expect == "value":
+                self._out.append("null")
+
+    def _close(self, ch: str) -> None:
+        kind = "{" if ch == "}" else "["
+        if not any(frame.kind == kind for frame in self._stack):
+            return  # Stray closer
+        while self._stack:
+            frame = self._stack.pop()
+            self._finish_frame(frame)
+            self._out.append("}" if frame.kind == "{" else "]")
+            if frame.kind == kind:
+                break
+        if not self._stack:
+            self._done = True
+
+    # -- results ------------------------------------------------------------
+
+    def text(self) -> str:
+        """Repaired JSON for the text consumed so far (open values are closed)."""
+        if not self._started:
+            return ""
+        if self._done:
+            return "".join(self._out)
+        state = copy.copy(self)
+        state._out = list(self._out)
+        state._stack = [copy.copy(frame) for frame in self._stack]
+        if state._quote:
+            state._quote = None
+            state._out.append('"')
+            state._after_string()
+        elif state._token:
+            token = state._token
+            state._token = ""
+            # Complete a truncated literal ("tru" -> "true")
+            for literal in ("true", "false", "null"):
+                if literal.startswith(token) and token:
+                    token = literal
+                    break
+            state._token = token
+            state._flush_token()
+            if not state._started:
+                return ""
+        while state._stack:
+            frame = state._stack.pop()
+            state._finish_frame(frame)
+            state._out.append("}" if frame.kind == "{" else "]")
+        return "".join(state._out)
+
+    def value(self) -> Any:
+        """
+        Parse the text consumed so far.
+
+        Returns:
+            Parsed value (partial if the input is incomplete), or None if no
+            object or array has started yet
+        """
+        repaired = self.text()
+        return json.loads(repaired) if repaired else None
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair malformed or truncated JSON.
+
+    Args:
+        text: Model output (may include code fences or surrounding prose)
+
+    Returns:
+        Valid JSON text, or "" if the text contains no object or array
+    """
+    return IncrementalJSONParser().feed(text).text()
+
+
+def parse_json(text: str, allow_truncated: bool = True) -> Any:
+    """
+    Parse JSON from model output, repairing it locally if needed.
+
+    Args:
+        text: Model output
+        allow_truncated: Accept output cut off mid-value (its open values are
+            closed); False for callers that must not act on a partial value
+
+    Returns:
+        Parsed value
+
+    Raises:
+        TruncatedJSONError: If the output is truncated and allow_truncated is False
+        ValueError: If the text contains no JSON object or array
+    """
+    stripped = text.strip()
+    try:
+        return json.loads(stripped)
+    except ValueError:
+        pass
+    parser = IncrementalJSONParser().feed(stripped)
+    repaired = parser.text()
+    if not repaired:
+        raise ValueError(f"No JSON object found in model output: {stripped[:100]!r}")
+    if parser.truncated and not allow_truncated:
+        raise TruncatedJSONError(f"Model output was cut off: ...{stripped[-100:]!r}")
+    return json.loads(repaired)
@@ -1,6 +1,8 @@
 """Pagination utilities."""
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Optional, Tuple
+from datetime import datetime
 from pydantic import BaseModel
+import base64
 
 T = TypeVar("T")
 
@@ -31,3 +33,30 @@ class PaginatedResponse(BaseModel, Generic[T]):
             pages=pages
         )
 
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Keyset-paginated response: pass next_cursor back to get the following page."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor for a (created_at, id) keyset position."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Keyset position of a cursor made by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
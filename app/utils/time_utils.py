@@ -1,8 +1,12 @@
 """Time utility functions."""
 from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-# Vietnam timezone
-VIETNAM_TZ = timezone(timedelta(hours=7))
+# Vietnam timezone (no DST, so the fixed offset is an exact fallback without tzdata)
+try:
+    VIETNAM_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
+except ZoneInfoNotFoundError:
+    VIETNAM_TZ = timezone(timedelta(hours=7))
 
 
 def now_vietnam() -> datetime:
@@ -13,4 +17,3 @@ def now_vietnam() -> datetime:
 def format_datetime(dt: datetime, format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
     """Format datetime to string."""
     return dt.strftime(format_str)
-
@@ -0,0 +1,404 @@
+"""Rule-based parser for Vietnamese date expressions ("hôm qua", "tháng trước", "quý 3", "từ 1/9 đến 15/9").
+
+Turns the period a user mentions into an inclusive (start, end) date range in
+Vietnam time, without an LLM call. Text is matched with accents stripped, so
+unaccented input ("thang truoc") works too.
+
+Periods without an explicit year that would lie in the future ("tháng 12"
+asked in October, "quý 4" asked in Q1) resolve to the previous year, since
+reads ask about past sales.
+
+Each date expression in the text is parsed on its own, so a question naming
+several periods ("hôm qua và hôm nay") is reported as such instead of
+resolving to whichever rule matched first. Numbers followed by an amount word
+("trên 1.5 triệu", "20.5k") or next to "giá" ("giá 10.5", "1/2 giá") are not
+read as dates.
+"""
+from typing import Callable, List, Optional, Tuple
+from datetime import date, timedelta
+import re
+import unicodedata
+from app.core.config import settings
+from app.utils.time_utils import now_vietnam
+
+DateRange = Tuple[date, date]
+
+_ROMAN = {"i": 1, "ii": 2, "iii": 3, "iv": 4}
+
+_PREVIOUS = r"(?:truoc|qua|roi|vua roi)"
+_PREVIOUS_YEAR = r"(?:ngoai|truoc|qua|roi)"
+
+# d/m, d-m, d.m with optional year
+_DATE = r"(\d{1,2})[/.-](\d{1,2})(?:[/.-](\d{2,4}))?"
+# Amount words after a number ("1.5 triệu", "20.5k", "100.000đ"), folded
+_AMOUNT = r"\s*(?:trieu|tr|nghin|ngan|k|ty|dong|d|vnd)\b"
+_RANGE = rf"\btu\s+(?:ngay\s+)?{_DATE}\s*(?:den|toi|-)\s*(?:ngay\s+)?{_DATE}"
+_FROM = rf"\b(?:tu|ke tu|sau)\s+ngay\s+{_DATE}"
+_DAY = rf"(?:\bngay\s+)?(?<![\d/.-])(?<!\bgia ){_DATE}(?![\d/.-])(?!{_AMOUNT})(?!\s*gia\b)"
+_LAST_DAYS = r"\b(\d{1,3})\s+ngay\s+(?:qua|vua qua|gan day|gan nhat)\b"
+# "2 tháng trước" (the month two months ago), "3 tuần qua" (the last three weeks), "tuần trước nữa"
+_AGO = r"\b(\d{1,2})\s+(ngay|tuan|thang|quy|nam)\s+truoc\b"
+_LAST_N = r"\b(\d{1,2})\s+(tuan|thang)\s+(?:qua|vua qua|gan day|gan nhat)\b"
+_BEFORE_LAST = r"\b(tuan|thang|quy|nam)\s+truoc\s+nua\b"
+_MONTH_SPAN = (
+    r"\b(?:tu\s+)?thang\s+(\d{1,2})(?:\s*/\s*(\d{4}))?"
+    r"\s*(?:den|toi|-)\s*(?:het\s+)?(?:thang\s+)?(\d{1,2})(?:\s*/\s*(\d{4}))?\b"
+)
+_MONTH = r"\bthang\s+(\d{1,2})(?:\s*/\s*(\d{4}))?\b"
+_QUARTER = r"\bquy\s+(\d|iv|i{1,3})(?:\s*/\s*(\d{4}))?\b"
+_YEAR = rf"\bnam\s+(?:nay|{_PREVIOUS_YEAR}|\d{{4}})\b"
+
+_RANGE_RE = re.compile(_RANGE)
+_FROM_RE = re.compile(_FROM)
+_DAY_RE = re.compile(_DAY)
+_LAST_DAYS_RE = re.compile(_LAST_DAYS)
+_AGO_RE = re.compile(_AGO)
+_LAST_N_RE = re.compile(_LAST_N)
+_BEFORE_LAST_RE = re.compile(_BEFORE_LAST)
+_MONTH_SPAN_RE = re.compile(_MONTH_SPAN)
+_MONTH_RE = re.compile(_MONTH)
+_QUARTER_RE = re.compile(_QUARTER)
+_YEAR_RE = re.compile(r"\bnam\s+(\d{4})\b")
+_YEAR_ONLY_RE = re.compile(_YEAR)
+
+# One date expression, longest forms first; a trailing year ("tháng 9 năm
+# ngoái") belongs to the expression it follows
+_YEAR_SUFFIX = rf"(?:\s+(?:cua\s+)?{_YEAR})?"
+_EXPRESSION_RE = re.compile("|".join([
+    rf"{_MONTH_SPAN}{_YEAR_SUFFIX}",
+    rf"{_RANGE}",
+    rf"{_FROM}",
+    _AGO,
+    _LAST_N,
+    _BEFORE_LAST,
+    r"\bhom\s+(?:nay|qua|kia)\b",
+    _LAST_DAYS,
+    rf"\btuan\s+(?:nay|{_PREVIOUS})\b",
+    rf"\bthang\s+(?:nay|{_PREVIOUS})\b",
+    rf"{_MONTH}{_YEAR_SUFFIX}",
+    rf"\bquy\s+(?:nay|{_PREVIOUS})\b",
+    rf"{_QUARTER}{_YEAR_SUFFIX}",
+    rf"{_DAY}{_YEAR_SUFFIX}",
+    _YEAR,
+]))
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip Vietnamese accents."""
+    text = unicodedata.normalize("NFD", text.lower().replace("đ", "d"))
+    return "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+
+
+def _has(pattern: str, text: str) -> bool:
+    return re.search(rf"\b{pattern}\b", text) is not None
+
+
+def _add_months(day: date, months: int) -> date:
+    """First of the month `months` after day's month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_range(first: date) -> DateRange:
+    return first, _add_months(first, 1) - timedelta(days=1)
+
+
+def _past_year(month_first: date, today: date, explicit_year: bool) -> date:
+    """Move a period start without an explicit year back a year if it is in the future."""
+    if not explicit_year and month_first > today:
+        return month_first.replace(year=month_first.year - 1)
+    return month_first
+
+
+def _year_hint(text: str, today: date) -> Optional[int]:
+    """Year named in the text ("năm nay", "năm ngoái", "năm 2025"), if any."""
+    if _has("nam nay", text):
+        return today.year
+    if _has(f"nam {_PREVIOUS_YEAR}", text):
+        return today.year - 1
+    match = _YEAR_RE.search(text)
+    return int(match.group(1)) if match else None
+
+
+def _parse_day(day: str, month: str, year: Optional[str], today: date) -> date:
+    """Build a date from d/m[/y] parts (raises ValueError if invalid)."""
+    if year:
+        value = int(year)
+        return date(value + 2000 if value < 100 else value, int(month), int(day))
+    parsed = date(today.year, int(month), int(day))
+    return parsed.replace(year=today.year - 1) if parsed > today else parsed
+
+
+def fiscal_quarter_range(
+    quarter: int,
+    fiscal_year: int,
+    fiscal_start_month: int = 1,
+) -> DateRange:
+    """
+    Date range of a fiscal quarter.
+
+    Args:
+        quarter: Quarter number (1-4)
+        fiscal_year: Calendar year in which the fiscal year starts
+        fiscal_start_month: First month of the fiscal year (1 = calendar quarters)
+
+    Returns:
+        Inclusive (start, end) dates
+    """
+    start = _add_months(date(fiscal_year, fiscal_start_month, 1), 3 * (quarter - 1))
+    return start, _add_months(start, 3) - timedelta(days=1)
+
+
+def current_fiscal_quarter(today: date, fiscal_start_month: int = 1) -> Tuple[int, int]:
+    """
+    Fiscal quarter containing a date.
+
+    Args:
+        today: Reference date
+        fiscal_start_month: First month of the fiscal year
+
+    Returns:
+        (quarter, fiscal_year)
+    """
+    fiscal_year = today.year if today.month >= fiscal_start_month else today.year - 1
+    months_in = (today.year - fiscal_year) * 12 + today.month - fiscal_start_month
+    return months_in // 3 + 1, fiscal_year
+
+
+def _shift_period(unit: str, count: int, today: date, fiscal_start_month: int) -> DateRange:
+    """The day, week, month, fiscal quarter or year `count` periods before the current one."""
+    if unit == "ngay":
+        day = today - timedelta(days=count)
+        return day, day
+    if unit == "tuan":
+        monday = today - timedelta(days=today.weekday() + 7 * count)
+        return monday, monday + timedelta(days=6)
+    if unit == "thang":
+        return _month_range(_add_months(today.replace(day=1), -count))
+    if unit == "quy":
+        quarter, fiscal_year = current_fiscal_quarter(today, fiscal_start_month)
+        index = fiscal_year * 4 + quarter - 1 - count
+        return fiscal_quarter_range(index % 4 + 1, index // 4, fiscal_start_month)
+    return date(today.year - count, 1, 1), date(today.year - count, 12, 31)
+
+
+def _periods_ago(text: str, today: date, fiscal_start_month: int) -> Optional[DateRange]:
+    """Counted relative periods ("2 tháng trước", "3 tuần qua", "tuần trước nữa")."""
+    match = _AGO_RE.search(text)
+    if match:
+        return _shift_period(match.group(2), int(match.group(1)), today, fiscal_start_month)
+    match = _BEFORE_LAST_RE.search(text)
+    if match:
+        return _shift_period(match.group(1), 2, today, fiscal_start_month)
+    match = _LAST_N_RE.search(text)
+    if match and int(match.group(1)) > 0:
+        count = int(match.group(1))
+        if match.group(2) == "tuan":
+            return today - timedelta(days=7 * count - 1), today
+        first = _add_months(today.replace(day=1), -count)
+        last_day = _month_range(first)[1].day
+        return first.replace(day=min(today.day, last_day)) + timedelta(days=1), today
+    return None
+
+
+def _explicit_range(text: str, today: date) -> Optional[DateRange]:
+    match = _RANGE_RE.search(text)
+    if match:
+        start = _parse_day(*match.groups()[:3], today)
+        end_year = match.group(6) or match.group(3)
+        end = _parse_day(match.group(4), match.group(5), end_year, today)
+        if not end_year and end < start:
+            end = end.replace(year=end.year + 1)  # "từ 20/12 đến 5/1"
+        return start, end
+    match = _FROM_RE.search(text)
+    if match:
+        return _parse_day(*match.groups(), today), today
+    return None
+
+
+def _relative_day(text: str, today: date) -> Optional[DateRange]:
+    if _has("hom nay", text):
+        return today, today
+    if _has("hom qua", text):
+        day = today - timedelta(days=1)
+        return day, day
+    if _has("hom kia", text):
+        day = today - timedelta(days=2)
+        return day, day
+    match = _LAST_DAYS_RE.search(text)
+    if match and int(match.group(1)) > 0:
+        return today - timedelta(days=int(match.group(1)) - 1), today
+    return None
+
+
+def _week(text: str, today: date) -> Optional[DateRange]:
+    monday = today - timedelta(days=today.weekday())
+    if _has(f"tuan {_PREVIOUS}", text):
+        monday -= timedelta(days=7)
+    elif not _has("tuan nay", text):
+        return None
+    return monday, monday + timedelta(days=6)
+
+
+def _month_span(text: str, today: date) -> Optional[DateRange]:
+    """Range of whole months ("từ tháng 1 đến tháng 3", "tháng 11/2025 - tháng 2/2026")."""
+    match = _MONTH_SPAN_RE.search(text)
+    if not match:
+        return None
+    first_month, last_month = int(match.group(1)), int(match.group(3))
+    if not (1 <= first_month <= 12 and 1 <= last_month <= 12):
+        return None
+    start_year = int(match.group(2)) if match.group(2) else None
+    end_year = int(match.group(4)) if match.group(4) else None
+    if start_year is None and end_year is not None:
+        start_year = end_year if first_month <= last_month else end_year - 1
+    if start_year is None:
+        start_year = _year_hint(text, today)
+    start = date(start_year or today.year, first_month, 1)
+    if start_year is None:
+        start = _past_year(start, today, explicit_year=False)
+    if end_year is None:
+        end_year = start.year if first_month <= last_month else start.year + 1
+    return start, _month_range(date(end_year, last_month, 1))[1]
+
+
+def _month(text: str, today: date) -> Optional[DateRange]:
+    this_month = today.replace(day=1)
+    if _has("thang nay", text):
+        return _month_range(this_month)
+    if _has(f"thang {_PREVIOUS}", text):
+        return _month_range(_add_months(this_month, -1))
+    match = _MONTH_RE.search(text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        year = int(match.group(2)) if match.group(2) else _year_hint(text, today)
+        first = _past_year(date(year or today.year, int(match.group(1)), 1), today, year is not None)
+        return _month_range(first)
+    return None
+
+
+def _quarter(text: str, today: date, fiscal_start_month: int) -> Optional[DateRange]:
+    quarter, fiscal_year = current_fiscal_quarter(today, fiscal_start_month)
+    if _has("quy nay", text):
+        return fiscal_quarter_range(quarter, fiscal_year, fiscal_start_month)
+    if _has(f"quy {_PREVIOUS}", text):
+        return _shift_period("quy", 1, today, fiscal_start_month)
+    match = _QUARTER_RE.search(text)
+    if not match:
+        return None
+    number = match.group(1)
+    quarter = int(number) if number.isdigit() else _ROMAN[number]
+    if not 1 <= quarter <= 4:
+        return None
+    year = int(match.group(2)) if match.group(2) else _year_hint(text, today)
+    if year is not None:
+        return fiscal_quarter_range(quarter, year, fiscal_start_month)
+    start, end = fiscal_quarter_range(quarter, fiscal_year, fiscal_start_month)
+    if start > today:
+        return fiscal_quarter_range(quarter, fiscal_year - 1, fiscal_start_month)
+    return start, end
+
+
+def _year(text: str, today: date) -> Optional[DateRange]:
+    year = _year_hint(text, today)
+    return (date(year, 1, 1), date(year, 12, 31)) if year else None
+
+
+def _single_day(text: str, today: date) -> Optional[DateRange]:
+    match = _DAY_RE.search(text)
+    if not match:
+        return None
+    day_part, month_part, year_part = match.groups()
+    hint = _year_hint(text, today)
+    day = _parse_day(day_part, month_part, year_part or (str(hint) if hint else None), today)
+    return day, day
+
+
+def _parse_expression(text: str, today: date, fiscal_start_month: int) -> Optional[DateRange]:
+    """Period of one folded date expression (most specific rule first)."""
+    rules: List[Callable[[str, date], Optional[DateRange]]] = [
+        _explicit_range,
+        lambda t, d: _periods_ago(t, d, fiscal_start_month),
+        _relative_day,
+        _week,
+        _month_span,
+        _month,
+        lambda t, d: _quarter(t, d, fiscal_start_month),
+        _single_day,  # Before _year: "ngày 5/9 năm 2024" is a day
+        _year,
+    ]
+    for rule in rules:
+        try:
+            result = rule(text, today)
+        except ValueError:
+            continue  # Invalid calendar date such as 31/2
+        if result:
+            return result
+    return None
+
+
+def find_date_ranges(
+    text: str,
+    today: Optional[date] = None,
+    fiscal_start_month: Optional[int] = None,
+) -> List[DateRange]:
+    """
+    Periods of every date expression in a Vietnamese question.
+
+    Recognized: explicit ranges ("từ 1/9 đến 15/9", "từ ngày 1/9"), relative
+    days ("hôm nay", "hôm qua", "7 ngày qua"), counted periods ("3 ngày
+    trước", "2 tháng trước", "3 tuần qua", "tuần trước nữa"), weeks ("tuần
+    này", "tuần trước"), month ranges ("từ tháng 1 đến tháng 3"), months ("tháng này",
+    "tháng trước", "tháng 9", "tháng 9/2025"), fiscal quarters ("quý này",
+    "quý trước", "quý 3", "quý III năm 2025"), years ("năm nay", "năm ngoái",
+    "năm 2025") and single dates ("ngày 5/9").
+
+    A lone year ("năm 2025 tháng 9") qualifies the other expressions instead
+    of counting as a period of its own.
+
+    Args:
+        text: User text
+        today: Reference date (default: today in Vietnam time)
+        fiscal_start_month: First month of the fiscal year (default: settings.fiscal_year_start_month)
+
+    Returns:
+        Distinct inclusive (start, end) ranges in order of appearance (empty if none)
+    """
+    today = today or now_vietnam().date()
+    fiscal_start_month = fiscal_start_month or settings.fiscal_year_start_month
+    folded = re.sub(r"\s+", " ", _fold(text))
+    expressions = [match.group(0) for match in _EXPRESSION_RE.finditer(folded)]
+
+    years = list(dict.fromkeys(e for e in expressions if _YEAR_ONLY_RE.fullmatch(e)))
+    others = [e for e in expressions if e not in years]
+    if others and len(years) <= 1:
+        expressions = [f"{e} {years[0]}" if years else e for e in others]
+
+    ranges: List[DateRange] = []
+    for expression in expressions:
+        result = _parse_expression(expression, today, fiscal_start_month)
+        if result and result not in ranges:
+            ranges.append(result)
+    return ranges
+
+
+def parse_date_range(
+    text: str,
+    today: Optional[date] = None,
+    fiscal_start_month: Optional[int] = None,
+) -> Optional[DateRange]:
+    """
+    Find the period a Vietnamese question refers to.
+
+    See find_date_ranges() for the recognized expressions.
+
+    Args:
+        text: User text
+        today: Reference date (default: today in Vietnam time)
+        fiscal_start_month: First month of the fiscal year (default: settings.fiscal_year_start_month)
+
+    Returns:
+        Inclusive (start, end) dates, or None if the text names no period or
+        several ("hôm qua và hôm nay")
+    """
+    ranges = find_date_ranges(text, today, fiscal_start_month)
+    return ranges[0] if len(ranges) == 1 else None
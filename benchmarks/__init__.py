@@ -0,0 +1 @@
+"""End-to-end benchmarks against in-process fake upstreams (python -m benchmarks.run)."""
@@ -0,0 +1,81 @@
+"""In-process fake upstreams: KiotViet API and token endpoint, OpenRouter, Google CSE."""
+from typing import Any, Dict, Optional
+from benchmarks.fakes.google_cse import create_google_cse_app
+from benchmarks.fakes.kiotviet import create_kiotviet_api, create_kiotviet_token_server
+from benchmarks.fakes.openrouter import create_openrouter_app
+from benchmarks.fakes.profiles import PROFILES, BenchmarkProfile, UpstreamProfile, get_profile
+from benchmarks.fakes.server import LocalServer, fake_app
+
+
+class FakeUpstreams:
+    """All fake upstreams of a benchmark run, each on its own local port."""
+
+    def __init__(
+        self,
+        profile: BenchmarkProfile,
+        scripts: Optional[Dict[str, Dict[str, Any]]] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Create the servers (ports are bound immediately, serving starts with start()).
+
+        Args:
+            profile: Profiles for each upstream
+            scripts: Scripted LLM replies by scenario message (see create_openrouter_app)
+            seed: Random seed for delays and injected errors
+        """
+        self.profile = profile
+        self.servers: Dict[str, LocalServer] = {
+            "openrouter": LocalServer(create_openrouter_app(profile.openrouter, scripts, seed), "openrouter"),
+            "kiotviet": LocalServer(create_kiotviet_api(profile.kiotviet, seed), "kiotviet"),
+            "kiotviet_token": LocalServer(create_kiotviet_token_server(profile.kiotviet_token, seed), "kiotviet-token"),
+            "google_cse": LocalServer(create_google_cse_app(profile.google_cse, seed), "google-cse"),
+        }
+
+    def start(self) -> "FakeUpstreams":
+        for server in self.servers.values():
+            server.start()
+        return self
+
+    def stop(self) -> None:
+        for server in self.servers.values():
+            server.stop()
+
+    def env(self) -> Dict[str, str]:
+        """Settings (environment variables) pointing the service at the fakes."""
+        return {
+            "OPENROUTER_BASE_URL": f"{self.servers['openrouter'].url}/api/v1",
+            "OPENROUTER_API_KEY": "bench-key",
+            "KIOTVIET_TOKEN_URL": f"{self.servers['kiotviet_token'].url}/connect/token",
+            "GOOGLE_SEARCH_URL": f"{self.servers['google_cse'].url}/customsearch/v1",
+            "GOOGLE_SEARCH_API_KEY": "bench-key",
+            "GOOGLE_SEARCH_CX": "bench-cx",
+        }
+
+    @property
+    def kiotviet_url(self) -> str:
+        """Base URL for the KiotViet connection (stored in the connected app's config_json)."""
+        return self.servers["kiotviet"].url
+
+    def calls(self) -> Dict[str, Dict[str, int]]:
+        """Requests received so far, per upstream and route."""
+        return {name: dict(server.app.state.calls) for name, server in self.servers.items()}
+
+    def reset_calls(self) -> None:
+        for server in self.servers.values():
+            server.app.state.calls.clear()
+
+
+__all__ = [
+    "FakeUpstreams",
+    "LocalServer",
+    "fake_app",
+    "BenchmarkProfile",
+    "UpstreamProfile",
+    "PROFILES",
+    "get_profile",
+    "create_google_cse_app",
+    "create_kiotviet_api",
+    "create_kiotviet_token_server",
+    "create_openrouter_app",
+]
@@ -0,0 +1,65 @@
+"""Fake Google Custom Search JSON API, plus the result pages it links to."""
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse
+from benchmarks.fakes.profiles import UpstreamProfile
+from benchmarks.fakes.server import fake_app
+
+PARAGRAPH = (
+    "<p>Theo quy định hiện hành, hộ kinh doanh và doanh nghiệp nhỏ nộp thuế giá trị gia tăng "
+    "theo tỷ lệ phần trăm trên doanh thu hoặc theo phương pháp khấu trừ. Người nộp thuế cần "
+    "lập hóa đơn điện tử cho mỗi lần bán hàng và kê khai theo quý hoặc theo tháng.</p>\n"
+)
+
+
+def _page_html(page_id: int, size: int) -> str:
+    head = (
+        f"<html><head><title>Hướng dẫn thuế số {page_id}</title></head><body>"
+        f"<nav>Trang chủ | Văn bản | Hỏi đáp</nav><article><h1>Hướng dẫn thuế số {page_id}</h1>\n"
+    )
+    tail = "</article><footer>Bản quyền thuộc về cổng thông tin</footer></body></html>"
+    body = PARAGRAPH * max(1, (size - len(head) - len(tail)) // len(PARAGRAPH.encode("utf-8")))
+    return head + body + tail
+
+
+def create_google_cse_app(profile: UpstreamProfile, seed: Optional[int] = None) -> FastAPI:
+    """
+    Fake Custom Search API at /customsearch/v1; result links point to /pages/<n> on the same server.
+
+    Args:
+        profile: Latency/error profile (items = results per search, page_bytes = page size)
+        seed: Random seed
+
+    Returns:
+        FastAPI app
+    """
+    app = fake_app("Google CSE", profile, seed)
+
+    @app.get("/customsearch/v1")
+    async def search(request: Request, q: str, key: str = "", cx: str = "", num: int = 10):
+        if not key or not cx:
+            raise HTTPException(403, "API key and cx are required")
+        base = str(request.base_url).rstrip("/")
+        count = min(num, profile.items)
+        return {
+            "kind": "customsearch#search",
+            "searchInformation": {"totalResults": str(count)},
+            "items": [
+                {
+                    "kind": "customsearch#result",
+                    "title": f"Hướng dẫn thuế số {i} - {q[:40]}",
+                    "link": f"{base}/pages/{i}",
+                    "snippet": "Theo quy định hiện hành, hộ kinh doanh nộp thuế GTGT theo tỷ lệ trên doanh thu...",
+                }
+                for i in range(1, count + 1)
+            ],
+        }
+
+    @app.get("/pages/{page_id}", response_class=HTMLResponse)
+    async def page(page_id: int):
+        return _page_html(page_id, profile.page_bytes)
+
+    return app
+
+
+__all__ = ["create_google_cse_app"]
@@ -0,0 +1,240 @@
+"""Fake KiotViet public API and token endpoint.
+
+Records are generated deterministically from their id, so lists, lookups by
+id and lookups by code agree with each other across requests.
+"""
+from typing import Any, Callable, Dict, Optional
+from datetime import date, datetime
+import itertools
+from fastapi import FastAPI, Form, HTTPException, Request
+from fastapi.responses import JSONResponse
+from benchmarks.fakes.profiles import UpstreamProfile
+from benchmarks.fakes.server import fake_app
+
+BRANCHES = ["Chi nhánh trung tâm", "Chi nhánh Quận 7", "Chi nhánh Thủ Đức"]
+CATEGORIES = ["Cà phê", "Trà", "Bánh ngọt", "Nước ép", "Topping"]
+PRODUCT_NAMES = ["Cà phê sữa", "Bạc xỉu", "Trà đào", "Trà sữa trân châu", "Bánh flan", "Nước cam", "Sinh tố bơ"]
+CUSTOMER_NAMES = ["Nguyễn Văn An", "Trần Thị Bình", "Lê Hoàng Cường", "Phạm Minh Dũng", "Võ Thị Em"]
+
+
+def _branch(i: int) -> Dict[str, Any]:
+    return {"id": i % len(BRANCHES) + 1, "branchName": BRANCHES[i % len(BRANCHES)], "address": "TP. Hồ Chí Minh"}
+
+
+def _product(i: int) -> Dict[str, Any]:
+    name = PRODUCT_NAMES[i % len(PRODUCT_NAMES)]
+    category = i % len(CATEGORIES)
+    return {
+        "id": i,
+        "code": f"SP{i:06d}",
+        "name": name,
+        "fullName": f"{name} {i}",
+        "categoryId": category + 1,
+        "categoryName": CATEGORIES[category],
+        "basePrice": 20000 + (i * 5000) % 45000,
+        "unit": "ly",
+        "isActive": True,
+        "inventories": [
+            {"branchId": b + 1, "branchName": BRANCHES[b], "onHand": (i * 7 + b * 3) % 50}
+            for b in range(len(BRANCHES))
+        ],
+    }
+
+
+def _customer(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "code": f"KH{i:06d}",
+        "name": CUSTOMER_NAMES[i % len(CUSTOMER_NAMES)],
+        "contactNumber": f"09{i:08d}",
+        "address": f"{i} Nguyễn Trãi, Quận 1",
+        "debt": (i * 13000) % 200000,
+        "totalRevenue": 500000 + (i * 91000) % 5000000,
+    }
+
+
+def _document(i: int, prefix: str, day: date) -> Dict[str, Any]:
+    branch = _branch(i)
+    customer = _customer(i % 50 + 1)
+    details = [
+        {"productId": p, "productCode": f"SP{p:06d}", "productName": _product(p)["name"], "quantity": 1 + (i + p) % 3,
+         "price": _product(p)["basePrice"]}
+        for p in (i % 20 + 1, i % 20 + 2, i % 20 + 3)
+    ]
+    total = sum(d["quantity"] * d["price"] for d in details)
+    return {
+        "id": i,
+        "code": f"{prefix}{i:06d}",
+        "purchaseDate": datetime.combine(day, datetime.min.time()).replace(hour=8 + i % 12).isoformat(),
+        "createdDate": datetime.combine(day, datetime.min.time()).isoformat(),
+        "branchId": branch["id"],
+        "branchName": branch["branchName"],
+        "customerId": customer["id"],
+        "customerCode": customer["code"],
+        "customerName": customer["name"],
+        "total": total,
+        "totalPayment": total if i % 4 else total // 2,
+        "status": 1,
+        "statusValue": "Hoàn thành",
+        "details": details,
+    }
+
+
+def _invoice(i: int, day: Optional[date] = None) -> Dict[str, Any]:
+    invoice = _document(i, "HD", day or date.today())
+    invoice["invoiceDetails"] = invoice.pop("details")
+    return invoice
+
+
+def _order(i: int, day: Optional[date] = None) -> Dict[str, Any]:
+    order = _document(i, "DH", day or date.today())
+    order["orderDetails"] = order.pop("details")
+    return order
+
+
+def _day_from(params: Dict[str, Any], *keys: str) -> Optional[date]:
+    for key in keys:
+        value = params.get(key)
+        if value:
+            try:
+                return datetime.fromisoformat(str(value)[:19]).date()
+            except ValueError:
+                pass
+    return None
+
+
+def _page(request: Request, profile: UpstreamProfile, build: Callable[[int], Dict[str, Any]]) -> Dict[str, Any]:
+    """One list page: pageSize/currentItem are honoured up to profile.items records in total."""
+    params = request.query_params
+    page_size = int(params.get("pageSize", 20))
+    current = int(params.get("currentItem", 0))
+    ids = range(current + 1, min(profile.items, current + page_size) + 1)
+    return {"total": profile.items, "pageSize": page_size, "data": [build(i) for i in ids]}
+
+
+def create_kiotviet_api(profile: UpstreamProfile, seed: Optional[int] = None) -> FastAPI:
+    """
+    Fake KiotViet public API (https://public.kiotapi.com).
+
+    Args:
+        profile: Latency/error/payload profile (items = records per list)
+        seed: Random seed
+
+    Returns:
+        FastAPI app
+    """
+    app = fake_app("KiotViet API", profile, seed)
+    next_id = itertools.count(100_000)
+
+    @app.middleware("http")
+    async def require_auth(request: Request, call_next):
+        if not request.headers.get("authorization", "").startswith("Bearer ") or not request.headers.get("retailer"):
+            return JSONResponse({"responseStatus": {"message": "Unauthorized"}}, status_code=401)
+        return await call_next(request)
+
+    builders: Dict[str, Callable[[int], Dict[str, Any]]] = {
+        "products": _product,
+        "customers": _customer,
+        "invoices": _invoice,
+        "orders": _order,
+    }
+
+    @app.get("/categories")
+    async def list_categories():
+        return {"total": len(CATEGORIES), "data": [
+            {"categoryId": i + 1, "categoryName": name, "retailerId": 1} for i, name in enumerate(CATEGORIES)
+        ]}
+
+    @app.get("/branches")
+    async def list_branches():
+        return {"total": len(BRANCHES), "data": [_branch(i) for i in range(len(BRANCHES))]}
+
+    @app.get("/invoices")
+    async def list_invoices(request: Request):
+        day = _day_from(request.query_params, "fromPurchaseDate", "toPurchaseDate")
+        return _page(request, profile, lambda i: _invoice(i, day))
+
+    @app.get("/orders")
+    async def list_orders(request: Request):
+        day = _day_from(request.query_params, "fromDate", "toDate")
+        return _page(request, profile, lambda i: _order(i, day))
+
+    @app.get("/{entity}")
+    async def list_entities(entity: str, request: Request):
+        if entity not in builders:
+            raise HTTPException(404)
+        return _page(request, profile, builders[entity])
+
+    @app.get("/{entity}/code/{code}")
+    async def get_by_code(entity: str, code: str):
+        if entity not in builders:
+            raise HTTPException(404)
+        digits = "".join(ch for ch in code if ch.isdigit())
+        return builders[entity](int(digits) if digits else 1)
+
+    @app.get("/{entity}/{record_id}")
+    async def get_by_id(entity: str, record_id: int):
+        if entity not in builders:
+            raise HTTPException(404)
+        return builders[entity](record_id)
+
+    @app.post("/{entity}")
+    async def create(entity: str, request: Request):
+        body = await request.json()
+        record_id = next(next_id)
+        if entity == "categories":
+            return {"data": {"categoryId": record_id, "categoryName": body.get("categoryName", "")}}
+        if entity not in builders:
+            raise HTTPException(404)
+        return {**builders[entity](record_id), **body, "id": record_id}
+
+    @app.put("/{entity}/{record_id}")
+    async def update(entity: str, record_id: int, request: Request):
+        body = await request.json()
+        if entity == "categories":
+            return {"data": {"categoryId": record_id, **body}}
+        if entity not in builders:
+            raise HTTPException(404)
+        return {**builders[entity](record_id), **body}
+
+    @app.delete("/{entity}/{record_id}")
+    async def delete(entity: str, record_id: int):
+        return {"message": "Xóa dữ liệu thành công"}
+
+    return app
+
+
+def create_kiotviet_token_server(profile: UpstreamProfile, seed: Optional[int] = None) -> FastAPI:
+    """
+    Fake KiotViet OAuth2 token endpoint (https://id.kiotviet.vn/connect/token).
+
+    Args:
+        profile: Latency/error profile
+        seed: Random seed
+
+    Returns:
+        FastAPI app
+    """
+    app = fake_app("KiotViet token", profile, seed)
+    issued = itertools.count(1)
+
+    @app.post("/connect/token")
+    async def token(
+        client_id: str = Form(...),
+        client_secret: str = Form(...),
+        grant_type: str = Form(...),
+        scopes: str = Form(""),
+    ):
+        if grant_type != "client_credentials":
+            raise HTTPException(400, "unsupported_grant_type")
+        return {
+            "access_token": f"fake-token-{client_id}-{next(issued)}",
+            "expires_in": 86400,
+            "token_type": "Bearer",
+            "scope": scopes,
+        }
+
+    return app
+
+
+__all__ = ["create_kiotviet_api", "create_kiotviet_token_server"]
@@ -0,0 +1,144 @@
+"""Fake OpenRouter chat completions API (OpenAI-compatible, with SSE streaming).
+
+The reply depends on which node is asking:
+- intent router (response_format "IntentClassification"): the scripted
+  classification of the scenario whose message appears in the prompt
+- plan generation (response_format "Plan"): the scenario's scripted plan
+- anything else: free text of profile.text_tokens words
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import itertools
+import json
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from benchmarks.fakes.profiles import UpstreamProfile
+from benchmarks.fakes.server import fake_app
+
+ANSWER_WORDS = (
+    "Dựa trên dữ liệu hiện có, doanh nghiệp của bạn cần lưu ý kê khai đúng hạn, "
+    "lưu giữ hóa đơn chứng từ đầy đủ và đối chiếu số liệu bán hàng hằng tháng để tránh sai sót."
+).split()
+
+DEFAULT_CLASSIFICATION = {"intent": "general_qa", "reasoning": "benchmark default", "needs_web": False}
+
+
+def _content(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):  # Multi-part content
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def _schema_name(body: Dict[str, Any]) -> str:
+    response_format = body.get("response_format") or {}
+    return (response_format.get("json_schema") or {}).get("name", "")
+
+
+def _answer_text(words: int) -> str:
+    return " ".join(ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(max(1, words)))
+
+
+def _chunks(text: str, json_output: bool) -> List[str]:
+    """Split a reply the way a model streams it (words for text, short slices for JSON)."""
+    if json_output:
+        return [text[i:i + 8] for i in range(0, len(text), 8)]
+    words = text.split(" ")
+    return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+
+def create_openrouter_app(
+    profile: UpstreamProfile,
+    scripts: Optional[Dict[str, Dict[str, Any]]] = None,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    """
+    Fake OpenRouter API, served under /api/v1.
+
+    Args:
+        profile: Latency (time to first token), error and answer size profile
+        scripts: Scenario message -> {"intent": classification dict, "plan": plan dict}
+        seed: Random seed
+
+    Returns:
+        FastAPI app
+    """
+    app = fake_app("OpenRouter", profile, seed)
+    scripts = scripts or {}
+    ids = itertools.count(1)
+
+    def script_for(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        prompt = "\n".join(_content(m) for m in messages if m.get("role") == "user")
+        # Longest phrase first, so a message containing another scenario's message still matches itself
+        for phrase in sorted(scripts, key=len, reverse=True):
+            if phrase in prompt:
+                return scripts[phrase]
+        return {}
+
+    def reply_for(body: Dict[str, Any]) -> tuple:
+        messages = body.get("messages") or []
+        system = " ".join(_content(m) for m in messages if m.get("role") == "system").lower()
+        schema = _schema_name(body)
+        script = script_for(messages)
+        if schema == "IntentClassification" or "intent classifier" in system:
+            return json.dumps(script.get("intent") or DEFAULT_CLASSIFICATION, ensure_ascii=False), True
+        if schema == "Plan" or "planning assistant" in system:
+            plan = script.get("plan") or {"description": "Không có thao tác", "steps": []}
+            return json.dumps(plan, ensure_ascii=False), True
+        return _answer_text(profile.text_tokens), False
+
+    def usage(body: Dict[str, Any], text: str) -> Dict[str, int]:
+        prompt_chars = sum(len(_content(m)) for m in body.get("messages") or [])
+        prompt_tokens = max(1, prompt_chars // 4)
+        completion_tokens = max(1, len(text) // 4)
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    @app.post("/api/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        text, json_output = reply_for(body)
+        completion_id = f"gen-bench-{next(ids)}"
+        created = int(time.time())
+        model = body.get("model", "fake/model")
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": usage(body, text),
+            }
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def event(choices: List[Dict[str, Any]], **extra: Any) -> str:
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": choices, **extra}
+            return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+        async def stream():
+            yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+            for piece in _chunks(text, json_output):
+                if profile.token_interval_ms:
+                    await asyncio.sleep(profile.token_interval_ms / 1000)
+                yield event([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+            yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if include_usage:
+                yield event([], usage=usage(body, text))
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/api/v1/models")
+    async def models():
+        return {"data": [{"id": "fake/model", "name": "Benchmark fake model"}]}
+
+    return app
+
+
+__all__ = ["create_openrouter_app"]
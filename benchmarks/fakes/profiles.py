@@ -0,0 +1,118 @@
+"""Latency, error and payload profiles for the fake upstream servers."""
+from typing import Dict, Optional
+from dataclasses import dataclass, field, replace
+import asyncio
+import math
+import random
+
+
+@dataclass(frozen=True)
+class UpstreamProfile:
+    """
+    Behaviour of one fake upstream.
+
+    Latency is log-normal around latency_ms: sigma 0 gives a fixed delay,
+    sigma 0.5-1.0 a realistic long tail.
+    """
+    latency_ms: float = 50.0  # Median response delay
+    latency_sigma: float = 0.0  # Log-normal shape (tail heaviness)
+    error_rate: float = 0.0  # Share of requests answered with error_status
+    error_status: int = 503
+    items: int = 20  # KiotViet: records per list page; Google CSE: results per search
+    text_tokens: int = 150  # OpenRouter: words per free-text answer
+    token_interval_ms: float = 5.0  # OpenRouter streaming: delay between chunks
+    page_bytes: int = 20_000  # Google CSE result pages: HTML size
+
+    def delay(self, rng: random.Random) -> float:
+        """Sample a response delay in seconds."""
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.latency_ms / 1000 * math.exp(self.latency_sigma * rng.gauss(0.0, 1.0))
+
+    def fails(self, rng: random.Random) -> bool:
+        """Whether this request should be answered with an error."""
+        return self.error_rate > 0 and rng.random() < self.error_rate
+
+
+@dataclass(frozen=True)
+class BenchmarkProfile:
+    """Profiles for every fake upstream in a benchmark run."""
+    name: str
+    openrouter: UpstreamProfile = field(default_factory=UpstreamProfile)
+    kiotviet: UpstreamProfile = field(default_factory=UpstreamProfile)
+    kiotviet_token: UpstreamProfile = field(default_factory=UpstreamProfile)
+    google_cse: UpstreamProfile = field(default_factory=UpstreamProfile)
+
+
+class Behaviour:
+    """Seeded random source applying a profile (one per fake server)."""
+
+    def __init__(self, profile: UpstreamProfile, seed: Optional[int] = None):
+        self.profile = profile
+        self.rng = random.Random(seed)
+
+    async def wait(self) -> None:
+        """Sleep for a sampled response delay."""
+        delay = self.profile.delay(self.rng)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def fails(self) -> bool:
+        return self.profile.fails(self.rng)
+
+
+_REALISTIC = BenchmarkProfile(
+    name="realistic",
+    openrouter=UpstreamProfile(latency_ms=600, latency_sigma=0.4, text_tokens=150, token_interval_ms=10),
+    kiotviet=UpstreamProfile(latency_ms=150, latency_sigma=0.3, items=20),
+    kiotviet_token=UpstreamProfile(latency_ms=200, latency_sigma=0.2),
+    google_cse=UpstreamProfile(latency_ms=300, latency_sigma=0.3, items=5, page_bytes=30_000),
+)
+
+PROFILES: Dict[str, BenchmarkProfile] = {
+    # Near-zero upstream latency: measures the service's own overhead
+    "fast": BenchmarkProfile(
+        name="fast",
+        openrouter=UpstreamProfile(latency_ms=5, text_tokens=50, token_interval_ms=0),
+        kiotviet=UpstreamProfile(latency_ms=5),
+        kiotviet_token=UpstreamProfile(latency_ms=5),
+        google_cse=UpstreamProfile(latency_ms=5, items=3, page_bytes=5_000),
+    ),
+    "realistic": _REALISTIC,
+    # Heavy tails: p99 upstream latency several times the median
+    "slow": replace(
+        _REALISTIC,
+        name="slow",
+        openrouter=replace(_REALISTIC.openrouter, latency_ms=1500, latency_sigma=0.9),
+        kiotviet=replace(_REALISTIC.kiotviet, latency_ms=400, latency_sigma=0.8),
+        google_cse=replace(_REALISTIC.google_cse, latency_ms=800, latency_sigma=0.8),
+    ),
+    # Rate limits and 5xx: exercises hedging, failover and error paths
+    "flaky": replace(
+        _REALISTIC,
+        name="flaky",
+        openrouter=replace(_REALISTIC.openrouter, error_rate=0.05, error_status=429),
+        kiotviet=replace(_REALISTIC.kiotviet, error_rate=0.05, error_status=503),
+        google_cse=replace(_REALISTIC.google_cse, error_rate=0.05, error_status=500),
+    ),
+    # Large payloads: full KiotViet pages, long answers, big result pages
+    "large": replace(
+        _REALISTIC,
+        name="large",
+        openrouter=replace(_REALISTIC.openrouter, text_tokens=800),
+        kiotviet=replace(_REALISTIC.kiotviet, items=100),
+        google_cse=replace(_REALISTIC.google_cse, items=10, page_bytes=500_000),
+    ),
+}
+
+
+def get_profile(name: str) -> BenchmarkProfile:
+    """
+    Get a benchmark profile by name.
+
+    Raises:
+        KeyError: If the profile does not exist
+    """
+    if name not in PROFILES:
+        raise KeyError(f"Unknown profile {name!r} (available: {', '.join(PROFILES)})")
+    return PROFILES[name]
@@ -0,0 +1,104 @@
+"""Fake upstream apps and a runner serving ASGI apps on local ports from background threads."""
+from typing import Any, Optional
+from collections import Counter
+import socket
+import threading
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from benchmarks.fakes.profiles import Behaviour, UpstreamProfile
+
+
+class _ThreadedServer(uvicorn.Server):
+    def install_signal_handlers(self) -> None:  # uvicorn < 0.29 installs them unconditionally
+        pass
+
+
+class LocalServer:
+    """An ASGI app served by uvicorn on 127.0.0.1 from a daemon thread."""
+
+    def __init__(self, app: Any, name: str, port: int = 0):
+        """
+        Bind the listening socket (the port is known before start()).
+
+        Args:
+            app: ASGI application
+            name: Name for logs and the thread
+            port: Port to bind (0 = any free port)
+        """
+        self.app = app
+        self.name = name
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", port))
+        self.port = self._socket.getsockname()[1]
+        self._server: Optional[_ThreadedServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "LocalServer":
+        """Start serving and wait until the server accepts connections."""
+        config = uvicorn.Config(self.app, log_level="warning", access_log=False, timeout_keep_alive=30)
+        self._server = _ThreadedServer(config)
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._socket]}, name=f"bench-{self.name}", daemon=True
+        )
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"{self.name} server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self._socket.close()
+
+
+def _route(path: str) -> str:
+    """Path with record ids and codes collapsed ("/products/code/SP1" -> "/products/code/{id}")."""
+    segments = path.split("/")
+    return "/".join(
+        "{id}" if segment.isdigit() or (i and segments[i - 1] == "code") else segment
+        for i, segment in enumerate(segments)
+    )
+
+
+def fake_app(title: str, profile: UpstreamProfile, seed: Optional[int] = None) -> FastAPI:
+    """
+    FastAPI app whose every request is delayed, and possibly failed, per profile.
+
+    Request counts per method and route are kept in app.state.calls.
+
+    Args:
+        title: Upstream name
+        profile: Latency/error profile
+        seed: Random seed (reproducible delays and errors)
+
+    Returns:
+        FastAPI app to add fake routes to
+    """
+    app = FastAPI(title=title)
+    app.state.behaviour = Behaviour(profile, seed)
+    app.state.calls = Counter()
+
+    @app.middleware("http")
+    async def apply_profile(request: Request, call_next):
+        behaviour: Behaviour = request.app.state.behaviour
+        request.app.state.calls[f"{request.method} {_route(request.url.path)}"] += 1
+        await behaviour.wait()
+        if behaviour.fails():
+            status = behaviour.profile.error_status
+            return JSONResponse({"error": {"code": status, "message": f"Injected {title} error"}}, status_code=status)
+        return await call_next(request)
+
+    return app
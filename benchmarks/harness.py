@@ -0,0 +1,245 @@
+"""Benchmark harness: configure the service against the fakes, bootstrap a workspace, drive load, report.
+
+The service reads its settings at import time, so configure_environment()
+must run before anything under app/ (other than app.telemetry.stats) is
+imported.
+"""
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from pathlib import Path
+import asyncio
+import json
+import os
+import time
+import httpx
+from app.telemetry.stats import percentile
+from benchmarks.scenarios import Scenario
+
+API_PREFIX = "/api/v1"
+
+
+def configure_environment(upstream_env: Dict[str, str], workdir: Path, database_url: Optional[str] = None) -> Dict[str, str]:
+    """
+    Point the service's settings at the fakes and at throwaway local state.
+
+    Args:
+        upstream_env: Upstream URLs and keys (FakeUpstreams.env())
+        workdir: Directory for the database, router stats and empty KB index
+        database_url: Database to use (default: SQLite file in workdir)
+
+    Returns:
+        The environment variables that were set
+    """
+    from cryptography.fernet import Fernet
+
+    (workdir / "kb_index").mkdir(parents=True, exist_ok=True)
+    env = {
+        **upstream_env,
+        "DATABASE_URL": database_url or f"sqlite:///{workdir / 'bench.db'}",
+        "SECRET_KEY": "benchmark-secret-key",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "720",
+        "ENCRYPTION_KEY": Fernet.generate_key().decode(),
+        "WEB_CACHE_ENABLED": "False",  # Every tax_qa run reaches Google CSE and the result pages
+        "KB_INDEX_DIR": str(workdir / "kb_index"),  # Empty: tax_qa falls back to web search
+        "MODEL_ROUTER_STATS_PATH": str(workdir / "model_router_stats.json"),
+        "RESEARCH_MODE": "google",
+        "AUTO_APPROVE_PLANS": "True",
+        "TRACING_ENABLED": "False",
+        "LOG_LEVEL": "WARNING",
+    }
+    os.environ.update(env)
+    return env
+
+
+@dataclass
+class Sample:
+    """One benchmark request."""
+    latency_s: float
+    first_event_s: Optional[float] = None  # Streaming: time to the first SSE event
+    ok: bool = True
+    intent: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ScenarioResult:
+    """Samples of one scenario on one endpoint."""
+    scenario: str
+    endpoint: str
+    expected_intent: str
+    concurrency: int
+    wall_s: float = 0.0
+    samples: List[Sample] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency percentiles (ms), throughput and error counts."""
+        latencies = [s.latency_s * 1000 for s in self.samples if s.ok]
+        first_events = [s.first_event_s * 1000 for s in self.samples if s.ok and s.first_event_s is not None]
+        errors = [s for s in self.samples if not s.ok]
+
+        def ms(values: List[float], p: float) -> Optional[float]:
+            value = percentile(values, p)
+            return round(value, 1) if value is not None else None
+
+        summary = {
+            "scenario": self.scenario,
+            "endpoint": self.endpoint,
+            "requests": len(self.samples),
+            "errors": len(errors),
+            "wrong_intent": sum(1 for s in self.samples if s.ok and s.intent != self.expected_intent),
+            "concurrency": self.concurrency,
+            "p50_ms": ms(latencies, 50),
+            "p95_ms": ms(latencies, 95),
+            "p99_ms": ms(latencies, 99),
+            "mean_ms": round(sum(latencies) / len(latencies), 1) if latencies else None,
+            "throughput_rps": round(len(self.samples) / self.wall_s, 2) if self.wall_s else None,
+        }
+        if first_events:
+            summary["first_event_p50_ms"] = ms(first_events, 50)
+            summary["first_event_p95_ms"] = ms(first_events, 95)
+        if errors:
+            summary["error_examples"] = sorted({e.error or "unknown" for e in errors})[:3]
+        return summary
+
+
+def bootstrap(base_url: str, kiotviet_url: str) -> Dict[str, Any]:
+    """
+    Create the benchmark user, workspace and KiotViet connection through the API.
+
+    Args:
+        base_url: Service URL
+        kiotviet_url: Fake KiotViet API URL
+
+    Returns:
+        {"token": bearer token, "workspace_id": id}
+    """
+    credentials = {"username": "benchmark", "password": "benchmark-password"}
+    with httpx.Client(base_url=base_url + API_PREFIX, timeout=30.0) as client:
+        client.post("/auth/register", json=credentials)  # Already exists on a reused database
+        response = client.post("/auth/login", json=credentials)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = client.post("/workspaces", json={"name": "Benchmark"}, headers=headers)
+        response.raise_for_status()
+        workspace_id = response.json()["id"]
+
+        response = client.post(f"/workspaces/{workspace_id}/connected-apps/connect", headers=headers, json={
+            "app_id": "kiotviet",
+            "name": "KiotViet (benchmark fake)",
+            "app_category": "POS_SIMPLE",
+            "connection_method": "api",
+            "client_id": "bench-client",
+            "client_secret": "bench-secret",
+            "retailer": "benchshop",
+            "config_json": {"base_url": kiotviet_url},
+            "is_default": True,
+        })
+        response.raise_for_status()
+    return {"token": headers["Authorization"].split(" ", 1)[1], "workspace_id": workspace_id}
+
+
+async def _chat(client: httpx.AsyncClient, path: str, message: str) -> Sample:
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json={"message": message})
+    except httpx.HTTPError as e:
+        return Sample(time.perf_counter() - start, ok=False, error=type(e).__name__)
+    latency = time.perf_counter() - start
+    if response.status_code != 200:
+        return Sample(latency, ok=False, error=f"HTTP {response.status_code}")
+    body = response.json()
+    return Sample(latency, ok=bool(body.get("answer")), intent=body.get("intent"),
+                  error=None if body.get("answer") else "empty answer")
+
+
+async def _chat_stream(client: httpx.AsyncClient, path: str, message: str) -> Sample:
+    start = time.perf_counter()
+    first_event = None
+    intent = None
+    error = "stream ended without done event"
+    try:
+        async with client.stream("POST", path, json={"message": message}) as response:
+            if response.status_code != 200:
+                return Sample(time.perf_counter() - start, ok=False, error=f"HTTP {response.status_code}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                event = json.loads(line[6:])
+                data = event.get("data") or {}
+                if event.get("event") == "intent":
+                    intent = data.get("intent")
+                elif event.get("event") == "error":
+                    error = str(data.get("error"))[:120]
+                elif event.get("event") == "done":
+                    intent = data.get("intent") or intent
+                    error = str(data["error"])[:120] if data.get("error") else None
+    except httpx.HTTPError as e:
+        return Sample(time.perf_counter() - start, first_event, ok=False, error=type(e).__name__)
+    return Sample(time.perf_counter() - start, first_event, ok=error is None, intent=intent, error=error)
+
+
+async def run_scenario(
+    base_url: str,
+    session: Dict[str, Any],
+    scenario: Scenario,
+    endpoint: str,
+    requests: int,
+    concurrency: int,
+    warmup: int = 2,
+) -> ScenarioResult:
+    """
+    Send a scenario's messages (round-robin, each in a new conversation) with fixed concurrency.
+
+    Args:
+        base_url: Service URL
+        session: bootstrap() result
+        scenario: Scenario to run
+        endpoint: "chat" or "stream"
+        requests: Measured requests
+        concurrency: Requests in flight
+        warmup: Unmeasured requests sent first (sequentially)
+
+    Returns:
+        ScenarioResult
+    """
+    path = f"{API_PREFIX}/workspaces/{session['workspace_id']}/chat" + ("/stream" if endpoint == "stream" else "")
+    send = _chat_stream if endpoint == "stream" else _chat
+    result = ScenarioResult(scenario.name, endpoint, scenario.intent, concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=300.0, limits=limits,
+        headers={"Authorization": f"Bearer {session['token']}"},
+    ) as client:
+        for i in range(warmup):
+            await send(client, path, scenario.messages[i % len(scenario.messages)].text)
+
+        issued = iter(range(requests))
+
+        async def worker():
+            for i in issued:
+                result.samples.append(await send(client, path, scenario.messages[i % len(scenario.messages)].text))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        result.wall_s = time.perf_counter() - start
+    return result
+
+
+def format_table(summaries: List[Dict[str, Any]]) -> str:
+    """Plain-text results table."""
+    columns = [
+        ("scenario", "scenario"), ("endpoint", "endpoint"), ("requests", "n"), ("errors", "err"),
+        ("wrong_intent", "intent!"), ("p50_ms", "p50 ms"), ("p95_ms", "p95 ms"), ("p99_ms", "p99 ms"),
+        ("first_event_p50_ms", "1st evt p50"), ("throughput_rps", "req/s"),
+    ]
+    rows = [[label for _, label in columns]]
+    rows += [["-" if s.get(key) is None else str(s.get(key)) for key, _ in columns] for s in summaries]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    lines = ["  ".join(cell.rjust(width) if i > 1 else cell.ljust(width) for i, (cell, width) in enumerate(zip(row, widths)))
+             for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
@@ -0,0 +1 @@
+"""Micro-benchmarks of CPU hot paths (mappers, answer prompt, SSE events, connected app config)."""
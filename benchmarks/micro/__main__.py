@@ -0,0 +1,81 @@
+"""Run the micro-benchmarks, optionally saving or comparing against a baseline.
+
+Usage:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --save main
+    python -m benchmarks.micro --compare main --threshold 0.15
+    python -m benchmarks.micro -k answer_prompt
+"""
+from typing import List
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.micro", description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="pattern", default=None, help="Only cases whose group/name contains this")
+    parser.add_argument("--max-time", type=float, default=1.0, help="Seconds of measurement per case")
+    parser.add_argument("--min-rounds", type=int, default=5, help="Minimum rounds per case")
+    parser.add_argument("--save", metavar="NAME", default=None,
+                        help="Save results as a baseline (benchmarks/micro/baselines/NAME.json, or a .json path)")
+    parser.add_argument("--compare", metavar="NAME", default=None, help="Baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Fail when a case's median is slower than the baseline by more than this fraction")
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def configure_environment() -> None:
+    """Throwaway settings; must run before the service is imported."""
+    from cryptography.fernet import Fernet
+
+    workdir = Path(tempfile.mkdtemp(prefix="culi-micro-"))
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{workdir / 'micro.db'}",
+        "ENCRYPTION_KEY": Fernet.generate_key().decode(),
+        "OPENROUTER_API_KEY": "micro",
+        "METRICS_ENABLED": "False",
+        "TRACING_ENABLED": "False",
+        "LOG_LEVEL": "WARNING",
+    })
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    configure_environment()
+    from benchmarks.micro import cases  # noqa: F401  (registers the cases)
+    from benchmarks.micro.runner import CASES, baseline_path, compare, format_table, run_cases, save_baseline, select
+
+    selected = select(CASES, args.pattern)
+    if not selected:
+        print(f"No cases match {args.pattern!r}", file=sys.stderr)
+        return 2
+    results = run_cases(selected, max_time=args.max_time, min_rounds=args.min_rounds)
+
+    regressions: List[str] = []
+    if args.compare:
+        path = baseline_path(args.compare)
+        if not path.exists():
+            print(f"Baseline not found: {path}", file=sys.stderr)
+            return 2
+        regressions = compare(results, json.loads(path.read_text()), args.threshold)
+
+    print()
+    print(format_table(results))
+    if args.save:
+        print(f"\nBaseline saved to {save_baseline(args.save, results)}")
+    if args.output:
+        args.output.write_text(json.dumps({"benchmarks": results}, indent=2))
+        print(f"\nResults written to {args.output}")
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,172 @@
+"""Micro-benchmark cases for pure-Python hot paths on the request path.
+
+Imported only after the environment is configured (see __main__), because
+importing the service reads its settings.
+"""
+from typing import Any, Callable, Dict, List
+import random
+from benchmarks.micro.runner import case
+
+LARGE_READ = 10_000  # Invoices in the large KiotViet payloads
+
+CUSTOMERS = ["Nguyễn Văn An", "Trần Thị Bình", "Lê Hoàng Cường", "Phạm Thu Dung", "Khách lẻ"]
+PRODUCTS = [("SP001", "Cà phê sữa đá", 25000), ("SP002", "Bạc xỉu", 29000), ("SP003", "Trà đào cam sả", 35000),
+            ("SP004", "Bánh mì thịt", 20000), ("SP005", "Cà phê muối", 35000)]
+
+
+def invoice_payload(count: int, seed: int = 7) -> Dict[str, Any]:
+    """KiotViet /invoices response with count invoices of 1-3 lines each."""
+    rng = random.Random(seed)
+    invoices = []
+    for i in range(count):
+        lines = [PRODUCTS[rng.randrange(len(PRODUCTS))] for _ in range(rng.randint(1, 3))]
+        details = [{"productCode": code, "productName": name, "quantity": 1 + rng.randrange(3), "price": price,
+                    "discount": 0, "subTotal": price} for code, name, price in lines]
+        total = sum(d["price"] * d["quantity"] for d in details)
+        invoices.append({
+            "id": 100000 + i,
+            "code": f"HD{100000 + i:06d}",
+            "purchaseDate": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T{8 + i % 12:02d}:15:00.0000000",
+            "branchId": 1,
+            "branchName": "Chi nhánh trung tâm",
+            "customerName": CUSTOMERS[i % len(CUSTOMERS)],
+            "total": total,
+            "totalPayment": total if rng.random() < 0.9 else 0,
+            "status": 1,
+            "statusValue": "Hoàn thành",
+            "invoiceDetails": details,
+        })
+    return {"total": count, "pageSize": count, "data": invoices, "removedIds": [], "timestamp": "2025-06-30T23:59:59"}
+
+
+def _state(**overrides: Any) -> Dict[str, Any]:
+    state = {
+        "workspace_id": "1",
+        "user_input": "Liệt kê các hóa đơn tháng này và cho biết khách nào mua nhiều nhất",
+        "chat_context": "",
+        "kb_context": "",
+        "intent": "app_read",
+        "read_intent": {"kind": "LIST_INVOICES", "params": {}},
+        "app_data": {},
+        "web_results": [],
+        "step_results": [],
+        "plan": None,
+        "prompt_versions": {},
+    }
+    state.update(overrides)
+    return state
+
+
+# --- KiotViet mappers -------------------------------------------------------
+
+@case("map_invoice_list_10k", "mappers")
+def _map_invoice_list() -> Callable[[], Any]:
+    from app.domain.apps.kiotviet.mappers import map_invoice_list
+    raw = invoice_payload(LARGE_READ)
+    return lambda: map_invoice_list(raw)
+
+
+@case("map_summary_revenue_10k", "mappers")
+def _map_summary_revenue() -> Callable[[], Any]:
+    from app.domain.apps.kiotviet.mappers import map_summary_revenue
+    raw = invoice_payload(LARGE_READ)
+    return lambda: map_summary_revenue(raw)
+
+
+@case("revenue_template_10k", "mappers")
+def _revenue_template() -> Callable[[], Any]:
+    from app.domain.apps.kiotviet.mappers import map_summary_revenue
+    from app.graph.answer_templates import render_template_answer
+    state = _state(user_input="Doanh thu tháng này là bao nhiêu?",
+                   read_intent={"kind": "SUMMARY_REVENUE", "params": {}},
+                   app_data=map_summary_revenue(invoice_payload(LARGE_READ)))
+    return lambda: render_template_answer(state)
+
+
+# --- Answer prompt assembly -------------------------------------------------
+
+def _answer_prompt(state: Dict[str, Any]) -> Callable[[], Any]:
+    from app.graph.nodes.answer_node import build_answer_prompt
+    return lambda: build_answer_prompt(state)
+
+
+@case("answer_prompt_invoices_10k", "answer_prompt")
+def _answer_prompt_invoices() -> Callable[[], Any]:
+    from app.domain.apps.kiotviet.mappers import map_invoice_list
+    return _answer_prompt(_state(app_data=map_invoice_list(invoice_payload(LARGE_READ))))
+
+
+@case("answer_prompt_web", "answer_prompt")
+def _answer_prompt_web() -> Callable[[], Any]:
+    paragraph = "Hộ kinh doanh nộp thuế GTGT theo tỷ lệ 1% trên doanh thu đối với hoạt động phân phối hàng hóa. "
+    web_results: List[Dict[str, Any]] = [
+        {"title": f"Hướng dẫn thuế số {i}", "url": f"https://example.vn/thue/{i}", "content": paragraph * 20}
+        for i in range(5)
+    ]
+    return _answer_prompt(_state(
+        intent="tax_qa", read_intent=None, user_input="Hộ kinh doanh bán cà phê nộp thuế GTGT bao nhiêu?",
+        kb_context=paragraph * 30, web_results=web_results,
+    ))
+
+
+@case("answer_prompt_plan", "answer_prompt")
+def _answer_prompt_plan() -> Callable[[], Any]:
+    steps = [{"id": i, "action": "CREATE_PRODUCT", "params": {"name": name, "code": code, "basePrice": price}}
+             for i, (code, name, price) in enumerate(PRODUCTS, 1)]
+    return _answer_prompt(_state(
+        intent="app_plan", read_intent=None, user_input="Thêm 5 sản phẩm đồ uống mới",
+        plan={"description": "Tạo sản phẩm", "steps": steps},
+        step_results=[{"step_id": s["id"], "action": s["action"], "status": "success", "output": {"id": 9000 + s["id"]}}
+                      for s in steps],
+    ))
+
+
+# --- SSE serialisation ------------------------------------------------------
+
+def _sse(event: Dict[str, Any]) -> Callable[[], Any]:
+    from app.api.v1.chat_router import format_sse_event
+    return lambda: format_sse_event(event)
+
+
+@case("sse_node_event", "sse")
+def _sse_node_event() -> Callable[[], Any]:
+    return _sse({"event": "node_start", "data": {"node": "app_read", "timestamp": None}})
+
+
+@case("sse_answer_event", "sse")
+def _sse_answer_event() -> Callable[[], Any]:
+    content = "Doanh thu tháng 6 của cửa hàng là **125.400.000 ₫** (3.120 hóa đơn). " * 40
+    return _sse({"event": "answer", "data": {"content": content, "node": "answer"}})
+
+
+@case("sse_done_event_with_plan", "sse")
+def _sse_done_event() -> Callable[[], Any]:
+    steps = [{"id": i, "action": "CREATE_PRODUCT", "params": {"name": name, "code": code, "basePrice": price}}
+             for i, (code, name, price) in enumerate(PRODUCTS, 1)]
+    return _sse({"event": "done", "data": {
+        "conversation_id": 42, "answer": "Đã tạo 5 sản phẩm mới. " * 10, "intent": "app_plan",
+        "plan": {"description": "Tạo sản phẩm", "steps": steps}, "error": None,
+    }})
+
+
+# --- Connected app config ---------------------------------------------------
+
+@case("connected_app_config", "connected_app")
+def _connected_app_config() -> Callable[[], Any]:
+    from app.domain.apps.base import AppCategory, ConnectedAppConfig, ConnectionMethod
+    credentials = {"client_id": "client-123", "client_secret": "secret-456", "retailer": "shop",
+                   "base_url": "https://public.kiotapi.com"}
+
+    def build() -> Dict[str, Any]:
+        return ConnectedAppConfig(
+            app_id="kiotviet", name="KiotViet", category=AppCategory.POS_SIMPLE,
+            connection_method=ConnectionMethod.API, credentials=dict(credentials), extra={},
+        ).dict()
+    return build
+
+
+@case("decrypt_client_secret", "connected_app")
+def _decrypt() -> Callable[[], Any]:
+    from app.utils.crypto import decrypt, encrypt
+    ciphertext = encrypt("kiotviet-client-secret-0123456789abcdef")
+    return lambda: decrypt(ciphertext)
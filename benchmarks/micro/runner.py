@@ -0,0 +1,211 @@
+"""Micro-benchmark runner: calibrated timing rounds, pytest-benchmark style statistics, saved baselines."""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from app.telemetry.stats import percentile
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+MIN_ROUND_S = 0.002  # Iterations per round are raised until one round takes at least this long
+
+
+@dataclass
+class Case:
+    """A registered micro-benchmark: setup() builds the inputs and returns the callable to time."""
+    name: str
+    group: str
+    setup: Callable[[], Callable[[], Any]]
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, group: str) -> Callable[[Callable[[], Callable[[], Any]]], Callable[[], Callable[[], Any]]]:
+    """Register a setup function as a micro-benchmark."""
+    def register(setup: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+        CASES.append(Case(name, group, setup))
+        return setup
+    return register
+
+
+@dataclass
+class Stats:
+    """Per-call timings (seconds) of one case."""
+    name: str
+    group: str
+    rounds: int
+    iterations: int
+    timings: List[float] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        q1, q3 = percentile(self.timings, 25), percentile(self.timings, 75)
+        mean = statistics.fmean(self.timings)
+        return {
+            "name": self.name,
+            "group": self.group,
+            "rounds": self.rounds,
+            "iterations": self.iterations,
+            "min": min(self.timings),
+            "max": max(self.timings),
+            "mean": mean,
+            "stddev": statistics.stdev(self.timings) if len(self.timings) > 1 else 0.0,
+            "median": statistics.median(self.timings),
+            "iqr": q3 - q1,
+            "ops": 1 / mean if mean else None,
+        }
+
+
+def _time_round(fn: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(fn: Callable[[], Any], max_time: float = 1.0, min_rounds: int = 5) -> Stats:
+    """
+    Time fn in rounds of calibrated iterations, like pytest-benchmark's pedantic mode.
+
+    Args:
+        fn: Callable to time (no arguments)
+        max_time: Seconds to spend measuring (at least min_rounds are run)
+        min_rounds: Minimum rounds
+
+    Returns:
+        Stats with one per-call timing per round
+    """
+    iterations = 1
+    while True:
+        elapsed = _time_round(fn, iterations)  # Calibration rounds double as warmup
+        if elapsed >= MIN_ROUND_S:
+            break
+        iterations *= 10 if elapsed < MIN_ROUND_S / 10 else 2
+    rounds = max(min_rounds, int(max_time / elapsed))
+    stats = Stats("", "", rounds, iterations)
+    for _ in range(rounds):
+        stats.timings.append(_time_round(fn, iterations) / iterations)
+    return stats
+
+
+def run_cases(cases: List[Case], max_time: float, min_rounds: int) -> List[Dict[str, Any]]:
+    results = []
+    for item in cases:
+        stats = measure(item.setup(), max_time=max_time, min_rounds=min_rounds)
+        stats.name, stats.group = item.name, item.group
+        results.append(stats.to_dict())
+        print(f"  {item.group}/{item.name}: median {_scaled(stats.to_dict()['median'])}", file=sys.stderr)
+    return results
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def baseline_path(name: str) -> Path:
+    """A saved baseline by name (benchmarks/micro/baselines/<name>.json) or an explicit path."""
+    path = Path(name)
+    return path if path.suffix == ".json" else BASELINE_DIR / f"{name}.json"
+
+
+def save_baseline(name: str, results: List[Dict[str, Any]]) -> Path:
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "machine_info": machine_info(),
+        "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "benchmarks": results,
+    }, indent=2))
+    return path
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float, stat: str = "median") -> List[str]:
+    """
+    Add the change against the baseline to each result and list regressions.
+
+    Args:
+        results: Current results
+        baseline: Saved baseline file contents
+        threshold: Allowed slowdown as a fraction (0.1 = 10%)
+        stat: Statistic compared
+
+    Returns:
+        One line per case slower than the baseline by more than threshold
+    """
+    if baseline.get("machine_info") != machine_info():
+        print("Warning: baseline was saved on a different machine or Python; comparison is indicative only",
+              file=sys.stderr)
+    previous = {(b["group"], b["name"]): b for b in baseline.get("benchmarks", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["group"], result["name"]))
+        if not before or not before.get(stat):
+            continue
+        change = result[stat] / before[stat] - 1
+        result["change"] = change
+        if change > threshold:
+            regressions.append(
+                f"{result['group']}/{result['name']}: {stat} {_scaled(before[stat])} -> {_scaled(result[stat])} (+{change:.1%})"
+            )
+    return regressions
+
+
+def _unit(seconds: float) -> Tuple[str, float]:
+    for unit, scale in (("s", 1.0), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return unit, scale
+    return "ns", 1e9
+
+
+def _scaled(seconds: float) -> str:
+    unit, scale = _unit(seconds)
+    return f"{seconds * scale:.2f} {unit}"
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    """Results by group, with a common time unit per group (pytest-benchmark layout)."""
+    lines = []
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        groups.setdefault(result["group"], []).append(result)
+    for group, rows in groups.items():
+        unit, scale = _unit(min(r["min"] for r in rows))
+        columns = ["min", "max", "mean", "stddev", "median", "iqr"]
+        header = ["Name (time in " + unit + ")"] + [c.capitalize() if c != "iqr" else "IQR" for c in columns]
+        header += ["OPS", "Rounds", "Iterations"]
+        has_change = any("change" in r for r in rows)
+        if has_change:
+            header.append("vs baseline")
+        table = [header]
+        for r in sorted(rows, key=lambda r: r["mean"]):
+            row = [r["name"]] + [f"{r[c] * scale:.4f}" for c in columns]
+            row += [f"{r['ops']:.2f}" if r["ops"] else "-", str(r["rounds"]), str(r["iterations"])]
+            if has_change:
+                row.append(f"{r['change']:+.1%}" if "change" in r else "-")
+            table.append(row)
+        widths = [max(len(row[i]) for row in table) for i in range(len(header))]
+        title = f" benchmark '{group}': {len(rows)} tests "
+        lines.append(title.center(sum(widths) + 2 * (len(widths) - 1), "-"))
+        lines += ["  ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths)))
+                  for row in table]
+        lines.append("")
+    lines.append("Legend: OPS = calls per second (1 / Mean); IQR = interquartile range of per-round timings.")
+    return "\n".join(lines)
+
+
+def select(cases: List[Case], pattern: Optional[str]) -> List[Case]:
+    """Cases whose group/name contains the pattern (all if None)."""
+    if not pattern:
+        return list(cases)
+    return [c for c in cases if pattern in f"{c.group}/{c.name}"]
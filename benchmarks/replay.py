@@ -0,0 +1,254 @@
+"""Replay recorded chat turns (cassettes) through the real graph, without network access.
+
+Cassettes are recorded by the service with CASSETTE_RECORDING_ENABLED=True
+(see app.telemetry.cassette). Each one is replayed --repeat times: the graph
+runs from the recorded initial state and every upstream request is answered
+from the cassette, either immediately (--timing zero: only the service's own
+CPU work is measured) or with the recorded upstream latencies (--timing
+preserve). Results can be saved and compared against a previous run to catch
+regressions between releases.
+
+Usage:
+    python -m benchmarks.replay data/cassettes
+    python -m benchmarks.replay data/cassettes --timing preserve --repeat 3
+    python -m benchmarks.replay data/cassettes --output new.json --baseline old.json --max-regression 0.2
+    python -m benchmarks.replay data/cassettes --stream --memory
+"""
+from typing import Any, Dict, List
+from pathlib import Path
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from app.telemetry.stats import percentile
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("paths", nargs="+", type=Path, help="Cassette files or directories of them")
+    parser.add_argument("--timing", choices=["zero", "preserve"], default="zero",
+                        help="Respond immediately, or wait the recorded upstream latencies")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured replays per cassette")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured replays per cassette")
+    parser.add_argument("--stream", action="store_true",
+                        help="Run the graph as /chat/stream does and measure the size of the streamed updates")
+    parser.add_argument("--memory", action="store_true",
+                        help="One extra replay per cassette under tracemalloc, reporting peak allocated memory")
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="Results of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Fail when a cassette's p50 exceeds the baseline by more than this fraction")
+    return parser.parse_args(argv)
+
+
+def find_cassettes(paths: List[Path]) -> List[Path]:
+    files = []
+    for path in paths:
+        files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+    return files
+
+
+def configure_environment(cassettes: List[Dict[str, Any]], workdir: Path) -> None:
+    """
+    Settings for replay: the recorded upstream URLs, no caches or adaptive behaviour that would vary between runs.
+
+    Must run before anything under app/ (other than app.telemetry.stats) is imported.
+    """
+    recorded = cassettes[0].get("settings") or {}
+    if any((c.get("settings") or {}) != recorded for c in cassettes[1:]):
+        print("Cassettes were recorded with different settings; using those of the first", file=sys.stderr)
+    env = {name.upper(): str(value) for name, value in recorded.items() if value is not None}
+    env.update({
+        "DATABASE_URL": f"sqlite:///{workdir / 'replay.db'}",
+        "OPENROUTER_API_KEY": os.environ.get("OPENROUTER_API_KEY") or "replay",  # Only checked for presence
+        "GOOGLE_SEARCH_API_KEY": os.environ.get("GOOGLE_SEARCH_API_KEY") or "replay",
+        "GOOGLE_SEARCH_CX": os.environ.get("GOOGLE_SEARCH_CX") or "replay",
+        "WEB_CACHE_ENABLED": "False",  # Every recorded search and page fetch is replayed
+        "MODEL_ROUTER_ENABLED": "False",
+        "MODEL_ROUTER_STATS_PATH": str(workdir / "model_router_stats.json"),
+        "LLM_HEDGE_ENABLED": "False",  # Backup requests would depend on replay speed
+        "CASSETTE_RECORDING_ENABLED": "False",
+        "TRACING_ENABLED": "False",
+        "LOG_LEVEL": "WARNING",
+    })
+    os.environ.update(env)
+
+
+def _seed_token_cache(cassette: Dict[str, Any]) -> None:
+    """Start each replay with the KiotViet token cache as the recorded turn found it."""
+    from app.core.config import settings
+    from app.integrations.kiotviet_oauth import _token_cache
+    from app.telemetry.cassette import REDACTED
+
+    credentials = (((cassette["initial_state"].get("connected_app") or {}).get("config") or {}).get("credentials") or {})
+    if not credentials.get("client_id"):
+        return
+    key = f"{credentials['client_id']}:{credentials.get('client_secret', REDACTED)}"
+    _token_cache.clear(key)
+    token_url = str(settings.kiotviet_token_url)
+    if not any(i["url"] == token_url for i in cassette.get("interactions") or []):
+        # The token was cached when the turn was recorded: no token request to replay
+        _token_cache.set(key, REDACTED, 3600)
+
+
+def _stream(graph: Any, state: Dict[str, Any], sizes: List[int]) -> Dict[str, Any]:
+    """Run the graph with the streaming endpoint's stream modes; sizes gets the JSON size of each update."""
+    from app.services.chat_service import STREAM_MODES
+
+    final_state: Dict[str, Any] = {}
+    for mode, chunk in graph.stream(state, stream_mode=STREAM_MODES):
+        if mode == "updates":
+            sizes.append(len(json.dumps(chunk, ensure_ascii=False, default=str)))
+        else:
+            final_state = chunk
+    return final_state
+
+
+def replay_once(graph: Any, cassette: Dict[str, Any], preserve_timing: bool, stream: bool = False) -> Dict[str, Any]:
+    """Run the graph once against a cassette; wall and CPU time, request matching and outcome."""
+    from app.telemetry.cassette import CassettePlayer
+
+    _seed_token_cache(cassette)
+    player = CassettePlayer(cassette, preserve_timing=preserve_timing)
+    state = copy.deepcopy(cassette["initial_state"])
+    error = None
+    sizes: List[int] = []
+    start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        final_state = player.run(_stream, graph, state, sizes) if stream else player.run(graph.invoke, state)
+    except Exception as e:
+        final_state, error = {}, f"{type(e).__name__}: {e}"
+    recorded = cassette.get("outcome") or {}
+    return {
+        "wall_s": time.perf_counter() - start,
+        "cpu_s": time.process_time() - cpu_start,
+        "updates": len(sizes),
+        "update_bytes": sum(sizes),
+        "misses": player.misses,
+        "unused": player.unused,
+        "error": error or final_state.get("error"),
+        "same_intent": final_state.get("intent") == recorded.get("intent"),
+        "same_answer": final_state.get("answer") == recorded.get("answer"),
+    }
+
+
+def peak_memory(graph: Any, cassette: Dict[str, Any], stream: bool) -> int:
+    """Peak memory (bytes) allocated during one replay, measured with tracemalloc."""
+    tracemalloc.start()
+    try:
+        replay_once(graph, cassette, preserve_timing=False, stream=stream)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(name: str, cassette: Dict[str, Any], runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    walls = [r["wall_s"] * 1000 for r in runs]
+    cpus = [r["cpu_s"] * 1000 for r in runs]
+    recorded = cassette.get("outcome") or {}
+    summary = {
+        "cassette": name,
+        "intent": recorded.get("intent"),
+        "requests": len(cassette.get("interactions") or []),
+        "runs": len(runs),
+        "p50_ms": round(percentile(walls, 50), 1),
+        "p95_ms": round(percentile(walls, 95), 1),
+        "cpu_mean_ms": round(sum(cpus) / len(cpus), 1),
+        "recorded_ms": round(recorded["duration_s"] * 1000, 1) if recorded.get("duration_s") is not None else None,
+        "misses": sum(len(r["misses"]) for r in runs),
+        "unused": sum(r["unused"] for r in runs),
+        "errors": sum(1 for r in runs if r["error"]),
+        "diverged": sum(1 for r in runs if not (r["same_intent"] and r["same_answer"])),
+        "miss_examples": sorted({m for r in runs for m in r["misses"]})[:3],
+    }
+    if runs[0]["updates"]:
+        summary["updates"] = runs[0]["updates"]
+        summary["update_kb"] = round(runs[0]["update_bytes"] / 1024, 1)
+    return summary
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Cassettes whose p50 regressed beyond max_regression against the baseline."""
+    previous = {r["cassette"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result["cassette"])
+        if not before or not before.get("p50_ms"):
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1
+        result["p50_change"] = round(change, 3)
+        if change > max_regression:
+            regressions.append(f"{result['cassette']}: p50 {before['p50_ms']} -> {result['p50_ms']} ms (+{change:.0%})")
+    return regressions
+
+
+def format_table(summaries: List[Dict[str, Any]]) -> str:
+    """Plain-text results table."""
+    columns = [
+        ("cassette", "cassette"), ("intent", "intent"), ("requests", "reqs"), ("p50_ms", "p50 ms"),
+        ("p95_ms", "p95 ms"), ("cpu_mean_ms", "cpu ms"), ("recorded_ms", "recorded ms"), ("p50_change", "vs base"),
+        ("update_kb", "updates kb"), ("peak_kb", "peak kb"), ("misses", "miss"), ("errors", "err"), ("diverged", "diverged"),
+    ]
+    rows = [[label for _, label in columns]]
+    rows += [["-" if s.get(key) is None else str(s.get(key)) for key, _ in columns] for s in summaries]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    lines = ["  ".join(cell.rjust(width) if i > 1 else cell.ljust(width) for i, (cell, width) in enumerate(zip(row, widths)))
+             for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    files = find_cassettes(args.paths)
+    if not files:
+        print("No cassettes found", file=sys.stderr)
+        return 2
+    raw = [json.loads(path.read_text()) for path in files]
+    configure_environment(raw, Path(tempfile.mkdtemp(prefix="culi-replay-")))
+
+    # Settings are read on import: only now may the service be loaded
+    from app.graph.app_graph import get_graph
+    from app.telemetry.cassette import load_cassette
+
+    cassettes = [load_cassette(path) for path in files]
+    graph = get_graph()
+    preserve = args.timing == "preserve"
+    summaries = []
+    for path, cassette in zip(files, cassettes):
+        for _ in range(args.warmup):
+            replay_once(graph, cassette, preserve, args.stream)
+        runs = [replay_once(graph, cassette, preserve, args.stream) for _ in range(args.repeat)]
+        summary = summarize(path.stem, cassette, runs)
+        if args.memory:
+            summary["peak_kb"] = round(peak_memory(graph, cassette, args.stream) / 1024, 1)
+        summaries.append(summary)
+        print(f"  {path.stem}: p50 {summary['p50_ms']} ms, cpu {summary['cpu_mean_ms']} ms, "
+              f"{summary['misses']} misses, {summary['diverged']} diverged", file=sys.stderr)
+
+    regressions: List[str] = []
+    if args.baseline:
+        regressions = compare(summaries, json.loads(args.baseline.read_text()), args.max_regression)
+
+    print(f"\nTiming: {args.timing}, {args.repeat} replays per cassette\n")
+    print(format_table(summaries))
+    if args.output:
+        args.output.write_text(json.dumps({
+            "timing": args.timing,
+            "repeat": args.repeat,
+            "stream": args.stream,
+            "results": summaries,
+        }, indent=2, ensure_ascii=False))
+        print(f"\nResults written to {args.output}")
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,95 @@
+"""End-to-end benchmark of /chat and /chat/stream against in-process fake upstreams.
+
+Runs fully offline: KiotViet (API and token endpoint), OpenRouter and Google
+CSE are served by local fakes, and the service uses a throwaway SQLite
+database unless --database-url is given.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --profile slow --scenarios app_read,app_plan --requests 50 --concurrency 8
+    python -m benchmarks.run --endpoint stream --output results.json
+"""
+from typing import List
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from benchmarks.fakes import PROFILES, FakeUpstreams, LocalServer, get_profile
+from benchmarks.harness import bootstrap, configure_environment, format_table, run_scenario
+from benchmarks.scenarios import SCENARIOS, llm_scripts
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--endpoint", choices=["chat", "stream", "both"], default="both")
+    parser.add_argument("--profile", choices=list(PROFILES), default="realistic",
+                        help="Upstream latency/error/payload profile")
+    parser.add_argument("--requests", type=int, default=20, help="Measured requests per scenario and endpoint")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per scenario and endpoint")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for fake latencies and injected errors")
+    parser.add_argument("--database-url", default=None, help="Database for the service (default: temporary SQLite)")
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    scenarios = [SCENARIOS[name] for name in names]
+    endpoints = ["chat", "stream"] if args.endpoint == "both" else [args.endpoint]
+    profile = get_profile(args.profile)
+
+    upstreams = FakeUpstreams(profile, llm_scripts(scenarios), seed=args.seed).start()
+    workdir = Path(tempfile.mkdtemp(prefix="culi-bench-"))
+    configure_environment(upstreams.env(), workdir, args.database_url)
+
+    # Settings are read on import: only now may the service be loaded
+    from app.db.session import init_db
+    from app.main import app
+
+    init_db()
+    service = LocalServer(app, "culi").start()
+    try:
+        session = bootstrap(service.url, upstreams.kiotviet_url)
+        summaries = []
+        for scenario in scenarios:
+            for endpoint in endpoints:
+                upstreams.reset_calls()
+                result = asyncio.run(run_scenario(
+                    service.url, session, scenario, endpoint,
+                    requests=args.requests, concurrency=args.concurrency, warmup=args.warmup,
+                ))
+                summary = result.summary()
+                summary["upstream_calls"] = {name: calls for name, calls in upstreams.calls().items() if calls}
+                summaries.append(summary)
+                print(f"  {scenario.name}/{endpoint}: p50 {summary['p50_ms']} ms, "
+                      f"p95 {summary['p95_ms']} ms, {summary['errors']} errors", file=sys.stderr)
+    finally:
+        service.stop()
+        upstreams.stop()
+
+    print(f"\nProfile: {profile.name}, concurrency {args.concurrency}, {args.requests} requests per row\n")
+    print(format_table(summaries))
+    if args.output:
+        args.output.write_text(json.dumps({
+            "profile": profile.name,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "results": summaries,
+        }, indent=2, ensure_ascii=False))
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
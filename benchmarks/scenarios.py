@@ -0,0 +1,114 @@
+"""Benchmark scenarios: one per intent, each with the LLM replies the fake OpenRouter scripts for it."""
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ScenarioMessage:
+    """A user message and the replies the fake LLM gives for it."""
+    text: str
+    classification: Dict[str, Any]  # Intent router output
+    plan: Optional[Dict[str, Any]] = None  # Plan output (app_plan)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Messages sent round-robin for one intent."""
+    name: str
+    intent: str  # Intent the run is expected to take
+    messages: List[ScenarioMessage] = field(default_factory=list)
+    needs_app: bool = False  # Needs the KiotViet connection
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "general_qa": Scenario(
+        name="general_qa",
+        intent="general_qa",
+        messages=[
+            ScenarioMessage(
+                "Chào Culi, bạn có thể giúp gì cho cửa hàng cà phê của tôi?",
+                {"intent": "general_qa", "reasoning": "Chào hỏi chung"},
+            ),
+            ScenarioMessage(
+                "Làm sao để quản lý dòng tiền tốt hơn cho quán nhỏ?",
+                {"intent": "general_qa", "reasoning": "Câu hỏi quản lý chung"},
+            ),
+        ],
+    ),
+    # No knowledge base index in the benchmark: always falls back to Google CSE + page fetching
+    "tax_qa": Scenario(
+        name="tax_qa",
+        intent="tax_qa",
+        messages=[
+            ScenarioMessage(
+                "Hộ kinh doanh bán cà phê phải nộp thuế GTGT bao nhiêu phần trăm?",
+                {"intent": "tax_qa", "reasoning": "Hỏi thuế suất", "needs_web": True},
+            ),
+            ScenarioMessage(
+                "Thời hạn nộp tờ khai thuế theo quý là khi nào?",
+                {"intent": "tax_qa", "reasoning": "Hỏi thời hạn kê khai", "needs_web": True},
+            ),
+        ],
+    ),
+    "app_read": Scenario(
+        name="app_read",
+        intent="app_read",
+        needs_app=True,
+        messages=[
+            # Templated answer (no answer LLM call)
+            ScenarioMessage(
+                "Doanh thu hôm nay của cửa hàng là bao nhiêu?",
+                {"intent": "app_read", "reasoning": "Hỏi doanh thu", "needs_app": True,
+                 "read": {"kind": "SUMMARY_REVENUE", "filters": {}}},
+            ),
+            # Answered by the LLM from the invoice list
+            ScenarioMessage(
+                "Liệt kê các hóa đơn gần đây của khách Nguyễn Văn An",
+                {"intent": "app_read", "reasoning": "Xem hóa đơn", "needs_app": True,
+                 "read": {"kind": "LIST_INVOICES", "filters": {"customer": "Nguyễn Văn An"}}},
+            ),
+        ],
+    ),
+    # Plans are auto-approved in the benchmark, so every step runs against the fake KiotViet API
+    "app_plan": Scenario(
+        name="app_plan",
+        intent="app_plan",
+        needs_app=True,
+        messages=[
+            ScenarioMessage(
+                "Tạo nhóm hàng Cà phê đặc biệt và thêm sản phẩm Cà phê muối giá 35000 đồng",
+                {"intent": "app_plan", "reasoning": "Tạo dữ liệu", "needs_app": True, "needs_plan": True},
+                plan={
+                    "description": "Tạo nhóm hàng và sản phẩm mới",
+                    "steps": [
+                        {"id": 1, "action": "CREATE_CATEGORY", "params": {"category_name": "Cà phê đặc biệt"}},
+                        {"id": 2, "action": "CREATE_PRODUCT", "params": {
+                            "name": "Cà phê muối", "code": "CFMUOI", "basePrice": 35000, "unit": "ly",
+                        }},
+                    ],
+                },
+            ),
+            ScenarioMessage(
+                "Thêm khách hàng Lê Thị Hoa, số điện thoại 0901234567",
+                {"intent": "app_plan", "reasoning": "Thêm khách hàng", "needs_app": True, "needs_plan": True},
+                plan={
+                    "description": "Thêm khách hàng mới",
+                    "steps": [
+                        {"id": 1, "action": "CREATE_CUSTOMER", "params": {
+                            "name": "Lê Thị Hoa", "contactNumber": "0901234567",
+                        }},
+                    ],
+                },
+            ),
+        ],
+    ),
+}
+
+
+def llm_scripts(scenarios: List[Scenario]) -> Dict[str, Dict[str, Any]]:
+    """Fake OpenRouter scripts (message -> scripted replies) for the given scenarios."""
+    scripts = {}
+    for scenario in scenarios:
+        for message in scenario.messages:
+            scripts[message.text] = {"intent": message.classification, "plan": message.plan}
+    return scripts
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Build the local tax/accounting knowledge base index.
+
+Reads every .txt, .md and .html document under a source directory, splits them
+into chunks and writes a new versioned BM25 index (optionally with embeddings).
+The CURRENT pointer is switched to the new version, and running servers pick it
+up on the next tax_qa question.
+
+Usage:
+    python scripts/build_kb_index.py --source docs/kb
+    python scripts/build_kb_index.py --source docs/kb --embedding-model openai/text-embedding-3-small
+    python scripts/build_kb_index.py --list
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.memory.knowledge_base import build_index, KnowledgeBaseIndex, CURRENT_POINTER
+
+
+def list_versions(index_dir: str):
+    """Print available index versions."""
+    base = Path(index_dir)
+    pointer = base / CURRENT_POINTER
+    current = pointer.read_text(encoding="utf-8").strip() if pointer.exists() else None
+    versions = sorted(p.name for p in base.iterdir() if p.is_dir()) if base.exists() else []
+    if not versions:
+        print(f"No index versions in {base}")
+        return
+    for version in versions:
+        marker = " (current)" if version == current else ""
+        print(f"  {version}{marker}")
+
+
+def main():
+    """Main function."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build local knowledge base index")
+    parser.add_argument("--source", type=str, help="Directory of source documents")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=settings.kb_index_dir,
+        help=f"Index directory (default: {settings.kb_index_dir})"
+    )
+    parser.add_argument("--chunk-size", type=int, default=1200, help="Chunk size in characters")
+    parser.add_argument("--overlap", type=int, default=200, help="Chunk overlap in characters")
+    parser.add_argument(
+        "--embedding-model",
+        type=str,
+        default=settings.kb_embedding_model,
+        help="Embedding model for hybrid retrieval (default: BM25 only)"
+    )
+    parser.add_argument("--list", action="store_true", help="List index versions and exit")
+    parser.add_argument("--activate", type=str, help="Point CURRENT at an existing version and exit")
+
+    args = parser.parse_args()
+
+    if args.list:
+        list_versions(args.output)
+        return
+
+    if args.activate:
+        index = KnowledgeBaseIndex.load(args.output, args.activate)
+        if not index:
+            print(f"❌ Version not found: {args.activate}")
+            sys.exit(1)
+        (Path(args.output) / CURRENT_POINTER).write_text(args.activate, encoding="utf-8")
+        print(f"✅ Activated version {args.activate} ({len(index)} chunks)")
+        return
+
+    if not args.source:
+        parser.error("--source is required")
+
+    if not Path(args.source).is_dir():
+        print(f"❌ Source directory not found: {args.source}")
+        sys.exit(1)
+
+    index = build_index(
+        args.source,
+        chunk_size=args.chunk_size,
+        overlap=args.overlap,
+        embedding_model=args.embedding_model,
+    )
+    if not len(index):
+        print(f"❌ No documents found in {args.source}")
+        sys.exit(1)
+
+    version_dir = index.save(args.output)
+    print(f"✅ Index {index.version} saved to: {version_dir} ({len(index)} chunks)")
+
+
+if __name__ == "__main__":
+    main()
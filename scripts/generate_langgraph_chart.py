@@ -40,6 +40,7 @@ def _generate_mermaid_from_structure():
         "    START([Start])",
         "    intent_router[intent_router]",
         "    context[context]",
+        "    kb_search[kb_search]",
         "    web_search[web_search]",
         "    app_read[app_read]",
         "    app_plan[app_plan]",
@@ -51,7 +52,7 @@ def _generate_mermaid_from_structure():
         "",
         "    START --> intent_router",
         "    intent_router -->|general_qa| context",
-        "    intent_router -->|tax_qa| web_search",
+        "    intent_router -->|tax_qa| kb_search",
         "    intent_router -->|app_read| context",
         "    intent_router -->|app_plan| context",
         "    intent_router -->|no_app| answer",
@@ -60,6 +61,8 @@ def _generate_mermaid_from_structure():
         "    context -->|app_read| app_read",
         "    context -->|app_plan| app_plan",
         "",
+        "    kb_search -->|answer| answer",
+        "    kb_search -->|web_search| web_search",
         "    web_search --> answer",
         "    app_read --> answer",
         "    app_plan --> present_plan",
@@ -101,7 +104,9 @@ def _generate_ascii_from_structure():
         "      │       ├─> [answer] → answer",
         "      │       ├─> [app_read] → app_read → answer",
         "      │       └─> [app_plan] → app_plan → present_plan",
-        "      ├─> [tax_qa] → web_search → answer",
+        "      ├─> [tax_qa] → kb_search",
+        "      │       ├─> [answer] → answer",
+        "      │       └─> [web_search] → web_search → answer",
         "      ├─> [app_read] → context → app_read → answer",
         "      ├─> [app_plan] → context → app_plan → present_plan",
         "      └─> [no_app] → answer",
@@ -156,7 +161,7 @@ def generate_png(output_path: str = "docs/langgraph_chart.png"):
                 # Create graph from structure
                 G = DiGraph()
                 nodes = [
-                    "intent_router", "context", "web_search", "app_read",
+                    "intent_router", "context", "kb_search", "web_search", "app_read",
                     "app_plan", "present_plan", "execute_plan", "answer", "error"
                 ]
                 for node in nodes:
@@ -164,7 +169,9 @@ def generate_png(output_path: str = "docs/langgraph_chart.png"):
                 
                 edges = [
                     ("intent_router", "context"),
-                    ("intent_router", "web_search"),
+                    ("intent_router", "kb_search"),
+                    ("kb_search", "answer"),
+                    ("kb_search", "web_search"),
                     ("intent_router", "answer"),
                     ("context", "answer"),
                     ("context", "app_read"),
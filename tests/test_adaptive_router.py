@@ -0,0 +1,28 @@
+"""Tests for the persisted stats of the adaptive model router."""
+import json
+from app.core.adaptive_router import AdaptiveModelRouter
+
+
+def test_processes_merge_their_stats(tmp_path):
+    path = str(tmp_path / "stats.json")
+    # Two workers started from the same (empty) file
+    first, second = AdaptiveModelRouter(path), AdaptiveModelRouter(path)
+    for _ in range(3):
+        first.stats("answer", "a").record(0.5)
+    second.stats("answer", "a").record(1.0, success=False)
+    second.stats("answer", "b").record(2.0)
+    first.save()
+    second.save()
+    first.save()  # Nothing new since the last save
+
+    saved = {item["model"]: item for item in json.loads((tmp_path / "stats.json").read_text())}
+    assert saved["a"]["calls"] == 4
+    assert saved["a"]["errors"] == 1
+    assert saved["a"]["latencies"] == [0.5, 0.5, 0.5]
+    assert saved["b"]["calls"] == 1
+
+    restarted = AdaptiveModelRouter(path)
+    assert restarted.stats("answer", "a").calls == 4
+    restarted.stats("answer", "a").record(0.5)
+    restarted.save()
+    assert json.loads((tmp_path / "stats.json").read_text())[0]["calls"] == 5
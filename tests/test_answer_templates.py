@@ -0,0 +1,77 @@
+"""Tests for the templated answers of simple app reads."""
+from app.graph.answer_templates import render_template_answer
+
+
+def answer(kind, params, app_data, question):
+    return render_template_answer({
+        "intent": "app_read",
+        "read_intent": {"kind": kind, "params": params},
+        "app_data": app_data,
+        "user_input": question,
+    })
+
+
+def test_count_describes_applied_filters():
+    text = answer(
+        "LIST_INVOICES",
+        {"customer": "Anh Tuấn", "branch": "Quận 1", "from_date": "2026-10-01", "to_date": "2026-10-19"},
+        {"invoices": [], "total": 12},
+        "Có bao nhiêu hóa đơn của anh Tuấn ở chi nhánh Quận 1 tháng này?",
+    )
+    assert text == "Có **12** hóa đơn của khách hàng Anh Tuấn tại chi nhánh Quận 1 từ 01/10/2026 đến 19/10/2026."
+
+
+def test_product_count_with_name():
+    text = answer("LIST_PRODUCTS", {"name": "sữa"}, {"products": [], "total": 7}, "mấy sản phẩm sữa?")
+    assert text == "Có **7** sản phẩm khớp với \"sữa\"."
+
+
+def test_product_count_with_unapplied_filters_goes_to_llm():
+    # Products are not filtered by branch or date: the total is store-wide
+    params = {"branch": "Quận 1", "from_date": "2026-10-01", "to_date": "2026-10-19"}
+    assert answer("LIST_PRODUCTS", params, {"products": [], "total": 850}, "bao nhiêu sản phẩm?") is None
+
+
+def test_customer_count_with_branch_goes_to_llm():
+    params = {"branch": "Quận 1"}
+    assert answer("LIST_CUSTOMERS", params, {"customers": [], "total": 4000}, "bao nhiêu khách hàng?") is None
+
+
+def test_customer_count_uses_the_customer_as_name():
+    text = answer("LIST_CUSTOMERS", {"customer": "Lan"}, {"customers": [], "total": 3}, "có mấy khách tên Lan")
+    assert text == "Có **3** khách hàng khớp với \"Lan\"."
+    # Only one of customer/name is sent to the API
+    params = {"customer": "Lan", "name": "Hoa"}
+    assert answer("LIST_CUSTOMERS", params, {"customers": [], "total": 3}, "bao nhiêu khách?") is None
+
+
+def test_invoice_count_with_name_goes_to_llm():
+    assert answer("LIST_INVOICES", {"name": "sữa"}, {"invoices": [], "total": 5}, "bao nhiêu hóa đơn sữa?") is None
+
+
+def test_count_needs_a_count_question():
+    assert answer("LIST_ORDERS", {}, {"orders": [], "total": 5}, "danh sách đơn hàng") is None
+    # "máy" (machine) is not "mấy"
+    assert answer("LIST_PRODUCTS", {}, {"products": [], "total": 5}, "máy pha cà phê") is None
+
+
+def test_revenue():
+    data = {"revenue": 1250000, "count": 3, "total_invoices": 3, "paid": 1000000, "outstanding": 250000}
+    text = answer("SUMMARY_REVENUE", {"branch": "Quận 1"}, data, "doanh thu chi nhánh Quận 1")
+    assert text.splitlines() == [
+        "Doanh thu tại chi nhánh Quận 1: **1.250.000 ₫** (3 hóa đơn).",
+        "- Đã thu: 1.000.000 ₫",
+        "- Còn phải thu: 250.000 ₫",
+    ]
+
+
+def test_revenue_goes_to_llm_when_partial_or_unfiltered():
+    data = {"revenue": 1250000, "count": 100, "total_invoices": 250}
+    assert answer("SUMMARY_REVENUE", {}, data, "doanh thu") is None
+    data = {"revenue": 1250000, "count": 3, "total_invoices": 3}
+    assert answer("SUMMARY_REVENUE", {"name": "sữa"}, data, "doanh thu sữa") is None
+
+
+def test_open_ended_questions_go_to_llm():
+    data = {"revenue": 1250000, "count": 3, "total_invoices": 3}
+    assert answer("SUMMARY_REVENUE", {}, data, "Phân tích doanh thu tháng này") is None
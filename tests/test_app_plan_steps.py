@@ -0,0 +1,38 @@
+"""Tests for the streamed plan step detection in app_plan_node."""
+import importlib
+from app.utils.json_repair import IncrementalJSONParser
+
+# app.graph.nodes re-exports node functions under the module names
+app_plan_node = importlib.import_module("app.graph.nodes.app_plan_node")
+
+
+def completed(text):
+    return app_plan_node._completed_steps(IncrementalJSONParser().feed(text))
+
+
+def test_no_steps_before_the_array():
+    assert completed("") == []
+    assert completed('{"summary": "Tạo') == []
+    assert completed('{"steps": [') == []
+
+
+def test_streaming_step_is_not_completed():
+    assert completed('{"steps": [{"id": 1, "action": "CREATE_PRODUCT"}, {"id": 2, "act') == [
+        {"id": 1, "action": "CREATE_PRODUCT"},
+    ]
+
+
+def test_last_step_waits_for_the_array_to_close():
+    # While the array is open its last element is held back, even if it looks closed
+    assert completed('{"steps": [{"id": 1}, {"id": 2}') == [{"id": 1}]
+    assert completed('{"steps": [{"id": 1}, {"id": 2}]') == [{"id": 1}, {"id": 2}]
+    assert completed('{"steps": [{"id": 1}, {"id": 2}]}') == [{"id": 1}, {"id": 2}]
+
+
+def test_bare_array_of_steps():
+    assert completed('[{"id": 1}, {"id": 2') == [{"id": 1}]
+    assert completed('[{"id": 1}, {"id": 2}]') == [{"id": 1}, {"id": 2}]
+
+
+def test_non_object_steps_are_skipped():
+    assert completed('{"steps": [{"id": 1}, "oops", {"id": 2}]}') == [{"id": 1}, {"id": 2}]
@@ -0,0 +1,64 @@
+"""Tests for the per-workspace connected app cache."""
+import time
+import pytest
+from app.core.config import settings
+from app.domain.apps.config_cache import MISSING, WorkspaceAppCache
+
+APP = {"app_id": "kiotviet", "name": "KiotViet"}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(settings, "connected_app_cache_ttl_s", 60.0)
+    return WorkspaceAppCache()
+
+
+def test_get_after_set(cache):
+    assert cache.get(1) is MISSING
+    cache.set(1, APP, cache.generation(1))
+    assert cache.get(1) == APP
+    assert cache.get(2) is MISSING
+
+
+def test_workspace_without_app_is_cached_as_none(cache):
+    cache.set(1, None, cache.generation(1))
+    assert cache.get(1) is None
+
+
+def test_invalidate_drops_the_entry(cache):
+    cache.set(1, APP, cache.generation(1))
+    cache.set(2, APP, cache.generation(2))
+    cache.invalidate(1)
+    assert cache.get(1) is MISSING
+    assert cache.get(2) == APP
+
+
+def test_set_after_concurrent_invalidation_is_ignored(cache):
+    generation = cache.generation(1)  # Read before resolving
+    cache.invalidate(1)               # A write lands while resolving
+    cache.set(1, APP, generation)
+    assert cache.get(1) is MISSING
+    cache.set(1, APP, cache.generation(1))
+    assert cache.get(1) == APP
+
+
+def test_clear_invalidates_in_flight_resolutions(cache):
+    cache.set(1, APP, cache.generation(1))
+    generation = cache.generation(1)
+    cache.clear()
+    assert cache.get(1) is MISSING
+    cache.set(1, APP, generation)
+    assert cache.get(1) is MISSING
+
+
+def test_expired_entry_is_missing(cache, monkeypatch):
+    cache.set(1, APP, cache.generation(1))
+    clock = time.monotonic() + 61
+    monkeypatch.setattr("app.domain.apps.config_cache.time.monotonic", lambda: clock)
+    assert cache.get(1) is MISSING
+
+
+def test_ttl_zero_disables_caching(cache, monkeypatch):
+    monkeypatch.setattr(settings, "connected_app_cache_ttl_s", 0)
+    cache.set(1, APP, cache.generation(1))
+    assert cache.get(1) is MISSING
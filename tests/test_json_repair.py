@@ -0,0 +1,79 @@
+"""Tests for app.utils.json_repair."""
+import json
+import pytest
+from app.utils.json_repair import IncrementalJSONParser, TruncatedJSONError, parse_json, repair_json
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Sure! {"a": 1} Hope this helps.', {"a": 1}),
+    ('{"a": 1,}', {"a": 1}),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}),
+    ("{'a': 'x', b: True, c: None}", {"a": "x", "b": True, "c": None}),
+    ('{"a": 1, // comment\n "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": "line\nbreak"}', {"a": "line\nbreak"}),
+    ("[1, 2, 3]", [1, 2, 3]),
+])
+def test_parse_json_repairs_common_mistakes(text, expected):
+    assert parse_json(text) == expected
+
+
+def test_truncated_output_is_closed():
+    assert parse_json('{"steps": [{"id": 1}, {"id": 2, "name": "Cà ph') == {
+        "steps": [{"id": 1}, {"id": 2, "name": "Cà ph"}],
+    }
+
+
+def test_truncated_literal_is_completed():
+    assert parse_json('{"ok": tru') == {"ok": True}
+
+
+def test_truncated_output_can_be_rejected():
+    with pytest.raises(TruncatedJSONError):
+        parse_json('{"steps": [{"id": 1}', allow_truncated=False)
+    assert parse_json('{"steps": [{"id": 1}]}', allow_truncated=False) == {"steps": [{"id": 1}]}
+
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        parse_json("no json here")
+    assert repair_json("no json here") == ""
+
+
+@pytest.mark.parametrize("text", [
+    'Here is [the] plan: {"steps": []}',
+    'See [the docs](https://example.com) for details: {"steps": []}',
+])
+def test_bracket_in_prose_is_not_the_root(text):
+    assert parse_json(text) == {"steps": []}
+
+
+def test_array_root_is_kept():
+    assert parse_json('Result: ["a", "b"]') == ["a", "b"]
+    assert parse_json("[true, x]") == [True, "x"]
+
+
+def test_incremental_parser_reports_progress():
+    parser = IncrementalJSONParser()
+    assert parser.value() is None
+    assert not parser.truncated
+
+    parser.feed('{"steps": [{"id": 1}, {"id"')
+    assert parser.truncated
+    assert parser.depth == 3
+    assert parser.value() == {"steps": [{"id": 1}, {"id": None}]}
+
+    parser.feed(': 2}]} trailing text')
+    assert parser.done
+    assert not parser.truncated
+    assert json.loads(parser.text()) == {"steps": [{"id": 1}, {"id": 2}]}
+
+
+def test_chunked_feed_matches_whole_feed():
+    text = "```json\n{'a': [1, 2, {b: 'x'}], c: False}\n```"
+    parser = IncrementalJSONParser()
+    for ch in text:
+        parser.feed(ch)
+    assert parser.text() == repair_json(text)
+    assert parser.value() == {"a": [1, 2, {"b": "x"}], "c": False}
@@ -0,0 +1,138 @@
+"""Tests for the KiotViet adapter's filter pushdown and invoice pagination."""
+from datetime import datetime
+import pytest
+from app.core.config import settings
+from app.domain.apps.base import AppReadIntent
+from app.domain.apps.kiotviet import adapter as kiotviet_adapter
+from app.domain.apps.kiotviet.adapter import KiotVietAdapter
+
+
+class StubClient:
+    """Stands in for KiotVietApiClient, recording every call."""
+
+    def __init__(self, customers=None, branches=None, invoice_total=0):
+        self.calls = []
+        self.customers = customers or []
+        self.branches = branches or []
+        self.invoice_total = invoice_total
+
+    async def get_products(self, **kwargs):
+        self.calls.append(("get_products", kwargs))
+        return {"data": [], "total": 0}
+
+    async def get_customers(self, **kwargs):
+        self.calls.append(("get_customers", kwargs))
+        return {"data": self.customers, "total": len(self.customers)}
+
+    async def get_branches(self):
+        self.calls.append(("get_branches", {}))
+        return {"data": self.branches}
+
+    async def get_orders(self, **kwargs):
+        self.calls.append(("get_orders", kwargs))
+        return {"data": [], "total": 0}
+
+    async def get_invoices(self, **kwargs):
+        self.calls.append(("get_invoices", kwargs))
+        offset = kwargs.get("current_item", 0)
+        count = max(0, min(kwargs.get("page_size", 100), self.invoice_total - offset))
+        return {"data": [{"id": offset + i} for i in range(count)], "total": self.invoice_total}
+
+    def called(self, method):
+        return [kwargs for name, kwargs in self.calls if name == method]
+
+
+def fetch(client, kind, **params):
+    return KiotVietAdapter()._fetch_filtered(client, AppReadIntent(kind=kind, params=params))
+
+
+@pytest.mark.asyncio
+async def test_product_name_is_pushed_down():
+    client = StubClient()
+    await fetch(client, "LIST_PRODUCTS", name="sữa", page_size=20)
+    assert client.called("get_products") == [{"name": "sữa", "page_size": 20}]
+
+
+@pytest.mark.asyncio
+async def test_customer_list_filters_by_name():
+    client = StubClient()
+    await fetch(client, "LIST_CUSTOMERS", customer="Lan", page_size=20)
+    assert client.called("get_customers") == [{"name": "Lan", "page_size": 20}]
+
+
+@pytest.mark.asyncio
+async def test_customer_and_branch_resolve_to_ids():
+    client = StubClient(
+        customers=[{"id": 7}, {"id": 9}],
+        branches=[{"id": 1, "branchName": "Chi nhánh Quận 1"}, {"id": 2, "branchName": "Thủ Đức"}],
+    )
+    await fetch(client, "LIST_ORDERS", customer="KH000123", branch="quan 1")
+    assert client.called("get_customers")[0]["code"] == "KH000123"
+    orders = client.called("get_orders")[0]
+    assert orders["customer_ids"] == [7, 9]
+    assert orders["branch_ids"] == [1]
+
+
+@pytest.mark.asyncio
+async def test_customer_lookup_by_phone():
+    client = StubClient(customers=[{"id": 7}])
+    await fetch(client, "LIST_INVOICES", customer="0901 234 567")
+    assert client.called("get_customers")[0]["contact_number"] == "0901 234 567"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{"customer": "Không Ai"}, {"branch": "Hà Nội"}])
+async def test_unmatched_customer_or_branch_returns_nothing(params):
+    client = StubClient(branches=[{"id": 1, "branchName": "Quận 1"}])
+    result = await fetch(client, "LIST_INVOICES", **params)
+    assert result == {"data": [], "total": 0}
+    assert client.called("get_invoices") == []
+
+
+@pytest.mark.asyncio
+async def test_invoice_dates_filter_purchase_date():
+    client = StubClient()
+    await fetch(client, "LIST_INVOICES", from_date="2026-10-01", to_date="2026-10-19")
+    invoices = client.called("get_invoices")[0]
+    assert invoices["from_purchase_date"] == datetime(2026, 10, 1)
+    assert invoices["to_purchase_date"] == datetime(2026, 10, 19, 23, 59, 59)
+    assert "from_date" not in invoices
+
+
+@pytest.mark.asyncio
+async def test_order_dates_filter_created_date():
+    client = StubClient()
+    await fetch(client, "LIST_ORDERS", from_date="2026-10-01")
+    assert client.called("get_orders")[0]["from_date"] == datetime(2026, 10, 1)
+
+
+@pytest.mark.asyncio
+async def test_revenue_fetches_every_invoice_page():
+    client = StubClient(invoice_total=250)
+    intent = AppReadIntent(kind="SUMMARY_REVENUE", params={"page_size": 100})
+    result = await KiotVietAdapter()._fetch_all_invoices(client, intent)
+    assert len(result["data"]) == 250
+    assert result["total"] == 250
+    offsets = sorted(kwargs.get("current_item", 0) for kwargs in client.called("get_invoices"))
+    assert offsets == [0, 100, 200]
+
+
+@pytest.mark.asyncio
+async def test_revenue_pages_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "kiotviet_summary_max_invoices", 250)
+    client = StubClient(invoice_total=10_000)
+    intent = AppReadIntent(kind="SUMMARY_REVENUE", params={})
+    result = await KiotVietAdapter()._fetch_all_invoices(client, intent)
+    assert len(result["data"]) == 250
+    assert result["total"] == 10_000
+    assert len(client.called("get_invoices")) == 3
+    assert all(kwargs["page_size"] == kiotviet_adapter.INVOICE_PAGE_SIZE for kwargs in client.called("get_invoices"))
+
+
+@pytest.mark.asyncio
+async def test_revenue_resolves_names_once():
+    client = StubClient(customers=[{"id": 7}], invoice_total=300)
+    intent = AppReadIntent(kind="SUMMARY_REVENUE", params={"customer": "Lan"})
+    await KiotVietAdapter()._fetch_all_invoices(client, intent)
+    assert len(client.called("get_customers")) == 1
+    assert all(kwargs["customer_ids"] == [7] for kwargs in client.called("get_invoices"))
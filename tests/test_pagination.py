@@ -0,0 +1,93 @@
+"""Tests for keyset cursors and MessageRepository.get_page."""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.models.message import Message, MessageSender
+from app.repositories.message_repo import AsyncMessageRepository, MessageRepository
+from app.utils.pagination import decode_cursor, encode_cursor
+
+START = datetime(2026, 10, 19, 8, 0, 0)
+
+
+def _messages(count):
+    # Pairs share a timestamp, so the id breaks ties
+    return [
+        Message(
+            id=i + 1,
+            conversation_id=1,
+            sender=MessageSender.USER if i % 2 == 0 else MessageSender.ASSISTANT,
+            content=f"m{i + 1}",
+            created_at=START + timedelta(seconds=i // 2),
+        )
+        for i in range(count)
+    ] + [Message(id=100, conversation_id=2, sender=MessageSender.USER, content="other", created_at=START)]
+
+
+@pytest.fixture
+def sqlite_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(_messages(7))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 19, 8, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(START, 1)[:-3]])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def _walk(get_page):
+    pages, before = [], None
+    while True:
+        rows, has_more = get_page(before)
+        pages.append([row.content for row in rows])
+        if not has_more:
+            return pages
+        before = decode_cursor(encode_cursor(rows[0].created_at, rows[0].id))
+
+
+def test_get_page_walks_back_in_chronological_pages(sqlite_db):
+    pages = _walk(lambda before: MessageRepository.get_page(sqlite_db, 1, limit=3, before=before))
+    assert pages == [["m5", "m6", "m7"], ["m2", "m3", "m4"], ["m1"]]
+
+
+def test_get_page_exact_fit_has_no_more(sqlite_db):
+    rows, has_more = MessageRepository.get_page(sqlite_db, 1, limit=7)
+    assert [row.content for row in rows] == [f"m{i}" for i in range(1, 8)]
+    assert not has_more
+
+
+@pytest.mark.asyncio
+async def test_async_get_page_matches_sync(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'messages.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        db.add_all(_messages(7))
+        await db.commit()
+        pages, before = [], None
+        while True:
+            rows, has_more = await AsyncMessageRepository.get_page(db, 1, limit=3, before=before)
+            pages.append([row.content for row in rows])
+            if not has_more:
+                break
+            before = (rows[0].created_at, rows[0].id)
+    await engine.dispose()
+    assert pages == [["m5", "m6", "m7"], ["m2", "m3", "m4"], ["m1"]]
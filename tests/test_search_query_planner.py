@@ -0,0 +1,47 @@
+"""Tests for the web search query planner."""
+import pytest
+from app.core.config import settings
+from app.graph.tools.search_query_planner import extract_key_terms, plan_search_queries
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Cho tôi hỏi hộ kinh doanh có phải nộp thuế không?", "hộ kinh doanh nộp thuế"),
+    ("Thông tư 80/2021/TT-BTC là gì vậy?", "thông tư 80/2021/tt-btc"),
+    ("mức thuế suất GTGT như thế nào ạ", "mức thuế suất gtgt"),
+])
+def test_filler_is_removed(text, expected):
+    assert extract_key_terms(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("sản phẩm không chịu thuế", "sản phẩm không chịu thuế"),
+    ("hàng hóa không chịu thuế có được khấu trừ hay không?", "hàng hóa không chịu thuế khấu trừ"),
+])
+def test_negation_is_kept(text, expected):
+    # "không" is dropped only as a trailing question tag
+    assert extract_key_terms(text) == expected
+
+
+@pytest.mark.asyncio
+async def test_plan_uses_key_terms(monkeypatch):
+    monkeypatch.setattr(settings, "web_search_query_rewrite", False)
+    queries = await plan_search_queries("Cho tôi hỏi thuế môn bài năm 2026 là bao nhiêu?")
+    assert queries == ["thuế môn bài năm 2026"]
+
+
+@pytest.mark.asyncio
+async def test_plan_falls_back_to_raw_input(monkeypatch):
+    monkeypatch.setattr(settings, "web_search_query_rewrite", False)
+    assert await plan_search_queries("là gì vậy?") == ["là gì vậy?"]
+
+
+@pytest.mark.asyncio
+async def test_follow_up_adds_previous_topic(monkeypatch):
+    monkeypatch.setattr(settings, "web_search_query_rewrite", False)
+    messages = [
+        {"role": "user", "content": "Thuế suất GTGT của dịch vụ ăn uống?"},
+        {"role": "assistant", "content": "..."},
+        {"role": "user", "content": "còn hộ kinh doanh thì sao?"},
+    ]
+    queries = await plan_search_queries("còn hộ kinh doanh thì sao?", messages)
+    assert queries == ["hộ kinh doanh", "thuế suất gtgt dịch vụ ăn uống hộ kinh doanh"]
@@ -0,0 +1,91 @@
+"""Tests for app.utils.vn_date_parser."""
+from datetime import date
+import pytest
+from app.utils.vn_date_parser import find_date_ranges, fiscal_quarter_range, parse_date_range
+
+TODAY = date(2026, 10, 19)  # A Monday
+
+
+def parse(text, fiscal_start_month=1):
+    return parse_date_range(text, today=TODAY, fiscal_start_month=fiscal_start_month)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("doanh thu hôm nay", (date(2026, 10, 19), date(2026, 10, 19))),
+    ("doanh thu hom qua", (date(2026, 10, 18), date(2026, 10, 18))),
+    ("7 ngày qua", (date(2026, 10, 13), date(2026, 10, 19))),
+    ("tuần này", (date(2026, 10, 19), date(2026, 10, 25))),
+    ("tuần trước", (date(2026, 10, 12), date(2026, 10, 18))),
+    ("tháng này", (date(2026, 10, 1), date(2026, 10, 31))),
+    ("tháng trước", (date(2026, 9, 1), date(2026, 9, 30))),
+    ("tháng 2", (date(2026, 2, 1), date(2026, 2, 28))),
+    ("tháng 9/2025", (date(2025, 9, 1), date(2025, 9, 30))),
+    ("tháng 9 năm 2025", (date(2025, 9, 1), date(2025, 9, 30))),
+    ("năm 2025 tháng 9", (date(2025, 9, 1), date(2025, 9, 30))),
+    ("quý 3", (date(2026, 7, 1), date(2026, 9, 30))),
+    ("quý III năm ngoái", (date(2025, 7, 1), date(2025, 9, 30))),
+    ("năm ngoái", (date(2025, 1, 1), date(2025, 12, 31))),
+    ("từ 1/9 đến 15/9", (date(2026, 9, 1), date(2026, 9, 15))),
+    ("từ ngày 1/10", (date(2026, 10, 1), date(2026, 10, 19))),
+    ("ngày 5/9", (date(2026, 9, 5), date(2026, 9, 5))),
+    ("ngày 5/9 năm 2024", (date(2024, 9, 5), date(2024, 9, 5))),
+    ("doanh thu 2 tháng trước", (date(2026, 8, 1), date(2026, 8, 31))),
+    ("tháng trước nữa", (date(2026, 8, 1), date(2026, 8, 31))),
+    ("tuần trước nữa", (date(2026, 10, 5), date(2026, 10, 11))),
+    ("3 ngày trước", (date(2026, 10, 16), date(2026, 10, 16))),
+    ("3 tuần qua", (date(2026, 9, 29), date(2026, 10, 19))),
+    ("2 tháng gần đây", (date(2026, 8, 20), date(2026, 10, 19))),
+    ("quý trước nữa", (date(2026, 4, 1), date(2026, 6, 30))),
+    ("năm trước nữa", (date(2024, 1, 1), date(2024, 12, 31))),
+])
+def test_single_period(text, expected):
+    assert parse(text) == expected
+
+
+def test_future_period_without_year_means_last_year():
+    assert parse("tháng 12") == (date(2025, 12, 1), date(2025, 12, 31))
+    assert parse_date_range("quý 4", today=date(2026, 2, 1), fiscal_start_month=1) == (
+        date(2025, 10, 1), date(2025, 12, 31),
+    )
+    assert parse("quý 4") == (date(2026, 10, 1), date(2026, 12, 31))  # Current quarter
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("doanh thu từ tháng 1 đến tháng 3", (date(2026, 1, 1), date(2026, 3, 31))),
+    ("tháng 1 - 3/2026", (date(2026, 1, 1), date(2026, 3, 31))),
+    ("tháng 11 đến tháng 2", (date(2025, 11, 1), date(2026, 2, 28))),
+])
+def test_month_range(text, expected):
+    assert parse(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "hóa đơn trên 1.5 triệu",
+    "đơn hàng 20.5k",
+    "hóa đơn 1.500.000đ",
+    "ngày 31/2",
+    "sản phẩm giá 10.5",
+    "giá 1/2",
+    "danh sách sản phẩm",
+])
+def test_no_period(text):
+    assert parse(text) is None
+
+
+def test_several_periods_are_ambiguous():
+    assert parse("hôm qua và hôm nay") is None
+    assert find_date_ranges("hôm qua và hôm nay", today=TODAY) == [
+        (date(2026, 10, 18), date(2026, 10, 18)),
+        (date(2026, 10, 19), date(2026, 10, 19)),
+    ]
+    assert parse("hôm nay, hôm nay") == (TODAY, TODAY)
+
+
+def test_fiscal_quarters():
+    assert fiscal_quarter_range(1, 2026, fiscal_start_month=4) == (date(2026, 4, 1), date(2026, 6, 30))
+    assert parse("quý này", fiscal_start_month=4) == (date(2026, 10, 1), date(2026, 12, 31))
+    assert parse("quý trước", fiscal_start_month=4) == (date(2026, 7, 1), date(2026, 9, 30))
+
+
+def test_price_fractions_are_not_dates():
+    assert parse("bán 1/2 giá hôm nay") == (TODAY, TODAY)